@@ -12,11 +12,13 @@ from .manager import (
     get_cache_manager,
     close_cache_manager
 )
+from .result_store import ResultStore
 
 __all__ = [
     'CacheManager',
     'QueryCache', 
     'SchemaCache',
     'get_cache_manager',
-    'close_cache_manager'
+    'close_cache_manager',
+    'ResultStore'
 ]
@@ -0,0 +1,230 @@
+"""
+Result Store for handing query results between agents by reference
+
+The data agent writes each query result here once and passes a short handle
+along the workflow; the visualization agent reads the rows back with that
+handle instead of receiving them through the backend. Results live in Redis
+(``REDIS_URL``) with a TTL, or in a directory shared by the agents
+(``RESULT_STORE_DIR``) when Redis is unavailable. Without either, the store is
+local to one container and results are not stored, so rows travel inline.
+
+The data and visualization agents each keep an identical copy of this module
+so every container stays self-contained.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+HANDLE_PREFIX = "result:"
+_HANDLE_PATTERN = re.compile(r"^result:[0-9a-f]{32}$")
+
+
+class ResultStore:
+    """
+    Stores query results under opaque handles for other agents to fetch.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        directory: Optional[str] = None,
+        ttl_seconds: Optional[int] = None
+    ):
+        """
+        Initialize the result store.
+
+        Args:
+            redis_url: Redis connection URL (REDIS_URL if None)
+            directory: Shared directory used when Redis is unavailable (RESULT_STORE_DIR if None;
+                a local temporary directory that other agents cannot read if neither is set)
+            ttl_seconds: Seconds a stored result stays available (RESULT_STORE_TTL, default 600)
+        """
+        self.redis_url = redis_url or os.getenv("REDIS_URL")
+        # Only an explicitly configured directory can be a volume shared with the other agents
+        self.directory_shared = bool(directory or os.getenv("RESULT_STORE_DIR"))
+        self.directory = Path(
+            directory or os.getenv("RESULT_STORE_DIR", os.path.join(tempfile.gettempdir(), "ai-cfo-results"))
+        )
+        self.ttl_seconds = ttl_seconds or int(os.getenv("RESULT_STORE_TTL", "600"))
+
+        self._redis_client: Optional[redis.Redis] = None
+        self._last_sweep = 0.0
+        self._stats = {"puts": 0, "hits": 0, "misses": 0, "errors": 0, "bytes_written": 0}
+
+    async def initialize(self) -> None:
+        """Connect to Redis, falling back to the shared directory if it is unreachable."""
+        if self.redis_url:
+            try:
+                self._redis_client = redis.from_url(self.redis_url, decode_responses=True)
+                await self._redis_client.ping()
+                logger.info(f"Result store using Redis (ttl={self.ttl_seconds}s)")
+                return
+            except Exception as e:
+                logger.warning(f"Result store could not connect to Redis, using {self.directory}: {e}")
+                self._redis_client = None
+
+        if not self.directory_shared:
+            logger.warning("Result store has neither Redis nor RESULT_STORE_DIR; results are passed inline")
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Result store using directory {self.directory} (ttl={self.ttl_seconds}s)")
+
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+    @property
+    def backend(self) -> str:
+        """Storage backend in use ("redis", "directory" or "none")."""
+        if self._redis_client:
+            return "redis"
+        return "directory" if self.directory_shared else "none"
+
+    @property
+    def shared(self) -> bool:
+        """Whether stored results are readable by the other agents."""
+        return self.backend != "none"
+
+    async def put(
+        self,
+        rows: List[Dict[str, Any]],
+        columns: List[str],
+        query_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Store a query result.
+
+        Args:
+            rows: Result rows
+            columns: Result column names
+            query_id: Query the result belongs to
+
+        Returns:
+            Handle to fetch the result with, or None if it could not be stored
+            or the store is not shared with the other agents
+        """
+        if not self.shared:
+            return None
+
+        handle = f"{HANDLE_PREFIX}{uuid.uuid4().hex}"
+        payload = json.dumps({
+            "query_id": query_id,
+            "columns": columns,
+            "rows": rows,
+            "row_count": len(rows),
+            "created_at": time.time()
+        }, default=str)
+
+        try:
+            if self._redis_client:
+                await self._redis_client.setex(self._redis_key(handle), self.ttl_seconds, payload)
+            else:
+                await asyncio.to_thread(self._write_file, handle, payload)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Failed to store result for query {query_id}: {e}")
+            return None
+
+        self._stats["puts"] += 1
+        self._stats["bytes_written"] += len(payload)
+        logger.debug(f"Stored {len(rows)} rows for query {query_id} as {handle}")
+        return handle
+
+    async def get(self, handle: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a stored result.
+
+        Args:
+            handle: Handle returned by :meth:`put`
+
+        Returns:
+            Dictionary with ``columns``, ``rows``, ``row_count`` and ``query_id``,
+            or None if the handle is invalid, expired or unknown
+        """
+        if not isinstance(handle, str) or not _HANDLE_PATTERN.match(handle):
+            logger.warning(f"Invalid result handle: {handle!r}")
+            return None
+
+        if not self.shared:
+            self._stats["misses"] += 1
+            return None
+
+        try:
+            if self._redis_client:
+                payload = await self._redis_client.get(self._redis_key(handle))
+            else:
+                payload = await asyncio.to_thread(self._read_file, handle)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Failed to fetch result {handle}: {e}")
+            return None
+
+        if payload is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return json.loads(payload)
+
+    async def delete(self, handle: str) -> None:
+        """Remove a stored result before it expires."""
+        if not isinstance(handle, str) or not _HANDLE_PATTERN.match(handle):
+            return
+        if self._redis_client:
+            await self._redis_client.delete(self._redis_key(handle))
+        elif self.shared:
+            self._path(handle).unlink(missing_ok=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get result store statistics."""
+        return {"backend": self.backend, "shared": self.shared, "ttl_seconds": self.ttl_seconds, **self._stats}
+
+    @staticmethod
+    def _redis_key(handle: str) -> str:
+        return f"result_store:{handle[len(HANDLE_PREFIX):]}"
+
+    def _path(self, handle: str) -> Path:
+        return self.directory / f"{handle[len(HANDLE_PREFIX):]}.json"
+
+    def _write_file(self, handle: str, payload: str) -> None:
+        """Write a result atomically, removing expired ones at most once a minute."""
+        path = self._path(handle)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(payload, encoding="utf-8")
+        os.replace(temp_path, path)
+
+        now = time.time()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        cutoff = now - self.ttl_seconds
+        for old_path in self.directory.glob("*.json"):
+            try:
+                if old_path.stat().st_mtime < cutoff:
+                    old_path.unlink()
+            except OSError:
+                pass
+
+    def _read_file(self, handle: str) -> Optional[str]:
+        """Read a result unless it is missing or expired."""
+        path = self._path(handle)
+        try:
+            if path.stat().st_mtime < time.time() - self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
@@ -16,6 +16,8 @@ import structlog
 import aiohttp
 from pydantic import BaseModel
 
+from . import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -138,23 +140,25 @@ class TiDBMCPClient:
             
             logger.debug(f"Sending MCP request to {url}: {method}")
             
-            async with self.session.post(
-                url,
-                json=params,
-                headers={"Content-Type": "application/json"}
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    logger.debug(f"MCP request successful: {method}")
-                    return result
-                elif response.status == 404:
-                    # Try alternative endpoint structure
-                    logger.debug(f"Trying alternative endpoint structure for {method}")
-                    return await self._try_alternative_endpoint(method, params)
-                else:
-                    error_text = await response.text()
-                    logger.error(f"MCP request failed ({response.status}): {error_text}")
-                    return {"error": f"HTTP {response.status}: {error_text}"}
+            with tracing.span(f"mcp.{method}", transport="http"):
+                async with self.session.post(
+                    url,
+                    json=params,
+                    headers=tracing.inject({"Content-Type": "application/json"})
+                ) as response:
+                    tracing.collect_header(response.headers.get(tracing.TRACE_SPANS_HEADER))
+                    if response.status == 200:
+                        result = await response.json()
+                        logger.debug(f"MCP request successful: {method}")
+                        return result
+                    elif response.status == 404:
+                        # Try alternative endpoint structure
+                        logger.debug(f"Trying alternative endpoint structure for {method}")
+                        return await self._try_alternative_endpoint(method, params)
+                    else:
+                        error_text = await response.text()
+                        logger.error(f"MCP request failed ({response.status}): {error_text}")
+                        return {"error": f"HTTP {response.status}: {error_text}"}
         
         except Exception as e:
             error_msg = str(e) if e else "Unknown connection error"
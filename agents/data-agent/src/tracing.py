@@ -0,0 +1,180 @@
+"""
+Trace context propagation between the services of a query
+
+Requests carry a W3C ``traceparent`` (``00-<trace id>-<parent span id>-<flags>``)
+in a message field or HTTP header. A service continues the caller's trace with
+:func:`server_span`, times its own work with :func:`span`, forwards the context
+to downstream calls with :func:`inject` and merges the spans those calls return
+with :func:`collect`. Finished spans travel back to the caller in the
+``trace_spans`` response field (or the ``x-trace-spans`` header), so the backend
+can assemble the whole waterfall without a separate collector.
+
+The agents and the MCP server each keep an identical copy of this module so
+every container stays self-contained.
+"""
+
+import contextvars
+import json
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+TRACEPARENT = "traceparent"
+TRACE_SPANS = "trace_spans"
+TRACE_SPANS_HEADER = "x-trace-spans"
+
+# Upper bound on spans returned with one response
+MAX_EXPORTED_SPANS = 200
+
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace"""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    service: str
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        """Context to propagate to calls made within this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        end_time = self.end_time if self.end_time is not None else time.time()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "start_time": self.start_time,
+            "duration_ms": round((end_time - self.start_time) * 1000, 3),
+            "attributes": self.attributes,
+            "status": self.status
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_finished_spans: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar("finished_spans", default=None)
+
+
+def parse_traceparent(value: Any) -> Optional[Tuple[str, str]]:
+    """
+    Parse a traceparent value.
+
+    Returns:
+        Tuple of (trace id, parent span id), or None if the value is missing or malformed
+    """
+    if not isinstance(value, str):
+        return None
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+@contextmanager
+def _activate(span: Span, finished: List[Dict[str, Any]]) -> Iterator[Span]:
+    """Make a span current for the enclosed code and record it when it ends."""
+    span_token = _current_span.set(span)
+    finished_token = _finished_spans.set(finished)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.attributes["error"] = str(e)[:200]
+        raise
+    finally:
+        span.end_time = time.time()
+        finished.append(span.to_dict())
+        _current_span.reset(span_token)
+        _finished_spans.reset(finished_token)
+
+
+@contextmanager
+def server_span(name: str, traceparent: Any, service: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Continue the caller's trace while handling one request.
+
+    Yields None and records nothing when the request carries no valid traceparent.
+    """
+    parsed = parse_traceparent(traceparent)
+    if parsed is None:
+        yield None
+        return
+    trace_id, parent_id = parsed
+    span_ = Span(trace_id, secrets.token_hex(8), parent_id, name, service, attributes=attributes)
+    with _activate(span_, []) as active:
+        yield active
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a unit of work as a child of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    finished = _finished_spans.get()
+    if parent is None or finished is None:
+        yield None
+        return
+    child = Span(parent.trace_id, secrets.token_hex(8), parent.span_id, name, parent.service, attributes=attributes)
+    with _activate(child, finished) as active:
+        yield active
+
+
+def inject(carrier: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the current trace context to an outgoing message or header dictionary."""
+    current = _current_span.get()
+    if current is not None:
+        carrier[TRACEPARENT] = current.traceparent
+    return carrier
+
+
+def collect(spans: Any) -> None:
+    """Merge spans returned by a downstream service into the current trace."""
+    finished = _finished_spans.get()
+    if finished is None or not isinstance(spans, list):
+        return
+    room = MAX_EXPORTED_SPANS - len(finished)
+    finished.extend(s for s in spans[:max(room, 0)] if isinstance(s, dict))
+
+
+def collect_header(value: Optional[str]) -> None:
+    """Merge spans returned in an ``x-trace-spans`` response header."""
+    if not value:
+        return
+    try:
+        collect(json.loads(value))
+    except ValueError:
+        pass
+
+
+def export_spans() -> List[Dict[str, Any]]:
+    """
+    Spans to return to the caller: every finished span of this request plus the
+    current one, timed up to now since the response is sent before it ends.
+    """
+    current = _current_span.get()
+    finished = _finished_spans.get()
+    if current is None or finished is None:
+        return []
+    return (finished + [current.to_dict()])[-MAX_EXPORTED_SPANS:]
+
+
+def response_fields() -> Dict[str, Any]:
+    """Fields to add to a response message; empty outside a trace."""
+    spans = export_spans()
+    return {TRACE_SPANS: spans} if spans else {}
@@ -22,6 +22,8 @@ import websockets.exceptions
 from src.mcp_agent import MCPDataAgent
 from src.optimization.optimizer import get_query_optimizer
 from src.cache.manager import get_cache_manager
+from src.cache.result_store import ResultStore
+from src import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +41,7 @@ class WebSocketDataServer:
         self.data_agent: Optional[MCPDataAgent] = None
         self.query_optimizer: Optional[Any] = None
         self.cache_manager: Optional[Any] = None
+        self.result_store: Optional[ResultStore] = None
         
         # Statistics
         self.start_time = time.time()
@@ -57,6 +60,10 @@ class WebSocketDataServer:
             # Initialize query optimizer
             self.query_optimizer = get_query_optimizer()
             
+            # Initialize result store shared with the viz agent
+            self.result_store = ResultStore()
+            await self.result_store.initialize()
+            
             # Initialize main Data agent
             self.data_agent = MCPDataAgent()
             await self.data_agent.initialize()
@@ -109,6 +116,8 @@ class WebSocketDataServer:
             # Cleanup agent components
             if self.cache_manager:
                 await self.cache_manager.close()
+            if self.result_store:
+                await self.result_store.close()
                 
         except Exception as e:
             logger.error(f"Error stopping Data WebSocket server: {e}")
@@ -181,7 +190,9 @@ class WebSocketDataServer:
                 logger.info(f"Handling heartbeat message for {client_id}")
                 await self.handle_heartbeat(websocket, data, client_id)
             elif message_type == "sql_query":
-                await self.handle_sql_query(websocket, data, client_id, message_id)
+                with tracing.server_span("data-agent.sql_query", data.get(tracing.TRACEPARENT),
+                                         service="data-agent", query_id=data.get("query_id")):
+                    await self.handle_sql_query(websocket, data, client_id, message_id)
             elif message_type == "health_check":
                 await self.handle_health_check(websocket, data, client_id, message_id)
             elif message_type == "stats":
@@ -262,6 +273,14 @@ class WebSocketDataServer:
             # Send completion status
             await self.send_progress(websocket, message_id, client_id, "completed", 100)
             
+            # Store the rows once so the viz agent can fetch them by handle; without a
+            # store shared with the viz agent the rows are sent inline only
+            rows = result.get("data", [])
+            result_handle = None
+            if result.get("success") and rows and self.result_store and self.result_store.shared:
+                with tracing.span("result_store.put", rows=len(rows)):
+                    result_handle = await self.result_store.put(rows, result.get("columns", []), query_id)
+            
             # Send result - Return the actual data, not just True/False
             response = {
                 "type": "sql_query_response",
@@ -270,13 +289,14 @@ class WebSocketDataServer:
                 "timestamp": datetime.utcnow().isoformat(),
                 "query_id": query_id,
                 "success": result.get("success", False),
-                "data": result.get("data", []),
-                "processed_data": result.get("data", []),  # Include both for compatibility
+                "data": rows,
                 "columns": result.get("columns", []),
                 "row_count": result.get("row_count", 0),
+                "result_handle": result_handle,
                 "processing_time_ms": processing_time,
                 "error": result.get("error"),
-                "metadata": result.get("metadata", {})
+                "metadata": result.get("metadata", {}),
+                **tracing.response_fields()
             }
             
             await websocket.send(json.dumps(response))
@@ -422,6 +442,7 @@ class WebSocketDataServer:
             "messages_processed": self.message_count,
             "queries_processed": self.query_count,
             "agent_initialized": self.data_agent is not None,
+            "result_store": self.result_store.get_stats() if self.result_store else None,
             "status": "running" if self.server else "stopped"
         }
 
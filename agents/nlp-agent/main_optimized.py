@@ -22,6 +22,7 @@ from src.optimized_nlp_agent import OptimizedNLPAgent
 from src.enhanced_websocket_client import EnhancedWebSocketMCPClient
 from src.hybrid_mcp_operations_adapter import HybridMCPOperationsAdapter
 from src.enhanced_monitoring import EnhancedMonitoringSystem
+from src import tracing
 # Query classifier removed - using unified processing approach
 # PerformanceOptimizer removed - using AdvancedCacheManager directly
 from performance_config import PerformanceConfig
@@ -766,7 +767,9 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                 elif message_type == "nlp_query_with_context":
                     # Handle enhanced query requests with database context
-                    await handle_websocket_nlp_query_with_context(websocket, message, client_id)
+                    with tracing.server_span("nlp-agent.nlp_query_with_context", message.get(tracing.TRACEPARENT),
+                                             service="nlp-agent", query_id=message.get("query_id")):
+                        await handle_websocket_nlp_query_with_context(websocket, message, client_id)
                     
                 else:
                     logger.warning(f"Unknown message type from {client_id}: {message_type}")
@@ -1021,7 +1024,8 @@ async def handle_websocket_nlp_query_with_context(websocket: WebSocket, message:
                 "version": "2.2.0",
                 "processing_method": "enhanced_websocket",
                 "database_context_available": database_context is not None
-            }
+            },
+            **tracing.response_fields()
         }
         
         # Send response
@@ -16,6 +16,8 @@ from dataclasses import dataclass
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException, InvalidStatusCode
 
+from . import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -131,6 +133,7 @@ class EnhancedWebSocketMCPClient:
         # Request handling
         self.request_id_counter = 0
         self.pending_requests = {}
+        self.response_trace_spans: Dict[str, List[Dict[str, Any]]] = {}
         self.request_semaphore = asyncio.Semaphore(max_concurrent_requests)
         
         # Background tasks
@@ -611,6 +614,8 @@ class EnhancedWebSocketMCPClient:
         request_id = data.get("request_id")
         if request_id in self.pending_requests:
             future = self.pending_requests.pop(request_id)
+            if data.get(tracing.TRACE_SPANS):
+                self.response_trace_spans[request_id] = data[tracing.TRACE_SPANS]
             if not future.done():
                 future.set_result(data.get("payload"))
     
@@ -865,11 +870,14 @@ class EnhancedWebSocketMCPClient:
         
         try:
             # Send request
-            await self._send_raw_message(message)
+            await self._send_raw_message(tracing.inject(message))
             self.stats.total_requests += 1
             
             # Wait for response with timeout
-            result = await asyncio.wait_for(future, timeout=timeout)
+            try:
+                result = await asyncio.wait_for(future, timeout=timeout)
+            finally:
+                tracing.collect(self.response_trace_spans.pop(request_id, None))
             
             # Update performance tracking
             response_time = time.time() - start_time
@@ -11,6 +11,8 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime
 import aiohttp
 
+from . import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,8 +96,10 @@ class HTTPMCPClient:
                     method=method,
                     url=url,
                     json=data if method in ["POST", "PUT", "PATCH"] else None,
-                    params=params
+                    params=params,
+                    headers=tracing.inject({})
                 ) as response:
+                    tracing.collect_header(response.headers.get(tracing.TRACE_SPANS_HEADER))
                     response_text = await response.text()
                     
                     if response.status >= 400:
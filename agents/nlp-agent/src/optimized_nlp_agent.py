@@ -10,6 +10,7 @@ import logging
 import re
 import time
 import uuid
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
@@ -106,6 +107,10 @@ class OptimizedNLPAgent:
         self.schema_cache_ttl = 600  # 10 minutes
         self.last_schema_update = 0
         
+        # Schema contexts by (schema id, version hash) for requests that carry a schema_ref
+        self.versioned_schema_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.versioned_schema_cache_size = 16
+        
         # Performance metrics (simplified)
         self.metrics = {
             "total_queries": 0,
@@ -116,7 +121,9 @@ class OptimizedNLPAgent:
             "total_latency": 0.0,
             "average_latency": 0.0,
             "optimized_single_call": 0,
-            "parallel_kimi_calls": 0
+            "parallel_kimi_calls": 0,
+            "schema_ref_hits": 0,
+            "schema_ref_misses": 0
         }
         
         # Event handlers
@@ -512,6 +519,13 @@ class OptimizedNLPAgent:
         """Get schema context with intelligent caching and database context awareness"""
         current_time = time.time()
         
+        # Requests reference the schema by id and version; resolve it from the versioned cache
+        schema_ref = database_context.get('schema_ref') if database_context else None
+        if isinstance(schema_ref, dict) and schema_ref.get('schema_id') and schema_ref.get('version'):
+            schema_context = await self._resolve_schema_ref(schema_ref['schema_id'], schema_ref['version'])
+            if schema_context is not None:
+                return schema_context
+        
         # Create cache key based on database context
         cache_key = "default"
         if database_context and database_context.get('database_name'):
@@ -574,6 +588,45 @@ class OptimizedNLPAgent:
                 "cache_key": cache_key
             }
     
+    async def _resolve_schema_ref(self, schema_id: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a schema reference from the versioned local cache, reading Redis only on a miss.
+        
+        The version is the hash of the serialized schema the backend stored under
+        ``schema_context:{schema_id}``, so a cached version never goes stale.
+        """
+        key = (schema_id, version)
+        schema_context = self.versioned_schema_cache.get(key)
+        if schema_context is not None:
+            self.versioned_schema_cache.move_to_end(key)
+            self.metrics["schema_ref_hits"] += 1
+            return schema_context
+        
+        self.metrics["schema_ref_misses"] += 1
+        redis_client = getattr(self.cache_manager, '_redis_client', None)
+        if not redis_client:
+            return None
+        
+        try:
+            raw_schema = await redis_client.get(f"schema_context:{schema_id}")
+        except Exception as e:
+            logger.warning(f"Failed to fetch schema context {schema_id}@{version}: {e}")
+            return None
+        if not raw_schema:
+            return None
+        
+        # The stored schema may have been replaced since the request was built; cache what was read
+        stored_version = hashlib.sha256(raw_schema.encode("utf-8")).hexdigest()[:16]
+        if stored_version != version:
+            logger.info(f"Schema context {schema_id} changed from {version} to {stored_version} since the request was built")
+        
+        schema_context = json.loads(raw_schema)
+        self.versioned_schema_cache[(schema_id, stored_version)] = schema_context
+        while len(self.versioned_schema_cache) > self.versioned_schema_cache_size:
+            self.versioned_schema_cache.popitem(last=False)
+        logger.info(f"✅ Loaded schema context {schema_id}@{stored_version} into the versioned cache")
+        return schema_context
+    
     def _format_schema_for_llm(self, schema_context: Dict[str, Any]) -> str:
         """Format schema context for LLM consumption with detailed column information"""
         try:
@@ -950,6 +1003,7 @@ class OptimizedNLPAgent:
         """Handle schema update events from MCP server"""
         logger.info("Received schema update event - invalidating schema cache")
         self.schema_cache = {}
+        self.versioned_schema_cache.clear()
         self.last_schema_update = 0
         
         # Invalidate related cache entries
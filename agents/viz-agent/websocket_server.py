@@ -22,6 +22,8 @@ import websockets.exceptions
 from src.visualization_agent import VisualizationAgent
 from src.models import VisualizationRequest
 from src.performance_optimizer import PerformanceOptimizer
+from src.result_store import ResultStore
+from src import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,9 @@ class WebSocketVizServer:
         # Dashboard integration
         self.dashboard_manager = None
         
+        # Results stored by the data agent, fetched by handle
+        self.result_store: Optional[ResultStore] = None
+        
         # Statistics
         self.start_time = time.time()
         self.message_count = 0
@@ -59,6 +64,10 @@ class WebSocketVizServer:
             # Initialize main Viz agent
             self.viz_agent = VisualizationAgent()
             
+            # Initialize result store shared with the data agent
+            self.result_store = ResultStore()
+            await self.result_store.initialize()
+            
             # Initialize dashboard integration manager
             from src.dashboard_integration import dashboard_integration_manager
             self.dashboard_manager = dashboard_integration_manager
@@ -125,6 +134,9 @@ class WebSocketVizServer:
                     return_exceptions=True
                 )
                 self.connections.clear()
+            
+            if self.result_store:
+                await self.result_store.close()
                 
         except Exception as e:
             logger.error(f"Error stopping Viz WebSocket server: {e}")
@@ -205,7 +217,9 @@ class WebSocketVizServer:
                 await self.handle_chart_export(websocket, data, client_id, message_id)
             elif message_type == "viz_query":
                 # Handle visualization query from backend
-                await self.handle_viz_query(websocket, data, client_id, message_id)
+                with tracing.server_span("viz-agent.viz_query", data.get(tracing.TRACEPARENT),
+                                         service="viz-agent", query_id=data.get("query_id")):
+                    await self.handle_viz_query(websocket, data, client_id, message_id)
             elif message_type == "test_message":
                 # Handle test messages from connectivity tests
                 response = {
@@ -389,9 +403,20 @@ class WebSocketVizServer:
             intent = data.get("intent", {})
             session_id = data.get("session_id", "default_session")
             user_id = data.get("user_id", "anonymous")
+            result_handle = data.get("result_handle")
             
             logger.info(f"Processing viz query for session {session_id}")
             
+            # The backend forwards large results by handle; fetch the rows from the result store
+            if result_handle and not query_data:
+                with tracing.span("result_store.get"):
+                    stored_result = await self.result_store.get(result_handle) if self.result_store else None
+                if stored_result is None:
+                    raise RuntimeError(f"Result {result_handle} is not available in the result store")
+                query_data = stored_result.get("rows", [])
+                columns = columns or stored_result.get("columns", [])
+                logger.info(f"Fetched {len(query_data)} rows for {result_handle} from the result store")
+            
             # Import dashboard integration manager
             from src.dashboard_integration import dashboard_integration_manager
             
@@ -407,15 +432,16 @@ class WebSocketVizServer:
                 }
             else:
                 # Process the query data and create dashboard visualization
-                dashboard_result = await dashboard_integration_manager.process_query_for_dashboard(
-                    data=query_data,
-                    columns=columns,
-                    query=query,
-                    query_id=message_id,
-                    session_id=session_id,
-                    user_id=user_id,
-                    intent=intent
-                )
+                with tracing.span("viz.dashboard_card", rows=len(query_data)):
+                    dashboard_result = await dashboard_integration_manager.process_query_for_dashboard(
+                        data=query_data,
+                        columns=columns,
+                        query=query,
+                        query_id=message_id,
+                        session_id=session_id,
+                        user_id=user_id,
+                        intent=intent
+                    )
                 
                 if dashboard_result["success"]:
                     # Successful visualization and dashboard update
@@ -446,6 +472,7 @@ class WebSocketVizServer:
                         "timestamp": datetime.utcnow().isoformat()
                     }
             
+            response.update(tracing.response_fields())
             await websocket.send(json.dumps(response))
             
         except Exception as e:
@@ -529,6 +556,7 @@ class WebSocketVizServer:
             "messages_processed": self.message_count,
             "charts_generated": self.chart_generation_count,
             "agent_initialized": self.viz_agent is not None,
+            "result_store": self.result_store.get_stats() if self.result_store else None,
             "status": "running" if self.server else "stopped"
         }
 
@@ -0,0 +1,237 @@
+"""
+End-to-end answer cache for the query orchestrator.
+
+Repeated questions against the same database would otherwise go through the
+NLP, Data and Viz agents again. This module caches the final query response,
+including its chart payload, in Redis keyed on the normalized question, the
+database, the schema version and the user-visible request options. A schema
+change produces a new schema version and therefore new keys, so answers built
+on an old schema are never served.
+
+Entries are fresh for ``ANSWER_CACHE_FRESH_TTL`` seconds and may then be served
+stale for up to ``ANSWER_CACHE_STALE_TTL`` seconds while one backend instance
+refreshes them in the background.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Request context entries that change on every request and never affect the answer
+VOLATILE_OPTION_KEYS = {"timestamp", "source", "platform", "user_agent", "request_id", "correlation_id"}
+
+# Seconds a refresh lock is held before another instance may take over the refresh
+REFRESH_LOCK_TTL = 120
+
+# Delete a refresh lock only if this instance still holds it; a refresh that ran past
+# the lock TTL must not release the lock another instance has taken since
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class CachedAnswer:
+    """A cached query response and when it was produced."""
+    response: Dict[str, Any]
+    created_at: float
+    session_id: Optional[str]
+    stale: bool
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.created_at
+
+
+class AnswerCache:
+    """
+    Redis-backed cache of final query responses with stale-while-revalidate refresh.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        fresh_ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None
+    ):
+        """
+        Initialize the answer cache.
+
+        Args:
+            redis_client: Redis client (decoded responses)
+            fresh_ttl: Seconds an answer is served without refresh (ANSWER_CACHE_FRESH_TTL, default 300)
+            stale_ttl: Seconds an answer is kept and served while refreshing (ANSWER_CACHE_STALE_TTL, default 3600)
+        """
+        self.redis_client = redis_client
+        self.fresh_ttl = fresh_ttl or int(os.getenv("ANSWER_CACHE_FRESH_TTL", "300"))
+        self.stale_ttl = max(stale_ttl or int(os.getenv("ANSWER_CACHE_STALE_TTL", "3600")), self.fresh_ttl)
+        self.key_prefix = "answer_cache:"
+        self.instance_id = uuid.uuid4().hex
+
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "stores": 0, "refreshes": 0, "errors": 0}
+
+        logger.info(f"Answer cache initialized (fresh={self.fresh_ttl}s, stale={self.stale_ttl}s)")
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """Normalize a question so trivially different phrasings share an entry."""
+        normalized = " ".join(question.lower().split())
+        return re.sub(r"[\s?.!]+$", "", normalized)
+
+    def make_key(
+        self,
+        question: str,
+        database_name: str,
+        schema_version: str,
+        options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Build the cache key of an answer.
+
+        Args:
+            question: Natural language question
+            database_name: Database the question runs against
+            schema_version: Version hash of the database's schema context
+            options: User-visible request options; volatile entries are ignored
+
+        Returns:
+            Cache key
+        """
+        stable_options = {
+            key: value for key, value in (options or {}).items() if key not in VOLATILE_OPTION_KEYS
+        }
+        material = json.dumps(
+            [self.normalize_question(question), database_name, schema_version, stable_options],
+            sort_keys=True, default=str
+        )
+        return f"{self.key_prefix}{hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]}"
+
+    async def get(self, key: str) -> Optional[CachedAnswer]:
+        """
+        Get a cached answer.
+
+        Returns:
+            The cached answer (flagged stale past the fresh TTL), or None on a miss
+        """
+        try:
+            payload = await self.redis_client.get(key)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Answer cache read failed: {e}")
+            return None
+
+        if not payload:
+            self._stats["misses"] += 1
+            return None
+
+        entry = json.loads(payload)
+        stale = time.time() - entry["created_at"] > self.fresh_ttl
+        self._stats["stale_hits" if stale else "hits"] += 1
+        return CachedAnswer(
+            response=entry["response"],
+            created_at=entry["created_at"],
+            session_id=entry.get("session_id"),
+            stale=stale
+        )
+
+    async def set(self, key: str, response: Dict[str, Any], session_id: Optional[str] = None) -> bool:
+        """
+        Cache a successful query response.
+
+        Args:
+            key: Cache key from :meth:`make_key`
+            response: JSON-compatible query response
+            session_id: Session the answer was produced for
+
+        Returns:
+            True if the answer was stored
+        """
+        try:
+            payload = json.dumps({"response": response, "created_at": time.time(), "session_id": session_id}, default=str)
+            await self.redis_client.setex(key, self.stale_ttl, payload)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Answer cache write failed: {e}")
+            return False
+
+        self._stats["stores"] += 1
+        return True
+
+    def schedule_refresh(
+        self,
+        key: str,
+        refresh: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+        session_id: Optional[str] = None
+    ) -> bool:
+        """
+        Refresh a stale answer in the background.
+
+        At most one refresh per key runs in this process, and a short Redis lock
+        keeps other backend instances from refreshing the same key concurrently.
+
+        Args:
+            key: Cache key of the stale answer
+            refresh: Coroutine function producing the new response, or None if it should not be cached
+            session_id: Session the refresh runs for
+
+        Returns:
+            True if a refresh was started
+        """
+        if key in self._refreshing:
+            return False
+        self._refreshing[key] = asyncio.create_task(self._refresh(key, refresh, session_id))
+        return True
+
+    async def _refresh(
+        self,
+        key: str,
+        refresh: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+        session_id: Optional[str]
+    ) -> None:
+        """Run one background refresh and store its result."""
+        try:
+            lock_key = f"{key}:refreshing"
+            if not await self.redis_client.set(lock_key, self.instance_id, nx=True, ex=REFRESH_LOCK_TTL):
+                return
+            try:
+                response = await refresh()
+                if response is not None:
+                    await self.set(key, response, session_id)
+                    self._stats["refreshes"] += 1
+            finally:
+                await self.redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, self.instance_id)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Answer cache refresh failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def close(self) -> None:
+        """Cancel background refreshes."""
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._refreshing.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get answer cache statistics."""
+        return {
+            "fresh_ttl": self.fresh_ttl,
+            "stale_ttl": self.stale_ttl,
+            "refreshing": len(self._refreshing),
+            **self._stats
+        }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Response Serialization Benchmark for the AGENT BI Backend
+This script compares FastAPI's default JSON encoding of query responses with
+the orjson-based encoder in serialization.py, and reports how much gzip and
+brotli shrink the encoded responses and what they cost.
+
+Payloads are synthetic query responses shaped like /api/query results: result
+rows with Decimal, date and datetime values plus a plotly figure, so the script
+runs without agents, Redis or a database.
+"""
+
+import argparse
+import datetime
+import decimal
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the backend directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fastapi.encoders import jsonable_encoder
+
+import serialization
+from compression import MINIMUM_SIZE, SUPPORTED_ENCODINGS, compress
+
+DEFAULT_ROW_COUNTS = [10, 100, 1000, 10000]
+
+
+def build_payload(rows):
+    """Build a query response with the given number of result rows."""
+    start = datetime.date(2023, 1, 1)
+    data = [
+        {
+            "period": start + datetime.timedelta(days=i),
+            "region": ["north", "south", "east", "west"][i % 4],
+            "revenue": decimal.Decimal(f"{100000 + i * 37.25:.2f}"),
+            "orders": 1000 + (i * 7) % 500,
+            "updated_at": datetime.datetime(2024, 1, 1, 12, 0) + datetime.timedelta(minutes=i)
+        }
+        for i in range(rows)
+    ]
+    return {
+        "query_id": "q_benchmark",
+        "intent": {"metric_type": "revenue", "time_period": "daily"},
+        "result": {
+            "data": data,
+            "columns": list(data[0].keys()) if data else [],
+            "row_count": rows,
+            "sql_query": "SELECT period, region, revenue, orders, updated_at FROM sales",
+            "processing_time_ms": 42
+        },
+        "visualization": {
+            "chart_type": "line",
+            "chart_json": {
+                "data": [{
+                    "type": "scatter",
+                    "mode": "lines",
+                    "x": [row["period"] for row in data],
+                    "y": [row["revenue"] for row in data]
+                }],
+                "layout": {"title": {"text": "Revenue by day"}, "xaxis": {"type": "date"}}
+            }
+        }
+    }
+
+
+def _median_ms(func, repeat):
+    """Median wall time of a function call in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _default_encode(payload):
+    """FastAPI's default path: jsonable_encoder followed by JSONResponse's json.dumps."""
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def benchmark_encoding(row_counts, repeat):
+    """Time the default and the fast encoder for each payload size."""
+    results = []
+    for rows in row_counts:
+        payload = build_payload(rows)
+        default_ms = _median_ms(lambda: _default_encode(payload), repeat)
+        fast_ms = _median_ms(lambda: serialization.dumps(payload), repeat)
+        results.append({
+            "rows": rows,
+            "bytes": len(serialization.dumps(payload)),
+            "default_ms": default_ms,
+            "fast_ms": fast_ms,
+            "speedup": default_ms / fast_ms if fast_ms else None
+        })
+    return results
+
+
+def benchmark_compression(row_counts, repeat):
+    """Measure compressed size and compression time per encoding and payload size."""
+    results = []
+    for rows in row_counts:
+        body = serialization.dumps(build_payload(rows))
+        for encoding in SUPPORTED_ENCODINGS:
+            compressed = compress(body, encoding)
+            results.append({
+                "rows": rows,
+                "encoding": encoding,
+                "bytes": len(body),
+                "compressed_bytes": len(compressed),
+                "ratio": len(body) / len(compressed),
+                "ms": _median_ms(lambda: compress(body, encoding), repeat),
+                "compressed_on_wire": len(body) >= MINIMUM_SIZE
+            })
+    return results
+
+
+def main():
+    """Run the serialization benchmark."""
+    parser = argparse.ArgumentParser(description="Compare backend response encoding and compression cost")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROW_COUNTS, help="Result row counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    repeat = max(1, args.repeat)
+    encoding = benchmark_encoding(args.rows, repeat)
+    compression = benchmark_compression(args.rows, repeat)
+
+    if args.json:
+        print(json.dumps({
+            "encoder": "orjson" if serialization.orjson is not None else "json",
+            "minimum_compressed_size": MINIMUM_SIZE,
+            "encoding": encoding,
+            "compression": compression
+        }, indent=2))
+        return 0
+
+    print(f"🧾 Response Encoding (median of {repeat}, fast encoder: {'orjson' if serialization.orjson is not None else 'json fallback'})")
+    print("=" * 70)
+    print(f"   {'rows':>7}  {'bytes':>10}  {'default ms':>11}  {'fast ms':>9}  {'speedup':>8}")
+    for row in encoding:
+        print(
+            f"   {row['rows']:>7}  {row['bytes']:>10}  {row['default_ms']:>11.2f}  "
+            f"{row['fast_ms']:>9.2f}  {row['speedup']:>7.1f}x"
+        )
+    print()
+
+    print(f"🗜️  Compression (bodies under {MINIMUM_SIZE} bytes are sent uncompressed)")
+    print("=" * 70)
+    print(f"   {'rows':>7}  {'encoding':>8}  {'bytes':>10}  {'compressed':>10}  {'ratio':>6}  {'ms':>8}")
+    for row in compression:
+        marker = "   " if row["compressed_on_wire"] else "⏭️  "
+        print(
+            f"{marker}{row['rows']:>7}  {row['encoding']:>8}  {row['bytes']:>10}  "
+            f"{row['compressed_bytes']:>10}  {row['ratio']:>5.1f}x  {row['ms']:>8.2f}"
+        )
+    print()
+    print("💡 The running backend compresses HTTP responses negotiated via Accept-Encoding and")
+    print("   WebSocket messages for clients connecting with ?compression=br,gzip.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
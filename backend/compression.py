@@ -0,0 +1,159 @@
+"""
+Negotiated compression of HTTP responses and WebSocket messages.
+
+Responses and messages at least ``RESPONSE_COMPRESSION_MIN_BYTES`` long are
+compressed with brotli (when installed) or gzip, whichever the client accepts;
+smaller payloads are sent as-is since compressing them costs more than it saves.
+
+HTTP clients negotiate with ``Accept-Encoding``. WebSocket clients opt in with a
+``compression`` query parameter on connect (for example ``?compression=br,gzip``)
+or a ``compression`` list in their connection handshake. Compressed WebSocket
+messages are sent as binary frames holding the encoded JSON; smaller ones stay
+JSON text frames.
+"""
+
+import gzip
+import os
+from typing import Any, Dict, Iterable, Optional, Union
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from fastapi import WebSocket
+
+from serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - exercised only without brotli installed
+    brotli = None
+
+MINIMUM_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+
+# Encodings in order of preference
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def negotiate_encoding(accepted: Union[str, Iterable[str], None]) -> Optional[str]:
+    """
+    Pick the preferred supported encoding a client accepts.
+
+    Args:
+        accepted: An Accept-Encoding style string (``"gzip, br;q=0.8"``) or a list of encodings
+
+    Returns:
+        The chosen encoding, or None if the client accepts none of them
+    """
+    if not accepted:
+        return None
+    if isinstance(accepted, str):
+        accepted = accepted.split(",")
+
+    offered = set()
+    for item in accepted:
+        name, *params = str(item).strip().lower().split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            offered.add(name.strip())
+
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in offered or "*" in offered:
+            return encoding
+    return None
+
+
+def compress(payload: bytes, encoding: str) -> bytes:
+    """Compress a payload with a supported encoding."""
+    if encoding == "br":
+        return brotli.compress(payload, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(payload, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class CompressionMiddleware:
+    """
+    Compress complete HTTP response bodies the client can decode.
+
+    Streaming responses, responses that already carry a Content-Encoding,
+    non-text content and bodies below the size threshold are passed through.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers back until the body shows whether to compress
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body" and start_message is not None:
+                start, start_message = start_message, None
+                body = message.get("body", b"")
+                headers = MutableHeaders(raw=start["headers"])
+                content_type = headers.get("content-type", "")
+
+                if (
+                    not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "content-encoding" not in headers
+                    and content_type.startswith(_COMPRESSIBLE_TYPES)
+                ):
+                    body = compress(body, encoding)
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(body))
+                    headers.add_vary_header("Accept-Encoding")
+                    message = {**message, "body": body}
+
+                await send(start)
+
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+def negotiate_websocket_compression(websocket: WebSocket, accepted: Union[str, Iterable[str], None]) -> Optional[str]:
+    """Record the compression a WebSocket client accepts and return the chosen encoding."""
+    websocket.state.compression = negotiate_encoding(accepted)
+    return websocket.state.compression
+
+
+async def send_websocket_json(websocket: WebSocket, message: Dict[str, Any]) -> None:
+    """
+    Send a JSON message over a WebSocket.
+
+    Large messages go out compressed as binary frames when the client negotiated
+    compression; everything else is sent as a JSON text frame.
+    """
+    payload = dumps(message)
+    encoding = getattr(websocket.state, "compression", None)
+    if encoding and len(payload) >= MINIMUM_SIZE:
+        await websocket.send_bytes(compress(payload, encoding))
+    else:
+        await websocket.send_text(payload.decode("utf-8"))
@@ -3,11 +3,21 @@ Database Context Management for Multi-Agent BI System
 
 This module handles user database selection, validation, and session-based
 context persistence using Redis for storage and caching.
+
+Contexts are looked up by key, never by scanning the keyspace: active sessions
+are indexed in a sorted set scored by expiry, and recently used contexts are
+kept in a small in-process LRU that backend replicas invalidate for each
+other over Redis pub/sub.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import redis.asyncio as redis
@@ -40,6 +50,52 @@ class DatabaseContext:
         return cls(**data)
 
 
+class SessionContextCache:
+    """
+    In-process LRU of session and schema contexts with a short TTL.
+    
+    Entries are dropped on pub/sub invalidation; the TTL only bounds staleness
+    if an invalidation message is missed.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached context, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Cache a context, evicting the least recently used entry when full."""
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, key: str) -> None:
+        """Drop a cached context."""
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop all cached contexts."""
+        self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
 class DatabaseContextManager:
     """
     Manages database contexts for user sessions with Redis persistence.
@@ -53,8 +109,22 @@ class DatabaseContextManager:
         self.session_ttl = 3600 * 24  # 24 hours
         self.database_list_ttl = 600  # 10 minutes
         self.context_prefix = "db_context:"
+        self.schema_context_prefix = "schema_context:"
+        self.schema_version_prefix = "schema_context_version:"
         self.database_list_key = "available_databases"
         
+        # Sorted set of session IDs scored by context expiry time
+        self.session_index_key = "db_context_sessions"
+        
+        # Local context cache, invalidated by other backend instances over pub/sub
+        self.invalidation_channel = "db_context_invalidation"
+        self.instance_id = uuid.uuid4().hex
+        self.local_cache = SessionContextCache(
+            max_size=int(os.getenv("DB_CONTEXT_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("DB_CONTEXT_CACHE_TTL", "30"))
+        )
+        self._invalidation_task: Optional[asyncio.Task] = None
+        
     async def generate_session_id(self) -> str:
         """Generate a unique session ID."""
         return str(uuid.uuid4())
@@ -280,10 +350,7 @@ class DatabaseContextManager:
             return False
         
         try:
-            context_key = f"{self.context_prefix}{session_id}"
-            context_data = json.dumps(context.to_dict())
-            
-            await self.redis_client.setex(context_key, self.session_ttl, context_data)
+            await self._write_context(session_id, context.to_dict(), self.session_ttl)
             logger.debug(f"Stored context for session {session_id}")
             return True
             
@@ -291,6 +358,40 @@ class DatabaseContextManager:
             logger.error(f"Error storing context for session {session_id}: {e}")
             return False
     
+    async def store_context_data(self, session_id: str, context_data: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Store a raw context dictionary for a session.
+        
+        Args:
+            session_id: Session identifier
+            context_data: Context dictionary to store
+            ttl: Expiry in seconds (session TTL if None)
+            
+        Returns:
+            True if stored successfully, False otherwise
+        """
+        if not self.redis_client:
+            logger.warning("Redis client not available, context not stored")
+            return False
+        
+        try:
+            await self._write_context(session_id, context_data, ttl or self.session_ttl)
+            logger.debug(f"Stored context data for session {session_id}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error storing context for session {session_id}: {e}")
+            return False
+    
+    async def _write_context(self, session_id: str, context_data: Dict[str, Any], ttl: int) -> None:
+        """Write a context, index the session by expiry and invalidate other instances' copies."""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(f"{self.context_prefix}{session_id}", ttl, json.dumps(context_data, default=str))
+            pipe.zadd(self.session_index_key, {session_id: time.time() + ttl})
+            pipe.publish(self.invalidation_channel, self._invalidation_message(f"session:{session_id}"))
+            await pipe.execute()
+        self.local_cache.set(f"session:{session_id}", context_data)
+    
     async def update_context(self, session_id: str, context: DatabaseContext) -> bool:
         """
         Update existing database context in Redis.
@@ -316,8 +417,7 @@ class DatabaseContextManager:
                 return False
             
             # Update the context
-            context_data = json.dumps(context.to_dict())
-            await self.redis_client.setex(context_key, self.session_ttl, context_data)
+            await self._write_context(session_id, context.to_dict(), self.session_ttl)
             logger.debug(f"Updated context for session {session_id}")
             return True
             
@@ -340,11 +440,9 @@ class DatabaseContextManager:
             return None
         
         try:
-            context_key = f"{self.context_prefix}{session_id}"
-            context_data = await self.redis_client.get(context_key)
+            context_dict = await self.get_context_data(session_id)
             
-            if context_data:
-                context_dict = json.loads(context_data)
+            if context_dict:
                 context = DatabaseContext.from_dict(context_dict)
                 
                 # Update last accessed time
@@ -361,6 +459,121 @@ class DatabaseContextManager:
             logger.error(f"Error retrieving context for session {session_id}: {e}")
             return None
     
+    async def get_context_data(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session's raw context dictionary with a single key lookup.
+        
+        Served from the local cache when possible. Unlike :meth:`get_context`,
+        this does not refresh the last accessed time.
+        
+        Args:
+            session_id: Session identifier
+            
+        Returns:
+            Copy of the context dictionary if found, None otherwise
+        """
+        if not self.redis_client:
+            return None
+        
+        cache_key = f"session:{session_id}"
+        context_data = self.local_cache.get(cache_key)
+        if context_data is None:
+            raw_data = await self.redis_client.get(f"{self.context_prefix}{session_id}")
+            if not raw_data:
+                return None
+            context_data = json.loads(raw_data)
+            self.local_cache.set(cache_key, context_data)
+        return dict(context_data)
+    
+    async def store_schema_context(self, database_name: str, schema_context: Dict[str, Any], ttl: int = 3600) -> bool:
+        """
+        Store the schema context of a database and invalidate other instances' copies.
+        
+        Args:
+            database_name: Database the schema context describes
+            schema_context: Schema context to store
+            ttl: Expiry in seconds
+            
+        Returns:
+            True if stored successfully, False otherwise
+        """
+        if not self.redis_client:
+            return False
+        
+        try:
+            payload = json.dumps(schema_context, default=str)
+            version = self.schema_version(payload)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.setex(f"{self.schema_context_prefix}{database_name}", ttl, payload)
+                pipe.setex(f"{self.schema_version_prefix}{database_name}", ttl, version)
+                pipe.publish(self.invalidation_channel, self._invalidation_message(f"schema:{database_name}"))
+                await pipe.execute()
+            self.local_cache.set(f"schema:{database_name}", schema_context)
+            self.local_cache.set(f"schema_version:{database_name}", {"version": version})
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error storing schema context for {database_name}: {e}")
+            return False
+    
+    async def get_schema_context(self, database_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached schema context of a database, served from the local cache when possible.
+        
+        Args:
+            database_name: Database name
+            
+        Returns:
+            Schema context if cached, None otherwise
+        """
+        if not self.redis_client:
+            return None
+        
+        cache_key = f"schema:{database_name}"
+        schema_context = self.local_cache.get(cache_key)
+        if schema_context is None:
+            raw_data = await self.redis_client.get(f"{self.schema_context_prefix}{database_name}")
+            if not raw_data:
+                return None
+            schema_context = json.loads(raw_data)
+            self.local_cache.set(cache_key, schema_context)
+        return schema_context
+    
+    @staticmethod
+    def schema_version(payload: str) -> str:
+        """Version hash of a serialized schema context, as stored in Redis."""
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    async def get_schema_reference(self, database_name: str) -> Optional[Dict[str, str]]:
+        """
+        Get a reference to the cached schema context of a database.
+        
+        Agents resolve the reference from their own versioned cache, so requests
+        carry the schema id and version hash instead of the schema itself.
+        
+        Args:
+            database_name: Database name
+            
+        Returns:
+            Dictionary with ``schema_id`` and ``version``, or None if no schema context is cached
+        """
+        if not self.redis_client:
+            return None
+        
+        cache_key = f"schema_version:{database_name}"
+        cached = self.local_cache.get(cache_key)
+        if cached is None:
+            version = await self.redis_client.get(f"{self.schema_version_prefix}{database_name}")
+            if not version:
+                # Schema contexts stored before versioning: hash the stored payload once
+                payload = await self.redis_client.get(f"{self.schema_context_prefix}{database_name}")
+                if not payload:
+                    return None
+                version = self.schema_version(payload)
+            cached = {"version": version}
+            self.local_cache.set(cache_key, cached)
+        return {"schema_id": database_name, "version": cached["version"]}
+    
     async def clear_context(self, session_id: str) -> bool:
         """
         Clear database context from Redis.
@@ -375,8 +588,12 @@ class DatabaseContextManager:
             return False
         
         try:
-            context_key = f"{self.context_prefix}{session_id}"
-            result = await self.redis_client.delete(context_key)
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(f"{self.context_prefix}{session_id}")
+                pipe.zrem(self.session_index_key, session_id)
+                pipe.publish(self.invalidation_channel, self._invalidation_message(f"session:{session_id}"))
+                result, _, _ = await pipe.execute()
+            self.local_cache.invalidate(f"session:{session_id}")
             logger.debug(f"Cleared context for session {session_id}")
             return result > 0
             
@@ -395,16 +612,19 @@ class DatabaseContextManager:
             return []
         
         try:
-            pattern = f"{self.context_prefix}*"
-            keys = await self.redis_client.keys(pattern)
+            # Drop expired sessions from the index, then read the live ones in one round trip
+            now = time.time()
+            await self.redis_client.zremrangebyscore(self.session_index_key, "-inf", now)
+            session_ids = await self.redis_client.zrangebyscore(self.session_index_key, now, "+inf")
+            if not session_ids:
+                return []
+            contexts = await self.redis_client.mget([f"{self.context_prefix}{session_id}" for session_id in session_ids])
             
             active_sessions = []
-            for key in keys:
+            for session_id, context_data in zip(session_ids, contexts):
                 try:
-                    context_data = await self.redis_client.get(key)
                     if context_data:
                         context_dict = json.loads(context_data)
-                        session_id = key.replace(self.context_prefix, "")
                         
                         active_sessions.append({
                             "session_id": session_id,
@@ -414,7 +634,7 @@ class DatabaseContextManager:
                             "table_count": context_dict.get("table_count", 0)
                         })
                 except Exception as session_error:
-                    logger.warning(f"Error processing session key {key}: {session_error}")
+                    logger.warning(f"Error processing session {session_id}: {session_error}")
                     continue
             
             return active_sessions
@@ -423,6 +643,57 @@ class DatabaseContextManager:
             logger.error(f"Error listing active sessions: {e}")
             return []
     
+    def _invalidation_message(self, cache_key: str) -> str:
+        """Pub/sub message telling other instances to drop a cached context."""
+        return json.dumps({"origin": self.instance_id, "key": cache_key})
+    
+    async def start_invalidation_listener(self) -> None:
+        """Start evicting locally cached contexts changed by other backend instances."""
+        if self.redis_client and not self._invalidation_task:
+            self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+    
+    async def stop_invalidation_listener(self) -> None:
+        """Stop the invalidation listener."""
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+    
+    async def _listen_for_invalidations(self) -> None:
+        """Apply invalidation messages, resubscribing after connection errors."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                logger.info(f"Listening for database context invalidations on {self.invalidation_channel}")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        payload = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    if payload.get("origin") != self.instance_id:
+                        cache_key = payload.get("key", "")
+                        self.local_cache.invalidate(cache_key)
+                        if cache_key.startswith("schema:"):
+                            self.local_cache.invalidate(f"schema_version:{cache_key[len('schema:'):]}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed while disconnected
+                logger.warning(f"Database context invalidation listener error: {e}")
+                self.local_cache.clear()
+                await asyncio.sleep(5)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+    
     async def cleanup_expired_sessions(self) -> int:
         """
         Clean up expired database contexts (Redis handles TTL automatically).
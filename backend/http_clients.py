@@ -0,0 +1,134 @@
+"""
+Shared HTTP client sessions for backend calls to the agents.
+
+Creating an ``aiohttp.ClientSession`` per request repeats DNS lookups and TCP
+setup on every call and throws the connection away afterwards. This module keeps
+one long-lived session per agent, keyed on the agent's base URL, with its own
+connection pool, keep-alive and DNS cache. The sessions are opened at startup
+and closed at shutdown; a session requested before startup is created lazily.
+"""
+
+import logging
+import os
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPClientRegistry:
+    """Application-scoped registry of per-agent HTTP sessions"""
+
+    def __init__(
+        self,
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        dns_cache_ttl: Optional[int] = None
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            limit_per_host: Connections per agent (AGENT_HTTP_POOL_LIMIT, default 20)
+            keepalive_timeout: Seconds an idle connection is kept open (AGENT_HTTP_KEEPALIVE_TIMEOUT, default 30)
+            dns_cache_ttl: Seconds a resolved agent address is cached (AGENT_HTTP_DNS_CACHE_TTL, default 300)
+        """
+        self.limit_per_host = limit_per_host or int(os.getenv("AGENT_HTTP_POOL_LIMIT", "20"))
+        self.keepalive_timeout = keepalive_timeout or float(os.getenv("AGENT_HTTP_KEEPALIVE_TIMEOUT", "30"))
+        self.dns_cache_ttl = dns_cache_ttl or int(os.getenv("AGENT_HTTP_DNS_CACHE_TTL", "300"))
+
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """Registry key of a URL: its scheme, host and port"""
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    async def start(self, base_urls: List[str]) -> None:
+        """Open the sessions of the given agents"""
+        for url in base_urls:
+            self.session(url)
+        logger.info(
+            f"HTTP client sessions opened for {len(self._sessions)} agents "
+            f"(limit={self.limit_per_host}, keepalive={self.keepalive_timeout}s, dns_ttl={self.dns_cache_ttl}s)"
+        )
+
+    def session(self, url: str) -> aiohttp.ClientSession:
+        """
+        Get the shared session for the agent serving a URL.
+
+        Args:
+            url: Agent base URL or any URL on the agent
+
+        Returns:
+            Long-lived client session; do not close it
+        """
+        key = self._key(url)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = self._create_session(key)
+            self._sessions[key] = session
+        return session
+
+    def _create_session(self, key: str) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit_per_host,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        stats = self._stats.setdefault(key, {"requests": 0, "connections_created": 0, "connections_reused": 0})
+
+        # Count requests and connection reuse so keep-alive effectiveness is visible
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            stats["requests"] += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats["connections_reused"] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+    async def close(self) -> None:
+        """Close all sessions and their connections"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        logger.info("HTTP client sessions closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics per agent"""
+        pools = {}
+        for key, stats in self._stats.items():
+            session = self._sessions.get(key)
+            connector = session.connector if session and not session.closed else None
+            pools[key] = {
+                "open": connector is not None,
+                "in_use": len(getattr(connector, "_acquired", ())) if connector else 0,
+                "idle": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()) if connector else 0,
+                **stats
+            }
+        return {
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "dns_cache_ttl": self.dns_cache_ttl,
+            "pools": pools
+        }
+
+
+# Global registry instance
+http_clients = HTTPClientRegistry()
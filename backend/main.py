@@ -43,7 +43,7 @@ import tracemalloc
 import random
 import string
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Awaitable, Callable
 from contextlib import asynccontextmanager
 
 from fastapi import (
@@ -57,7 +57,8 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from orchestration import (
     CircuitBreaker, CircuitBreakerException, RetryConfig, 
     retry_with_backoff, RetryExhaustedException,
-    orchestration_metrics, WebSocketProgressReporter
+    orchestration_metrics, WebSocketProgressReporter,
+    PipelineExecutor, PipelineStep, PipelineStepError, AdmissionController, AdmissionRejected
 )
 
 # Import WebSocket Agent Manager for Phase 1 parallel implementation
@@ -78,6 +79,11 @@ from shared.models.workflow import (
 )
 from models.ui import BentoGridLayout, BentoGridCard
 from database_context import DatabaseContextManager, DatabaseContext
+from answer_cache import AnswerCache
+from http_clients import http_clients
+from serialization import FastJSONResponse
+from compression import CompressionMiddleware, negotiate_websocket_compression, send_websocket_json
+import tracing
 from models.user import UserProfile, PersonalizationRecommendation, QueryHistoryEntry
 
 # Import Pydantic for remaining local models
@@ -117,32 +123,42 @@ limiter = Limiter(key_func=get_remote_address)
 redis_client: Optional[redis.Redis] = None
 websocket_connections: Dict[str, WebSocket] = {}
 database_context_manager: Optional[DatabaseContextManager] = None
+answer_cache: Optional[AnswerCache] = None
 
 # Dynamic schema management globals
 dynamic_schema_manager = None
 intelligent_query_builder = None
 configuration_manager = None
 
-# Circuit breakers for agent protection
+# Bounded admission for agent workflows (answer cache hits bypass it)
+query_admission = AdmissionController(name="query_workflow")
+
+# Circuit breakers for agent protection; only transport failures count against an
+# agent, not errors it reports about the query itself
+AGENT_TRANSPORT_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError, aiohttp.ClientError)
+
 nlp_agent_circuit_breaker = CircuitBreaker(
     failure_threshold=5,
     recovery_timeout=60.0,
     timeout=30.0,
-    name="NLP_Agent"
+    name="NLP_Agent",
+    expected_exception=AGENT_TRANSPORT_ERRORS
 )
 
 data_agent_circuit_breaker = CircuitBreaker(
     failure_threshold=5,
     recovery_timeout=120.0,
     timeout=120.0,
-    name="Data_Agent"
+    name="Data_Agent",
+    expected_exception=AGENT_TRANSPORT_ERRORS
 )
 
 viz_agent_circuit_breaker = CircuitBreaker(
     failure_threshold=3,
     recovery_timeout=45.0,
     timeout=45.0,
-    name="Viz_Agent"
+    name="Viz_Agent",
+    expected_exception=AGENT_TRANSPORT_ERRORS
 )
 
 # Retry configurations
@@ -150,21 +166,21 @@ nlp_retry_config = RetryConfig(
     max_attempts=3,
     base_delay=1.0,
     max_delay=30.0,
-    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError)
+    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
 )
 
 data_retry_config = RetryConfig(
     max_attempts=2,
     base_delay=2.0,
     max_delay=60.0,
-    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError)
+    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
 )
 
 viz_retry_config = RetryConfig(
     max_attempts=2,
     base_delay=1.0,
     max_delay=30.0,
-    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError)
+    retry_exceptions=(aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)
 )
 
 
@@ -182,11 +198,13 @@ app = FastAPI(
     title="AGENT BI Backend",
     description="FastAPI Gateway for AGENT BI with WebSocket Support",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add middleware
 app.add_middleware(SlowAPIMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 # Get CORS origins from environment variables
 frontend_url = os.getenv("FRONTEND_URL", "http://frontend:3000")
@@ -408,7 +426,7 @@ def validate_viz_response(response_data: Dict[str, Any]) -> Optional[Visualizati
 
 async def startup_event():
     """Initialize connections, dynamic schema management, and validate environment on startup"""
-    global redis_client, dynamic_schema_manager, intelligent_query_builder, configuration_manager, database_context_manager
+    global redis_client, dynamic_schema_manager, intelligent_query_builder, configuration_manager, database_context_manager, answer_cache
     
     # Enable tracemalloc for better memory debugging
     if not tracemalloc.is_tracing():
@@ -422,6 +440,13 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize WebSocket Agent Manager: {e}")
     
+    # Open the shared HTTP sessions to the agents
+    await http_clients.start([
+        os.getenv("NLP_AGENT_URL", "http://nlp-agent:8001"),
+        os.getenv("DATA_AGENT_URL", "http://data-agent:8002"),
+        os.getenv("VIZ_AGENT_URL", "http://viz-agent:8003")
+    ])
+    
     # Initialize Redis connection
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
     try:
@@ -431,12 +456,18 @@ async def startup_event():
         
         # Initialize Database Context Manager
         database_context_manager = DatabaseContextManager(redis_client=redis_client)
+        await database_context_manager.start_invalidation_listener()
         logger.info("Database Context Manager initialized")
         
+        # Initialize the end-to-end answer cache
+        if os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true":
+            answer_cache = AnswerCache(redis_client=redis_client)
+        
     except Exception as e:
         logger.error(f"Redis connection failed: {e}")
         redis_client = None
         database_context_manager = None
+        answer_cache = None
     
     # Initialize Dynamic Schema Management
     if DYNAMIC_SCHEMA_AVAILABLE:
@@ -483,6 +514,12 @@ async def shutdown_event():
     """Clean up connections on shutdown"""
     global redis_client
     
+    if database_context_manager:
+        await database_context_manager.stop_invalidation_listener()
+    
+    if answer_cache:
+        await answer_cache.close()
+    
     # Shutdown WebSocket Agent Manager
     try:
         await websocket_agent_manager.stop()
@@ -490,6 +527,8 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error stopping WebSocket Agent Manager: {e}")
     
+    await http_clients.close()
+    
     if redis_client:
         await redis_client.close()
         logger.info("Redis connection closed")
@@ -672,7 +711,10 @@ async def get_orchestration_metrics(request: Request):
                 "total_circuit_breakers": len(circuit_breaker_stats),
                 "status": "healthy" if open_circuits == 0 else "degraded" if open_circuits < 2 else "critical"
             },
-            "websocket_connections": len(websocket_connections)
+            "websocket_connections": len(websocket_connections),
+            "answer_cache": answer_cache.get_stats() if answer_cache else None,
+            "admission": query_admission.get_stats(),
+            "http_clients": http_clients.get_stats()
         }
         
     except Exception as e:
@@ -707,6 +749,36 @@ async def reset_circuit_breakers(request: Request):
 
 
 
+@app.get("/api/traces")
+@limiter.limit("30/minute")
+async def list_traces(request: Request, limit: int = 20):
+    """List the most recent and the slowest request traces"""
+    span_recorder = tracing.span_recorder
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "recent": span_recorder.recent(limit),
+        "slowest": span_recorder.slowest(limit),
+        "stats": span_recorder.get_stats()
+    }
+
+
+@app.get("/api/traces/{trace_id}")
+@limiter.limit("60/minute")
+async def get_trace_waterfall(request: Request, trace_id: str):
+    """Get the span waterfall of a recorded trace across the backend, agents and MCP server"""
+    trace = tracing.span_recorder.get_trace(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail=f"Trace {trace_id} not found")
+    return trace
+
+
+def _with_trace_id(response: QueryResponse, span: Optional[tracing.Span]) -> QueryResponse:
+    """Report the trace of a query in its agent performance data"""
+    if span:
+        response.agent_performance = {**(response.agent_performance or {}), "trace_id": span.trace_id}
+    return response
+
+
 async def process_query_core(query_request: QueryRequest) -> QueryResponse:
     """Core query processing logic without FastAPI dependencies"""
     query_id = f"q_{datetime.utcnow().timestamp()}"
@@ -742,157 +814,251 @@ async def process_query_core(query_request: QueryRequest) -> QueryResponse:
                 )
             )
     
-    try:
-        # Step 1: Send query to NLP Agent using enhanced communication
-        nlp_result = await send_to_agent_enhanced(
-            AgentType.NLP,
-            {
-                "type": "nlp_query_with_context",
-                "query": query_request.query,
-                "query_id": query_id,
-                "user_id": user_id,
-                "session_id": session_id,
+    return await _answer_with_cache(
+        query_request,
+        query_id,
+        session_id,
+        database_context,
+        lambda: _admitted(lambda: _run_query_workflow(query_request, query_id, user_id, session_id, database_context)),
+        dashboard_user_id=user_id
+    )
+
+
+async def _nlp_step(
+    query: str,
+    query_id: str,
+    user_id: str,
+    session_id: str,
+    database_context: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Query pipeline step: translate the question to SQL with the NLP Agent"""
+    nlp_result = await send_to_agent_enhanced(
+        AgentType.NLP,
+        {
+            "type": "nlp_query_with_context",
+            "query": query,
+            "query_id": query_id,
+            "user_id": user_id,
+            "session_id": session_id,
+            "database_context": database_context,
+            "context": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "source": "backend_api_websocket"
+            }
+        }
+    )
+    
+    logger.info(f"NLP processing completed for query: {query}")
+    
+    # Debug logging to understand the NLP response
+    logger.info(f"🔍 DEBUG: NLP result type: {type(nlp_result)}")
+    logger.info(f"🔍 DEBUG: NLP result keys: {list(nlp_result.keys()) if isinstance(nlp_result, dict) else 'Not a dict'}")
+    if isinstance(nlp_result, dict):
+        logger.info(f"🔍 DEBUG: NLP result has 'success' field: {'success' in nlp_result}")
+        logger.info(f"🔍 DEBUG: NLP result 'success' value: {nlp_result.get('success')}")
+        logger.info(f"🔍 DEBUG: NLP result has 'sql_query' field: {'sql_query' in nlp_result}")
+    
+    # Check for standard NLP response format - NLP Agent may not return "success" field
+    if not nlp_result:
+        raise Exception("NLP processing failed: No response")
+    
+    # Check for error responses from enhanced communication
+    if nlp_result.get("success") is False:
+        raise _agent_error("NLP processing failed", nlp_result.get("error", {}))
+    
+    # Check if we have a valid NLP response (sql_query indicates success)
+    if not nlp_result.get("sql_query") and not nlp_result.get("success"):
+        logger.error(f"NLP response missing required fields: {nlp_result}")
+        raise Exception("NLP processing failed: Response missing sql_query and success fields")
+    
+    sql_query = nlp_result.get("sql_query", "")
+    logger.info(f"Generated SQL query: {sql_query}")
+    return {"intent": nlp_result.get("intent", {}), "sql_query": sql_query}
+
+
+async def _data_step(sql_query: str, query_id: str, database_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Query pipeline step: execute the SQL with the Data Agent"""
+    logger.info(f"🔧 Sending SQL query to Data Agent: {sql_query[:100]}...")
+    
+    data_result = await send_to_agent_enhanced(
+        AgentType.DATA,
+        {
+            "type": "sql_query",
+            "sql_query": sql_query,
+            "query_id": query_id,
+            "query_context": {
                 "database_context": database_context,
-                "context": {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "source": "backend_api_websocket"
-                }
+                "timestamp": datetime.utcnow().isoformat(),
+                "source": "backend_api"
+            },
+            "execution_config": {
+                "use_cache": True,
+                "validate_result": True,
+                "optimize_query": True
             }
-        )
-        
-        logger.info("Enhanced communication with nlp agent successful")
-        logger.info(f"NLP processing completed for query: {query_request.query}")
-        
-        # Debug logging to understand the NLP response
-        logger.info(f"🔍 DEBUG: NLP result type: {type(nlp_result)}")
-        logger.info(f"🔍 DEBUG: NLP result keys: {list(nlp_result.keys()) if isinstance(nlp_result, dict) else 'Not a dict'}")
-        if isinstance(nlp_result, dict):
-            logger.info(f"🔍 DEBUG: NLP result has 'success' field: {'success' in nlp_result}")
-            logger.info(f"🔍 DEBUG: NLP result 'success' value: {nlp_result.get('success')}")
-            logger.info(f"🔍 DEBUG: NLP result has 'sql_query' field: {'sql_query' in nlp_result}")
-        
-        # Check for standard NLP response format - NLP Agent may not return "success" field
-        if not nlp_result:
-            raise Exception("NLP processing failed: No response")
-        
-        # Check for error responses from enhanced communication
-        if nlp_result.get("success") is False:
-            error_info = nlp_result.get("error", {})
-            if isinstance(error_info, dict):
-                error_msg = error_info.get("message", "Unknown error")
-            else:
-                error_msg = str(error_info)
-            raise Exception(f"NLP processing failed: {error_msg}")
-        
-        # Check if we have a valid NLP response (sql_query indicates success)
-        if not nlp_result.get("sql_query") and not nlp_result.get("success"):
-            logger.error(f"NLP response missing required fields: {nlp_result}")
-            raise Exception("NLP processing failed: Response missing sql_query and success fields")
-        
-        query_intent = nlp_result.get("intent", {})
-        sql_query = nlp_result.get("sql_query", "")
-        
-        logger.info(f"Generated SQL query: {sql_query}")
-        
-        # Step 2: Send SQL query to Data Agent
-        logger.info(f"🔧 Sending SQL query to Data Agent: {sql_query[:100]}...")
-        
-        data_result = await send_to_agent_enhanced(
-            AgentType.DATA,
-            {
-                "type": "sql_query",
-                "sql_query": sql_query,
-                "query_id": query_id,
-                "query_context": {
-                    "database_context": database_context,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "source": "backend_api"
-                },
-                "execution_config": {
-                    "use_cache": True,
-                    "validate_result": True,
-                    "optimize_query": True
-                }
+        }
+    )
+    
+    logger.info(f"📊 Data Agent WebSocket response received: {bool(data_result)}")
+    logger.info(f"🔍 DEBUG: Data agent response type: {type(data_result)}")
+    logger.info(f"🔍 DEBUG: Data agent response keys: {list(data_result.keys()) if isinstance(data_result, dict) else 'Not a dict'}")
+    if isinstance(data_result, dict):
+        logger.info(f"🔍 DEBUG: Data agent success field: {data_result.get('success')}")
+        logger.info(f"🔍 DEBUG: Data agent error field: {data_result.get('error')}")
+    
+    if not data_result:
+        raise Exception("Data processing failed: No response from data agent")
+    if not data_result.get("success"):
+        raise _agent_error("Data processing failed", data_result.get("error", "Unknown error"))
+    return data_result
+
+
+async def _data_fallback_step(sql_query: str, query_id: str, database_context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Query pipeline fallback: execute the SQL through the MCP server directly"""
+    logger.info("🔄 Attempting fallback data processing...")
+    from mcp_client import get_backend_mcp_client
+    mcp_client = get_backend_mcp_client()
+    fallback_result = await mcp_client.execute_query(sql_query)
+    
+    if not fallback_result or fallback_result.get("error"):
+        raise Exception(f"Fallback processing failed: {fallback_result.get('error', 'Unknown error') if fallback_result else 'No response'}")
+    
+    logger.info("✅ Data processing completed")
+    return {
+        "success": True,
+        "data": fallback_result.get("rows", []),
+        "columns": fallback_result.get("columns", []),
+        "processing_time_ms": fallback_result.get("execution_time_ms", 0)
+    }
+
+
+async def _viz_step(
+    data_result: Dict[str, Any],
+    intent: Dict[str, Any],
+    query: str,
+    query_id: str,
+    user_id: str,
+    session_id: str,
+    database_context: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Query pipeline step: chart the data with the Viz Agent, with session context for dashboard integration"""
+    query_data = data_result.get("data", [])
+    columns = data_result.get("columns", [])
+    logger.info(f"🎨 Sending data to Viz Agent: {len(query_data)} rows")
+    
+    viz_result = await send_to_agent_enhanced(
+        AgentType.VIZ,
+        {
+            "type": "viz_query",
+            **_viz_data_fields(data_result, query_data, columns),
+            "query": query,
+            "intent": intent,
+            "query_id": query_id,
+            "session_id": session_id,  # Include session for dashboard integration
+            "user_id": user_id,        # Include user for dashboard integration
+            "context": {
+                "timestamp": datetime.utcnow().isoformat(),
+                "source": "backend_api_websocket",
+                "database_context": database_context
             }
+        }
+    )
+    
+    logger.info(f"📈 Viz Agent WebSocket response received: {bool(viz_result)}")
+    
+    if not viz_result:
+        raise Exception("Visualization processing failed: No response from viz agent")
+    if not viz_result.get("success"):
+        raise _agent_error("Visualization processing failed", viz_result.get("error", "Unknown error"))
+    return viz_result
+
+
+async def _viz_fallback_step(data_result: Dict[str, Any], query: str, **_) -> Dict[str, Any]:
+    """Query pipeline fallback: show the data as a table"""
+    logger.info("🔄 Using fallback visualization")
+    return {
+        "success": True,
+        "chart_config": {
+            "chart_type": "table",
+            "title": f"Results for: {query}"
+        },
+        "chart_data": {"rows": data_result.get("data", []), "columns": data_result.get("columns", [])},
+        "chart_html": None,
+        "chart_json": None
+    }
+
+
+def _agent_error(prefix: str, error_info: Any) -> Exception:
+    """Exception for an agent error response; communication errors are retryable"""
+    if isinstance(error_info, dict):
+        message = f"{prefix}: {error_info.get('message', 'Unknown error')}"
+        if error_info.get("type") == "communication_error":
+            return ConnectionError(message)
+        return Exception(message)
+    return Exception(f"{prefix}: {error_info}")
+
+
+# NLP -> Data -> Viz workflow of process_query_core
+query_pipeline = PipelineExecutor(
+    "query",
+    [
+        PipelineStep(
+            name="nlp",
+            func=_nlp_step,
+            inputs=["query", "query_id", "user_id", "session_id", "database_context"],
+            outputs=["intent", "sql_query"],
+            timeout=30.0,
+            retry_config=nlp_retry_config,
+            circuit_breaker=nlp_agent_circuit_breaker
+        ),
+        PipelineStep(
+            name="data",
+            func=_data_step,
+            inputs=["sql_query", "query_id", "database_context"],
+            outputs=["data_result"],
+            timeout=120.0,
+            retry_config=data_retry_config,
+            circuit_breaker=data_agent_circuit_breaker,
+            fallback=_data_fallback_step
+        ),
+        PipelineStep(
+            name="viz",
+            func=_viz_step,
+            inputs=["data_result", "intent", "query", "query_id", "user_id", "session_id", "database_context"],
+            outputs=["viz_result"],
+            timeout=45.0,
+            retry_config=viz_retry_config,
+            circuit_breaker=viz_agent_circuit_breaker,
+            fallback=_viz_fallback_step
         )
+    ]
+)
+
+
+async def _run_query_workflow(
+    query_request: QueryRequest,
+    query_id: str,
+    user_id: str,
+    session_id: str,
+    database_context: Optional[Dict[str, Any]]
+) -> QueryResponse:
+    """Run a query through the NLP, Data and Viz agents"""
+    try:
+        run = await query_pipeline.run({
+            "query": query_request.query,
+            "query_id": query_id,
+            "user_id": user_id,
+            "session_id": session_id,
+            "database_context": database_context
+        })
         
-        logger.info(f"📊 Data Agent WebSocket response received: {bool(data_result)}")
-        logger.info(f"🔍 DEBUG: Data agent response type: {type(data_result)}")
-        logger.info(f"🔍 DEBUG: Data agent response keys: {list(data_result.keys()) if isinstance(data_result, dict) else 'Not a dict'}")
-        if isinstance(data_result, dict):
-            logger.info(f"🔍 DEBUG: Data agent success field: {data_result.get('success')}")
-            logger.info(f"🔍 DEBUG: Data agent error field: {data_result.get('error')}")
-        
-        if not data_result or not data_result.get("success"):
-            error_msg = data_result.get('error', 'Unknown error') if data_result else 'No response from data agent'
-            logger.error(f"❌ Data processing failed: {error_msg}")
-            
-            # Try fallback processing
-            logger.info("🔄 Attempting fallback data processing...")
-            try:
-                # Use MCP client as fallback
-                from mcp_client import get_backend_mcp_client
-                mcp_client = get_backend_mcp_client()
-                fallback_result = await mcp_client.execute_query(sql_query)
-                
-                if fallback_result and not fallback_result.get("error"):
-                    data_result = {
-                        "success": True,
-                        "data": fallback_result.get("rows", []),
-                        "columns": fallback_result.get("columns", []),
-                        "processing_time_ms": fallback_result.get("execution_time_ms", 0)
-                    }
-                    logger.info("✅ Data processing completed")
-                else:
-                    raise Exception(f"Fallback processing failed: {fallback_result.get('error', 'Unknown error')}")
-            except Exception as fallback_error:
-                logger.error(f"MCP fallback processing failed: {fallback_error}")
-                raise Exception(f"Data processing failed: {error_msg}")
-        
+        query_intent = run.outputs["intent"]
+        sql_query = run.outputs["sql_query"]
+        data_result = run.outputs["data_result"]
+        viz_result = run.outputs["viz_result"]
         query_data = data_result.get("data", [])
         columns = data_result.get("columns", [])
-        logger.info(f"✅ Data processing completed, retrieved {len(query_data)} rows")
-        
-        # Step 3: Send data to Viz Agent with session context for dashboard integration
-        logger.info(f"🎨 Sending data to Viz Agent: {len(query_data)} rows")
-        
-        viz_result = await send_to_agent_enhanced(
-            AgentType.VIZ,
-            {
-                "type": "viz_query",
-                "data": query_data,
-                "columns": columns,
-                "query": query_request.query,
-                "intent": query_intent,
-                "query_id": query_id,
-                "session_id": session_id,  # Include session for dashboard integration
-                "user_id": user_id,        # Include user for dashboard integration
-                "context": {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "source": "backend_api_websocket",
-                    "database_context": database_context
-                }
-            }
-        )
-        
-        logger.info(f"📈 Viz Agent WebSocket response received: {bool(viz_result)}")
-        
-        if not viz_result or not viz_result.get("success"):
-            logger.warning(f"⚠️ Visualization processing failed: {viz_result.get('error', 'Unknown error') if viz_result else 'No response from viz agent'}")
-            # Use fallback visualization
-            logger.info("🔄 Using fallback visualization")
-            viz_result = {
-                "success": True,
-                "chart_config": {
-                    "chart_type": "table",
-                    "title": f"Results for: {query_request.query}"
-                },
-                "chart_data": {"rows": query_data, "columns": columns},
-                "chart_html": None,
-                "chart_json": None
-            }
-        
-        logger.info("✅ Visualization processing completed")
+        logger.info(f"✅ Query pipeline completed, retrieved {len(query_data)} rows (steps: {run.step_timings})")
         
         return QueryResponse(
             query_id=query_id,
@@ -914,21 +1080,38 @@ async def process_query_core(query_request: QueryRequest) -> QueryResponse:
                 "chart_html": viz_result.get("chart_html"),
                 "chart_json": viz_result.get("chart_json")
             },
+            # Steps that failed and were answered by their fallback instead
+            agent_performance={"step_timings_ms": run.step_timings, "fallbacks": sorted(run.errors)},
             success=True
         )
         
     except Exception as e:
         logger.error(f"Error in core query processing: {str(e)}")
-        return QueryResponse(
-            query_id=query_id,
-            intent=QueryIntent(metric_type="unknown", time_period="unknown"),
-            error=ErrorResponse(
-                error_type="processing_error",
-                message=f"Error processing query: {str(e)}",
-                recovery_action="retry",
-                suggestions=["Please try again or rephrase your question"]
-            )
-        )
+        return _processing_error_response(query_id, e)
+
+
+def _processing_error_response(query_id: str, e: Exception) -> QueryResponse:
+    """
+    Error response for a failed query workflow.
+    
+    Users see the agent's own error; the name of a failed pipeline step is kept
+    out of the message and reported in ``agent_performance`` instead.
+    """
+    agent_performance = None
+    if isinstance(e, PipelineStepError):
+        agent_performance = {"failed_step": e.step}
+        e = e.error
+    return QueryResponse(
+        query_id=query_id,
+        intent=QueryIntent(metric_type="unknown", time_period="unknown"),
+        error=ErrorResponse(
+            error_type="processing_error",
+            message=f"Error processing query: {str(e)}",
+            recovery_action="retry",
+            suggestions=["Please try again or rephrase your question"]
+        ),
+        agent_performance=agent_performance
+    )
 
 
 @app.post("/api/query", response_model=QueryResponse)
@@ -939,7 +1122,18 @@ async def process_query(
 ):
     """Process natural language query through multi-agent workflow"""
     try:
-        return await process_query_core(query_request)
+        with tracing.root_span(
+            "POST /api/query",
+            traceparent=request.headers.get(tracing.TRACEPARENT),
+            user_id=query_request.user_id
+        ) as span:
+            return _with_trace_id(await process_query_core(query_request), span)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error processing query: {str(e)}")
         return QueryResponse(
@@ -1107,14 +1301,8 @@ async def select_database_and_fetch_schema(request: Request, body: dict):
                         # Fetch full schema context from MCP server and cache it
                         schema_context = await mcp_client.build_schema_context(database_name=database_name)
                         
-                        # Cache schema context in Redis for faster access
-                        if redis_client:
-                            cache_key = f"schema_context:{database_name}"
-                            await redis_client.setex(
-                                cache_key,
-                                3600,  # 1 hour cache
-                                json.dumps(schema_context)
-                            )
+                        # Cache schema context in Redis for faster access (1 hour)
+                        if await database_context_manager.store_schema_context(database_name, schema_context, ttl=3600):
                             logger.info(f"✅ Schema context cached for {database_name}")
                         
                         # Update database context to mark schema as cached
@@ -1479,37 +1667,29 @@ async def test_database(request: Request):
 # Helper functions for database context management
 async def get_database_context(session_id: str) -> Optional[Dict[str, Any]]:
     """Retrieve database context from Redis session and include schema context"""
-    if not redis_client:
+    if not redis_client or not database_context_manager:
         logger.warning("Redis not available, database context unavailable")
         return None
     
     try:
-        context_key = f"db_context:{session_id}"  # Fixed prefix to match DatabaseContextManager
-        logger.info(f"🔍 Looking for database context with key: {context_key}")
-        
-        # List all session keys for debugging
-        all_keys = await redis_client.keys("db_context:*")
-        logger.info(f"🔍 Available database context keys: {[key.decode() if isinstance(key, bytes) else key for key in all_keys]}")
+        # Single key lookup, served from the local context cache when possible
+        database_context = await database_context_manager.get_context_data(session_id)
         
-        context_data = await redis_client.get(context_key)
-        
-        if context_data:
-            database_context = json.loads(context_data)
+        if database_context:
             database_name = database_context.get('database_name')
             logger.info(f"✅ Retrieved database context for session {session_id}: {database_name}")
             
-            # ✅ ENHANCED: Include schema context for NLP agent
+            # ✅ ENHANCED: Reference the schema context for the NLP agent, which resolves it from its own cache
             if database_name:
-                schema_cache_key = f"schema_context:{database_name}"
-                schema_data = await redis_client.get(schema_cache_key)
+                try:
+                    schema_ref = await database_context_manager.get_schema_reference(database_name)
+                except Exception as schema_error:
+                    logger.warning(f"Failed to load schema context version for {database_name}: {schema_error}")
+                    schema_ref = None
                 
-                if schema_data:
-                    try:
-                        schema_context = json.loads(schema_data)
-                        database_context['schema_context'] = schema_context
-                        logger.info(f"✅ Included detailed schema context for {database_name}: {schema_context.get('total_tables', 0)} tables, {schema_context.get('total_columns', 0)} columns")
-                    except Exception as schema_error:
-                        logger.warning(f"Failed to parse schema context for {database_name}: {schema_error}")
+                if schema_ref:
+                    database_context['schema_ref'] = schema_ref
+                    logger.info(f"✅ Included schema context reference for {database_name}: version {schema_ref['version']}")
                 else:
                     logger.warning(f"No schema context cached for database {database_name}")
             
@@ -1525,18 +1705,14 @@ async def get_database_context(session_id: str) -> Optional[Dict[str, Any]]:
 
 async def set_database_context(session_id: str, database_context: Dict[str, Any]) -> bool:
     """Store database context in Redis session"""
-    if not redis_client:
+    if not redis_client or not database_context_manager:
         logger.warning("Redis not available, cannot store database context")
         return False
     
     try:
-        context_key = f"db_context:{session_id}"  # Fixed prefix to match DatabaseContextManager
         # Set with 1 hour expiration
-        await redis_client.setex(
-            context_key,
-            3600,
-            json.dumps(database_context, default=str)
-        )
+        if not await database_context_manager.store_context_data(session_id, database_context, ttl=3600):
+            return False
         logger.info(f"Stored database context for session {session_id}: {database_context.get('database_name', 'unknown')}")
         return True
         
@@ -1571,24 +1747,24 @@ async def send_to_nlp_agent(query: str, query_id: str, session_id: Optional[str]
             payload["database_context"] = database_context
         
         timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(f"{nlp_agent_url}/process", json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
+        session = http_clients.session(nlp_agent_url)
+        async with session.post(f"{nlp_agent_url}/process", json=payload, timeout=timeout) as response:
+            if response.status == 200:
+                result = await response.json()
                     
-                    # Validate and standardize the response
-                    validated_response = validate_nlp_response(result)
-                    if validated_response:
-                        logger.info(f"NLP Agent processed query {query_id} successfully (validated)")
-                        # Convert back to dict for backward compatibility
-                        return validated_response.dict()
-                    else:
-                        logger.error(f"NLP Agent response validation failed for query {query_id}")
-                        return {"error": "Invalid response format from NLP Agent"}
+                # Validate and standardize the response
+                validated_response = validate_nlp_response(result)
+                if validated_response:
+                    logger.info(f"NLP Agent processed query {query_id} successfully (validated)")
+                    # Convert back to dict for backward compatibility
+                    return validated_response.dict()
                 else:
-                    error_text = await response.text()
-                    logger.error(f"NLP Agent error {response.status}: {error_text}")
-                    return {"error": f"NLP Agent returned {response.status}: {error_text}"}
+                    logger.error(f"NLP Agent response validation failed for query {query_id}")
+                    return {"error": "Invalid response format from NLP Agent"}
+            else:
+                error_text = await response.text()
+                logger.error(f"NLP Agent error {response.status}: {error_text}")
+                return {"error": f"NLP Agent returned {response.status}: {error_text}"}
                     
     except asyncio.TimeoutError:
         logger.error(f"NLP Agent timeout for query {query_id}")
@@ -1626,24 +1802,24 @@ async def send_to_data_agent(sql_query: str, query_context: dict, query_id: str,
         
         # Increase timeout to handle database connection issues
         timeout = aiohttp.ClientTimeout(total=120)  # Increased from 60 to 120 seconds
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(f"{data_agent_url}/execute", json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
+        session = http_clients.session(data_agent_url)
+        async with session.post(f"{data_agent_url}/execute", json=payload, timeout=timeout) as response:
+            if response.status == 200:
+                result = await response.json()
                     
-                    # Validate and standardize the response
-                    validated_response = validate_data_response(result)
-                    if validated_response:
-                        logger.info(f"Data Agent processed query {query_id} successfully (validated)")
-                        # Convert back to dict for backward compatibility
-                        return validated_response.dict()
-                    else:
-                        logger.error(f"Data Agent response validation failed for query {query_id}")
-                        return {"success": False, "error": "Invalid response format from Data Agent"}
+                # Validate and standardize the response
+                validated_response = validate_data_response(result)
+                if validated_response:
+                    logger.info(f"Data Agent processed query {query_id} successfully (validated)")
+                    # Convert back to dict for backward compatibility
+                    return validated_response.dict()
                 else:
-                    error_text = await response.text()
-                    logger.error(f"Data Agent error {response.status}: {error_text}")
-                    return {"success": False, "error": f"Data Agent returned {response.status}: {error_text}"}
+                    logger.error(f"Data Agent response validation failed for query {query_id}")
+                    return {"success": False, "error": "Invalid response format from Data Agent"}
+            else:
+                error_text = await response.text()
+                logger.error(f"Data Agent error {response.status}: {error_text}")
+                return {"success": False, "error": f"Data Agent returned {response.status}: {error_text}"}
                     
     except asyncio.TimeoutError:
         logger.error(f"Data Agent timeout for query {query_id}")
@@ -1681,24 +1857,24 @@ async def send_to_viz_agent(data: list, query_context: dict, query_id: str, sess
             payload["database_context"] = database_context
         
         timeout = aiohttp.ClientTimeout(total=45)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(f"{viz_agent_url}/visualize", json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
+        session = http_clients.session(viz_agent_url)
+        async with session.post(f"{viz_agent_url}/visualize", json=payload, timeout=timeout) as response:
+            if response.status == 200:
+                result = await response.json()
                     
-                    # Validate and standardize the response
-                    validated_response = validate_viz_response(result)
-                    if validated_response:
-                        logger.info(f"Viz Agent processed query {query_id} successfully (validated)")
-                        # Convert back to dict for backward compatibility
-                        return validated_response.dict()
-                    else:
-                        logger.error(f"Viz Agent response validation failed for query {query_id}")
-                        return {"success": False, "error": "Invalid response format from Viz Agent"}
+                # Validate and standardize the response
+                validated_response = validate_viz_response(result)
+                if validated_response:
+                    logger.info(f"Viz Agent processed query {query_id} successfully (validated)")
+                    # Convert back to dict for backward compatibility
+                    return validated_response.dict()
                 else:
-                    error_text = await response.text()
-                    logger.error(f"Viz Agent error {response.status}: {error_text}")
-                    return {"success": False, "error": f"Viz Agent returned {response.status}: {error_text}"}
+                    logger.error(f"Viz Agent response validation failed for query {query_id}")
+                    return {"success": False, "error": "Invalid response format from Viz Agent"}
+            else:
+                error_text = await response.text()
+                logger.error(f"Viz Agent error {response.status}: {error_text}")
+                return {"success": False, "error": f"Viz Agent returned {response.status}: {error_text}"}
                     
     except asyncio.TimeoutError:
         logger.error(f"Viz Agent timeout for query {query_id}")
@@ -1758,6 +1934,135 @@ async def send_to_agent_enhanced(
         }
 
 
+# Rows forwarded to the viz agent alongside a result handle
+RESULT_PREVIEW_ROWS = int(os.getenv("RESULT_PREVIEW_ROWS", "20"))
+
+
+def _viz_data_fields(data_result: Dict[str, Any], query_data: List[Dict[str, Any]], columns: List[str]) -> Dict[str, Any]:
+    """
+    Data fields of a viz_query message.
+    
+    When the data agent stored the result in the shared result store, only the
+    handle and a preview are forwarded and the viz agent fetches the rows
+    itself; otherwise the rows are sent inline.
+    """
+    result_handle = data_result.get("result_handle")
+    if result_handle:
+        return {
+            "result_handle": result_handle,
+            "preview": query_data[:RESULT_PREVIEW_ROWS],
+            "row_count": len(query_data),
+            "columns": columns
+        }
+    return {"data": query_data, "columns": columns}
+
+
+def _is_cacheable_answer(response: QueryResponse) -> bool:
+    """Whether a workflow response is a complete answer: no error and no step fell back"""
+    if response.error or not response.result:
+        return False
+    return not (response.agent_performance or {}).get("fallbacks")
+
+
+async def _answer_with_cache(
+    query_request: QueryRequest,
+    query_id: str,
+    session_id: str,
+    database_context: Optional[Dict[str, Any]],
+    run_workflow: Callable[[], Awaitable[QueryResponse]],
+    dashboard_user_id: Optional[str] = None
+) -> QueryResponse:
+    """
+    Serve a query from the answer cache, running the agent workflow on a miss.
+
+    Answers are keyed on the normalized question, the database, its schema
+    version and the request options, so a schema change never serves an answer
+    built on the old schema. Stale answers are returned immediately and
+    refreshed in the background. When ``dashboard_user_id`` is given, a fresh
+    answer first produced for another session is also added to this session's
+    dashboard by the viz agent. Degraded answers, where a step fell back, are
+    returned but never cached.
+    """
+    schema_ref = (database_context or {}).get("schema_ref")
+    if not answer_cache or not schema_ref:
+        return await run_workflow()
+
+    cache_key = answer_cache.make_key(
+        query_request.query,
+        database_context.get("database_name"),
+        schema_ref["version"],
+        query_request.context
+    )
+
+    async def refresh() -> Optional[Dict[str, Any]]:
+        response = await run_workflow()
+        if not _is_cacheable_answer(response):
+            return None
+        return response.model_dump(mode="json")
+
+    cached = await answer_cache.get(cache_key)
+    if cached:
+        response = QueryResponse(**cached.response)
+        response.query_id = query_id
+        response.agent_performance = {
+            **(response.agent_performance or {}),
+            "answer_cache": {"status": "stale" if cached.stale else "hit", "age_seconds": round(cached.age_seconds, 1)}
+        }
+        if cached.stale:
+            # The refresh runs the full workflow for this session, dashboard included
+            answer_cache.schedule_refresh(cache_key, refresh, session_id)
+        elif dashboard_user_id and cached.session_id != session_id:
+            asyncio.create_task(_add_cached_answer_to_dashboard(
+                response, query_request.query, session_id, dashboard_user_id, database_context
+            ))
+        logger.info(f"Answered query {query_id} from answer cache ({response.agent_performance['answer_cache']['status']})")
+        return response
+
+    response = await run_workflow()
+    if _is_cacheable_answer(response):
+        await answer_cache.set(cache_key, response.model_dump(mode="json"), session_id)
+    return response
+
+
+async def _admitted(
+    run_workflow: Callable[[], Awaitable[QueryResponse]],
+    on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None
+) -> QueryResponse:
+    """Run an agent workflow within the in-flight budget, raising AdmissionRejected under overload"""
+    async with query_admission.admit(on_queued):
+        return await run_workflow()
+
+
+async def _add_cached_answer_to_dashboard(
+    response: QueryResponse,
+    query: str,
+    session_id: str,
+    user_id: str,
+    database_context: Optional[Dict[str, Any]]
+) -> None:
+    """Have the viz agent create the dashboard card of a cached answer for another session"""
+    try:
+        await send_to_agent_enhanced(
+            AgentType.VIZ,
+            {
+                "type": "viz_query",
+                **_viz_data_fields({}, response.result.data, response.result.columns),
+                "query": query,
+                "intent": response.intent.model_dump(),
+                "query_id": response.query_id,
+                "session_id": session_id,
+                "user_id": user_id,
+                "context": {
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "source": "backend_answer_cache",
+                    "database_context": database_context
+                }
+            }
+        )
+    except Exception as e:
+        logger.warning(f"Failed to add cached answer {response.query_id} to dashboard: {e}")
+
+
 # Fallback Functions for Agent Communication Failures
 async def fallback_nlp_processing(query: str, query_id: str) -> dict:
     """Fallback NLP processing when agent is unavailable"""
@@ -1919,7 +2224,10 @@ async def fallback_data_processing(sql_query: str, query_context: dict, query_id
 
 
 # WebSocket processing function for direct use
-async def process_websocket_query_directly(query_request: QueryRequest) -> QueryResponse:
+async def process_websocket_query_directly(
+    query_request: QueryRequest,
+    progress_reporter: Optional[WebSocketProgressReporter] = None
+) -> QueryResponse:
     """
     Process WebSocket query directly without FastAPI dependencies
     This is a clean implementation for WebSocket context
@@ -1935,6 +2243,10 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
     
     logger.info(f"Starting multi-agent workflow for query: {query_request.query} (session: {session_id})")
     
+    async def on_queued(position: int, estimated_wait: float):
+        if progress_reporter:
+            await progress_reporter.report_queue_position(query_id, position, estimated_wait)
+    
     try:
         # Validate database context
         database_context = await get_database_context(session_id)
@@ -1955,6 +2267,33 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
                 )
             )
         
+        return await _answer_with_cache(
+            query_request,
+            query_id,
+            session_id,
+            database_context,
+            lambda: _admitted(
+                lambda: _run_websocket_query_workflow(query_request, query_id, user_id, session_id, database_context),
+                on_queued=on_queued
+            )
+        )
+        
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.error(f"WebSocket query processing error: {str(e)}")
+        return _processing_error_response(query_id, e)
+
+
+async def _run_websocket_query_workflow(
+    query_request: QueryRequest,
+    query_id: str,
+    user_id: str,
+    session_id: str,
+    database_context: Dict[str, Any]
+) -> QueryResponse:
+    """Run a WebSocket query through the NLP, Data and Viz agents"""
+    try:
         # Step 1: Send query to NLP Agent
         nlp_result = await send_to_agent_enhanced(
             AgentType.NLP,
@@ -2003,6 +2342,9 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
         
         logger.info(f"Generated SQL query: {sql_query}")
         
+        # Steps answered by a fallback instead of their agent
+        fallbacks: List[str] = []
+        
         # Step 2: Send to Data Agent
         data_result = await send_to_agent_enhanced(
             AgentType.DATA,
@@ -2028,17 +2370,17 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
             logger.warning("Data agent returned no response, attempting fallback")
         elif data_result.get("success") is False:
             logger.warning(f"Data agent returned error: {data_result.get('error', 'Unknown error')}")
-        elif not data_result.get("processed_data") and not data_result.get("success"):
-            logger.warning("Data agent response missing processed_data field")
+        elif not data_result.get("data", data_result.get("processed_data")) and not data_result.get("success"):
+            logger.warning("Data agent response missing data field")
         else:
             # Data agent response looks good, continue with processing
+            query_data = data_result.get("data", data_result.get("processed_data", []))
+            columns = data_result.get("columns", [])
+            
             # Debug logging to understand what backend receives
-            logger.info(f"🔍 DEBUG: Backend received processed_data length: {len(data_result.get('processed_data', []))}")
-            logger.info(f"🔍 DEBUG: Backend received processed_data sample: {str(data_result.get('processed_data', []))[:200]}...")
+            logger.info(f"🔍 DEBUG: Backend received data length: {len(query_data)}")
+            logger.info(f"🔍 DEBUG: Backend received data sample: {str(query_data)[:200]}...")
             logger.info(f"🔍 DEBUG: Backend received row_count: {data_result.get('row_count', 'MISSING')}")
-            
-            query_data = data_result.get("processed_data", [])
-            columns = data_result.get("columns", [])
             logger.info(f"✅ Data processing completed, retrieved {len(query_data)} rows")
             
             # Skip fallback and go to visualization
@@ -2046,8 +2388,7 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
                 AgentType.VIZ,
                 {
                     "type": "viz_query",
-                    "data": query_data,
-                    "columns": columns,
+                    **_viz_data_fields(data_result, query_data, columns),
                     "query": query_request.query,
                     "intent": query_intent,
                     "query_id": query_id,
@@ -2060,6 +2401,7 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
             
             if not viz_result or viz_result.get("success") is False:
                 logger.warning("⚠️ Visualization processing failed, using fallback")
+                fallbacks.append("viz")
                 viz_result = {
                     "success": True,
                     "chart_config": {
@@ -2093,6 +2435,7 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
                     "chart_html": viz_result.get("chart_html"),
                     "chart_json": viz_result.get("chart_json")
                 },
+                agent_performance={"fallbacks": fallbacks},
                 success=True
             )
         
@@ -2110,6 +2453,7 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
                     "columns": fallback_result.get("columns", []),
                     "processing_time_ms": fallback_result.get("execution_time_ms", 0)
                 }
+                fallbacks.append("data")
                 logger.info("✅ Fallback data processing succeeded")
             else:
                 raise Exception(f"Fallback processing failed: {fallback_result.get('error', 'Unknown error') if fallback_result else 'No response'}")
@@ -2141,6 +2485,7 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
         
         if not viz_result or viz_result.get("success") is False:
             logger.warning("⚠️ Visualization processing failed, using fallback")
+            fallbacks.append("viz")
             viz_result = {
                 "success": True,
                 "chart_config": {
@@ -2174,6 +2519,7 @@ async def process_websocket_query_directly(query_request: QueryRequest) -> Query
                 "chart_html": viz_result.get("chart_html"),
                 "chart_json": viz_result.get("chart_json")
             },
+            agent_performance={"fallbacks": fallbacks},
             success=True
         )
         
@@ -2200,7 +2546,7 @@ async def handle_websocket_query(websocket: WebSocket, user_id: str, data: Dict[
         correlation_id = data.get("correlation_id")
         
         # Send processing started message
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "query_processing_started",
             "query": query_text,
             "session_id": session_id,
@@ -2219,19 +2565,34 @@ async def handle_websocket_query(websocket: WebSocket, user_id: str, data: Dict[
         logger.info(f"Processing WebSocket query from {user_id}: {query_text}")
         
         # Use direct processing to avoid FastAPI dependencies in WebSocket context
-        response = await process_websocket_query_directly(query_request)
+        with tracing.root_span("WS query", traceparent=data.get(tracing.TRACEPARENT), user_id=user_id) as span:
+            response = _with_trace_id(
+                await process_websocket_query_directly(query_request, WebSocketProgressReporter(websocket, user_id)),
+                span
+            )
         
         # Send response back through WebSocket
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "query_response",
             "response": response.model_dump() if hasattr(response, 'model_dump') else response.__dict__,
             "correlation_id": correlation_id,
             "timestamp": datetime.utcnow().isoformat()
         })
         
+    except AdmissionRejected as e:
+        await send_websocket_json(websocket, {
+            "type": "query_error",
+            "error": {
+                "error_type": "server_overloaded",
+                "message": str(e),
+                "retry_after": e.retry_after
+            },
+            "correlation_id": data.get("correlation_id"),
+            "timestamp": datetime.utcnow().isoformat()
+        })
     except Exception as e:
         logger.error(f"WebSocket query processing error: {e}")
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "query_error",
             "error": {
                 "error_type": "query_processing_error",
@@ -2250,7 +2611,7 @@ async def handle_websocket_database_select(websocket: WebSocket, user_id: str, d
         correlation_id = data.get("correlation_id")
         
         if not database_name:
-            await websocket.send_json({
+            await send_websocket_json(websocket, {
                 "type": "database_select_error",
                 "error": {
                     "error_type": "missing_database_name",
@@ -2262,7 +2623,7 @@ async def handle_websocket_database_select(websocket: WebSocket, user_id: str, d
             return
         
         # Send processing started message
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "database_select_started",
             "database_name": database_name,
             "session_id": session_id,
@@ -2284,7 +2645,7 @@ async def handle_websocket_database_select(websocket: WebSocket, user_id: str, d
             }
         
         # Send response back through WebSocket
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "database_select_response", 
             "response": response,
             "correlation_id": correlation_id,
@@ -2293,7 +2654,7 @@ async def handle_websocket_database_select(websocket: WebSocket, user_id: str, d
         
     except Exception as e:
         logger.error(f"WebSocket database selection error: {e}")
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "database_select_error",
             "error": {
                 "error_type": "database_selection_error",
@@ -2323,7 +2684,7 @@ async def handle_websocket_get_databases(websocket: WebSocket, user_id: str, dat
             databases = databases_response.get("databases", [])
         
         # Send response back through WebSocket
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "databases_response",
             "databases": databases,
             "correlation_id": correlation_id,
@@ -2332,7 +2693,7 @@ async def handle_websocket_get_databases(websocket: WebSocket, user_id: str, dat
         
     except Exception as e:
         logger.error(f"WebSocket get databases error: {e}")
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "databases_error",
             "error": {
                 "error_type": "get_databases_error",
@@ -2353,7 +2714,7 @@ async def handle_websocket_get_database_context(websocket: WebSocket, user_id: s
         database_context = await get_database_context(session_id)
         
         # Send response back through WebSocket
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "database_context_response",
             "database_context": database_context,
             "session_id": session_id,
@@ -2363,7 +2724,7 @@ async def handle_websocket_get_database_context(websocket: WebSocket, user_id: s
         
     except Exception as e:
         logger.error(f"WebSocket get database context error: {e}")
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "database_context_error",
             "error": {
                 "error_type": "get_database_context_error",
@@ -2379,6 +2740,7 @@ async def handle_websocket_get_database_context(websocket: WebSocket, user_id: s
 async def websocket_query_endpoint(websocket: WebSocket, user_id: str):
     """WebSocket endpoint for real-time BI query processing"""
     await websocket.accept()
+    negotiate_websocket_compression(websocket, websocket.query_params.get("compression"))
     
     # Close any existing connection for this user to prevent session conflicts
     if user_id in websocket_connections:
@@ -2396,7 +2758,7 @@ async def websocket_query_endpoint(websocket: WebSocket, user_id: str):
         logger.info(f"WebSocket query connection established for user: {user_id}")
         
         # Send welcome message
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "connection_established",
             "message": "Connected to Agentic BI System",
             "timestamp": datetime.utcnow().isoformat(),
@@ -2413,7 +2775,7 @@ async def websocket_query_endpoint(websocket: WebSocket, user_id: str):
             # Handle different message types
             if message_type.lower() in ["heartbeat", "ping"]:
                 # Standardized heartbeat response format
-                await websocket.send_json({
+                await send_websocket_json(websocket, {
                     "type": "heartbeat_response", 
                     "timestamp": datetime.utcnow().isoformat(),
                     "correlation_id": data.get("correlation_id"),
@@ -2449,19 +2811,23 @@ async def websocket_query_endpoint(websocket: WebSocket, user_id: str):
                 
                 logger.info(f"Received handshake from {agent_id} ({agent_type}) with capabilities: {capabilities}")
                 
+                if "compression" in data:
+                    negotiate_websocket_compression(websocket, data.get("compression"))
+                
                 # Send handshake acknowledgment
-                await websocket.send_json({
+                await send_websocket_json(websocket, {
                     "type": "connection_acknowledged",
                     "agent_id": agent_id,
                     "server_agent_id": f"backend_{user_id}",
                     "server_capabilities": ["query_processing", "database_management", "real_time_updates"],
                     "session_established": True,
+                    "compression": websocket.state.compression,
                     "timestamp": datetime.utcnow().isoformat()
                 })
                 
             else:
                 # Unknown message type  
-                await websocket.send_json({
+                await send_websocket_json(websocket, {
                     "type": "error",
                     "error": {
                         "error_type": "unknown_message_type",
@@ -2483,7 +2849,7 @@ async def websocket_query_endpoint(websocket: WebSocket, user_id: str):
         if user_id in websocket_connections:
             del websocket_connections[user_id]
         try:
-            await websocket.send_json({
+            await send_websocket_json(websocket, {
                 "type": "error",
                 "error": {
                     "error_type": "websocket_error", 
@@ -2505,12 +2871,13 @@ async def websocket_query_endpoint(websocket: WebSocket, user_id: str):
 async def websocket_chat_endpoint(websocket: WebSocket, user_id: str):
     """WebSocket endpoint for chat compatibility (redirects to query endpoint)"""
     await websocket.accept()
+    negotiate_websocket_compression(websocket, websocket.query_params.get("compression"))
     
     try:
         logger.info(f"WebSocket chat connection (legacy) established for user: {user_id}")
         
         # Send welcome message with migration note
-        await websocket.send_json({
+        await send_websocket_json(websocket, {
             "type": "system",
             "message": "Connected to Agentic BI System (Legacy Chat Mode)",
             "timestamp": datetime.utcnow().isoformat(),
@@ -2529,15 +2896,15 @@ async def check_agent_health(agent_url: str, agent_name: str) -> bool:
     """Check if an agent is healthy and responding"""
     try:
         timeout = aiohttp.ClientTimeout(total=5)  # Short timeout for health checks
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(f"{agent_url}/health") as response:
-                if response.status == 200:
-                    health_data = await response.json()
-                    logger.debug(f"{agent_name} health check passed: {health_data.get('status', 'unknown')}")
-                    return True
-                else:
-                    logger.warning(f"{agent_name} health check failed: HTTP {response.status}")
-                    return False
+        session = http_clients.session(agent_url)
+        async with session.get(f"{agent_url}/health", timeout=timeout) as response:
+            if response.status == 200:
+                health_data = await response.json()
+                logger.debug(f"{agent_name} health check passed: {health_data.get('status', 'unknown')}")
+                return True
+            else:
+                logger.warning(f"{agent_name} health check failed: HTTP {response.status}")
+                return False
     except Exception as e:
         logger.warning(f"{agent_name} health check failed: {e}")
         return False
@@ -2581,7 +2948,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "message": exc.detail,
             "status_code": exc.status_code,
             "timestamp": datetime.utcnow().isoformat()
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -13,8 +13,13 @@ from typing import Any, Dict, List, Optional
 import aiohttp
 from contextlib import asynccontextmanager
 
+import tracing
+
 logger = logging.getLogger(__name__)
 
+# Tables per get_table_schemas request when building the schema context
+SCHEMA_BATCH_SIZE = 100
+
 try:
     from .websocket_mcp_client import WebSocketMCPClient
 except ImportError:
@@ -194,18 +199,20 @@ class BackendMCPClient:
                 
                 endpoint = endpoint_map.get(tool_name, f"{tool_name}_tool")
                 
-                async with self.session.post(
-                    f"{self.server_url}/tools/{endpoint}",
-                    json=params,
-                    headers={"Content-Type": "application/json"}
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"MCP tool '{tool_name}' -> '{endpoint}' failed ({response.status}): {error_text}")
-                        return {"error": f"HTTP {response.status}: {error_text}"}
+                with tracing.span(f"mcp.{mcp_tool_name}", transport="http"):
+                    async with self.session.post(
+                        f"{self.server_url}/tools/{endpoint}",
+                        json=params,
+                        headers=tracing.inject({"Content-Type": "application/json"})
+                    ) as response:
+                        tracing.collect_header(response.headers.get(tracing.TRACE_SPANS_HEADER))
+                        if response.status == 200:
+                            result = await response.json()
+                            return result
+                        else:
+                            error_text = await response.text()
+                            logger.error(f"MCP tool '{tool_name}' -> '{endpoint}' failed ({response.status}): {error_text}")
+                            return {"error": f"HTTP {response.status}: {error_text}"}
                     
         except Exception as e:
             logger.error(f"MCP tool '{tool_name}' error: {e}")
@@ -352,54 +359,20 @@ class BackendMCPClient:
                         async with self.ws_client.operation_lock:
                             self.ws_client.heavy_operation_in_progress = True
                     
-                    # Process tables in parallel with controlled concurrency
-                    logger.info(f"🚀 Processing {len(tables)} tables in parallel for {db_name}")
-                    # Reduce concurrency to prevent overwhelming WebSocket connection
-                    max_concurrent = min(3, len(tables))  # Max 3 concurrent requests
-                    semaphore = asyncio.Semaphore(max_concurrent)
-                    
-                    async def bounded_fetch(table):
-                        async with semaphore:
-                            # Add small delay between requests to prevent overwhelming
-                            await asyncio.sleep(0.1)
-                            return await fetch_table_schema(table)
+                    # Fetch schemas in bulk first; only tables the bulk tool could not serve are fetched one by one
+                    bulk_results, remaining_names = await self._fetch_table_schemas_bulk(
+                        db_name, [table.get("name") if isinstance(table, dict) else str(table) for table in tables]
+                    )
+                    remaining_tables = [
+                        table for table in tables
+                        if (table.get("name") if isinstance(table, dict) else str(table)) in remaining_names
+                    ]
                     
-                    # Execute all table schema fetches concurrently with retry logic
-                    max_retries = 2
-                    retry_delay = 2.0
-                    
-                    for attempt in range(max_retries + 1):
-                        try:
-                            logger.info(f"🔄 Schema fetch attempt {attempt + 1}/{max_retries + 1} for {db_name}")
-                            schema_results = await asyncio.gather(
-                                *[bounded_fetch(table) for table in tables],
-                                return_exceptions=True
-                            )
-                            
-                            # Check if we got mostly successful results
-                            successful_results = sum(
-                                1 for result in schema_results 
-                                if not isinstance(result, Exception) and not result.get("error")
-                            )
-                            
-                            if successful_results >= len(tables) * 0.7:  # 70% success rate
-                                logger.info(f"✅ Schema fetch successful: {successful_results}/{len(tables)} tables")
-                                break
-                            else:
-                                if attempt < max_retries:
-                                    logger.warning(f"⚠️ Only {successful_results}/{len(tables)} tables successful, retrying in {retry_delay}s")
-                                    await asyncio.sleep(retry_delay)
-                                    retry_delay *= 1.5  # Exponential backoff
-                                
-                        except Exception as e:
-                            if attempt < max_retries:
-                                logger.warning(f"⚠️ Schema fetch failed (attempt {attempt + 1}): {e}, retrying in {retry_delay}s")
-                                await asyncio.sleep(retry_delay)
-                                retry_delay *= 1.5
-                            else:
-                                logger.error(f"❌ Schema fetch failed after {max_retries + 1} attempts: {e}")
-                                # Create error results for all tables
-                                schema_results = [{"table_name": table.get("name") if isinstance(table, dict) else str(table), "error": str(e)} for table in tables]
+                    schema_results = list(bulk_results)
+                    if remaining_tables:
+                        schema_results.extend(await self._fetch_table_schemas_individually(
+                            db_name, remaining_tables, fetch_table_schema
+                        ))
                     
                     # Process results
                     for result in schema_results:
@@ -460,6 +433,103 @@ class BackendMCPClient:
             logger.error(f"💥 Failed to build schema context: {e}")
             raise Exception(f"Schema context building failed: {str(e)}")
     
+    async def _fetch_table_schemas_bulk(self, db_name: str, table_names: List[str]) -> tuple:
+        """
+        Fetch table schemas with the multi-table get_table_schemas tool.
+        
+        Returns:
+            Tuple of (schema results in build_schema_context's per-table format,
+            names of tables the bulk tool could not serve and that should be
+            fetched individually)
+        """
+        results = []
+        remaining = []
+        
+        for start in range(0, len(table_names), SCHEMA_BATCH_SIZE):
+            batch = table_names[start:start + SCHEMA_BATCH_SIZE]
+            try:
+                bulk_result = await self.call_tool("get_table_schemas", {
+                    "database": db_name,
+                    "tables": batch
+                })
+            except Exception as e:
+                bulk_result = {"error": str(e)}
+            
+            if not isinstance(bulk_result, dict) or not isinstance(bulk_result.get("tables"), dict):
+                error = bulk_result.get("error") if isinstance(bulk_result, dict) else "Unexpected response"
+                logger.warning(f"⚠️ Bulk schema fetch failed for {len(batch)} tables in {db_name}, falling back to per-table requests: {error}")
+                remaining.extend(batch)
+                continue
+            
+            for table_name, schema in bulk_result["tables"].items():
+                results.append({
+                    "table_name": table_name,
+                    "schema": schema,
+                    "columns": schema.get("columns", []),
+                    "indexes": schema.get("indexes", []),
+                    "foreign_keys": schema.get("foreign_keys", [])
+                })
+            # Per-table errors from the bulk tool are authoritative (e.g. the table no longer exists)
+            for table_name, error in (bulk_result.get("errors") or {}).items():
+                results.append({"table_name": table_name, "error": error})
+        
+        logger.info(f"📦 Bulk schema fetch for {db_name}: {len(results)}/{len(table_names)} tables, {len(remaining)} falling back")
+        return results, remaining
+    
+    async def _fetch_table_schemas_individually(self, db_name: str, tables: List[Any], fetch_table_schema) -> List[Any]:
+        """Fetch table schemas one request per table with bounded concurrency and retries."""
+        # Process tables in parallel with controlled concurrency
+        logger.info(f"🚀 Processing {len(tables)} tables in parallel for {db_name}")
+        # Reduce concurrency to prevent overwhelming WebSocket connection
+        max_concurrent = min(3, len(tables))  # Max 3 concurrent requests
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def bounded_fetch(table):
+            async with semaphore:
+                # Add small delay between requests to prevent overwhelming
+                await asyncio.sleep(0.1)
+                return await fetch_table_schema(table)
+        
+        # Execute all table schema fetches concurrently with retry logic
+        max_retries = 2
+        retry_delay = 2.0
+        schema_results = []
+        
+        for attempt in range(max_retries + 1):
+            try:
+                logger.info(f"🔄 Schema fetch attempt {attempt + 1}/{max_retries + 1} for {db_name}")
+                schema_results = await asyncio.gather(
+                    *[bounded_fetch(table) for table in tables],
+                    return_exceptions=True
+                )
+                
+                # Check if we got mostly successful results
+                successful_results = sum(
+                    1 for result in schema_results 
+                    if not isinstance(result, Exception) and not result.get("error")
+                )
+                
+                if successful_results >= len(tables) * 0.7:  # 70% success rate
+                    logger.info(f"✅ Schema fetch successful: {successful_results}/{len(tables)} tables")
+                    break
+                else:
+                    if attempt < max_retries:
+                        logger.warning(f"⚠️ Only {successful_results}/{len(tables)} tables successful, retrying in {retry_delay}s")
+                        await asyncio.sleep(retry_delay)
+                        retry_delay *= 1.5  # Exponential backoff
+                    
+            except Exception as e:
+                if attempt < max_retries:
+                    logger.warning(f"⚠️ Schema fetch failed (attempt {attempt + 1}): {e}, retrying in {retry_delay}s")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay *= 1.5
+                else:
+                    logger.error(f"❌ Schema fetch failed after {max_retries + 1} attempts: {e}")
+                    # Create error results for all tables
+                    schema_results = [{"table_name": table.get("name") if isinstance(table, dict) else str(table), "error": str(e)} for table in tables]
+        
+        return schema_results
+    
     async def health_check(self) -> bool:
         """Check MCP server health."""
         try:
@@ -6,14 +6,20 @@ that work seamlessly with the WebSocket architecture.
 """
 
 import asyncio
+import math
+import os
 import time
 import logging
-from typing import Dict, Any, Optional, Callable, Union, List
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Callable, Union, List, Awaitable, Deque
 from datetime import datetime, timedelta
 from enum import Enum
 import json
 from dataclasses import dataclass, field
 
+import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -312,6 +318,174 @@ async def retry_with_backoff(
     )
 
 
+class AdmissionRejected(Exception):
+    """Exception raised when a request is refused admission under overload"""
+    
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server is overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded admission for expensive requests.
+    
+    At most ``max_in_flight`` requests run at once; up to ``max_queue`` more wait
+    in FIFO order for at most ``queue_timeout`` seconds. Requests beyond that,
+    or whose estimated wait already exceeds the deadline, are rejected at once
+    with a Retry-After hint instead of piling onto the downstream services.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        progress_interval: float = 1.0
+    ):
+        """
+        Initialize the admission controller.
+        
+        Args:
+            name: Controller name for logging and metrics
+            max_in_flight: Concurrent request budget (QUERY_MAX_IN_FLIGHT, default 8)
+            max_queue: Maximum number of waiting requests (QUERY_MAX_QUEUE, default 32)
+            queue_timeout: Seconds a request may wait for admission (QUERY_QUEUE_TIMEOUT, default 10)
+            progress_interval: Seconds between queue position checks while waiting
+        """
+        self.name = name
+        self.max_in_flight = max(max_in_flight or int(os.getenv("QUERY_MAX_IN_FLIGHT", "8")), 1)
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("QUERY_MAX_QUEUE", "32"))
+        self.queue_timeout = queue_timeout or float(os.getenv("QUERY_QUEUE_TIMEOUT", "10"))
+        self.progress_interval = progress_interval
+        
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time: Optional[float] = None
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_deadline": 0,
+            "rejected_timeout": 0
+        }
+    
+    def estimated_wait(self, position: int) -> float:
+        """Estimated seconds until the request at a queue position is admitted"""
+        if self._service_time is None:
+            return 0.0
+        return position * self._service_time / self.max_in_flight
+    
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying"""
+        return max(1, math.ceil(self.estimated_wait(len(self._waiters) + 1)))
+    
+    @asynccontextmanager
+    async def admit(self, on_queued: Optional[Callable[[int, float], Awaitable[None]]] = None):
+        """
+        Hold an in-flight slot for the enclosed request.
+        
+        Args:
+            on_queued: Coroutine function called with the queue position and the
+                estimated wait in seconds whenever a waiting request moves up
+            
+        Raises:
+            AdmissionRejected: When the queue is full or the deadline passes
+        """
+        await self._acquire(on_queued)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record_service_time(time.monotonic() - started)
+            self._release()
+    
+    async def _acquire(self, on_queued: Optional[Callable[[int, float], Awaitable[None]]]):
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._stats["admitted"] += 1
+            return
+        
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+        if self.estimated_wait(len(self._waiters) + 1) > self.queue_timeout:
+            self._reject("deadline")
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        deadline = time.monotonic() + self.queue_timeout
+        last_position = None
+        
+        try:
+            while not waiter.done():
+                position = self._waiters.index(waiter) + 1
+                if on_queued and position != last_position:
+                    last_position = position
+                    try:
+                        await on_queued(position, self.estimated_wait(position))
+                    except Exception as e:
+                        logger.debug(f"Queue position callback failed: {e}")
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and not waiter.done():
+                    self._reject("timeout")
+                await asyncio.wait({waiter}, timeout=min(remaining, self.progress_interval))
+            
+            self._stats["admitted"] += 1
+            
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as the wait ended; pass it on
+                self._release()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+    
+    def _release(self):
+        # Hand the slot straight to the next waiter so newcomers cannot jump the queue
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+    
+    def _reject(self, reason: str):
+        self._stats[f"rejected_{reason}"] += 1
+        retry_after = self.retry_after()
+        logger.warning(
+            f"{self.name} rejected a request ({reason}): "
+            f"{self.in_flight} in flight, {len(self._waiters)} queued, retry after {retry_after}s"
+        )
+        raise AdmissionRejected(reason, retry_after)
+    
+    def _record_service_time(self, duration: float):
+        if self._service_time is None:
+            self._service_time = duration
+        else:
+            self._service_time = 0.8 * self._service_time + 0.2 * duration
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics"""
+        return {
+            "name": self.name,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "queue_length": len(self._waiters),
+            "average_service_time_ms": round(self._service_time * 1000, 2) if self._service_time is not None else None,
+            **self._stats
+        }
+
+
 class OrchestrationMetrics:
     """Collect and manage orchestration metrics"""
     
@@ -323,7 +497,8 @@ class OrchestrationMetrics:
             "average_processing_time": 0.0,
             "circuit_breakers": {},
             "agent_stats": {},
-            "processing_times": []
+            "processing_times": [],
+            "step_timings": {}
         }
         self._lock = asyncio.Lock()
     
@@ -356,6 +531,23 @@ class OrchestrationMetrics:
         async with self._lock:
             self._metrics["failed_queries"] += 1
     
+    async def record_step_timing(self, pipeline: str, step: str, duration_ms: float, success: bool = True):
+        """Record the duration of one pipeline step"""
+        async with self._lock:
+            timing = self._metrics["step_timings"].setdefault(f"{pipeline}.{step}", {
+                "count": 0,
+                "failures": 0,
+                "average_ms": 0.0,
+                "max_ms": 0.0,
+                "last_ms": 0.0
+            })
+            timing["count"] += 1
+            if not success:
+                timing["failures"] += 1
+            timing["average_ms"] += (duration_ms - timing["average_ms"]) / timing["count"]
+            timing["max_ms"] = max(timing["max_ms"], duration_ms)
+            timing["last_ms"] = duration_ms
+    
     async def update_circuit_breaker_stats(self, breaker: CircuitBreaker):
         """Update circuit breaker statistics"""
         async with self._lock:
@@ -380,6 +572,206 @@ class OrchestrationMetrics:
 orchestration_metrics = OrchestrationMetrics()
 
 
+@dataclass
+class PipelineStep:
+    """
+    One step of a pipeline DAG.
+    
+    The step function is called with its declared inputs as keyword arguments.
+    With a single output its return value is stored under that name; with
+    several outputs it must return a dictionary containing all of them. If the
+    step fails after its retries, the fallback is called with the same inputs.
+    """
+    name: str
+    func: Callable
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+    retry_config: Optional[RetryConfig] = None
+    circuit_breaker: Optional[CircuitBreaker] = None
+    fallback: Optional[Callable] = None
+    required: bool = True
+    
+    def __post_init__(self):
+        if not self.outputs:
+            self.outputs = [self.name]
+
+
+class PipelineStepError(Exception):
+    """Exception raised when a required pipeline step fails"""
+    
+    def __init__(self, step: str, error: Exception):
+        super().__init__(f"Pipeline step '{step}' failed: {error}")
+        self.step = step
+        self.error = error
+
+
+@dataclass
+class PipelineRun:
+    """Result of one pipeline execution"""
+    outputs: Dict[str, Any]
+    step_timings: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class PipelineExecutor:
+    """
+    Run a DAG of pipeline steps, starting each step as soon as its inputs are available.
+    
+    Dependencies are derived from the declared inputs and outputs, so steps that
+    do not depend on each other run concurrently. Inputs no step produces must be
+    passed to run(). Per-step timings are recorded in OrchestrationMetrics.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        steps: List[PipelineStep],
+        metrics: Optional[OrchestrationMetrics] = None
+    ):
+        """
+        Initialize pipeline executor.
+        
+        Args:
+            name: Pipeline name used in logs and metrics
+            steps: Pipeline steps
+            metrics: Metrics collector for step timings (global instance if None)
+            
+        Raises:
+            ValueError: If step names or outputs are duplicated or the steps form a cycle
+        """
+        self.name = name
+        self.metrics = metrics or orchestration_metrics
+        self.steps: Dict[str, PipelineStep] = {}
+        
+        producers: Dict[str, str] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Pipeline '{name}' has duplicate step '{step.name}'")
+            self.steps[step.name] = step
+            for output in step.outputs:
+                if output in producers:
+                    raise ValueError(f"Output '{output}' of pipeline '{name}' is produced by both '{producers[output]}' and '{step.name}'")
+                producers[output] = step.name
+        
+        self.external_inputs = {i for step in steps for i in step.inputs if i not in producers}
+        self._dependencies = {
+            step.name: {producers[i] for i in step.inputs if i in producers}
+            for step in steps
+        }
+        
+        # Reject cycles up front so run() always terminates
+        resolved: set = set()
+        while len(resolved) < len(self._dependencies):
+            ready = [n for n, deps in self._dependencies.items() if n not in resolved and deps <= resolved]
+            if not ready:
+                raise ValueError(f"Pipeline '{name}' has a dependency cycle between steps {sorted(set(self._dependencies) - resolved)}")
+            resolved.update(ready)
+    
+    async def run(self, inputs: Dict[str, Any]) -> PipelineRun:
+        """
+        Execute the pipeline.
+        
+        Args:
+            inputs: Values of the inputs no step produces
+            
+        Returns:
+            All inputs and step outputs, per-step timings in milliseconds and the
+            errors of steps that failed or fell back
+            
+        Raises:
+            ValueError: If an external input is missing
+            PipelineStepError: When a required step fails and has no working fallback
+        """
+        missing = self.external_inputs - inputs.keys()
+        if missing:
+            raise ValueError(f"Pipeline '{self.name}' is missing inputs {sorted(missing)}")
+        
+        run = PipelineRun(outputs=dict(inputs))
+        finished: set = set()
+        running: Dict[asyncio.Task, str] = {}
+        
+        try:
+            while len(finished) < len(self.steps):
+                started = set(running.values())
+                for name, deps in self._dependencies.items():
+                    if name not in finished and name not in started and deps <= finished:
+                        step = self.steps[name]
+                        kwargs = {i: run.outputs[i] for i in step.inputs}
+                        running[asyncio.create_task(self._run_step(step, kwargs, run))] = name
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    run.outputs.update(task.result())
+                    finished.add(name)
+        finally:
+            for task in running:
+                task.cancel()
+        
+        return run
+    
+    async def _run_step(self, step: PipelineStep, kwargs: Dict[str, Any], run: PipelineRun) -> Dict[str, Any]:
+        """Execute one step with its fallback and return its outputs"""
+        start_time = time.time()
+        error: Optional[Exception] = None
+        with tracing.span(f"step.{step.name}", pipeline=self.name) as span:
+            try:
+                outputs = self._step_outputs(step, await self._invoke(step, kwargs))
+            except Exception as e:
+                error = e
+                run.errors[step.name] = str(e)
+                logger.warning(f"Pipeline '{self.name}' step '{step.name}' failed: {e}")
+                outputs = None
+                if step.fallback:
+                    try:
+                        outputs = self._step_outputs(step, await step.fallback(**kwargs))
+                    except Exception as fallback_error:
+                        logger.error(f"Pipeline '{self.name}' step '{step.name}' fallback failed: {fallback_error}")
+            
+            if span and error is not None:
+                span.status = "error" if outputs is None else "fallback"
+                span.set_attribute("error", str(error)[:200])
+        
+        duration_ms = (time.time() - start_time) * 1000
+        run.step_timings[step.name] = round(duration_ms, 2)
+        await self.metrics.record_step_timing(self.name, step.name, duration_ms, success=error is None)
+        
+        if outputs is None:
+            if step.required:
+                raise PipelineStepError(step.name, error)
+            outputs = {output: None for output in step.outputs}
+        return outputs
+    
+    async def _invoke(self, step: PipelineStep, kwargs: Dict[str, Any]) -> Any:
+        """Call a step function through its circuit breaker, timeout and retries"""
+        async def call():
+            if step.circuit_breaker:
+                return await step.circuit_breaker.call(step.func, **kwargs)
+            return await step.func(**kwargs)
+        
+        async def attempt():
+            if step.timeout is None:
+                return await call()
+            try:
+                return await asyncio.wait_for(call(), timeout=step.timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Step '{step.name}' timed out after {step.timeout}s")
+        
+        if step.retry_config:
+            return await retry_with_backoff(attempt, step.retry_config)
+        return await attempt()
+    
+    @staticmethod
+    def _step_outputs(step: PipelineStep, result: Any) -> Dict[str, Any]:
+        """Map a step result to its declared outputs"""
+        if len(step.outputs) == 1:
+            return {step.outputs[0]: result}
+        if not isinstance(result, dict) or not all(output in result for output in step.outputs):
+            raise ValueError(f"Step '{step.name}' must return a dictionary with outputs {step.outputs}")
+        return {output: result[output] for output in step.outputs}
+
+
 class WebSocketProgressReporter:
     """Report real-time progress updates via WebSocket"""
     
@@ -418,6 +810,18 @@ class WebSocketProgressReporter:
         except Exception as e:
             logger.warning(f"Failed to send WebSocket progress update: {e}")
     
+    async def report_queue_position(self, query_id: str, position: int, estimated_wait: float):
+        """Send the query's place in the admission queue via WebSocket"""
+        await self.report_progress(
+            query_id=query_id,
+            step="admission",
+            status="queued",
+            data={
+                "queue_position": position,
+                "estimated_wait_seconds": round(estimated_wait, 1)
+            }
+        )
+    
     async def report_error(self, query_id: str, error: str, step: str = None):
         """Send error update via WebSocket"""
         await self.report_progress(
@@ -0,0 +1,68 @@
+"""
+Fast JSON serialization for backend responses.
+
+Query responses carry full result rows and plotly figure JSON, so encoding them
+is a noticeable part of each request. This module serializes with orjson when it
+is installed, falling back to the standard library otherwise. Values that JSON
+has no type for (datetimes, dates, Decimals, numpy scalars and arrays, bytes,
+sets, dataclasses and pydantic models) are converted the same way on both paths.
+"""
+
+import base64
+import dataclasses
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Convert values the JSON encoders do not handle natively."""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if type(value).__module__ == "numpy" and hasattr(value, "tolist"):
+        # numpy scalars become Python scalars, arrays become (nested) lists
+        return value.tolist()
+    if isinstance(value, bytes):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return base64.b64encode(value).decode('ascii')
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, 'model_dump'):
+        return value.model_dump()
+    return str(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any) -> bytes:
+        """Serialize a value to compact JSON bytes."""
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(value: Any) -> bytes:
+        """Serialize a value to compact JSON bytes."""
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with :func:`dumps` instead of the standard encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
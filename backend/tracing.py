@@ -0,0 +1,355 @@
+"""
+Distributed tracing for the query workflow
+
+Requests carry a W3C ``traceparent`` (``00-<trace id>-<parent span id>-<flags>``)
+in a message field or HTTP header from the backend to the agents and the MCP
+server. Each of them keeps its own copy of the propagation helpers below: it
+continues the caller's trace with :func:`server_span`, times its work with
+:func:`span`, forwards the context with :func:`inject` and returns its finished
+spans in the ``trace_spans`` response field (or the ``x-trace-spans`` header).
+
+The backend starts the trace of a request with :func:`root_span` and merges
+returned spans with :func:`collect`. When the request ends, the whole trace is
+handed to the in-process :class:`SpanRecorder`, which keeps recent and slowest
+traces as waterfalls, so no external collector is needed.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = "traceparent"
+TRACE_SPANS = "trace_spans"
+TRACE_SPANS_HEADER = "x-trace-spans"
+
+# Upper bound on spans returned with one response
+MAX_EXPORTED_SPANS = 200
+
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace"""
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    service: str
+    start_time: float = field(default_factory=time.time)
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        """Context to propagate to calls made within this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        end_time = self.end_time if self.end_time is not None else time.time()
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "service": self.service,
+            "start_time": self.start_time,
+            "duration_ms": round((end_time - self.start_time) * 1000, 3),
+            "attributes": self.attributes,
+            "status": self.status
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_finished_spans: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar("finished_spans", default=None)
+
+
+def parse_traceparent(value: Any) -> Optional[Tuple[str, str]]:
+    """
+    Parse a traceparent value.
+
+    Returns:
+        Tuple of (trace id, parent span id), or None if the value is missing or malformed
+    """
+    if not isinstance(value, str):
+        return None
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+@contextmanager
+def _activate(span: Span, finished: List[Dict[str, Any]]) -> Iterator[Span]:
+    """Make a span current for the enclosed code and record it when it ends."""
+    span_token = _current_span.set(span)
+    finished_token = _finished_spans.set(finished)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = "error"
+        span.attributes["error"] = str(e)[:200]
+        raise
+    finally:
+        span.end_time = time.time()
+        finished.append(span.to_dict())
+        _current_span.reset(span_token)
+        _finished_spans.reset(finished_token)
+
+
+@contextmanager
+def server_span(name: str, traceparent: Any, service: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Continue the caller's trace while handling one request.
+
+    Yields None and records nothing when the request carries no valid traceparent.
+    """
+    parsed = parse_traceparent(traceparent)
+    if parsed is None:
+        yield None
+        return
+    trace_id, parent_id = parsed
+    span_ = Span(trace_id, secrets.token_hex(8), parent_id, name, service, attributes=attributes)
+    with _activate(span_, []) as active:
+        yield active
+
+
+@contextmanager
+def root_span(name: str, traceparent: Any = None, service: str = "backend", **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Trace one request handled by the backend and record it in the span recorder.
+
+    The trace continues the caller's ``traceparent`` when one is given and
+    valid, otherwise a new trace is started. Inside an existing trace this
+    behaves like :func:`span`. Yields None when tracing is disabled.
+    """
+    if not span_recorder.enabled:
+        yield None
+        return
+    if _current_span.get() is not None:
+        with span(name, **attributes) as child:
+            yield child
+        return
+    
+    parsed = parse_traceparent(traceparent)
+    trace_id, parent_id = parsed if parsed else (secrets.token_hex(16), None)
+    root = Span(trace_id, secrets.token_hex(8), parent_id, name, service, attributes=attributes)
+    finished: List[Dict[str, Any]] = []
+    try:
+        with _activate(root, finished) as active:
+            yield active
+    finally:
+        span_recorder.record_trace(root.to_dict(), finished)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time a unit of work as a child of the current span; a no-op outside a trace."""
+    parent = _current_span.get()
+    finished = _finished_spans.get()
+    if parent is None or finished is None:
+        yield None
+        return
+    child = Span(parent.trace_id, secrets.token_hex(8), parent.span_id, name, parent.service, attributes=attributes)
+    with _activate(child, finished) as active:
+        yield active
+
+
+def inject(carrier: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the current trace context to an outgoing message or header dictionary."""
+    current = _current_span.get()
+    if current is not None:
+        carrier[TRACEPARENT] = current.traceparent
+    return carrier
+
+
+def collect(spans: Any) -> None:
+    """Merge spans returned by a downstream service into the current trace."""
+    finished = _finished_spans.get()
+    if finished is None or not isinstance(spans, list):
+        return
+    room = MAX_EXPORTED_SPANS - len(finished)
+    finished.extend(s for s in spans[:max(room, 0)] if isinstance(s, dict))
+
+
+def collect_header(value: Optional[str]) -> None:
+    """Merge spans returned in an ``x-trace-spans`` response header."""
+    if not value:
+        return
+    try:
+        collect(json.loads(value))
+    except ValueError:
+        pass
+
+
+def export_spans() -> List[Dict[str, Any]]:
+    """
+    Spans to return to the caller: every finished span of this request plus the
+    current one, timed up to now since the response is sent before it ends.
+    """
+    current = _current_span.get()
+    finished = _finished_spans.get()
+    if current is None or finished is None:
+        return []
+    return (finished + [current.to_dict()])[-MAX_EXPORTED_SPANS:]
+
+
+def response_fields() -> Dict[str, Any]:
+    """Fields to add to a response message; empty outside a trace."""
+    spans = export_spans()
+    return {TRACE_SPANS: spans} if spans else {}
+
+
+class SpanRecorder:
+    """
+    In-process store of finished traces for the waterfall endpoint.
+    
+    Keeps the most recent traces (``TRACE_MAX_TRACES``) and, separately, the
+    slowest ones (``TRACE_MAX_SLOWEST``) so slow outliers survive a burst of
+    fast requests.
+    """
+    
+    def __init__(self, max_traces: Optional[int] = None, max_slowest: Optional[int] = None, enabled: Optional[bool] = None):
+        """
+        Initialize the span recorder.
+        
+        Args:
+            max_traces: Recent traces kept (TRACE_MAX_TRACES, default 200)
+            max_slowest: Slowest traces kept (TRACE_MAX_SLOWEST, default 20)
+            enabled: Whether requests are traced (TRACING_ENABLED, default true)
+        """
+        self.max_traces = max_traces or int(os.getenv("TRACE_MAX_TRACES", "200"))
+        self.max_slowest = max_slowest or int(os.getenv("TRACE_MAX_SLOWEST", "20"))
+        self.enabled = enabled if enabled is not None else os.getenv("TRACING_ENABLED", "true").lower() == "true"
+        
+        self._recent: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._slowest: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._stats = {"traces": 0, "spans": 0}
+    
+    def record_trace(self, root: Dict[str, Any], spans: List[Dict[str, Any]]) -> None:
+        """Record a finished trace from its root span and all spans collected under it."""
+        trace = self.build_waterfall(root, spans)
+        with self._lock:
+            self._stats["traces"] += 1
+            self._stats["spans"] += trace["span_count"]
+            
+            self._recent[trace["trace_id"]] = trace
+            self._recent.move_to_end(trace["trace_id"])
+            while len(self._recent) > self.max_traces:
+                self._recent.popitem(last=False)
+            
+            if len(self._slowest) < self.max_slowest or trace["duration_ms"] > self._slowest[-1]["duration_ms"]:
+                self._slowest = [t for t in self._slowest if t["trace_id"] != trace["trace_id"]]
+                self._slowest.append(trace)
+                self._slowest.sort(key=lambda t: t["duration_ms"], reverse=True)
+                del self._slowest[self.max_slowest:]
+        
+        logger.debug(f"Recorded trace {trace['trace_id']} ({trace['name']}, {trace['duration_ms']:.1f}ms, {trace['span_count']} spans)")
+    
+    @staticmethod
+    def build_waterfall(root: Dict[str, Any], spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Order the spans of a trace for display.
+        
+        Each span gets its start offset from the root span and its depth in the
+        call tree. Spans whose parent is unknown are attached to the root.
+        """
+        unique: Dict[str, Dict[str, Any]] = {}
+        for s in spans:
+            if s.get("trace_id") == root["trace_id"] and s.get("span_id"):
+                unique[s["span_id"]] = s
+        unique[root["span_id"]] = root
+        
+        depths: Dict[str, int] = {}
+        
+        def depth(span_id: str, seen: Tuple[str, ...] = ()) -> int:
+            if span_id in depths:
+                return depths[span_id]
+            parent_id = unique[span_id].get("parent_id")
+            if span_id == root["span_id"] or parent_id in seen:
+                value = 0
+            elif parent_id not in unique:
+                value = 1
+            else:
+                value = depth(parent_id, seen + (span_id,)) + 1
+            depths[span_id] = value
+            return value
+        
+        ordered = sorted(unique.values(), key=lambda s: s.get("start_time", 0.0))
+        waterfall = [
+            {
+                **s,
+                "offset_ms": round((s.get("start_time", root["start_time"]) - root["start_time"]) * 1000, 3),
+                "depth": depth(s["span_id"])
+            }
+            for s in ordered
+        ]
+        
+        return {
+            "trace_id": root["trace_id"],
+            "name": root["name"],
+            "start_time": root["start_time"],
+            "duration_ms": root["duration_ms"],
+            "status": "error" if any(s.get("status") == "error" for s in ordered) else "ok",
+            "services": sorted({s.get("service", "unknown") for s in ordered}),
+            "span_count": len(waterfall),
+            "spans": waterfall
+        }
+    
+    @staticmethod
+    def _summary(trace: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in trace.items() if key != "spans"}
+    
+    def get_trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        """Get the waterfall of a recorded trace."""
+        with self._lock:
+            trace = self._recent.get(trace_id)
+            if trace is None:
+                trace = next((t for t in self._slowest if t["trace_id"] == trace_id), None)
+            return trace
+    
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Summaries of the most recent traces, newest first."""
+        with self._lock:
+            return [self._summary(t) for t in list(reversed(self._recent.values()))[:limit]]
+    
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Summaries of the slowest traces, slowest first."""
+        with self._lock:
+            return [self._summary(t) for t in self._slowest[:limit]]
+    
+    def clear(self) -> None:
+        """Drop all recorded traces."""
+        with self._lock:
+            self._recent.clear()
+            self._slowest.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get span recorder statistics."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "recent_traces": len(self._recent),
+                "slowest_traces": len(self._slowest),
+                **self._stats
+            }
+
+
+# Global span recorder
+span_recorder = SpanRecorder()
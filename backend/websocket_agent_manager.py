@@ -3,6 +3,11 @@ WebSocket Agent Connection Pool Manager
 
 Manages persistent WebSocket connections to all agents with connection pooling,
 failover, and real-time communication capabilities.
+
+Each agent gets a pool of connections. Requests go to the healthy connection
+with the fewest outstanding responses, so one large response does not hold up
+every other request to that agent. The pool grows while all of its connections
+are busy and shrinks back once the extra connections sit idle.
 """
 
 import asyncio
@@ -14,12 +19,18 @@ from typing import Dict, Any, Optional, List, Callable
 from enum import Enum
 from dataclasses import dataclass, field
 from contextlib import asynccontextmanager
+import aiohttp
 import websockets
 import websockets.exceptions
 from orchestration import CircuitBreaker, retry_with_backoff, RetryConfig
+from http_clients import http_clients
+import tracing
 
 logger = logging.getLogger(__name__)
 
+# Consecutive timeouts after which a connection is considered unhealthy and recycled
+UNHEALTHY_AFTER_FAILURES = 3
+
 
 class AgentType(Enum):
     """Agent types"""
@@ -50,6 +61,86 @@ class WebSocketConnection:
     last_error: Optional[str] = None
     pending_responses: Dict[str, asyncio.Future] = field(default_factory=dict)
     recv_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    connection_id: int = 0
+    last_used: float = field(default_factory=time.time)
+    consecutive_failures: int = 0
+    tasks: List[asyncio.Task] = field(default_factory=list)
+    
+    @property
+    def outstanding(self) -> int:
+        """Number of requests awaiting a response on this connection"""
+        return len(self.pending_responses)
+    
+    @property
+    def is_open(self) -> bool:
+        return self.state == ConnectionState.CONNECTED and self.websocket is not None
+    
+    @property
+    def is_healthy(self) -> bool:
+        return self.is_open and self.consecutive_failures < UNHEALTHY_AFTER_FAILURES
+
+
+class AgentConnectionPool:
+    """WebSocket connections to one agent with least-outstanding-requests selection"""
+    
+    def __init__(self, min_size: int = 1, max_size: int = 4, scale_up_pending: int = 2):
+        self.min_size = max(min_size, 1)
+        self.max_size = max(max_size, self.min_size)
+        self.scale_up_pending = max(scale_up_pending, 1)
+        self.connections: List[WebSocketConnection] = []
+        self._next_id = 0
+    
+    def add(self) -> WebSocketConnection:
+        """Add a new, not yet connected connection to the pool"""
+        connection = WebSocketConnection(connection_id=self._next_id)
+        self._next_id += 1
+        self.connections.append(connection)
+        return connection
+    
+    def remove(self, connection: WebSocketConnection):
+        if connection in self.connections:
+            self.connections.remove(connection)
+    
+    def select(self) -> Optional[WebSocketConnection]:
+        """
+        Pick the connection for the next request.
+        
+        Healthy connections are preferred; among them the one with the fewest
+        outstanding responses wins. Returns None when no connection is open.
+        """
+        open_connections = [c for c in self.connections if c.is_open]
+        candidates = [c for c in open_connections if c.is_healthy] or open_connections
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: (c.outstanding, c.connection_id))
+    
+    def needs_growth(self) -> bool:
+        """Whether every connection is busy and another one may be opened"""
+        if not self.connections or len(self.connections) >= self.max_size:
+            return False
+        # Wait for connections still being established before opening more
+        if not all(c.is_open for c in self.connections):
+            return False
+        return all(c.outstanding >= self.scale_up_pending for c in self.connections)
+    
+    def surplus(self, idle_timeout: float) -> List[WebSocketConnection]:
+        """Connections beyond the minimum size that have sat idle for ``idle_timeout`` seconds"""
+        removable = [
+            c for c in self.connections
+            if c.outstanding == 0 and time.time() - c.last_used > idle_timeout
+        ]
+        return sorted(removable, key=lambda c: -c.connection_id)[:max(len(self.connections) - self.min_size, 0)]
+    
+    @property
+    def state(self) -> ConnectionState:
+        """Connected while any connection is open, otherwise the state of the first one"""
+        if any(c.is_open for c in self.connections):
+            return ConnectionState.CONNECTED
+        return self.connections[0].state if self.connections else ConnectionState.DISCONNECTED
+    
+    @property
+    def outstanding(self) -> int:
+        return sum(c.outstanding for c in self.connections)
 
 
 @dataclass 
@@ -66,6 +157,10 @@ class AgentConfig:
     max_reconnect_attempts: int = 5
     reconnect_delay: float = 2.0
     circuit_breaker_config: Optional[Dict[str, Any]] = None
+    min_connections: int = 1
+    max_connections: int = 4
+    scale_up_pending: int = 2  # Outstanding responses per connection before the pool grows
+    idle_timeout: float = 120.0  # Seconds before an idle extra connection is closed
 
 
 class WebSocketAgentManager:
@@ -76,11 +171,9 @@ class WebSocketAgentManager:
     
     def __init__(self):
         self.agents: Dict[AgentType, AgentConfig] = {}
-        self.connections: Dict[AgentType, WebSocketConnection] = {}
+        self.pools: Dict[AgentType, AgentConnectionPool] = {}
         self.circuit_breakers: Dict[AgentType, CircuitBreaker] = {}
         self.message_handlers: Dict[str, Callable] = {}
-        self.heartbeat_tasks: Dict[AgentType, asyncio.Task] = {}
-        self.reconnect_tasks: Dict[AgentType, asyncio.Task] = {}
         self._shutdown_event = asyncio.Event()
         
         # Initialize agent configurations
@@ -90,6 +183,14 @@ class WebSocketAgentManager:
         """Initialize agent configurations"""
         import os
         
+        # Connection pool sizing shared by all agents
+        pool_config = {
+            "min_connections": int(os.getenv("AGENT_WS_POOL_MIN", "1")),
+            "max_connections": int(os.getenv("AGENT_WS_POOL_MAX", "4")),
+            "scale_up_pending": int(os.getenv("AGENT_WS_POOL_SCALE_UP_PENDING", "2")),
+            "idle_timeout": float(os.getenv("AGENT_WS_POOL_IDLE_TIMEOUT", "120"))
+        }
+        
         # NLP Agent
         self.agents[AgentType.NLP] = AgentConfig(
             name="nlp-agent",
@@ -101,7 +202,8 @@ class WebSocketAgentManager:
                 "failure_threshold": 3,
                 "recovery_timeout": 30.0,
                 "name": "nlp-agent-ws"
-            }
+            },
+            **pool_config
         )
         
         # Data Agent
@@ -115,7 +217,8 @@ class WebSocketAgentManager:
                 "failure_threshold": 3,
                 "recovery_timeout": 30.0,
                 "name": "data-agent-ws"
-            }
+            },
+            **pool_config
         )
         
         # Viz Agent
@@ -129,17 +232,21 @@ class WebSocketAgentManager:
                 "failure_threshold": 3,
                 "recovery_timeout": 30.0,
                 "name": "viz-agent-ws"
-            }
-        )        # Initialize circuit breakers
+            },
+            **pool_config
+        )
+        
+        # Initialize circuit breakers
         for agent_type, config in self.agents.items():
             if config.circuit_breaker_config:
                 self.circuit_breakers[agent_type] = CircuitBreaker(**config.circuit_breaker_config)
             
-            # Initialize connections
-            self.connections[agent_type] = WebSocketConnection()
-        
-        # Task to handle incoming messages
-        self.message_router_tasks: Dict[AgentType, asyncio.Task] = {}
+            # Initialize connection pools
+            self.pools[agent_type] = AgentConnectionPool(
+                min_size=config.min_connections,
+                max_size=config.max_connections,
+                scale_up_pending=config.scale_up_pending
+            )
     
     async def start(self):
         """Start the WebSocket agent manager with delayed connection attempts"""
@@ -162,9 +269,13 @@ class WebSocketAgentManager:
                 # Try to establish connections for WebSocket-enabled agents
                 for agent_type, config in self.agents.items():
                     if config.enabled and config.use_websocket:
-                        connection = self.connections[agent_type]
-                        if connection.state == ConnectionState.DISCONNECTED:
+                        pool = self.pools[agent_type]
+                        # Replace connections that ran out of reconnect attempts
+                        for connection in [c for c in pool.connections if c.state == ConnectionState.FAILED]:
+                            await self._stop_connection(agent_type, connection)
+                        while len(pool.connections) < pool.min_size:
                             await self._start_agent_connection(agent_type)
+                        await self._shrink_pool(agent_type)
                 
                 # Wait before next maintenance cycle
                 await asyncio.sleep(30)  # Check every 30 seconds
@@ -180,70 +291,77 @@ class WebSocketAgentManager:
         logger.info("Stopping WebSocket Agent Manager")
         self._shutdown_event.set()
         
-        # Cancel all tasks
-        all_tasks = (list(self.heartbeat_tasks.values()) + 
-                    list(self.reconnect_tasks.values()) + 
-                    list(self.message_router_tasks.values()))
+        # Cancel all connection tasks and close all connections
+        for agent_type, pool in self.pools.items():
+            for connection in list(pool.connections):
+                await self._stop_connection(agent_type, connection)
+        
+        logger.info("WebSocket Agent Manager stopped")
+    
+    async def _start_agent_connection(self, agent_type: AgentType) -> WebSocketConnection:
+        """Add a WebSocket connection to an agent's pool and start maintaining it"""
+        config = self.agents[agent_type]
+        connection = self.pools[agent_type].add()
+        
+        logger.info(f"Starting WebSocket connection #{connection.connection_id} to {config.name}")
+        
+        # Start connection and heartbeat tasks
+        connection.tasks = [
+            asyncio.create_task(self._maintain_connection(agent_type, connection)),
+            asyncio.create_task(self._heartbeat_loop(agent_type, connection))
+        ]
+        return connection
+    
+    async def _stop_connection(self, agent_type: AgentType, connection: WebSocketConnection):
+        """Remove a connection from its pool, cancel its tasks and close it"""
+        self.pools[agent_type].remove(connection)
         
-        for task in all_tasks:
+        for task in connection.tasks:
             if not task.done():
                 task.cancel()
                 try:
                     await task
                 except asyncio.CancelledError:
                     pass
+        connection.tasks.clear()
         
-        # Close all connections
-        for agent_type, connection in self.connections.items():
-            if connection.websocket:
-                try:
-                    await connection.websocket.close()
-                except:
-                    pass
-                connection.state = ConnectionState.DISCONNECTED
-        
-        logger.info("WebSocket Agent Manager stopped")
+        if connection.websocket:
+            try:
+                await connection.websocket.close()
+            except:
+                pass
+        connection.state = ConnectionState.DISCONNECTED
+    
+    async def _grow_pool(self, agent_type: AgentType):
+        """Open another connection when every pooled connection is busy"""
+        pool = self.pools[agent_type]
+        if pool.needs_growth():
+            logger.info(
+                f"Growing {self.agents[agent_type].name} pool to {len(pool.connections) + 1} connections "
+                f"({pool.outstanding} responses outstanding)"
+            )
+            await self._start_agent_connection(agent_type)
     
-    async def _start_agent_connection(self, agent_type: AgentType):
-        """Start WebSocket connection for an agent"""
+    async def _shrink_pool(self, agent_type: AgentType):
+        """Close idle connections beyond the pool's minimum size"""
         config = self.agents[agent_type]
-        connection = self.connections[agent_type]
-        
-        logger.info(f"Starting WebSocket connection to {config.name}")
-        
-        # Start connection task
-        connection_task = asyncio.create_task(
-            self._maintain_connection(agent_type)
-        )
-        
-        # Start heartbeat task
-        heartbeat_task = asyncio.create_task(
-            self._heartbeat_loop(agent_type)
-        )
-        
-        self.reconnect_tasks[agent_type] = connection_task
-        self.heartbeat_tasks[agent_type] = heartbeat_task
+        for connection in self.pools[agent_type].surplus(config.idle_timeout):
+            logger.info(f"Closing idle connection #{connection.connection_id} to {config.name}")
+            await self._stop_connection(agent_type, connection)
     
-    async def _maintain_connection(self, agent_type: AgentType):
+    async def _maintain_connection(self, agent_type: AgentType, connection: WebSocketConnection):
         """Maintain WebSocket connection with reconnection logic"""
         config = self.agents[agent_type]
-        connection = self.connections[agent_type]
         
         while not self._shutdown_event.is_set():
             try:
                 if connection.state == ConnectionState.DISCONNECTED:
-                    await self._connect_agent(agent_type)
+                    await self._connect_agent(agent_type, connection)
                 
                 if connection.websocket and connection.state == ConnectionState.CONNECTED:
-                    # Start message router task if not already running
-                    if agent_type not in self.message_router_tasks or self.message_router_tasks[agent_type].done():
-                        self.message_router_tasks[agent_type] = asyncio.create_task(
-                            self._message_router(agent_type)
-                        )
-                    
-                    # Wait for connection to be lost
+                    # Route messages until the connection is lost
                     try:
-                        await self.message_router_tasks[agent_type]
+                        await self._message_router(agent_type, connection)
                     except asyncio.CancelledError:
                         break
                     except Exception as e:
@@ -255,6 +373,8 @@ class WebSocketAgentManager:
                 # Wait before reconnecting
                 if connection.state in [ConnectionState.DISCONNECTED, ConnectionState.FAILED]:
                     await asyncio.sleep(config.reconnect_delay)
+                    if connection.state == ConnectionState.FAILED and connection.reconnect_count < config.max_reconnect_attempts:
+                        connection.state = ConnectionState.DISCONNECTED
                     
             except asyncio.CancelledError:
                 break
@@ -262,10 +382,9 @@ class WebSocketAgentManager:
                 logger.error(f"Unexpected error in connection maintenance for {config.name}: {e}")
                 await asyncio.sleep(config.reconnect_delay)
     
-    async def _message_router(self, agent_type: AgentType):
-        """Central message router that handles all incoming WebSocket messages"""
+    async def _message_router(self, agent_type: AgentType, connection: WebSocketConnection):
+        """Message router that handles all incoming messages of one pooled connection"""
         config = self.agents[agent_type]
-        connection = self.connections[agent_type]
         
         try:
             async for message in connection.websocket:
@@ -285,15 +404,18 @@ class WebSocketAgentManager:
                                 logger.debug(f"Completed future for message_id {message_id} with type {msg_type}")
                         else:
                             # Handle other message types (including progress updates)
-                            await self._handle_message(agent_type, message)
+                            await self._handle_message(agent_type, connection, message)
                             
                     except json.JSONDecodeError:
                         logger.error(f"Invalid JSON message from {agent_type.value}: {message}")
                     except Exception as e:
                         logger.error(f"Error processing message from {agent_type.value}: {e}")
+            
+            # The iterator ends when the connection closes normally
+            connection.state = ConnectionState.DISCONNECTED
                         
         except websockets.exceptions.ConnectionClosed:
-            logger.warning(f"WebSocket connection to {config.name} closed")
+            logger.warning(f"WebSocket connection #{connection.connection_id} to {config.name} closed")
             connection.state = ConnectionState.DISCONNECTED
         except Exception as e:
             logger.error(f"Error in message router for {config.name}: {e}")
@@ -306,11 +428,12 @@ class WebSocketAgentManager:
                 if not future.done():
                     future.cancel()
             connection.pending_responses.clear()
+            connection.websocket = None
+            connection.consecutive_failures = 0
     
-    async def _connect_agent(self, agent_type: AgentType):
+    async def _connect_agent(self, agent_type: AgentType, connection: WebSocketConnection):
         """Connect to agent WebSocket with better error handling"""
         config = self.agents[agent_type]
-        connection = self.connections[agent_type]
         
         if connection.reconnect_count >= config.max_reconnect_attempts:
             logger.warning(f"Max reconnect attempts ({config.max_reconnect_attempts}) reached for {config.name}")
@@ -337,7 +460,7 @@ class WebSocketAgentManager:
             connection.connection_time = time.time()
             connection.reconnect_count = 0  # Reset on successful connection
             
-            logger.info(f"Successfully connected to {config.name}")
+            logger.info(f"Successfully connected to {config.name} (connection #{connection.connection_id})")
             
         except (ConnectionRefusedError, OSError) as e:
             logger.debug(f"Connection refused to {config.name} - agent may not be ready yet: {e}")
@@ -357,10 +480,9 @@ class WebSocketAgentManager:
             connection.last_error = str(e)
             connection.reconnect_count += 1
     
-    async def _heartbeat_loop(self, agent_type: AgentType):
+    async def _heartbeat_loop(self, agent_type: AgentType, connection: WebSocketConnection):
         """Send periodic heartbeat to agent"""
         config = self.agents[agent_type]
-        connection = self.connections[agent_type]
         
         while not self._shutdown_event.is_set():
             try:
@@ -385,7 +507,7 @@ class WebSocketAgentManager:
                 logger.warning(f"Heartbeat failed for {config.name}: {e}")
                 await asyncio.sleep(5)
     
-    async def _handle_message(self, agent_type: AgentType, message: str):
+    async def _handle_message(self, agent_type: AgentType, connection: WebSocketConnection, message: str):
         """Handle incoming WebSocket message from agent"""
         try:
             data = json.loads(message)
@@ -393,7 +515,6 @@ class WebSocketAgentManager:
             
             # Handle heartbeat messages (both heartbeat and heartbeat_response)
             if msg_type in ["heartbeat", "heartbeat_response"]:
-                connection = self.connections[agent_type]
                 connection.last_heartbeat = time.time()
                 logger.debug(f"Received {msg_type} from {agent_type.value}")
                 
@@ -465,12 +586,22 @@ class WebSocketAgentManager:
         """
         config = self.agents[agent_type]
         
-        # Use WebSocket if enabled and connected
-        if config.use_websocket and self.is_agent_connected(agent_type):
-            return await self._send_websocket_message(agent_type, message, timeout)
-        else:
-            # Fallback to HTTP
-            return await self._send_http_message(agent_type, message, timeout)
+        with tracing.span(f"agent.{agent_type.value}", message_type=message.get("type")) as span:
+            # Propagate the trace to the agent, which returns its spans with the response
+            tracing.inject(message)
+            
+            # Use WebSocket if enabled and connected
+            if config.use_websocket and self.is_agent_connected(agent_type):
+                response = await self._send_websocket_message(agent_type, message, timeout)
+            else:
+                # Fallback to HTTP
+                if span:
+                    span.set_attribute("transport", "http")
+                response = await self._send_http_message(agent_type, message, timeout)
+            
+            if isinstance(response, dict):
+                tracing.collect(response.pop(tracing.TRACE_SPANS, None))
+            return response
     
     async def _send_websocket_message(
         self, 
@@ -478,14 +609,18 @@ class WebSocketAgentManager:
         message: Dict[str, Any], 
         timeout: float
     ) -> Dict[str, Any]:
-        """Send message via WebSocket"""
-        connection = self.connections[agent_type]
+        """Send message via the least loaded pooled WebSocket connection"""
+        pool = self.pools[agent_type]
         circuit_breaker = self.circuit_breakers.get(agent_type)
         
         async def _send():
-            if not connection.websocket or connection.state != ConnectionState.CONNECTED:
+            connection = pool.select()
+            if connection is None:
                 raise ConnectionError(f"WebSocket not connected to {agent_type.value}")
             
+            # Open another connection for later requests if this one is already busy
+            await self._grow_pool(agent_type)
+            
             # Add message ID for response correlation
             message_id = str(uuid.uuid4())
             message["message_id"] = message_id
@@ -494,6 +629,7 @@ class WebSocketAgentManager:
             # Create a future to wait for the response
             response_future = asyncio.Future()
             connection.pending_responses[message_id] = response_future
+            connection.last_used = time.time()
             
             try:
                 # Send message
@@ -501,11 +637,14 @@ class WebSocketAgentManager:
                 
                 # Wait for response
                 response = await asyncio.wait_for(response_future, timeout=timeout)
+                connection.consecutive_failures = 0
+                connection.last_used = time.time()
                 return response
                 
             except asyncio.TimeoutError:
                 # Clean up pending response
                 connection.pending_responses.pop(message_id, None)
+                self._record_timeout(agent_type, connection)
                 raise TimeoutError(f"No response received from {agent_type.value} within {timeout}s")
             except Exception as e:
                 # Clean up pending response
@@ -517,18 +656,27 @@ class WebSocketAgentManager:
         else:
             return await _send()
     
+    def _record_timeout(self, agent_type: AgentType, connection: WebSocketConnection):
+        """Count a timeout against a connection and recycle it once it is unhealthy"""
+        connection.consecutive_failures += 1
+        connection.error_count += 1
+        connection.last_error = "Response timeout"
+        if connection.consecutive_failures == UNHEALTHY_AFTER_FAILURES and connection.websocket:
+            logger.warning(
+                f"Connection #{connection.connection_id} to {self.agents[agent_type].name} is unhealthy "
+                f"after {connection.consecutive_failures} timeouts, reconnecting"
+            )
+            asyncio.create_task(connection.websocket.close())
+    
     async def _send_http_message(
         self, 
         agent_type: AgentType, 
         message: Dict[str, Any], 
         timeout: float
     ) -> Dict[str, Any]:
-        """Send message via HTTP fallback"""
+        """Send message via HTTP fallback over the agent's shared HTTP session"""
         config = self.agents[agent_type]
         
-        # Import here to avoid circular imports
-        import httpx
-        
         # Determine the correct endpoint based on agent type
         if agent_type == AgentType.DATA:
             endpoint = "/execute"  # Data agent uses /execute endpoint
@@ -537,42 +685,59 @@ class WebSocketAgentManager:
         else:
             endpoint = "/process"  # NLP agent uses /process endpoint
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{config.http_url}{endpoint}",
-                json=message,
-                timeout=timeout
-            )
+        session = http_clients.session(config.http_url)
+        async with session.post(
+            f"{config.http_url}{endpoint}",
+            json=message,
+            headers=tracing.inject({}),
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
             response.raise_for_status()
-            return response.json()
+            return await response.json()
     
     def is_agent_connected(self, agent_type: AgentType) -> bool:
         """Check if agent is connected via WebSocket"""
-        connection = self.connections.get(agent_type)
-        return (connection and 
-                connection.state == ConnectionState.CONNECTED and 
-                connection.websocket is not None)
+        pool = self.pools.get(agent_type)
+        return pool is not None and pool.select() is not None
     
     def get_agent_stats(self) -> Dict[str, Any]:
         """Get connection statistics for all agents"""
         stats = {}
         
-        for agent_type, connection in self.connections.items():
+        for agent_type, pool in self.pools.items():
             config = self.agents[agent_type]
             circuit_breaker = self.circuit_breakers.get(agent_type)
+            connections = pool.connections
             
             agent_stats = {
                 "name": config.name,
                 "enabled": config.enabled,
                 "use_websocket": config.use_websocket,
-                "state": connection.state.value,
+                "state": pool.state.value,
                 "connected": self.is_agent_connected(agent_type),
-                "connection_time": connection.connection_time,
-                "last_heartbeat": connection.last_heartbeat,
-                "reconnect_count": connection.reconnect_count,
-                "message_count": connection.message_count,
-                "error_count": connection.error_count,
-                "last_error": connection.last_error
+                "connection_time": min((c.connection_time for c in connections if c.connection_time), default=None),
+                "last_heartbeat": max((c.last_heartbeat for c in connections if c.last_heartbeat), default=None),
+                "reconnect_count": sum(c.reconnect_count for c in connections),
+                "message_count": sum(c.message_count for c in connections),
+                "error_count": sum(c.error_count for c in connections),
+                "last_error": next((c.last_error for c in reversed(connections) if c.last_error), None),
+                "pool": {
+                    "size": len(connections),
+                    "min_size": pool.min_size,
+                    "max_size": pool.max_size,
+                    "outstanding": pool.outstanding,
+                    "connections": [
+                        {
+                            "id": c.connection_id,
+                            "state": c.state.value,
+                            "healthy": c.is_healthy,
+                            "outstanding": c.outstanding,
+                            "message_count": c.message_count,
+                            "consecutive_failures": c.consecutive_failures
+                        }
+                        for c in connections
+                    ]
+                }
             }
             
             if circuit_breaker:
@@ -590,7 +755,7 @@ class WebSocketAgentManager:
             logger.info(f"Enabled WebSocket for {config.name}")
             
             # Start connection if not already started
-            if agent_type not in self.reconnect_tasks:
+            if not self.pools[agent_type].connections:
                 asyncio.create_task(self._start_agent_connection(agent_type))
     
     def disable_websocket_for_agent(self, agent_type: AgentType):
@@ -600,11 +765,9 @@ class WebSocketAgentManager:
             config.use_websocket = False
             logger.info(f"Disabled WebSocket for {config.name}")
             
-            # Stop connection
-            connection = self.connections[agent_type]
-            if connection.websocket:
-                asyncio.create_task(connection.websocket.close())
-                connection.state = ConnectionState.DISCONNECTED
+            # Stop all pooled connections
+            for connection in list(self.pools[agent_type].connections):
+                asyncio.create_task(self._stop_connection(agent_type, connection))
 
 
 # Global manager instance
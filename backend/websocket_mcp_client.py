@@ -11,12 +11,14 @@ import uuid
 from typing import Any, Dict, List, Optional, Set, Callable
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 
 import websockets
 from websockets import WebSocketClientProtocol, ConnectionClosed
 
+import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +38,7 @@ class PendingRequest:
     timestamp: float
     future: asyncio.Future
     timeout: float = 120.0  # Increased to 120s for schema operations
+    trace_spans: List[Dict[str, Any]] = field(default_factory=list)
 
 
 @dataclass
@@ -118,7 +121,7 @@ class WebSocketMCPClient:
         self.operation_lock = asyncio.Lock()
         self.schema_operation_methods = {
             "get_table_schema", "build_schema_context", "discover_databases", 
-            "discover_tables", "get_sample_data"
+            "discover_tables", "get_sample_data", "get_table_schemas", "get_sample_data_batch"
         }
         
         # Event handlers
@@ -336,6 +339,8 @@ class WebSocketMCPClient:
             request = self.pending_requests.pop(request_id, None)
             
         if request:
+            # Spans of the server side, merged into the caller's trace by call_tool
+            request.trace_spans = message.get(tracing.TRACE_SPANS) or []
             try:
                 # Handle TiDB MCP server response format
                 payload = message.get("payload", {})
@@ -437,7 +442,7 @@ class WebSocketMCPClient:
         async with self.cache_lock:
             # Determine TTL based on operation type
             ttl = 300.0  # 5 minutes default
-            if request.method == "get_table_schema":
+            if request.method in ["get_table_schema", "get_table_schemas"]:
                 ttl = 900.0  # 15 minutes for schema (less frequent changes)
             elif request.method in ["discover_databases", "discover_tables"]:
                 ttl = 300.0  # 5 minutes for discovery (moderate changes)
@@ -682,7 +687,7 @@ class WebSocketMCPClient:
             
             # Set dynamic timeout based on operation type
             timeout = 120.0  # Increased default timeout
-            if method in ["get_table_schema", "build_schema_context"]:
+            if method in ["get_table_schema", "get_table_schemas", "build_schema_context"]:
                 timeout = 180.0  # Longer timeout for schema operations
             elif method in ["discover_databases", "discover_tables"]:
                 timeout = 90.0  # Medium timeout for discovery operations
@@ -708,10 +713,14 @@ class WebSocketMCPClient:
                 "timestamp": time.time()
             }
             
-            await self.websocket.send(json.dumps(message))
-            
-            # Wait for response
-            result = await future
+            with tracing.span(f"mcp.{method}", transport="websocket"):
+                await self.websocket.send(json.dumps(tracing.inject(message)))
+                
+                # Wait for response
+                try:
+                    result = await future
+                finally:
+                    tracing.collect(request.trace_spans)
             
             # Record success for circuit breaker
             self._record_success()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Start-up Time Benchmark for TiDB MCP Server
+This script reports how much each module import and each component
+initialization contributes to the server's cold start.
+
+Imports are timed in a fresh interpreter per module so earlier imports do not
+hide the cost of shared dependencies. Components are constructed without a
+database connection, so the script runs anywhere the package is installed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent / "src"
+
+# Add src to path for imports
+sys.path.insert(0, str(SRC_DIR))
+
+# Modules imported on the server start-up path, then heavy subsystems loaded on first use
+MODULES = [
+    "tidb_mcp_server.config",
+    "tidb_mcp_server.cache_manager",
+    "tidb_mcp_server.database",
+    "tidb_mcp_server.query_executor",
+    "tidb_mcp_server.schema_inspector",
+    "tidb_mcp_server.mcp_tools",
+    "tidb_mcp_server.mcp_server",
+    "tidb_mcp_server.http_api",
+    "tidb_mcp_server.websocket_server",
+    "tidb_mcp_server.main",
+    "tidb_mcp_server.schema_intelligence",
+    "tidb_mcp_server.llm_tools",
+    "tidb_mcp_server.performance_monitor",
+]
+
+THIRD_PARTY_MODULES = ["fastmcp", "fastapi", "uvicorn", "pydantic", "pymysql", "httpx", "psutil", "orjson"]
+
+_IMPORT_PROBE = (
+    "import sys, time\n"
+    "sys.path.insert(0, {src!r})\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "print((time.perf_counter() - start) * 1000)\n"
+)
+
+
+def time_import(module, repeat):
+    """Time a cold import of a module in fresh interpreters, returning (median_ms, error)."""
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE.format(src=str(SRC_DIR), module=module)],
+            capture_output=True, text=True, env=os.environ.copy()
+        )
+        if result.returncode != 0:
+            last_line = (result.stderr.strip().splitlines() or ["import failed"])[-1]
+            return None, last_line
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), None
+
+
+def _build_components():
+    """Component constructors timed by the benchmark, in start-up order."""
+    def cache_manager():
+        from tidb_mcp_server.cache_manager import CacheManager
+        return CacheManager(default_ttl=300, max_size=1000)
+
+    def rate_limiter():
+        from tidb_mcp_server.rate_limiter import RateLimiter
+        return RateLimiter(requests_per_minute=60)
+
+    def query_scheduler():
+        from tidb_mcp_server.query_scheduler import QueryScheduler
+        return QueryScheduler(max_concurrent=10)
+
+    def latency_model():
+        from tidb_mcp_server.latency_model import QueryLatencyModel
+        return QueryLatencyModel(path=None)
+
+    def schema_intelligence():
+        from tidb_mcp_server.schema_intelligence import SchemaIntelligenceEngine
+        return SchemaIntelligenceEngine()
+
+    def llm_client():
+        from tidb_mcp_server.config import LLMConfig
+        from tidb_mcp_server.llm_tools import LLMClient
+        return LLMClient(LLMConfig(api_key="benchmark"))
+
+    def performance_monitor():
+        from tidb_mcp_server.performance_monitor import PerformanceMonitor
+        return PerformanceMonitor()
+
+    return [
+        ("cache_manager", cache_manager),
+        ("rate_limiter", rate_limiter),
+        ("query_scheduler", query_scheduler),
+        ("latency_model", latency_model),
+        ("schema_intelligence (lazy)", schema_intelligence),
+        ("llm_client (lazy)", llm_client),
+        ("performance_monitor", performance_monitor),
+    ]
+
+
+def time_components():
+    """Time each component's first construction (including its imports) in this process."""
+    results = []
+    for name, build in _build_components():
+        start = time.perf_counter()
+        try:
+            build()
+            results.append({"component": name, "ms": (time.perf_counter() - start) * 1000, "error": None})
+        except Exception as e:
+            results.append({"component": name, "ms": None, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+def print_table(title, rows, key):
+    """Print timings as an aligned table, slowest first."""
+    print(title)
+    print("=" * 50)
+    width = max(len(row[key]) for row in rows)
+    for row in sorted(rows, key=lambda r: -(r["ms"] or 0)):
+        if row["error"]:
+            print(f"⚠️  {row[key]:<{width}}  unavailable ({row['error']})")
+        else:
+            print(f"   {row[key]:<{width}}  {row['ms']:8.1f} ms")
+    print()
+
+
+def main():
+    """Run the start-up benchmark."""
+    parser = argparse.ArgumentParser(description="Report TiDB MCP Server import and initialization cost per component")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold imports per module (median is reported)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    print("⏱️  Measuring cold import times...", file=sys.stderr)
+    imports = []
+    for module in THIRD_PARTY_MODULES + MODULES:
+        ms, error = time_import(module, max(1, args.repeat))
+        imports.append({"module": module, "ms": ms, "error": error})
+
+    components = time_components()
+
+    if args.json:
+        print(json.dumps({"imports": imports, "components": components}, indent=2))
+        return 0
+
+    print()
+    print_table("📦 Cold Import Time (fresh interpreter, median)", imports, "module")
+    print_table("🔧 Component Initialization Time (first construction)", components, "component")
+    print("💡 Components marked (lazy) are created on first use, not at server start-up.")
+    print("   The running server logs per-step timings as 'startup_timings_ms' on start.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Approximate query planning for exploratory analytics.
+
+This module rewrites SELECT statements for the executor's opt-in approximate
+mode. Exact ``COUNT(DISTINCT ...)`` becomes TiDB's sketch-based
+``APPROX_COUNT_DISTINCT`` and percentile expressions (``MEDIAN`` and
+``PERCENTILE_CONT``/``PERCENTILE_DISC ... WITHIN GROUP``, which TiDB does not
+support natively) become ``APPROX_PERCENTILE``. Optionally, single-table
+aggregate queries run over a Bernoulli sample of the table with COUNT and SUM
+scaled back up, and the sampling error is estimated from the number of sampled
+rows per result row.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+# Hidden column carrying the number of sampled rows behind each result row
+SAMPLE_ROWS_COLUMN = "__approx_sample_rows"
+
+# Typical relative error of TiDB's sketch-based distinct count; not a guaranteed bound
+APPROX_COUNT_DISTINCT_RELATIVE_ERROR = 0.02
+
+_COUNT_DISTINCT = re.compile(r"\bCOUNT\s*\(\s*DISTINCT\s+", re.IGNORECASE)
+_MEDIAN = re.compile(r"\bMEDIAN\s*\(", re.IGNORECASE)
+_PERCENTILE = re.compile(
+    r"\bPERCENTILE_(CONT|DISC)\s*\(\s*([0-9]*\.?[0-9]+)\s*\)\s*WITHIN\s+GROUP\s*\(", re.IGNORECASE
+)
+_ORDER_BY_EXPR = re.compile(r"^\s*ORDER\s+BY\s+(.+?)(?:\s+(ASC|DESC))?\s*$", re.IGNORECASE | re.DOTALL)
+_SCALABLE_AGGREGATE = re.compile(r"\b(COUNT|SUM)\s*\(", re.IGNORECASE)
+_SAMPLEABLE_AGGREGATE = re.compile(r"\b(COUNT|SUM|AVG|APPROX_PERCENTILE)\s*\(", re.IGNORECASE)
+_UNSAMPLEABLE = [
+    (re.compile(r"\bJOIN\b", re.IGNORECASE), "joins cannot be sampled independently per table"),
+    (re.compile(r"\bUNION\b", re.IGNORECASE), "UNION queries are not sampled"),
+    (re.compile(r"\(\s*SELECT\b", re.IGNORECASE), "subqueries are not sampled"),
+    (re.compile(r"^\s*SELECT\s+DISTINCT\b", re.IGNORECASE), "SELECT DISTINCT cannot be estimated from a sample"),
+    (re.compile(r"\bAPPROX_COUNT_DISTINCT\s*\(", re.IGNORECASE), "distinct counts do not scale from a sample"),
+    (re.compile(r"\b(MIN|MAX)\s*\(", re.IGNORECASE), "MIN/MAX cannot be estimated from a sample"),
+]
+_FROM_TABLE = re.compile(
+    r"\bFROM\s+((?:`?[A-Za-z_][\w$]*`?\s*\.\s*)?`?([A-Za-z_][\w$]*)`?)"
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|GROUP|ORDER|LIMIT|HAVING|WINDOW)\b)(`?[A-Za-z_][\w$]*`?))?",
+    re.IGNORECASE
+)
+
+
+def _find_closing_paren(text: str, open_index: int) -> int:
+    """Find the index of the parenthesis closing the one at ``open_index``."""
+    depth = 0
+    quote = None
+    for index in range(open_index, len(text)):
+        char = text[index]
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return index
+    raise ValueError("Unbalanced parentheses in query")
+
+
+@dataclass
+class ApproximationPlan:
+    """A query rewritten for approximate execution, with a record of what changed."""
+
+    original_query: str
+    query: str
+    rewrites: list[str] = field(default_factory=list)
+    sample_fraction: float | None = None
+    sampling_skipped_reason: str | None = None
+
+    @property
+    def is_approximate(self) -> bool:
+        """Whether the rewritten query returns approximate results."""
+        return bool(self.rewrites) or self.sample_fraction is not None
+
+    def to_metadata(self, sampling_error: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Describe the approximation for QueryResult metadata."""
+        info: dict[str, Any] = {'rewrites': list(self.rewrites)}
+        if any(rewrite.startswith('APPROX_COUNT_DISTINCT') for rewrite in self.rewrites):
+            info['count_distinct_relative_error'] = APPROX_COUNT_DISTINCT_RELATIVE_ERROR
+        if self.sample_fraction is not None:
+            info['sample_fraction'] = self.sample_fraction
+            info.update(sampling_error or {})
+        if self.sampling_skipped_reason:
+            info['sampling_skipped_reason'] = self.sampling_skipped_reason
+        return info
+
+
+def _rewrite_count_distinct(query: str, rewrites: list[str]) -> str:
+    while True:
+        match = _COUNT_DISTINCT.search(query)
+        if not match:
+            return query
+        open_index = query.index('(', match.start())
+        close_index = _find_closing_paren(query, open_index)
+        inner = query[match.end():close_index].strip()
+        query = f"{query[:match.start()]}APPROX_COUNT_DISTINCT({inner}){query[close_index + 1:]}"
+        rewrites.append(f"APPROX_COUNT_DISTINCT({inner})")
+
+
+def _rewrite_percentiles(query: str, rewrites: list[str]) -> str:
+    while True:
+        match = _MEDIAN.search(query)
+        if not match:
+            break
+        open_index = match.end() - 1
+        close_index = _find_closing_paren(query, open_index)
+        inner = query[open_index + 1:close_index].strip()
+        query = f"{query[:match.start()]}APPROX_PERCENTILE({inner}, 50){query[close_index + 1:]}"
+        rewrites.append(f"APPROX_PERCENTILE({inner}, 50)")
+
+    while True:
+        match = _PERCENTILE.search(query)
+        if not match:
+            return query
+        open_index = match.end() - 1
+        close_index = _find_closing_paren(query, open_index)
+        order_by = _ORDER_BY_EXPR.match(query[open_index + 1:close_index])
+        if not order_by:
+            return query  # Leave unusual forms for the database to reject
+        fraction = float(match.group(2))
+        if not 0.0 <= fraction <= 1.0:
+            return query
+        percent = fraction * 100
+        if (order_by.group(2) or '').upper() == 'DESC':
+            percent = 100 - percent
+        # TiDB requires an integer percentage in [1, 100]
+        percent = min(100, max(1, round(percent)))
+        expression = order_by.group(1).strip()
+        query = f"{query[:match.start()]}APPROX_PERCENTILE({expression}, {percent}){query[close_index + 1:]}"
+        rewrites.append(f"APPROX_PERCENTILE({expression}, {percent})")
+
+
+def _apply_sampling(query: str, sample_fraction: float) -> tuple[str | None, str | None]:
+    """Rewrite a single-table aggregate query to run over a Bernoulli sample."""
+    for pattern, reason in _UNSAMPLEABLE:
+        if pattern.search(query):
+            return None, reason
+    if not _SAMPLEABLE_AGGREGATE.search(query):
+        return None, "only aggregate queries are sampled"
+
+    from_matches = list(_FROM_TABLE.finditer(query))
+    if len(from_matches) != 1 or re.search(r"\bFROM\b[^()]*,", query, re.IGNORECASE):
+        return None, "only single-table queries are sampled"
+
+    # Scale COUNT and SUM by the inverse sampling fraction
+    select_list_end = from_matches[0].start()
+    scaled = []
+    position = 0
+    for match in _SCALABLE_AGGREGATE.finditer(query):
+        if match.start() < position:
+            continue
+        open_index = match.end() - 1
+        close_index = _find_closing_paren(query, open_index)
+        aggregate = query[match.start():close_index + 1]
+        scaled.append(query[position:match.start()])
+        scaled.append(f"({aggregate} / {sample_fraction})")
+        # Keep the original column name for unaliased select-list aggregates
+        if close_index < select_list_end and re.match(r"\s*(?:,|FROM\b)", query[close_index + 1:], re.IGNORECASE):
+            scaled.append(" AS `{}`".format(aggregate.replace('`', '``')))
+        position = close_index + 1
+    scaled.append(query[position:])
+    query = ''.join(scaled)
+
+    from_match = _FROM_TABLE.search(query)
+    table_ref, table_name, alias = from_match.group(1), from_match.group(2), from_match.group(3)
+    sampled_from = (f"FROM (SELECT * FROM {table_ref} WHERE RAND() < {sample_fraction}) "
+                    f"AS {alias or table_name}")
+    # Expose the raw sample size behind each result row for error estimation. The
+    # column goes last so positional GROUP BY / ORDER BY references stay valid.
+    select_list = query[:from_match.start()].rstrip()
+    query = f"{select_list}, COUNT(*) AS {SAMPLE_ROWS_COLUMN} {sampled_from}{query[from_match.end():]}"
+    return query, None
+
+
+def plan_approximate_query(query: str, sample_fraction: float | None = None) -> ApproximationPlan:
+    """
+    Rewrite a validated SELECT query for approximate execution.
+
+    ``USE db; SELECT ...`` queries are supported; only the SELECT is rewritten.
+
+    Args:
+        query: Validated SQL query
+        sample_fraction: Optional fraction of rows (0 < f < 1) to sample for
+            single-table aggregate queries
+
+    Returns:
+        ApproximationPlan with the rewritten query (unchanged if nothing applies)
+    """
+    prefix = ''
+    statement = query.strip().rstrip(';')
+    use_match = re.match(r"^\s*USE\s+[^;]+;\s*", statement, re.IGNORECASE)
+    if use_match:
+        prefix, statement = statement[:use_match.end()], statement[use_match.end():]
+
+    plan = ApproximationPlan(original_query=query, query=query)
+    if not re.match(r"^\s*SELECT\b", statement, re.IGNORECASE):
+        return plan
+
+    rewrites: list[str] = []
+    statement = _rewrite_count_distinct(statement, rewrites)
+    statement = _rewrite_percentiles(statement, rewrites)
+    plan.rewrites = rewrites
+
+    if sample_fraction is not None and sample_fraction < 1.0:
+        sampled, reason = _apply_sampling(statement, sample_fraction)
+        if sampled is None:
+            plan.sampling_skipped_reason = reason
+        else:
+            statement = sampled
+            plan.sample_fraction = sample_fraction
+
+    if plan.is_approximate:
+        plan.query = f"{prefix}{statement}"
+    return plan
+
+
+def estimate_sampling_error(rows: list[dict[str, Any]],
+                            sample_fraction: float) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    Strip the hidden sample-size column and estimate the sampling error.
+
+    For Bernoulli sampling with fraction ``p``, a scaled count built from ``k``
+    sampled rows has a relative standard error of about ``sqrt((1 - p) / k)``.
+    Scaled sums have at least this error; averages and percentiles are unscaled.
+
+    Args:
+        rows: Result rows including the hidden sample-size column
+        sample_fraction: Sampling fraction used for the query
+
+    Returns:
+        Tuple of (rows without the hidden column, error summary)
+    """
+    cleaned = []
+    sample_sizes = []
+    for row in rows:
+        row = dict(row)
+        sample_sizes.append(int(row.pop(SAMPLE_ROWS_COLUMN, 0) or 0))
+        cleaned.append(row)
+
+    if not sample_sizes:
+        return cleaned, {'sample_rows_min': 0, 'relative_standard_error_max': None}
+
+    smallest = min(sample_sizes)
+    error = math.sqrt((1 - sample_fraction) / smallest) if smallest > 0 else None
+    return cleaned, {
+        'sample_rows_min': smallest,
+        'sample_rows_total': sum(sample_sizes),
+        'relative_standard_error_max': round(error, 4) if error is not None else None,
+        'error_basis': 'bernoulli_count'
+    }
@@ -7,7 +7,7 @@ schema information, query results, LLM responses, and other frequently accessed
 
 import time
 import threading
-from typing import Any, Dict, List, Optional, Pattern
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import re
@@ -79,6 +79,11 @@ class CacheManager:
         
         logger.info(f"CacheManager initialized with TTL={default_ttl}s, max_size={max_size}")
     
+    @property
+    def default_ttl(self) -> int:
+        """Default TTL in seconds for entries stored without an explicit TTL."""
+        return self._default_ttl
+    
     def get(self, key: str) -> Optional[Any]:
         """
         Retrieve a value from the cache.
@@ -241,7 +246,35 @@ class CacheManager:
                     return []
             
             return keys
-    
+
+    def export_entries(self, pattern: Optional[str] = None) -> List[Tuple[str, Any, float, float]]:
+        """
+        Export live cache entries with their remaining TTLs.
+
+        Expired entries are skipped and access statistics are not updated.
+
+        Args:
+            pattern: Optional regex pattern to filter keys
+
+        Returns:
+            List of (key, value, remaining_ttl_seconds, created_at) tuples; remaining
+            TTL is infinite for entries that never expire
+        """
+        regex = None
+        if pattern:
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                logger.error(f"Invalid regex pattern '{pattern}': {e}")
+                return []
+
+        with self._lock:
+            return [
+                (key, entry.value, entry.get_remaining_ttl(), entry.created_at)
+                for key, entry in self._cache.items()
+                if not entry.is_expired() and (regex is None or regex.search(key))
+            ]
+
     def _cleanup_expired(self) -> None:
         """Remove expired entries from cache (internal method)."""
         current_time = time.time()
@@ -0,0 +1,312 @@
+"""
+Persistent warm-start snapshots for the Universal MCP Server cache.
+
+This module serializes the schema-related cache namespaces (database list,
+table lists and table schemas) to a local JSON file together with their
+remaining TTLs, and restores them on startup so a freshly deployed server does
+not have to rebuild everything from INFORMATION_SCHEMA. Each snapshot records a
+schema version per database, and only entries cached since that version was
+first observed are written; after a restore the versions are re-checked in the
+background and any database whose schema changed is invalidated.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache_manager import CacheKeyGenerator, CacheManager
+from .models import ColumnInfo, DatabaseInfo, IndexInfo, TableInfo, TableSchema
+
+logger = logging.getLogger(__name__)
+
+# Model types that may appear in the snapshotted namespaces
+_MODEL_TYPES = {
+    cls.__name__: cls
+    for cls in (DatabaseInfo, TableInfo, ColumnInfo, IndexInfo, TableSchema)
+}
+
+
+class CacheSnapshotManager:
+    """
+    Saves and restores schema cache namespaces to and from a local file.
+
+    Only the databases, tables and schema namespaces are persisted; query
+    results, sample data and LLM responses are deliberately left out because
+    they are cheap to lose and may be large or sensitive.
+    """
+
+    SNAPSHOT_FORMAT_VERSION = 1
+
+    def __init__(self, cache_manager: CacheManager, path: str, min_remaining_ttl: float = 5.0):
+        """
+        Initialize the snapshot manager.
+
+        Args:
+            cache_manager: Cache manager whose entries are snapshotted
+            path: Snapshot file path
+            min_remaining_ttl: Entries with less remaining TTL than this are skipped
+        """
+        self.cache_manager = cache_manager
+        self.path = os.path.expanduser(path)
+        self.min_remaining_ttl = min_remaining_ttl
+
+        # Schema versions recorded in the most recently loaded snapshot
+        self.loaded_schema_versions: Dict[str, Optional[str]] = {}
+        # Per database: the last observed schema version and when it was first observed;
+        # entries cached before that may have been built from an older schema
+        self._observed_versions: Dict[str, Tuple[str, float]] = {}
+        self._restored_at = 0.0
+        self._stats = {
+            'snapshots_saved': 0,
+            'entries_saved': 0,
+            'entries_restored': 0,
+            'databases_invalidated': 0,
+            'last_saved_at': None,
+            'last_loaded_at': None
+        }
+
+    @staticmethod
+    def snapshot_patterns() -> List[str]:
+        """Get the cache key patterns included in snapshots."""
+        return [
+            CacheKeyGenerator.database_pattern(),
+            CacheKeyGenerator.tables_pattern(),
+            CacheKeyGenerator.schema_pattern()
+        ]
+
+    def save(self, schema_inspector=None) -> int:
+        """
+        Write the schema cache namespaces to the snapshot file.
+
+        Table and schema entries are written only if they were cached after their
+        database's current schema version was first observed, so the recorded
+        version is the one they were built from. A database whose version changed
+        since the previous save has its cached entries invalidated and left out.
+
+        Args:
+            schema_inspector: Optional SchemaInspector used to record per-database
+                schema versions for later verification
+
+        Returns:
+            Number of cache entries written
+        """
+        exported = [
+            (key, value, remaining_ttl, created_at)
+            for pattern in self.snapshot_patterns()
+            for key, value, remaining_ttl, created_at in self.cache_manager.export_entries(pattern)
+            if remaining_ttl >= self.min_remaining_ttl
+        ]
+
+        schema_versions = {}
+        for database in sorted(self._databases_in_keys(key for key, *_ in exported)):
+            schema_versions[database] = self._observe_schema_version(schema_inspector, database)
+
+        entries = []
+        for key, value, remaining_ttl, created_at in exported:
+            database = self._database_of_key(key)
+            if database is not None and schema_versions[database] is not None:
+                _, observed_since = self._observed_versions[database]
+                if created_at < observed_since:
+                    continue
+            try:
+                encoded = self._encode_value(value)
+            except TypeError as e:
+                logger.debug(f"Skipping unserializable cache entry {key}: {e}")
+                continue
+            entries.append({
+                'key': key,
+                'remaining_ttl': None if remaining_ttl == float('inf') else remaining_ttl,
+                'value': encoded
+            })
+
+        snapshot = {
+            'format_version': self.SNAPSHOT_FORMAT_VERSION,
+            'saved_at': time.time(),
+            'schema_versions': schema_versions,
+            'entries': entries
+        }
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        # Write atomically so a crash mid-write never leaves a truncated snapshot
+        fd, tmp_path = tempfile.mkstemp(prefix='.cache_snapshot_', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self._stats['snapshots_saved'] += 1
+        self._stats['entries_saved'] = len(entries)
+        self._stats['last_saved_at'] = snapshot['saved_at']
+
+        logger.info(f"Saved cache snapshot with {len(entries)} entries to {self.path}")
+        return len(entries)
+
+    def load(self) -> int:
+        """
+        Restore cache entries from the snapshot file.
+
+        Entries keep the TTL they had left when the snapshot was taken, minus the
+        time elapsed since then; entries that have expired in the meantime are dropped.
+
+        Returns:
+            Number of cache entries restored
+        """
+        if not os.path.exists(self.path):
+            logger.info(f"No cache snapshot found at {self.path}, starting cold")
+            return 0
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache snapshot {self.path}: {e}")
+            return 0
+
+        if snapshot.get('format_version') != self.SNAPSHOT_FORMAT_VERSION:
+            logger.warning(f"Ignoring cache snapshot with unsupported format version "
+                           f"{snapshot.get('format_version')}")
+            return 0
+
+        elapsed = max(0.0, time.time() - snapshot.get('saved_at', 0))
+        restored = 0
+        self._restored_at = time.time()
+
+        for entry in snapshot.get('entries', []):
+            remaining_ttl = entry.get('remaining_ttl')
+            if remaining_ttl is None:
+                ttl = 0  # Never expires
+            else:
+                ttl = int(remaining_ttl - elapsed)
+                if ttl < self.min_remaining_ttl:
+                    continue
+            try:
+                value = self._decode_value(entry['value'])
+            except (KeyError, TypeError, ValueError) as e:
+                logger.debug(f"Skipping undecodable snapshot entry {entry.get('key')}: {e}")
+                continue
+            self.cache_manager.set(entry['key'], value, ttl=ttl)
+            restored += 1
+
+        self.loaded_schema_versions = dict(snapshot.get('schema_versions', {}))
+        self._stats['entries_restored'] = restored
+        self._stats['last_loaded_at'] = time.time()
+
+        logger.info(f"Restored {restored} cache entries from snapshot {self.path} "
+                    f"(snapshot age: {elapsed:.0f}s)")
+        return restored
+
+    def verify(self, schema_inspector) -> List[str]:
+        """
+        Verify restored entries against current schema versions.
+
+        Databases whose schema version changed (or could not be verified) since the
+        snapshot was taken have their cached tables and schemas invalidated.
+
+        Args:
+            schema_inspector: SchemaInspector used to compute current schema versions
+
+        Returns:
+            Names of the databases that were invalidated
+        """
+        invalidated = []
+
+        for database, snapshot_version in self.loaded_schema_versions.items():
+            current_version = self._get_schema_version(schema_inspector, database)
+            if snapshot_version is not None and snapshot_version == current_version:
+                # The restored entries were built from the current schema
+                self._observed_versions[database] = (current_version, self._restored_at)
+                continue
+            if current_version is not None:
+                self._observed_versions[database] = (current_version, time.time())
+
+            count = schema_inspector.invalidate_cache(database)
+            invalidated.append(database)
+            logger.info(f"Schema of database '{database}' changed since snapshot, "
+                        f"invalidated {count} cache entries")
+
+        if invalidated:
+            # The database list may also be stale if schemas were created or dropped
+            self.cache_manager.invalidate(CacheKeyGenerator.database_pattern())
+
+        self._stats['databases_invalidated'] += len(invalidated)
+        self.loaded_schema_versions = {}
+
+        logger.info(f"Cache snapshot verification completed ({len(invalidated)} databases invalidated)")
+        return invalidated
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot statistics."""
+        return {'path': self.path, **self._stats}
+
+    def _get_schema_version(self, schema_inspector, database: str) -> Optional[str]:
+        """Get the current schema version of a database, or None if unavailable."""
+        if schema_inspector is None:
+            return None
+        try:
+            return schema_inspector.get_schema_version(database)
+        except Exception as e:
+            logger.warning(f"Failed to compute schema version for '{database}': {e}")
+            return None
+
+    def _observe_schema_version(self, schema_inspector, database: str) -> Optional[str]:
+        """
+        Get the current schema version of a database and record when it was first observed.
+
+        When the version differs from the previously observed one, the database's
+        cached entries are invalidated since they may predate the change.
+        """
+        version = self._get_schema_version(schema_inspector, database)
+        if version is None:
+            return None
+
+        previous = self._observed_versions.get(database)
+        if previous is None or previous[0] != version:
+            if previous is not None:
+                count = schema_inspector.invalidate_cache(database)
+                logger.info(f"Schema of database '{database}' changed, invalidated {count} cache entries")
+            self._observed_versions[database] = (version, time.time())
+        return version
+
+    @staticmethod
+    def _database_of_key(key: str) -> Optional[str]:
+        """Extract the database name referenced by a table or schema cache key."""
+        for prefix in (CacheKeyGenerator.PREFIX_TABLES + ':', CacheKeyGenerator.PREFIX_SCHEMA + ':'):
+            if key.startswith(prefix):
+                return key[len(prefix):].split(':', 1)[0]
+        return None
+
+    @classmethod
+    def _databases_in_keys(cls, keys) -> set:
+        """Extract the database names referenced by table and schema cache keys."""
+        return {database for database in map(cls._database_of_key, keys) if database is not None}
+
+    @classmethod
+    def _encode_value(cls, value: Any) -> Any:
+        """Encode a cached value into JSON-compatible data with type tags."""
+        if isinstance(value, list):
+            return {'__type__': 'list', 'items': [cls._encode_value(item) for item in value]}
+        type_name = type(value).__name__
+        if type_name in _MODEL_TYPES:
+            return {'__type__': type_name, 'data': value.to_dict()}
+        if value is None or isinstance(value, (str, int, float, bool, dict)):
+            return {'__type__': 'json', 'data': value}
+        raise TypeError(f"Unsupported snapshot value type: {type_name}")
+
+    @classmethod
+    def _decode_value(cls, encoded: Dict[str, Any]) -> Any:
+        """Decode a value produced by :meth:`_encode_value`."""
+        type_name = encoded['__type__']
+        if type_name == 'list':
+            return [cls._decode_value(item) for item in encoded['items']]
+        if type_name == 'json':
+            return encoded['data']
+        return _MODEL_TYPES[type_name].from_dict(encoded['data'])
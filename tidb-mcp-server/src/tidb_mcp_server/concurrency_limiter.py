@@ -0,0 +1,187 @@
+"""
+Adaptive concurrency limiting for database work.
+
+The query scheduler caps how many statements hold a TiDB connection at once.
+A fixed cap is either too low for a healthy cluster or too high for one that
+is already saturated. This module estimates the in-flight limit from observed
+statement latency instead: when latency rises above its long-term baseline the
+limit shrinks, and while latency stays healthy it grows back.
+
+Two algorithms are provided:
+
+* ``gradient`` compares the average latency of a short window of samples with
+  a slowly moving long-term average and scales the limit by their ratio.
+* ``aimd`` adds one slot per healthy sample and multiplies the limit by a
+  backoff ratio when a sample exceeds a latency threshold or times out.
+"""
+
+import logging
+import math
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM_GRADIENT = "gradient"
+ALGORITHM_AIMD = "aimd"
+ALGORITHMS = (ALGORITHM_GRADIENT, ALGORITHM_AIMD)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Thread-safe latency-driven estimate of how many statements may run at once.
+
+    Callers report one sample per finished statement through :meth:`on_sample`;
+    the current limit is read through :attr:`limit`. The limit only grows while
+    at least half of it is in use, so an idle server does not inflate it.
+    """
+
+    def __init__(self, algorithm: str = ALGORITHM_GRADIENT, initial_limit: int = 10,
+                 min_limit: int = 1, max_limit: int = 100, window_size: int = 10,
+                 tolerance: float = 1.5, smoothing: float = 0.2, long_window: int = 500,
+                 latency_threshold_ms: float = 2000.0, backoff_ratio: float = 0.9):
+        """
+        Initialize the limiter.
+
+        Args:
+            algorithm: ``"gradient"`` or ``"aimd"``
+            initial_limit: Limit before any samples are observed
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            window_size: Samples averaged into one gradient update
+            tolerance: Latency increase over the baseline tolerated before shrinking (gradient)
+            smoothing: Weight of each new gradient estimate in the limit (0-1)
+            long_window: Samples the long-term baseline averages over (gradient)
+            latency_threshold_ms: Sample latency treated as overload (aimd)
+            backoff_ratio: Multiplier applied to the limit on overload (aimd, and timeouts in both)
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown concurrency algorithm '{algorithm}'. Must be one of: {list(ALGORITHMS)}")
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Concurrency limits must satisfy 1 <= min_limit <= max_limit")
+        if not 0.0 < backoff_ratio < 1.0:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+
+        self.algorithm = algorithm
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window_size = max(1, window_size)
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.long_window = max(1, long_window)
+        self.latency_threshold_ms = latency_threshold_ms
+        self.backoff_ratio = backoff_ratio
+
+        self._lock = threading.Lock()
+        self._estimated_limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._long_rtt_ms: float | None = None
+        self._long_samples = 0
+        self._window_total_ms = 0.0
+        self._window_count = 0
+        self._window_max_inflight = 0
+        self._last_short_rtt_ms: float | None = None
+        self._stats = {'samples': 0, 'drops': 0, 'increases': 0, 'decreases': 0}
+
+        logger.info(f"AdaptiveConcurrencyLimiter initialized ({algorithm}, limit={self.limit}, "
+                    f"range={min_limit}-{max_limit})")
+
+    @property
+    def limit(self) -> int:
+        """The current in-flight limit."""
+        return int(self._estimated_limit)
+
+    def on_sample(self, latency_ms: float, inflight: int, dropped: bool = False) -> int:
+        """
+        Record one finished statement and update the limit.
+
+        Args:
+            latency_ms: Time the statement held its database slot
+            inflight: Statements in flight when it finished, including itself
+            dropped: Whether the statement timed out, which always shrinks the limit
+
+        Returns:
+            The limit after this sample
+        """
+        with self._lock:
+            self._stats['samples'] += 1
+            old_limit = self.limit
+
+            if dropped:
+                self._stats['drops'] += 1
+                self._set_limit(self._estimated_limit * self.backoff_ratio)
+            elif self.algorithm == ALGORITHM_AIMD:
+                self._aimd_update(latency_ms, inflight)
+            else:
+                self._gradient_update(latency_ms, inflight)
+
+            new_limit = self.limit
+
+        if new_limit != old_limit:
+            logger.debug(f"Concurrency limit {old_limit} -> {new_limit} "
+                         f"(latency={latency_ms:.1f}ms, inflight={inflight}, dropped={dropped})")
+        return new_limit
+
+    def _aimd_update(self, latency_ms: float, inflight: int) -> None:
+        """Additive increase on healthy samples, multiplicative decrease on slow ones (lock must be held)."""
+        if latency_ms > self.latency_threshold_ms:
+            self._set_limit(self._estimated_limit * self.backoff_ratio)
+        elif inflight * 2 >= self._estimated_limit:
+            self._set_limit(self._estimated_limit + 1)
+
+    def _gradient_update(self, latency_ms: float, inflight: int) -> None:
+        """Scale the limit by the long-term to short-term latency ratio once per window (lock must be held)."""
+        self._window_total_ms += latency_ms
+        self._window_count += 1
+        self._window_max_inflight = max(self._window_max_inflight, inflight)
+        if self._window_count < self.window_size:
+            return
+
+        short_rtt = self._window_total_ms / self._window_count
+        max_inflight = self._window_max_inflight
+        self._window_total_ms = 0.0
+        self._window_count = 0
+        self._window_max_inflight = 0
+        self._last_short_rtt_ms = short_rtt
+
+        # Long-term baseline: a plain average while warming up, then an exponential moving average
+        self._long_samples += 1
+        if self._long_rtt_ms is None:
+            self._long_rtt_ms = short_rtt
+        else:
+            weight = 1.0 / min(self._long_samples, self.long_window / self.window_size)
+            self._long_rtt_ms += (short_rtt - self._long_rtt_ms) * weight
+
+        # After a latency spike the baseline stays inflated; let it recover towards the current latency
+        if self._long_rtt_ms / max(short_rtt, 1e-3) > 2.0:
+            self._long_rtt_ms *= 0.95
+
+        # Don't grow the limit while the server is not using it
+        if max_inflight * 2 < self._estimated_limit:
+            return
+
+        gradient = max(0.5, min(1.0, self.tolerance * self._long_rtt_ms / max(short_rtt, 1e-3)))
+        queue_allowance = math.sqrt(self._estimated_limit)
+        target = self._estimated_limit * gradient + queue_allowance
+        self._set_limit(self._estimated_limit * (1 - self.smoothing) + target * self.smoothing)
+
+    def _set_limit(self, value: float) -> None:
+        """Clamp and store a new limit estimate, counting the direction of change (lock must be held)."""
+        value = min(max(value, float(self.min_limit)), float(self.max_limit))
+        if int(value) > self.limit:
+            self._stats['increases'] += 1
+        elif int(value) < self.limit:
+            self._stats['decreases'] += 1
+        self._estimated_limit = value
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get limiter statistics including the current limit."""
+        with self._lock:
+            return {
+                'algorithm': self.algorithm,
+                'limit': self.limit,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'short_rtt_ms': round(self._last_short_rtt_ms, 2) if self._last_short_rtt_ms is not None else None,
+                'long_rtt_ms': round(self._long_rtt_ms, 2) if self._long_rtt_ms is not None else None,
+                **self._stats
+            }
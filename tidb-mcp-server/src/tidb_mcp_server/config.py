@@ -1,7 +1,7 @@
 """Configuration management for Universal MCP Server."""
 
 import os
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from pydantic_settings import BaseSettings
 
@@ -100,6 +100,12 @@ class MCPServerConfig(BaseModel):
     version: str = Field(default="1.0.0", description="Server version")
     max_connections: int = Field(default=10, description="Maximum concurrent connections")
     request_timeout: int = Field(default=180, description="Request timeout in seconds")
+    ws_outbound_queue_size: int = Field(
+        default=256, description="Maximum messages queued for a WebSocket agent before the slow-consumer policy applies"
+    )
+    ws_slow_consumer_policy: str = Field(
+        default="drop_oldest", description="What to do when an agent's outbound queue is full"
+    )
     
     @field_validator('max_connections')
     @classmethod
@@ -116,6 +122,23 @@ class MCPServerConfig(BaseModel):
         if v <= 0:
             raise ValueError('Request timeout must be positive')
         return v
+    
+    @field_validator('ws_outbound_queue_size')
+    @classmethod
+    def validate_ws_outbound_queue_size(cls, v):
+        """Validate outbound queue size is positive."""
+        if v <= 0:
+            raise ValueError('WebSocket outbound queue size must be positive')
+        return v
+    
+    @field_validator('ws_slow_consumer_policy')
+    @classmethod
+    def validate_ws_slow_consumer_policy(cls, v):
+        """Validate slow-consumer policy."""
+        valid_policies = ["drop_oldest", "coalesce", "disconnect"]
+        if v.lower() not in valid_policies:
+            raise ValueError(f'Slow consumer policy must be one of: {valid_policies}')
+        return v.lower()
 
 
 class CacheConfig(BaseModel):
@@ -124,6 +147,12 @@ class CacheConfig(BaseModel):
     enabled: bool = Field(default=True, description="Enable caching")
     ttl_seconds: int = Field(default=300, description="Cache TTL in seconds (5 minutes)")
     max_size: int = Field(default=1000, description="Maximum cache entries")
+    snapshot_enabled: bool = Field(default=True, description="Persist schema cache snapshots for warm restarts")
+    snapshot_path: str = Field(
+        default="~/.cache/tidb-mcp-server/cache_snapshot.json",
+        description="Path of the schema cache snapshot file"
+    )
+    snapshot_interval_seconds: int = Field(default=300, description="Interval between periodic cache snapshots")
     
     @field_validator('ttl_seconds')
     @classmethod
@@ -140,6 +169,14 @@ class CacheConfig(BaseModel):
         if v <= 0:
             raise ValueError('Cache max size must be positive')
         return v
+    
+    @field_validator('snapshot_interval_seconds')
+    @classmethod
+    def validate_snapshot_interval(cls, v):
+        """Validate snapshot interval is positive."""
+        if v <= 0:
+            raise ValueError('Cache snapshot interval must be positive')
+        return v
 
 
 class SecurityConfig(BaseModel):
@@ -147,6 +184,7 @@ class SecurityConfig(BaseModel):
     
     max_query_timeout: int = Field(default=180, description="Maximum query timeout in seconds")
     max_sample_rows: int = Field(default=100, description="Maximum sample rows to return")
+    max_stream_rows: int = Field(default=100000, description="Maximum rows returned by a streamed query")
     allowed_query_types: list[str] = Field(
         default=["SELECT"], 
         description="Allowed SQL query types"
@@ -172,6 +210,14 @@ class SecurityConfig(BaseModel):
             raise ValueError('Max sample rows must be between 1 and 1000')
         return v
     
+    @field_validator('max_stream_rows')
+    @classmethod
+    def validate_stream_rows(cls, v):
+        """Validate streamed rows limit."""
+        if not 1 <= v <= 10_000_000:
+            raise ValueError('Max stream rows must be between 1 and 10000000')
+        return v
+    
     @field_validator('rate_limit_requests_per_minute')
     @classmethod
     def validate_rate_limit(cls, v):
@@ -181,6 +227,106 @@ class SecurityConfig(BaseModel):
         return v
 
 
+class SchedulerConfig(BaseModel):
+    """Query scheduler configuration."""
+    
+    max_concurrent_queries: int = Field(default=10, description="Global cap on concurrent database slots")
+    max_concurrent_streams: int = Field(
+        default=4,
+        description="Cap on concurrent streamed queries, which hold their slots while clients read"
+    )
+    client_weights: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-client fair-share weights"
+    )
+    interactive_weight: float = Field(default=4.0, description="Weight of the interactive priority class")
+    background_weight: float = Field(default=1.0, description="Weight of the background priority class")
+    adaptive_concurrency_enabled: bool = Field(
+        default=True,
+        description="Adjust the concurrent query limit from database latency, up to max_concurrent_queries"
+    )
+    adaptive_concurrency_algorithm: str = Field(default="gradient", description="Limit algorithm: gradient or aimd")
+    adaptive_min_concurrency: int = Field(default=2, description="Lowest concurrent query limit")
+    adaptive_latency_threshold_ms: float = Field(
+        default=2000.0,
+        description="Statement latency treated as overload by the aimd algorithm"
+    )
+    
+    @field_validator('max_concurrent_queries', 'max_concurrent_streams', 'adaptive_min_concurrency')
+    @classmethod
+    def validate_max_concurrent_queries(cls, v):
+        """Validate concurrent query limits are positive."""
+        if v <= 0:
+            raise ValueError('Concurrent query limits must be positive')
+        return v
+    
+    @field_validator('adaptive_concurrency_algorithm')
+    @classmethod
+    def validate_adaptive_concurrency_algorithm(cls, v):
+        """Validate the adaptive concurrency algorithm name."""
+        if v.lower() not in ('gradient', 'aimd'):
+            raise ValueError('Adaptive concurrency algorithm must be gradient or aimd')
+        return v.lower()
+    
+    @field_validator('interactive_weight', 'background_weight')
+    @classmethod
+    def validate_priority_weight(cls, v):
+        """Validate priority weights are positive."""
+        if v <= 0:
+            raise ValueError('Priority weights must be positive')
+        return v
+
+
+class LatencyModelConfig(BaseModel):
+    """Query latency model configuration."""
+    
+    enabled: bool = Field(default=True, description="Persist query latency history across restarts")
+    path: str = Field(
+        default="~/.cache/tidb-mcp-server/latency_model.json",
+        description="Path of the latency history file"
+    )
+    warning_threshold_ms: float = Field(
+        default=5000.0,
+        description="Predicted latency above which queries are flagged as long-running"
+    )
+    save_interval_seconds: int = Field(default=300, description="Interval between latency history saves")
+    
+    @field_validator('warning_threshold_ms', 'save_interval_seconds')
+    @classmethod
+    def validate_positive(cls, v):
+        """Validate thresholds and intervals are positive."""
+        if v <= 0:
+            raise ValueError('Latency model thresholds and intervals must be positive')
+        return v
+
+
+class RoutingConfig(BaseModel):
+    """Storage engine routing configuration."""
+    
+    tiflash_enabled: bool = Field(default=True, description="Route analytical queries to TiFlash replicas")
+    tiflash_min_rows: int = Field(
+        default=100000,
+        description="Estimated table rows required before a table is read from TiFlash"
+    )
+    replica_refresh_seconds: int = Field(default=300, description="Interval between TiFlash replica metadata refreshes")
+    
+    @field_validator('tiflash_min_rows')
+    @classmethod
+    def validate_tiflash_min_rows(cls, v):
+        """Validate minimum table rows is not negative."""
+        if v < 0:
+            raise ValueError('TiFlash minimum table rows cannot be negative')
+        return v
+    
+    @field_validator('replica_refresh_seconds')
+    @classmethod
+    def validate_replica_refresh(cls, v):
+        """Validate replica refresh interval is positive."""
+        if v <= 0:
+            raise ValueError('TiFlash replica refresh interval must be positive')
+        return v
+
+
 class ServerConfig(BaseSettings):
     """Main Universal MCP server configuration loaded from environment variables."""
     
@@ -223,17 +369,53 @@ class ServerConfig(BaseSettings):
     mcp_server_version: str = Field(default="1.0.0", env="MCP_SERVER_VERSION")
     mcp_max_connections: int = Field(default=10, env="MCP_MAX_CONNECTIONS")
     mcp_request_timeout: int = Field(default=180, env="MCP_REQUEST_TIMEOUT")
+    mcp_ws_outbound_queue_size: int = Field(default=256, env="MCP_WS_OUTBOUND_QUEUE_SIZE")
+    mcp_ws_slow_consumer_policy: str = Field(default="drop_oldest", env="MCP_WS_SLOW_CONSUMER_POLICY")
     
     # Cache configuration
     cache_enabled: bool = Field(default=True, env="CACHE_ENABLED")
     cache_ttl_seconds: int = Field(default=300, env="CACHE_TTL_SECONDS")
     cache_max_size: int = Field(default=1000, env="CACHE_MAX_SIZE")
+    cache_snapshot_enabled: bool = Field(default=True, env="CACHE_SNAPSHOT_ENABLED")
+    cache_snapshot_path: str = Field(
+        default="~/.cache/tidb-mcp-server/cache_snapshot.json", env="CACHE_SNAPSHOT_PATH"
+    )
+    cache_snapshot_interval_seconds: int = Field(default=300, env="CACHE_SNAPSHOT_INTERVAL_SECONDS")
     
     # Security configuration
     max_query_timeout: int = Field(default=180, env="MAX_QUERY_TIMEOUT")
     max_sample_rows: int = Field(default=100, env="MAX_SAMPLE_ROWS")
+    max_stream_rows: int = Field(default=100000, env="MAX_STREAM_ROWS")
     rate_limit_requests_per_minute: int = Field(default=60, env="RATE_LIMIT_RPM")
     
+    # Query scheduler configuration
+    scheduler_max_concurrent_queries: int = Field(default=10, env="SCHEDULER_MAX_CONCURRENT_QUERIES")
+    scheduler_max_concurrent_streams: int = Field(default=4, env="SCHEDULER_MAX_CONCURRENT_STREAMS")
+    scheduler_client_weights_str: str = Field(
+        default="",
+        env="SCHEDULER_CLIENT_WEIGHTS",
+        description="Comma-separated client:weight pairs, e.g. 'nlp-agent:2,data-agent:1'"
+    )
+    scheduler_interactive_weight: float = Field(default=4.0, env="SCHEDULER_INTERACTIVE_WEIGHT")
+    scheduler_background_weight: float = Field(default=1.0, env="SCHEDULER_BACKGROUND_WEIGHT")
+    adaptive_concurrency_enabled: bool = Field(default=True, env="ADAPTIVE_CONCURRENCY_ENABLED")
+    adaptive_concurrency_algorithm: str = Field(default="gradient", env="ADAPTIVE_CONCURRENCY_ALGORITHM")
+    adaptive_min_concurrency: int = Field(default=2, env="ADAPTIVE_MIN_CONCURRENCY")
+    adaptive_latency_threshold_ms: float = Field(default=2000.0, env="ADAPTIVE_LATENCY_THRESHOLD_MS")
+    
+    # Query latency model configuration
+    latency_model_enabled: bool = Field(default=True, env="LATENCY_MODEL_ENABLED")
+    latency_model_path: str = Field(
+        default="~/.cache/tidb-mcp-server/latency_model.json", env="LATENCY_MODEL_PATH"
+    )
+    latency_warning_threshold_ms: float = Field(default=5000.0, env="LATENCY_WARNING_THRESHOLD_MS")
+    latency_model_save_interval_seconds: int = Field(default=300, env="LATENCY_MODEL_SAVE_INTERVAL_SECONDS")
+    
+    # Storage engine routing configuration
+    tiflash_routing_enabled: bool = Field(default=True, env="TIFLASH_ROUTING_ENABLED")
+    tiflash_routing_min_rows: int = Field(default=100000, env="TIFLASH_ROUTING_MIN_ROWS")
+    tiflash_replica_refresh_seconds: int = Field(default=300, env="TIFLASH_REPLICA_REFRESH_SECONDS")
+    
     # Logging configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     log_format: str = Field(default="json", env="LOG_FORMAT")
@@ -304,6 +486,8 @@ class ServerConfig(BaseSettings):
             version=self.mcp_server_version,
             max_connections=self.mcp_max_connections,
             request_timeout=self.mcp_request_timeout,
+            ws_outbound_queue_size=self.mcp_ws_outbound_queue_size,
+            ws_slow_consumer_policy=self.mcp_ws_slow_consumer_policy,
         )
     
     def get_cache_config(self) -> CacheConfig:
@@ -312,6 +496,9 @@ class ServerConfig(BaseSettings):
             enabled=self.cache_enabled,
             ttl_seconds=self.cache_ttl_seconds,
             max_size=self.cache_max_size,
+            snapshot_enabled=self.cache_snapshot_enabled,
+            snapshot_path=self.cache_snapshot_path,
+            snapshot_interval_seconds=self.cache_snapshot_interval_seconds,
         )
     
     def get_security_config(self) -> SecurityConfig:
@@ -319,9 +506,48 @@ class ServerConfig(BaseSettings):
         return SecurityConfig(
             max_query_timeout=self.max_query_timeout,
             max_sample_rows=self.max_sample_rows,
+            max_stream_rows=self.max_stream_rows,
             rate_limit_requests_per_minute=self.rate_limit_requests_per_minute,
         )
     
+    def get_scheduler_config(self) -> SchedulerConfig:
+        """Get query scheduler configuration object."""
+        client_weights = {}
+        for pair in self.scheduler_client_weights_str.split(','):
+            if ':' not in pair:
+                continue
+            client_id, weight = pair.rsplit(':', 1)
+            client_weights[client_id.strip()] = float(weight)
+        
+        return SchedulerConfig(
+            max_concurrent_queries=self.scheduler_max_concurrent_queries,
+            max_concurrent_streams=self.scheduler_max_concurrent_streams,
+            client_weights=client_weights,
+            interactive_weight=self.scheduler_interactive_weight,
+            background_weight=self.scheduler_background_weight,
+            adaptive_concurrency_enabled=self.adaptive_concurrency_enabled,
+            adaptive_concurrency_algorithm=self.adaptive_concurrency_algorithm,
+            adaptive_min_concurrency=self.adaptive_min_concurrency,
+            adaptive_latency_threshold_ms=self.adaptive_latency_threshold_ms,
+        )
+    
+    def get_latency_model_config(self) -> LatencyModelConfig:
+        """Get query latency model configuration object."""
+        return LatencyModelConfig(
+            enabled=self.latency_model_enabled,
+            path=self.latency_model_path,
+            warning_threshold_ms=self.latency_warning_threshold_ms,
+            save_interval_seconds=self.latency_model_save_interval_seconds,
+        )
+    
+    def get_routing_config(self) -> RoutingConfig:
+        """Get storage engine routing configuration object."""
+        return RoutingConfig(
+            tiflash_enabled=self.tiflash_routing_enabled,
+            tiflash_min_rows=self.tiflash_routing_min_rows,
+            replica_refresh_seconds=self.tiflash_replica_refresh_seconds,
+        )
+    
     def validate_configuration(self) -> None:
         """Validate the complete configuration and raise errors if invalid."""
         errors = []
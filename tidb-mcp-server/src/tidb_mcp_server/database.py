@@ -6,22 +6,40 @@ Provides direct database connections with proper error handling and configuratio
 import logging
 import os
 import pymysql
+import re
 import ssl
+import threading
+import time
+import weakref
 import datetime
 import decimal
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from .prepared_statements import PreparedStatementCache
+
 # Load environment variables from .env file
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
+def _record_timing(timings: Optional[Dict[str, float]], phase: str, start: float) -> None:
+    """Add the milliseconds elapsed since ``start`` to a phase in an optional timings dict."""
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + (time.perf_counter() - start) * 1000
+
+
 class TiDBConnection:
     """
     TiDB connection manager with SSL support and error handling.
+    
+    Connections are kept in a small idle pool keyed by their selected schema,
+    so a request for a database reuses a connection already switched to it.
+    Database context is applied with ``select_db`` on the connection that runs
+    the statement rather than with a separate ``USE`` round trip. Parameterized
+    queries are prepared server-side once per pooled connection and reused.
     """
     
     def __init__(self):
@@ -29,6 +47,18 @@ class TiDBConnection:
         self.config = self._load_config()
         self._connection = None
         
+        # Idle connections by selected schema, most recently used last
+        self.pool_max_idle = int(os.getenv("TIDB_POOL_MAX_IDLE", "10"))
+        self.pool_idle_timeout = float(os.getenv("TIDB_POOL_IDLE_TIMEOUT", "300"))
+        self._idle: Dict[Optional[str], List[Tuple[Any, float]]] = {}
+        self._pool_lock = threading.Lock()
+        self._pool_stats = {"created": 0, "reused": 0, "schema_switches": 0, "discarded": 0}
+        
+        # Server-side prepared statements of each live connection
+        self.prepared_cache_size = int(os.getenv("TIDB_PREPARED_CACHE_SIZE", "100"))
+        self._prepared: "weakref.WeakKeyDictionary[Any, PreparedStatementCache]" = weakref.WeakKeyDictionary()
+        self._prepared_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        
     def _load_config(self) -> Dict[str, Any]:
         """Load database configuration from environment variables."""
         return {
@@ -55,9 +85,8 @@ class TiDBConnection:
             logger.warning(f"Failed to create SSL context: {e}")
             return None
     
-    @contextmanager
-    def get_connection(self):
-        """Get a database connection with proper cleanup and retry logic."""
+    def _connect(self):
+        """Open a new database connection with retry logic."""
         connection = None
         max_retries = 3
         retry_delay = 1.0
@@ -79,8 +108,8 @@ class TiDBConnection:
                 connection = pymysql.connect(**connect_config)
                 logger.debug(f"Database connection established (attempt {attempt + 1})")
                 
-                # Success, exit retry loop and yield connection
-                break
+                # Success, exit retry loop
+                return connection
                 
             except Exception as e:
                 logger.warning(f"Database connection attempt {attempt + 1} failed: {e}")
@@ -93,23 +122,110 @@ class TiDBConnection:
                     connection = None
                 
                 if attempt < max_retries - 1:
-                    import time
                     time.sleep(retry_delay)
                     retry_delay *= 2  # Exponential backoff
                 else:
                     logger.error(f"Database connection failed after {max_retries} attempts: {e}")
                     raise
+    
+    def _close_quietly(self, connection) -> None:
+        """Close a connection, ignoring errors."""
+        try:
+            connection.close()
+            logger.debug("Database connection closed")
+        except Exception as close_error:
+            logger.warning(f"Error closing database connection: {close_error}")
+    
+    @staticmethod
+    def _selected_schema(connection) -> Optional[str]:
+        """Schema currently selected on a connection (pymysql keeps it as bytes after connect)."""
+        db = connection.db
+        return db.decode("utf-8") if isinstance(db, bytes) else db
+    
+    def _acquire(self, database: Optional[str]):
+        """Take an idle connection for a schema, or open a new one."""
+        target = database or self.config["database"]
+        now = time.time()
+        
+        while True:
+            with self._pool_lock:
+                # Prefer a connection already on the target schema, else any idle one
+                idle = self._idle.get(target) or next((conns for conns in self._idle.values() if conns), None)
+                if not idle:
+                    break
+                connection, last_used = idle.pop()
+            
+            if now - last_used > self.pool_idle_timeout:
+                self._pool_stats["discarded"] += 1
+                self._close_quietly(connection)
+                continue
+            try:
+                # Connections idle for a while may have been dropped by the server
+                if now - last_used > 30:
+                    connection.ping(reconnect=False)
+                if self._selected_schema(connection) != target:
+                    connection.select_db(target)
+                    self._pool_stats["schema_switches"] += 1
+            except Exception as e:
+                logger.debug(f"Discarding pooled connection: {e}")
+                self._pool_stats["discarded"] += 1
+                self._close_quietly(connection)
+                continue
+            self._pool_stats["reused"] += 1
+            return connection
         
-        # Only yield once after successful connection or after all retries exhausted
+        connection = self._connect()
+        self._pool_stats["created"] += 1
+        if self._selected_schema(connection) != target:
+            connection.select_db(target)
+        return connection
+    
+    def _release(self, connection) -> None:
+        """Return a healthy connection to the idle pool, tagged by its selected schema."""
+        with self._pool_lock:
+            idle_count = sum(len(conns) for conns in self._idle.values())
+            if idle_count < self.pool_max_idle and connection.open:
+                self._idle.setdefault(self._selected_schema(connection), []).append((connection, time.time()))
+                return
+        self._close_quietly(connection)
+    
+    @contextmanager
+    def get_connection(self, database: Optional[str] = None):
+        """
+        Get a database connection selected to ``database`` (the default database if None).
+        
+        The connection returns to the idle pool when the block completes normally
+        and is closed if the block raises or is abandoned, since it may still hold
+        unread results.
+        """
+        connection = self._acquire(database)
         try:
             yield connection
-        finally:
-            if connection:
-                try:
-                    connection.close()
-                    logger.debug("Database connection closed")
-                except Exception as close_error:
-                    logger.warning(f"Error closing database connection: {close_error}")
+        except BaseException:
+            self._pool_stats["discarded"] += 1
+            self._close_quietly(connection)
+            raise
+        self._release(connection)
+    
+    def close_pool(self) -> None:
+        """Close all idle pooled connections."""
+        with self._pool_lock:
+            idle = [connection for conns in self._idle.values() for connection, _ in conns]
+            self._idle.clear()
+        for connection in idle:
+            self._close_quietly(connection)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        with self._pool_lock:
+            idle_by_schema = {schema or "": len(conns) for schema, conns in self._idle.items() if conns}
+        return {
+            **self._pool_stats,
+            "idle": sum(idle_by_schema.values()),
+            "idle_by_schema": idle_by_schema,
+            "max_idle": self.pool_max_idle,
+            "prepared_statements": dict(self._prepared_stats)
+        }
     
     def test_connection(self) -> bool:
         """Test database connectivity."""
@@ -128,17 +244,40 @@ class TiDBConnection:
         query: str,
         params: Optional[Tuple] = None,
         fetch_all: bool = True,
-        fetch_one: bool = False
+        fetch_one: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+        database: Optional[str] = None
     ) -> Any:
-        """Execute a query and return results."""
+        """
+        Execute a query and return results.
+        
+        If a ``timings`` dict is given, the milliseconds spent connecting, executing,
+        fetching and converting rows are added to its ``connect``, ``execute``,
+        ``fetch`` and ``conversion`` entries.
+        
+        The query runs on a pooled connection selected to ``database`` (the
+        default database if None). A ``USE db`` statement only switches the
+        schema of the connection it runs on.
+        """
         try:
-            with self.get_connection() as conn:
+            phase_start = time.perf_counter()
+            with self.get_connection(database) as conn:
+                _record_timing(timings, "connect", phase_start)
+                
+                use_match = re.match(r"^\s*USE\s+`?([^`;\s]+)`?\s*;?\s*$", query, re.IGNORECASE)
+                if use_match and not params:
+                    # Apply through the connection's selected schema so its pool tag stays accurate
+                    conn.select_db(use_match.group(1))
+                    return 0
+                
                 with conn.cursor() as cursor:
                     # Execute the query
+                    phase_start = time.perf_counter()
                     if params:
                         cursor.execute(query, params)
                     else:
                         cursor.execute(query)
+                    _record_timing(timings, "execute", phase_start)
                     
                     # Determine how to fetch results based on query type
                     query_upper = query.strip().upper()
@@ -150,8 +289,14 @@ class TiDBConnection:
                             result = cursor.fetchone()
                             return self._sanitize_result(result) if result else None
                         elif fetch_all:
+                            phase_start = time.perf_counter()
                             results = cursor.fetchall()
-                            return [self._sanitize_result(row) for row in results] if results else []
+                            _record_timing(timings, "fetch", phase_start)
+                            
+                            phase_start = time.perf_counter()
+                            sanitized = [self._sanitize_result(row) for row in results] if results else []
+                            _record_timing(timings, "conversion", phase_start)
+                            return sanitized
                         else:
                             return cursor
                     else:
@@ -163,6 +308,106 @@ class TiDBConnection:
             logger.error(f"Query execution failed: {e}")
             raise
     
+    def execute_prepared(
+        self,
+        template: str,
+        params: Tuple,
+        database: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute a read query with ``?`` placeholders as a server-side prepared statement.
+        
+        The template is prepared once per pooled connection and schema; later
+        executions only bind the parameters, so TiDB reuses the cached plan.
+        The least recently used statement is deallocated when a connection
+        holds ``TIDB_PREPARED_CACHE_SIZE`` statements.
+        
+        Args:
+            template: Single SELECT-like statement with ``?`` placeholders
+            params: Values bound to the placeholders in order
+            database: Database to select on the connection before executing
+            timings: Optional dict receiving ``connect``, ``execute``, ``fetch`` and ``conversion`` milliseconds
+            
+        Returns:
+            Sanitized result rows
+        """
+        try:
+            phase_start = time.perf_counter()
+            with self.get_connection(database) as conn:
+                _record_timing(timings, "connect", phase_start)
+                
+                with conn.cursor() as cursor:
+                    phase_start = time.perf_counter()
+                    statements = self._prepared.get(conn)
+                    if statements is None:
+                        statements = self._prepared[conn] = PreparedStatementCache(self.prepared_cache_size)
+                    
+                    key = (self._selected_schema(conn), template)
+                    name = statements.get(key)
+                    if name is None:
+                        self._prepared_stats["misses"] += 1
+                        name, evicted = statements.reserve()
+                        if evicted:
+                            self._prepared_stats["evictions"] += 1
+                            cursor.execute(f"DEALLOCATE PREPARE {evicted}")
+                        cursor.execute(f"PREPARE {name} FROM %s", (template,))
+                        statements.add(key, name)
+                    else:
+                        self._prepared_stats["hits"] += 1
+                    
+                    # EXECUTE only binds user variables, so the values travel through SET
+                    if params:
+                        variables = [f"@mcp_p{i}" for i in range(len(params))]
+                        cursor.execute("SET " + ", ".join(f"{var} = %s" for var in variables), params)
+                        cursor.execute(f"EXECUTE {name} USING {', '.join(variables)}")
+                    else:
+                        cursor.execute(f"EXECUTE {name}")
+                    _record_timing(timings, "execute", phase_start)
+                    
+                    phase_start = time.perf_counter()
+                    results = cursor.fetchall()
+                    _record_timing(timings, "fetch", phase_start)
+                    
+                    phase_start = time.perf_counter()
+                    sanitized = [self._sanitize_result(row) for row in results] if results else []
+                    _record_timing(timings, "conversion", phase_start)
+                    return sanitized
+                    
+        except Exception as e:
+            logger.error(f"Prepared query execution failed: {e}")
+            raise
+    
+    def stream_query(
+        self,
+        query: str,
+        batch_size: int = 500,
+        database: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Execute a query and yield its rows in batches as they arrive.
+        
+        Uses an unbuffered server-side cursor so rows are not materialized in
+        memory before the first batch is yielded. The connection stays open
+        until the generator is exhausted or closed.
+        
+        Args:
+            query: Single SELECT statement to execute
+            batch_size: Maximum rows per yielded batch
+            database: Database to select on the connection before executing
+        """
+        with self.get_connection(database) as conn:
+            cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(query)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [self._sanitize_result(row) for row in rows]
+            # Only close an exhausted cursor: closing an unbuffered cursor early reads
+            # the remaining rows, so abandoned streams just drop the connection instead
+            cursor.close()
+    
     def _sanitize_result(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Sanitize database results to handle binary data and encoding issues."""
         if not isinstance(row, dict):
@@ -253,10 +498,31 @@ class DatabaseManager:
         query: str,
         params: Optional[Tuple] = None,
         fetch_all: bool = True,
-        fetch_one: bool = False
+        fetch_one: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+        database: Optional[str] = None
     ) -> Any:
         """Execute a query with the same interface as backend DatabaseManager."""
-        return self.tidb_connection.execute_query(query, params, fetch_all, fetch_one)
+        return self.tidb_connection.execute_query(query, params, fetch_all, fetch_one, timings, database)
+    
+    def execute_prepared(
+        self,
+        template: str,
+        params: Tuple,
+        database: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[Dict[str, Any]]:
+        """Execute a read query with ``?`` placeholders as a cached server-side prepared statement."""
+        return self.tidb_connection.execute_prepared(template, params, database, timings)
+    
+    def stream_query(
+        self,
+        query: str,
+        batch_size: int = 500,
+        database: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Execute a query and yield its rows in batches."""
+        return self.tidb_connection.stream_query(query, batch_size, database)
     
     def execute_many(self, query: str, params_list: List[Tuple]) -> int:
         """Execute multiple queries."""
@@ -270,9 +536,19 @@ class DatabaseManager:
         """Check database health."""
         return self.test_connection()
     
+    @property
+    def default_database(self) -> Optional[str]:
+        """Database selected on connections when no database is requested."""
+        return self.tidb_connection.config["database"]
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        return self.tidb_connection.get_pool_stats()
+    
     def close(self):
-        """Close database connections (no-op for connection-per-request pattern)."""
-        logger.debug("Database manager close called (no persistent connections)")
+        """Close idle pooled database connections."""
+        self.tidb_connection.close_pool()
+        logger.debug("Database manager closed pooled connections")
 
 
 # Global database manager instance
@@ -7,28 +7,50 @@ Supports both database operations and LLM services.
 """
 
 import asyncio
+import json
 import logging
 import os
 from contextlib import asynccontextmanager
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 import uvicorn
 
 from tidb_mcp_server.config import ServerConfig
 from tidb_mcp_server.mcp_server import UniversalMCPServer
 import tidb_mcp_server.mcp_tools as mcp_tools
+from tidb_mcp_server.serialization import NDJSON_MEDIA_TYPE, FastJSONResponse, dumps_line
+from tidb_mcp_server import tracing
 
 logger = logging.getLogger(__name__)
 
+# Streamed NDJSON lines are flushed to the client in chunks of about this size
+STREAM_CHUNK_BYTES = 64 * 1024
+
 
 # Pydantic models for HTTP requests
 class ExecuteQueryRequest(BaseModel):
     query: str
     timeout: Optional[int] = None
     use_cache: bool = True
+    client_id: Optional[str] = None
+    priority: str = "interactive"
+    approximate: bool = False
+    sample_fraction: Optional[float] = None
+    params: Optional[List[Any]] = None
+
+
+class StreamQueryRequest(BaseModel):
+    query: str
+    timeout: Optional[int] = None
+    client_id: Optional[str] = None
+    priority: str = "interactive"
+    batch_size: int = 500
+    max_rows: Optional[int] = None
 
 
 class ValidateQueryRequest(BaseModel):
@@ -47,6 +69,18 @@ class GetTableSchemaRequest(BaseModel):
     table: str
 
 
+class GetTableSchemasRequest(BaseModel):
+    database: str
+    tables: List[str]
+
+
+class GetSampleDataBatchRequest(BaseModel):
+    database: str
+    tables: List[str]
+    limit: int = 10
+    masked_columns: Optional[List[str]] = None
+
+
 class DiscoverTablesRequest(BaseModel):
     database: str
 
@@ -146,7 +180,8 @@ app = FastAPI(
     title="TiDB MCP Server HTTP API",
     description="HTTP API wrapper for TiDB MCP Server tools",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -159,6 +194,22 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def trace_tool_requests(request: Request, call_next):
+    """Continue the caller's trace for tool calls and return the server spans in a response header"""
+    traceparent = request.headers.get(tracing.TRACEPARENT)
+    if not traceparent or not request.url.path.startswith("/tools/"):
+        return await call_next(request)
+
+    tool_name = request.url.path[len("/tools/"):]
+    with tracing.server_span(f"mcp.{tool_name}", traceparent, service="tidb-mcp-server", transport="http"):
+        response = await call_next(request)
+        spans = tracing.export_spans()
+        if spans:
+            response.headers[tracing.TRACE_SPANS_HEADER] = json.dumps(spans, separators=(",", ":"), default=str)
+        return response
+
+
 @app.post("/admin/initialize")
 async def initialize_mcp_tools():
     """Initialize MCP tools manually"""
@@ -235,7 +286,7 @@ async def health_check():
 async def discover_databases_endpoint():
     """Discover all accessible databases"""
     try:
-        result = mcp_tools.discover_databases()
+        result = await asyncio.to_thread(mcp_tools.discover_databases)
         return result
     except Exception as e:
         logger.error(f"discover_databases failed: {e}")
@@ -246,7 +297,7 @@ async def discover_databases_endpoint():
 async def discover_tables_endpoint(request: DiscoverTablesRequest):
     """Discover tables in a specific database"""
     try:
-        result = mcp_tools.discover_tables(request.database)
+        result = await asyncio.to_thread(mcp_tools.discover_tables, request.database)
         return result
     except Exception as e:
         logger.error(f"discover_tables failed: {e}")
@@ -257,7 +308,7 @@ async def discover_tables_endpoint(request: DiscoverTablesRequest):
 async def get_table_schema_endpoint(request: GetTableSchemaRequest):
     """Get detailed schema information for a specific table"""
     try:
-        result = mcp_tools.get_table_schema(request.database, request.table)
+        result = await asyncio.to_thread(mcp_tools.get_table_schema, request.database, request.table)
         return result
     except Exception as e:
         logger.error(f"get_table_schema failed: {e}")
@@ -268,7 +319,8 @@ async def get_table_schema_endpoint(request: GetTableSchemaRequest):
 async def get_sample_data_endpoint(request: GetSampleDataRequest):
     """Get sample data from a specific table"""
     try:
-        result = mcp_tools.get_sample_data(
+        result = await asyncio.to_thread(
+            mcp_tools.get_sample_data,
             database=request.database,
             table=request.table,
             limit=request.limit,
@@ -280,16 +332,52 @@ async def get_sample_data_endpoint(request: GetSampleDataRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/tools/get_table_schemas_tool")
+async def get_table_schemas_endpoint(request: GetTableSchemasRequest):
+    """Get detailed schema information for several tables"""
+    try:
+        result = await asyncio.to_thread(mcp_tools.get_table_schemas, request.database, request.tables)
+        return result
+    except Exception as e:
+        logger.error(f"get_table_schemas failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/tools/get_sample_data_batch_tool")
+async def get_sample_data_batch_endpoint(request: GetSampleDataBatchRequest):
+    """Get sample data from several tables"""
+    try:
+        result = await asyncio.to_thread(
+            mcp_tools.get_sample_data_batch,
+            database=request.database,
+            tables=request.tables,
+            limit=request.limit,
+            masked_columns=request.masked_columns
+        )
+        return result
+    except Exception as e:
+        logger.error(f"get_sample_data_batch failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/tools/execute_query_tool")
 async def execute_query_endpoint(request: ExecuteQueryRequest):
     """Execute a read-only SQL query"""
     try:
-        result = mcp_tools.execute_query(
+        # Waiting for a scheduler slot blocks, so keep it off the event loop
+        result = await asyncio.to_thread(
+            mcp_tools.execute_query,
             query=request.query,
             timeout=request.timeout,
-            use_cache=request.use_cache
+            use_cache=request.use_cache,
+            client_id=request.client_id,
+            priority=request.priority,
+            approximate=request.approximate,
+            sample_fraction=request.sample_fraction,
+            params=request.params
         )
-        return result
+        # Rendered directly to skip jsonable_encoder over every row
+        return FastJSONResponse(result)
     except Exception as e:
         logger.error(f"execute_query failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -306,6 +394,17 @@ async def validate_query_endpoint(request: ValidateQueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/tools/predict_query_latency_tool")
+async def predict_query_latency_endpoint(request: ValidateQueryRequest):
+    """Predict a SQL query's execution time from past executions"""
+    try:
+        result = mcp_tools.predict_query_latency(request.query)
+        return result
+    except Exception as e:
+        logger.error(f"predict_query_latency failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/tools/get_server_stats_tool")
 async def get_server_stats_endpoint():
     """Get server statistics and performance metrics"""
@@ -405,9 +504,12 @@ async def list_tools():
             "discover_databases_tool",
             "discover_tables_tool",
             "get_table_schema_tool",
+            "get_table_schemas_tool",
             "get_sample_data_tool",
+            "get_sample_data_batch_tool",
             "execute_query_tool",
             "validate_query_tool",
+            "predict_query_latency_tool",
             "get_server_stats_tool",
             "clear_cache_tool"
         ],
@@ -588,17 +690,81 @@ async def get_sample_data_api():
 async def execute_query_api(request: ExecuteQueryRequest):
     """Execute query via API endpoint"""
     try:
-        result = mcp_tools.execute_query(
+        # Waiting for a scheduler slot blocks, so keep it off the event loop
+        result = await asyncio.to_thread(
+            mcp_tools.execute_query,
             query=request.query,
             timeout=request.timeout,
-            use_cache=request.use_cache
+            use_cache=request.use_cache,
+            client_id=request.client_id,
+            priority=request.priority,
+            approximate=request.approximate,
+            sample_fraction=request.sample_fraction,
+            params=request.params
         )
-        return result
+        return FastJSONResponse(result)
     except Exception as e:
         logger.error(f"execute_query_api failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/query/stream")
+async def stream_query_api(request: StreamQueryRequest):
+    """
+    Stream query results as newline-delimited JSON.
+    
+    The first line is ``{"type": "columns", ...}``, followed by one
+    ``{"type": "row", "row": {...}}`` line per row and a final ``{"type": "end", ...}``
+    line. Errors after streaming has started are reported as a ``{"type": "error"}`` line.
+    The query's database slot is released as soon as the response ends or the
+    client disconnects, and the stream ends with an error line after ``timeout`` seconds.
+    """
+    events = None
+    try:
+        events = mcp_tools.stream_query(
+            query=request.query,
+            timeout=request.timeout,
+            client_id=request.client_id,
+            priority=request.priority,
+            batch_size=request.batch_size,
+            max_rows=request.max_rows
+        )
+        # Start the query before responding so validation and connection errors get a status code
+        first_event = await asyncio.to_thread(next, events)
+    except asyncio.CancelledError:
+        # The client went away while the query was starting
+        if events is not None:
+            asyncio.get_running_loop().run_in_executor(None, events.close)
+        raise
+    except Exception as e:
+        logger.error(f"stream_query failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def ndjson_chunks():
+        chunk = bytearray(dumps_line(first_event))
+        flushed = False
+        try:
+            while (event := await asyncio.to_thread(next, events, None)) is not None:
+                chunk += dumps_line(event)
+                # Send the first row right away, then batch lines into larger chunks
+                if not flushed or len(chunk) >= STREAM_CHUNK_BYTES:
+                    yield bytes(chunk)
+                    chunk.clear()
+                    flushed = True
+        except Exception as e:
+            logger.error(f"stream_query failed while streaming: {e}")
+            chunk += dumps_line({"type": "error", "error": str(e), "error_type": type(e).__name__})
+        finally:
+            # Also reached when the client disconnects; closing waits for an in-flight fetch,
+            # so it runs in a worker thread instead of holding up the cancelled response
+            asyncio.get_running_loop().run_in_executor(None, events.close)
+        if chunk:
+            yield bytes(chunk)
+
+    # The background task releases the slot even if the body iterator is abandoned mid-stream
+    return StreamingResponse(ndjson_chunks(), media_type=NDJSON_MEDIA_TYPE, background=BackgroundTask(events.close))
+
+
 if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(
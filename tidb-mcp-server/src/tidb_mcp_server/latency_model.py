@@ -0,0 +1,301 @@
+"""
+Historical execution-time model per query fingerprint.
+
+This module keeps a small persistent history of database execution time, rows
+and result bytes per query fingerprint and serves latency predictions before a
+query runs: an exponentially weighted moving average for the recent trend and
+quantiles from a uniform reservoir sample of past executions. Callers use the
+prediction to pick deadlines, to warn users before long-running queries start,
+and to decide whether and for how long a result is worth caching.
+"""
+
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any
+
+from .workload_recorder import fingerprint_query
+
+logger = logging.getLogger(__name__)
+
+
+class _FingerprintHistory:
+    """Execution history of one query fingerprint."""
+
+    __slots__ = ("count", "ewma_ms", "ewma_rows", "ewma_bytes", "max_ms", "samples", "last_seen")
+
+    def __init__(self):
+        self.count = 0
+        self.ewma_ms = 0.0
+        self.ewma_rows = 0.0
+        self.ewma_bytes = 0.0
+        self.max_ms = 0.0
+        self.samples: list[float] = []
+        self.last_seen = 0.0
+
+    def record(self, latency_ms: float, rows: int, result_bytes: int, alpha: float,
+               reservoir_size: int, rng: random.Random) -> None:
+        self.count += 1
+        if self.count == 1:
+            self.ewma_ms, self.ewma_rows, self.ewma_bytes = latency_ms, float(rows), float(result_bytes)
+        else:
+            self.ewma_ms += alpha * (latency_ms - self.ewma_ms)
+            self.ewma_rows += alpha * (rows - self.ewma_rows)
+            self.ewma_bytes += alpha * (result_bytes - self.ewma_bytes)
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.last_seen = time.time()
+
+        # Reservoir sampling keeps a uniform sample of all executions
+        if len(self.samples) < reservoir_size:
+            self.samples.append(latency_ms)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < reservoir_size:
+                self.samples[slot] = latency_ms
+
+    def quantile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "ewma_ms": round(self.ewma_ms, 3),
+            "ewma_rows": round(self.ewma_rows, 2),
+            "ewma_bytes": round(self.ewma_bytes, 1),
+            "max_ms": round(self.max_ms, 3),
+            "samples": [round(sample, 3) for sample in self.samples],
+            "last_seen": self.last_seen,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> '_FingerprintHistory':
+        history = cls()
+        history.count = int(data["count"])
+        history.ewma_ms = float(data["ewma_ms"])
+        history.ewma_rows = float(data.get("ewma_rows", 0.0))
+        history.ewma_bytes = float(data.get("ewma_bytes", 0.0))
+        history.max_ms = float(data.get("max_ms", history.ewma_ms))
+        history.samples = [float(sample) for sample in data.get("samples", [])]
+        history.last_seen = float(data.get("last_seen", 0.0))
+        return history
+
+
+class QueryLatencyModel:
+    """
+    Thread-safe latency model keyed by query fingerprint, optionally persisted to a file.
+
+    Predictions are only served once a fingerprint has ``min_samples`` executions.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: str | None = None, alpha: float = 0.2, reservoir_size: int = 128,
+                 max_fingerprints: int = 5000, min_samples: int = 3,
+                 warning_threshold_ms: float = 5000.0):
+        """
+        Initialize the latency model.
+
+        Args:
+            path: Optional JSON file to load from and save to (in-memory only if None)
+            alpha: EWMA smoothing factor; higher values follow recent executions more closely
+            reservoir_size: Number of latency samples kept per fingerprint for quantiles
+            max_fingerprints: Maximum fingerprints retained; least recently seen are evicted
+            min_samples: Executions required before a prediction is served
+            warning_threshold_ms: Predicted p95 latency above which queries are flagged as long-running
+        """
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+
+        self.path = os.path.expanduser(path) if path else None
+        self.alpha = alpha
+        self.reservoir_size = reservoir_size
+        self.max_fingerprints = max_fingerprints
+        self.min_samples = min_samples
+        self.warning_threshold_ms = warning_threshold_ms
+
+        self._lock = threading.Lock()
+        self._history: dict[str, _FingerprintHistory] = {}
+        self._rng = random.Random()
+        self._dirty = False
+
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def fingerprint(query: str) -> str:
+        """Get the fingerprint under which a query's history is kept."""
+        return fingerprint_query(query)[0]
+
+    def record(self, fingerprint: str, latency_ms: float, rows: int = 0, result_bytes: int = 0) -> None:
+        """
+        Record one database execution of a fingerprint.
+
+        Args:
+            fingerprint: Query fingerprint from :meth:`fingerprint`
+            latency_ms: Database execution time in milliseconds
+            rows: Rows fetched from the database
+            result_bytes: Bytes of the serialized result
+        """
+        with self._lock:
+            history = self._history.get(fingerprint)
+            if history is None:
+                if len(self._history) >= self.max_fingerprints:
+                    stalest = min(self._history, key=lambda key: self._history[key].last_seen)
+                    del self._history[stalest]
+                history = _FingerprintHistory()
+                self._history[fingerprint] = history
+            history.record(latency_ms, rows, result_bytes, self.alpha, self.reservoir_size, self._rng)
+            self._dirty = True
+
+    def predict(self, fingerprint: str) -> dict[str, Any] | None:
+        """
+        Predict the execution profile of a fingerprint.
+
+        Args:
+            fingerprint: Query fingerprint from :meth:`fingerprint`
+
+        Returns:
+            Dictionary with ``samples``, ``ewma_ms``, ``p50_ms``, ``p95_ms``, ``p99_ms``,
+            ``max_ms``, ``expected_rows``, ``expected_bytes`` and ``long_running``,
+            or None if there is not enough history
+        """
+        with self._lock:
+            history = self._history.get(fingerprint)
+            if history is None or history.count < self.min_samples:
+                return None
+            p95 = history.quantile(0.95)
+            return {
+                "fingerprint": fingerprint,
+                "samples": history.count,
+                "ewma_ms": round(history.ewma_ms, 2),
+                "p50_ms": round(history.quantile(0.5), 2),
+                "p95_ms": round(p95, 2),
+                "p99_ms": round(history.quantile(0.99), 2),
+                "max_ms": round(history.max_ms, 2),
+                "expected_rows": round(history.ewma_rows),
+                "expected_bytes": round(history.ewma_bytes),
+                "long_running": max(p95, history.ewma_ms) >= self.warning_threshold_ms,
+            }
+
+    @staticmethod
+    def suggest_timeout(prediction: dict[str, Any] | None, max_timeout: int,
+                        min_timeout: int = 5, safety_factor: float = 3.0) -> int:
+        """
+        Suggest a query deadline in seconds from a prediction.
+
+        The deadline is the p99 latency times ``safety_factor``, clamped to
+        ``[min_timeout, max_timeout]``; without history it is ``max_timeout``.
+        """
+        if prediction is None:
+            return max_timeout
+        seconds = int(prediction["p99_ms"] * safety_factor / 1000) + 1
+        return max(min_timeout, min(max_timeout, seconds))
+
+    @staticmethod
+    def suggest_cache_ttl(prediction: dict[str, Any] | None, default_ttl: int,
+                          max_cacheable_bytes: int = 1_000_000) -> int | None:
+        """
+        Suggest how long a result should be cached.
+
+        Slow queries are kept longer than the default TTL; fast queries with large
+        results are not cached at all because recomputing them is cheaper than the
+        memory they would hold.
+
+        Returns:
+            TTL in seconds, or None if the result should not be cached
+        """
+        if prediction is None:
+            return default_ttl
+        if prediction["ewma_ms"] < 50 and prediction["expected_bytes"] > max_cacheable_bytes:
+            return None
+        if prediction["p50_ms"] >= 10_000:
+            return default_ttl * 4
+        if prediction["p50_ms"] >= 1_000:
+            return default_ttl * 2
+        return default_ttl
+
+    def load(self) -> int:
+        """
+        Load history from the model file.
+
+        Returns:
+            Number of fingerprints loaded
+        """
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("format_version") != self.FORMAT_VERSION:
+                logger.warning(f"Ignoring latency model with unsupported format version {data.get('format_version')}")
+                return 0
+            history = {
+                fingerprint: _FingerprintHistory.from_dict(entry)
+                for fingerprint, entry in data.get("fingerprints", {}).items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable latency model {self.path}: {e}")
+            return 0
+
+        with self._lock:
+            self._history = history
+            self._dirty = False
+        logger.info(f"Loaded latency history for {len(history)} query fingerprints from {self.path}")
+        return len(history)
+
+    def save(self, force: bool = False) -> bool:
+        """
+        Write history to the model file if it changed since the last save.
+
+        Args:
+            force: Write even if nothing changed
+
+        Returns:
+            True if the file was written
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            if not (self._dirty or force):
+                return False
+            data = {
+                "format_version": self.FORMAT_VERSION,
+                "saved_at": time.time(),
+                "fingerprints": {fingerprint: history.to_dict() for fingerprint, history in self._history.items()},
+            }
+            self._dirty = False
+
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.latency_model_', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            with self._lock:
+                self._dirty = True
+            raise
+
+        logger.debug(f"Saved latency history for {len(data['fingerprints'])} fingerprints to {self.path}")
+        return True
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get latency model statistics."""
+        with self._lock:
+            return {
+                "path": self.path,
+                "fingerprints": len(self._history),
+                "executions": sum(history.count for history in self._history.values()),
+                "predictable_fingerprints": sum(
+                    1 for history in self._history.values() if history.count >= self.min_samples
+                ),
+                "warning_threshold_ms": self.warning_threshold_ms,
+            }
@@ -8,7 +8,6 @@ and AI-powered operations using the Kimi (Moonshot) API.
 import logging
 import time
 from typing import Any, Dict, List, Optional
-import httpx
 import json
 
 from .config import LLMConfig
@@ -94,7 +93,8 @@ class LLMClient:
             
             logger.info(f"Generating text with LLM: {prompt[:100]}...")
             
-            # Make API request
+            # Make API request (httpx is imported on first use to keep server start-up fast)
+            import httpx
             async with httpx.AsyncClient(timeout=self.config.timeout) as client:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
@@ -352,6 +352,9 @@ Please explain what this data shows and provide insights."""
 # Global LLM client instance
 _llm_client: Optional[LLMClient] = None
 
+# Configuration for an LLM client created on first use
+_pending_config: Optional[tuple[LLMConfig, Optional[CacheManager]]] = None
+
 
 def initialize_llm_tools(config: LLMConfig, cache_manager: Optional[CacheManager] = None) -> None:
     """
@@ -366,11 +369,30 @@ def initialize_llm_tools(config: LLMConfig, cache_manager: Optional[CacheManager
     logger.info("LLM tools initialized")
 
 
+def configure_llm_tools(config: LLMConfig, cache_manager: Optional[CacheManager] = None) -> None:
+    """
+    Configure LLM tools without creating the client.
+    
+    The client is created by the first LLM tool call, so servers that never
+    use LLM tools do not pay for it at start-up.
+    
+    Args:
+        config: LLM configuration
+        cache_manager: Optional cache manager
+    """
+    global _llm_client, _pending_config
+    _llm_client = None
+    _pending_config = (config, cache_manager)
+    logger.info("LLM tools configured (client created on first use)")
+
+
 def _ensure_llm_initialized() -> LLMClient:
-    """Ensure LLM client is initialized."""
+    """Ensure LLM client is initialized, creating it from a pending configuration if needed."""
     global _llm_client
     if _llm_client is None:
-        raise RuntimeError("LLM tools not initialized. Call initialize_llm_tools() first.")
+        if _pending_config is None:
+            raise RuntimeError("LLM tools not initialized. Call initialize_llm_tools() first.")
+        initialize_llm_tools(*_pending_config)
     return _llm_client
 
 
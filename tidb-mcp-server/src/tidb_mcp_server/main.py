@@ -74,7 +74,12 @@ async def main_async(config=None) -> int:
             from .websocket_server import WebSocketMCPServerManager
             
             # Initialize WebSocket manager
-            websocket_manager = WebSocketMCPServerManager(app)
+            mcp_config = config.get_mcp_server_config()
+            websocket_manager = WebSocketMCPServerManager(
+                app,
+                outbound_queue_size=mcp_config.ws_outbound_queue_size,
+                slow_consumer_policy=mcp_config.ws_slow_consumer_policy
+            )
             
             # Start background tasks
             await websocket_manager.start_background_tasks()
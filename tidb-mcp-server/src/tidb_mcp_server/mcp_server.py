@@ -20,6 +20,8 @@ from fastmcp import FastMCP
 from .database import get_database_manager, DatabaseManager
 
 from .cache_manager import CacheManager
+from .cache_snapshot import CacheSnapshotManager
+from .concurrency_limiter import AdaptiveConcurrencyLimiter
 from .config import ServerConfig
 from .exceptions import (
     DatabaseConnectionError,
@@ -27,10 +29,13 @@ from .exceptions import (
     RateLimitError,
     TiDBMCPServerError,
 )
+from .latency_model import QueryLatencyModel
 from .mcp_tools import initialize_tools, register_all_tools
 from .query_executor import QueryExecutor
+from .query_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, QueryScheduler
 from .rate_limiter import RateLimiter
 from .schema_inspector import SchemaInspector
+from .storage_router import StorageRouter
 
 logger = logging.getLogger(__name__)
 
@@ -66,8 +71,11 @@ class UniversalMCPServer:
         self.mcp_server: Optional[FastMCP] = None
         self.db_manager: Optional[DatabaseManager] = None
         self.cache_manager: Optional[CacheManager] = None
+        self.cache_snapshot: Optional[CacheSnapshotManager] = None
         self.schema_inspector: Optional[SchemaInspector] = None
         self.query_executor: Optional[QueryExecutor] = None
+        self.query_scheduler: Optional[QueryScheduler] = None
+        self.latency_model: Optional[QueryLatencyModel] = None
         self.rate_limiter: Optional[RateLimiter] = None
         
         # Server state
@@ -75,9 +83,13 @@ class UniversalMCPServer:
         self._shutdown_event = asyncio.Event()
         self._health_check_task: Optional[asyncio.Task] = None
         self._metrics_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._snapshot_verify_task: Optional[asyncio.Task] = None
+        self._latency_model_task: Optional[asyncio.Task] = None
         
         # Performance metrics
         self._start_time = time.time()
+        self.startup_timings_ms: Dict[str, float] = {}
         self._request_count = 0
         self._error_count = 0
         self._last_health_check = 0
@@ -109,27 +121,27 @@ class UniversalMCPServer:
             
             # Initialize database connection with retry logic (if enabled)
             if self.config.database_tools_enabled:
-                await self._initialize_database_connection()
+                await self._timed_startup_step("database_connection", self._initialize_database_connection)
             
             # Initialize cache manager
-            await self._initialize_cache_manager()
+            await self._timed_startup_step("cache_manager", self._initialize_cache_manager)
             
             # Initialize rate limiter
-            await self._initialize_rate_limiter()
+            await self._timed_startup_step("rate_limiter", self._initialize_rate_limiter)
             
             # Initialize database components (if enabled)
             if self.config.database_tools_enabled:
-                await self._initialize_database_components()
+                await self._timed_startup_step("database_components", self._initialize_database_components)
             
             # Initialize LLM components (if enabled)  
             if self.config.llm_tools_enabled:
-                await self._initialize_llm_components()
+                await self._timed_startup_step("llm_components", self._initialize_llm_components)
             
             # Initialize MCP server
-            await self._initialize_mcp_server()
+            await self._timed_startup_step("mcp_server", self._initialize_mcp_server)
             
             # Start background tasks
-            await self._start_background_tasks()
+            await self._timed_startup_step("background_tasks", self._start_background_tasks)
             
             # Mark server as running
             self._running = True
@@ -138,6 +150,7 @@ class UniversalMCPServer:
                 "Universal MCP Server started successfully",
                 extra={
                     "startup_time_ms": (time.time() - self._start_time) * 1000,
+                    "startup_timings_ms": self.startup_timings_ms,
                     "server_status": "running",
                     "enabled_tools": self.config.enabled_tools
                 }
@@ -186,6 +199,10 @@ class UniversalMCPServer:
             # Stop background tasks
             await self._stop_background_tasks()
             
+            # Persist the schema cache for the next start (needs the database for schema versions)
+            await self._save_cache_snapshot()
+            await self._save_latency_model()
+            
             # Close database connections
             await self._cleanup_database_connections()
             
@@ -201,6 +218,21 @@ class UniversalMCPServer:
         except Exception as e:
             self.logger.error(f"Error during shutdown: {e}", exc_info=True)
     
+    async def _timed_startup_step(self, name: str, step) -> None:
+        """
+        Run one start-up step and record how long it took.
+        
+        Args:
+            name: Component name used in ``startup_timings_ms``
+            step: Coroutine function performing the initialization
+        """
+        step_start = time.perf_counter()
+        try:
+            await step()
+        finally:
+            self.startup_timings_ms[name] = round((time.perf_counter() - step_start) * 1000, 2)
+            self.logger.debug(f"Start-up step '{name}' took {self.startup_timings_ms[name]}ms")
+    
     async def _initialize_database_connection(self) -> None:
         """
         Initialize database connection with retry logic and health checking.
@@ -269,6 +301,18 @@ class UniversalMCPServer:
                 "max_size": cache_config.max_size
             }
         )
+        
+        # Warm the cache from the last snapshot; entries are verified once the database is up
+        if cache_config.enabled and cache_config.snapshot_enabled:
+            self.cache_snapshot = CacheSnapshotManager(self.cache_manager, cache_config.snapshot_path)
+            try:
+                restored = await asyncio.to_thread(self.cache_snapshot.load)
+                self.logger.info(
+                    "Cache snapshot restored",
+                    extra={"path": self.cache_snapshot.path, "entries_restored": restored}
+                )
+            except Exception as e:
+                self.logger.warning(f"Failed to restore cache snapshot: {e}")
     
     async def _initialize_rate_limiter(self) -> None:
         """Initialize rate limiter with configuration."""
@@ -290,19 +334,71 @@ class UniversalMCPServer:
         self.logger.info("Initializing database components...")
         
         security_config = self.config.get_security_config()
+        scheduler_config = self.config.get_scheduler_config()
+        latency_config = self.config.get_latency_model_config()
+        routing_config = self.config.get_routing_config()
+        
+        # Shrink the concurrent query limit while TiDB latency is high, up to the configured cap
+        limiter = None
+        if scheduler_config.adaptive_concurrency_enabled:
+            limiter = AdaptiveConcurrencyLimiter(
+                algorithm=scheduler_config.adaptive_concurrency_algorithm,
+                initial_limit=scheduler_config.max_concurrent_queries,
+                min_limit=min(scheduler_config.adaptive_min_concurrency, scheduler_config.max_concurrent_queries),
+                max_limit=scheduler_config.max_concurrent_queries,
+                latency_threshold_ms=scheduler_config.adaptive_latency_threshold_ms
+            )
+        
+        # Initialize the fair-share scheduler shared by schema and query work
+        self.query_scheduler = QueryScheduler(
+            max_concurrent=scheduler_config.max_concurrent_queries,
+            client_weights=scheduler_config.client_weights,
+            priority_weights={
+                PRIORITY_INTERACTIVE: scheduler_config.interactive_weight,
+                PRIORITY_BACKGROUND: scheduler_config.background_weight
+            },
+            limiter=limiter
+        )
         
         # Initialize schema inspector
         self.schema_inspector = SchemaInspector(
             db_manager=self.db_manager,
-            cache_manager=self.cache_manager
+            cache_manager=self.cache_manager,
+            scheduler=self.query_scheduler
         )
         
+        # Keep latency history across connection recoveries; load it from disk on first start
+        if self.latency_model is None:
+            self.latency_model = QueryLatencyModel(
+                path=latency_config.path if latency_config.enabled else None,
+                warning_threshold_ms=latency_config.warning_threshold_ms
+            )
+        
         # Initialize query executor
         self.query_executor = QueryExecutor(
             db_manager=self.db_manager,
             cache_manager=self.cache_manager,
             max_timeout=security_config.max_query_timeout,
-            max_result_rows=security_config.max_sample_rows
+            max_result_rows=security_config.max_sample_rows,
+            max_stream_rows=security_config.max_stream_rows,
+            scheduler=self.query_scheduler,
+            # Streams hold their slots while clients read, so they get a budget of their own
+            stream_scheduler=QueryScheduler(
+                max_concurrent=scheduler_config.max_concurrent_streams,
+                client_weights=scheduler_config.client_weights,
+                priority_weights={
+                    PRIORITY_INTERACTIVE: scheduler_config.interactive_weight,
+                    PRIORITY_BACKGROUND: scheduler_config.background_weight
+                }
+            ),
+            latency_model=self.latency_model,
+            storage_router=StorageRouter(
+                self.db_manager,
+                default_database=self.db_manager.default_database,
+                enabled=routing_config.tiflash_enabled,
+                min_table_rows=routing_config.tiflash_min_rows,
+                refresh_seconds=routing_config.replica_refresh_seconds
+            )
         )
         
         self.logger.info("Database components initialized successfully")
@@ -312,14 +408,14 @@ class UniversalMCPServer:
         self.logger.info("Initializing LLM components...")
         
         # Import LLM tools (lazy import to avoid circular dependencies)
-        from .llm_tools import initialize_llm_tools
+        from .llm_tools import configure_llm_tools
         
         llm_config = self.config.get_llm_config()
         
-        # Initialize LLM tools with configuration and cache manager
-        initialize_llm_tools(llm_config, self.cache_manager)
+        # Configure LLM tools; the client is created by the first LLM call
+        configure_llm_tools(llm_config, self.cache_manager)
         
-        self.logger.info("LLM components initialized successfully")
+        self.logger.info("LLM components configured successfully")
     
     async def _initialize_mcp_server(self) -> None:
         """
@@ -416,13 +512,29 @@ class UniversalMCPServer:
         # Start metrics logging task
         self._metrics_task = asyncio.create_task(self._metrics_loop())
         
+        # Start cache snapshot tasks
+        if self.cache_snapshot:
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+            if self.schema_inspector and self.cache_snapshot.loaded_schema_versions:
+                self._snapshot_verify_task = asyncio.create_task(self._verify_cache_snapshot())
+        
+        # Start latency model persistence task
+        if self.latency_model and self.latency_model.path:
+            self._latency_model_task = asyncio.create_task(self._latency_model_loop())
+        
         self.logger.info("Background tasks started successfully")
     
     async def _stop_background_tasks(self) -> None:
         """Stop all background tasks."""
         self.logger.info("Stopping background tasks...")
         
-        tasks = [self._health_check_task, self._metrics_task]
+        tasks = [
+            self._health_check_task,
+            self._metrics_task,
+            self._snapshot_task,
+            self._snapshot_verify_task,
+            self._latency_model_task
+        ]
         
         for task in tasks:
             if task and not task.done():
@@ -473,6 +585,59 @@ class UniversalMCPServer:
                 self.logger.error(f"Metrics logging error: {e}", exc_info=True)
                 await asyncio.sleep(300)
     
+    async def _snapshot_loop(self) -> None:
+        """Background task for periodic cache snapshots."""
+        interval = self.config.get_cache_config().snapshot_interval_seconds
+        while not self._shutdown_event.is_set():
+            try:
+                await asyncio.sleep(interval)
+                await self._save_cache_snapshot()
+            except asyncio.CancelledError:
+                break
+    
+    async def _save_cache_snapshot(self) -> None:
+        """Write the schema cache snapshot without blocking the event loop."""
+        if not self.cache_snapshot or not self.cache_manager:
+            return
+        
+        try:
+            await asyncio.to_thread(self.cache_snapshot.save, self.schema_inspector)
+        except Exception as e:
+            self.logger.error(f"Failed to save cache snapshot: {e}")
+    
+    async def _latency_model_loop(self) -> None:
+        """Background task for periodic latency history saves."""
+        interval = self.config.get_latency_model_config().save_interval_seconds
+        while not self._shutdown_event.is_set():
+            try:
+                await asyncio.sleep(interval)
+                await self._save_latency_model()
+            except asyncio.CancelledError:
+                break
+    
+    async def _save_latency_model(self) -> None:
+        """Write the query latency history without blocking the event loop."""
+        if not self.latency_model:
+            return
+        
+        try:
+            await asyncio.to_thread(self.latency_model.save)
+        except Exception as e:
+            self.logger.error(f"Failed to save latency model: {e}")
+    
+    async def _verify_cache_snapshot(self) -> None:
+        """Invalidate restored cache entries whose database schema has changed."""
+        try:
+            invalidated = await asyncio.to_thread(self.cache_snapshot.verify, self.schema_inspector)
+            self.logger.info(
+                "Cache snapshot verified",
+                extra={"databases_invalidated": invalidated}
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Cache snapshot verification failed: {e}")
+    
     async def _log_metrics(self) -> None:
         """Log performance metrics."""
         try:
@@ -494,6 +659,7 @@ class UniversalMCPServer:
                     "requests_per_second": self._request_count / max(uptime_seconds, 1),
                     "cache_stats": cache_stats,
                     "rate_limiter_stats": rate_limiter_stats,
+                    "concurrency_limit": self.query_scheduler.concurrency_limit if self.query_scheduler else None,
                     "last_health_check": self._last_health_check
                 }
             )
@@ -9,7 +9,7 @@ parameter validation and error handling.
 import logging
 import time
 import threading
-from typing import Any, Dict, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Tuple
 
 from fastmcp import FastMCP
 
@@ -20,18 +20,12 @@ from .exceptions import (
     QueryValidationError,
     TiDBMCPServerError,
 )
-from .query_executor import QueryExecutor
+from .query_executor import QueryExecutor, QueryStream
 from .schema_inspector import SchemaInspector
-from .schema_intelligence import (
-    SchemaIntelligenceEngine, 
-    get_schema_intelligence,
-    initialize_schema_intelligence,
-    discover_business_mappings_impl,
-    analyze_query_intent_impl, 
-    suggest_schema_optimizations_impl,
-    get_schema_intelligence_stats_impl,
-    learn_from_successful_mapping_impl
-)
+
+if TYPE_CHECKING:
+    # Loaded on first use by _ensure_schema_intelligence to keep server start-up fast
+    from .schema_intelligence import SchemaIntelligenceEngine
 
 logger = logging.getLogger(__name__)
 
@@ -40,12 +34,14 @@ _schema_inspector: SchemaInspector | None = None
 _query_executor: QueryExecutor | None = None
 _cache_manager: CacheManager | None = None
 _mcp_server: FastMCP | None = None
-_schema_intelligence: SchemaIntelligenceEngine | None = None
+_schema_intelligence: "SchemaIntelligenceEngine | None" = None
+_schema_intelligence_lock = threading.Lock()
 
 # Request deduplication cache to prevent redundant calls within short time windows
 _request_dedup_cache: Dict[str, Tuple[Any, float]] = {}
 _request_dedup_lock = threading.RLock()
 _DEDUP_WINDOW_SECONDS = 5  # Cache identical requests for 5 seconds
+_MAX_BATCH_TABLES = 100  # Tables accepted by one multi-table schema or sample request
 _dedup_stats = {
     'hits': 0,
     'misses': 0,
@@ -74,20 +70,67 @@ def initialize_tools(schema_inspector: SchemaInspector,
     _cache_manager = cache_manager
     _mcp_server = mcp_server
     
-    # Initialize schema intelligence engine
-    _schema_intelligence = initialize_schema_intelligence(
-        schema_inspector=schema_inspector,
-        query_executor=query_executor,
-        cache_manager=cache_manager
-    )
+    # The schema intelligence engine is created on first use with these dependencies
+    _schema_intelligence = None
     
-    # Initialize LLM tools if enabled
+    # Configure LLM tools if enabled; the client is created on the first LLM call
     if config.llm_tools_enabled:
-        from .llm_tools import initialize_llm_tools
-        llm_config = config.get_llm_config()
-        initialize_llm_tools(llm_config, cache_manager)
+        from .llm_tools import configure_llm_tools
+        configure_llm_tools(config.get_llm_config(), cache_manager)
+    
+    logger.info(f"MCP tools initialized (database: {config.database_tools_enabled}, llm: {config.llm_tools_enabled}, schema_intelligence: lazy)")
+
+
+def _ensure_schema_intelligence() -> "SchemaIntelligenceEngine":
+    """
+    Load the schema intelligence module and create its engine on first use.
+    
+    Returns:
+        The shared SchemaIntelligenceEngine
+        
+    Raises:
+        TiDBMCPServerError: If the engine cannot be created
+    """
+    global _schema_intelligence
+    
+    if _schema_intelligence is not None:
+        return _schema_intelligence
+    
+    with _schema_intelligence_lock:
+        if _schema_intelligence is None:
+            try:
+                start_time = time.perf_counter()
+                from .schema_intelligence import initialize_schema_intelligence
+                _schema_intelligence = initialize_schema_intelligence(
+                    schema_inspector=_schema_inspector,
+                    query_executor=_query_executor,
+                    cache_manager=_cache_manager
+                )
+                logger.info(f"Schema intelligence engine initialized on first use in "
+                           f"{(time.perf_counter() - start_time) * 1000:.1f}ms")
+            except Exception as e:
+                logger.error(f"Failed to initialize schema intelligence engine: {e}")
+                raise TiDBMCPServerError(f"Schema intelligence engine not initialized: {str(e)}")
+    
+    return _schema_intelligence
+
+
+def _lazy_schema_intelligence_impl(name: str):
+    """Build a forwarder to a schema_intelligence ``*_impl`` coroutine that loads the engine on first call."""
+    async def forward(*args, **kwargs):
+        _ensure_schema_intelligence()
+        from . import schema_intelligence
+        return await getattr(schema_intelligence, name)(*args, **kwargs)
     
-    logger.info(f"MCP tools initialized (database: {config.database_tools_enabled}, llm: {config.llm_tools_enabled}, schema_intelligence: True)")
+    forward.__name__ = forward.__qualname__ = name
+    return forward
+
+
+discover_business_mappings_impl = _lazy_schema_intelligence_impl("discover_business_mappings_impl")
+analyze_query_intent_impl = _lazy_schema_intelligence_impl("analyze_query_intent_impl")
+suggest_schema_optimizations_impl = _lazy_schema_intelligence_impl("suggest_schema_optimizations_impl")
+get_schema_intelligence_stats_impl = _lazy_schema_intelligence_impl("get_schema_intelligence_stats_impl")
+learn_from_successful_mapping_impl = _lazy_schema_intelligence_impl("learn_from_successful_mapping_impl")
 
 
 def _get_deduped_result(key: str, func, *args, **kwargs):
@@ -168,16 +211,12 @@ def _ensure_initialized() -> None:
             security_config = config.get_security_config()
             
             _query_executor = QueryExecutor(max_timeout=security_config.max_query_timeout)
-            _schema_inspector = SchemaInspector()
+            _schema_inspector = SchemaInspector(scheduler=_query_executor.scheduler)
             _cache_manager = CacheManager()
             _mcp_server = None  # Will be set when properly initialized
             
-            # Initialize schema intelligence
-            _schema_intelligence = initialize_schema_intelligence(
-                schema_inspector=_schema_inspector,
-                query_executor=_query_executor,
-                cache_manager=_cache_manager
-            )
+            # Schema intelligence is created on first use
+            _schema_intelligence = None
             
             logger.info("MCP tools auto-initialized successfully")
             
@@ -306,39 +345,7 @@ def get_table_schema(database: str, table: str) -> dict[str, Any]:
 
     try:
         schema = _get_deduped_result(dedup_key, _get_schema)
-
-        # Convert to MCP-compatible format
-        result = {
-            "database": schema.database,
-            "table": schema.table,
-            "columns": [],
-            "indexes": [],
-            "primary_keys": schema.primary_keys,
-            "foreign_keys": schema.foreign_keys
-        }
-
-        # Convert columns
-        for column in schema.columns:
-            column_info = {
-                "name": column.name,
-                "data_type": column.data_type,
-                "is_nullable": column.is_nullable,
-                "default_value": column.default_value,
-                "is_primary_key": column.is_primary_key,
-                "is_foreign_key": column.is_foreign_key,
-                "comment": column.comment
-            }
-            result["columns"].append(column_info)
-
-        # Convert indexes
-        for index in schema.indexes:
-            index_info = {
-                "name": index.name,
-                "columns": index.columns,
-                "is_unique": index.is_unique,
-                "index_type": index.index_type
-            }
-            result["indexes"].append(index_info)
+        result = _format_table_schema(schema)
 
         logger.debug(f"Retrieved schema for table '{database}.{table}' with "
                    f"{len(result['columns'])} columns, {len(result['indexes'])} indexes")
@@ -349,6 +356,103 @@ def get_table_schema(database: str, table: str) -> dict[str, Any]:
         raise TiDBMCPServerError(f"Failed to get schema for table '{database}.{table}': {str(e)}")
 
 
+def _format_table_schema(schema) -> dict[str, Any]:
+    """Convert a TableSchema to the MCP-compatible response format."""
+    result = {
+        "database": schema.database,
+        "table": schema.table,
+        "columns": [],
+        "indexes": [],
+        "primary_keys": schema.primary_keys,
+        "foreign_keys": schema.foreign_keys
+    }
+
+    # Convert columns
+    for column in schema.columns:
+        column_info = {
+            "name": column.name,
+            "data_type": column.data_type,
+            "is_nullable": column.is_nullable,
+            "default_value": column.default_value,
+            "is_primary_key": column.is_primary_key,
+            "is_foreign_key": column.is_foreign_key,
+            "comment": column.comment
+        }
+        result["columns"].append(column_info)
+
+    # Convert indexes
+    for index in schema.indexes:
+        index_info = {
+            "name": index.name,
+            "columns": index.columns,
+            "is_unique": index.is_unique,
+            "index_type": index.index_type
+        }
+        result["indexes"].append(index_info)
+
+    return result
+
+
+def _validate_table_list(tables: list[str]) -> list[str]:
+    """Validate a multi-table request and return its table names without duplicates."""
+    if not isinstance(tables, list) or not tables:
+        raise ValueError("Tables must be a non-empty list of table names")
+
+    if any(not isinstance(table, str) or not table.strip() for table in tables):
+        raise ValueError("Table names must be non-empty strings")
+
+    unique_tables = list(dict.fromkeys(tables))
+    if len(unique_tables) > _MAX_BATCH_TABLES:
+        raise ValueError(f"At most {_MAX_BATCH_TABLES} tables can be requested at once, got {len(unique_tables)}")
+
+    return unique_tables
+
+
+def get_table_schemas(database: str, tables: list[str]) -> dict[str, Any]:
+    """
+    Get detailed schema information for several tables in one request.
+    
+    Reads all uncached tables with bulk INFORMATION_SCHEMA queries instead of
+    one round trip per table. Tables that do not exist are reported in
+    ``errors`` without failing the others.
+    
+    Args:
+        database: Name of the database
+        tables: Names of the tables (at most 100)
+        
+    Returns:
+        Dictionary with ``tables`` mapping each table to its schema in the
+        get_table_schema format and ``errors`` mapping failed tables to messages
+        
+    Raises:
+        Exception: If the parameters are invalid or the metadata queries fail
+    """
+    _ensure_initialized()
+
+    if not database or not database.strip():
+        raise ValueError("Database name is required and cannot be empty")
+
+    tables = _validate_table_list(tables)
+
+    try:
+        logger.debug(f"Getting schemas for {len(tables)} tables in '{database}' via MCP tool")
+        schemas, errors = _schema_inspector.get_table_schemas(database, tables)
+
+        result = {
+            "database": database,
+            "tables": {table: _format_table_schema(schema) for table, schema in schemas.items()},
+            "errors": errors,
+            "success": not errors
+        }
+
+        logger.debug(f"Retrieved schemas for {len(schemas)}/{len(tables)} tables in '{database}'")
+        return result
+
+    except Exception as e:
+        logger.error(f"Schema retrieval failed for {len(tables)} tables in '{database}': {e}")
+        raise TiDBMCPServerError(f"Failed to get schemas for tables in '{database}': {str(e)}")
+
+
 def get_sample_data(database: str, table: str, limit: int = 10,
                    masked_columns: list[str] | None = None) -> dict[str, Any]:
     """
@@ -397,22 +501,7 @@ def get_sample_data(database: str, table: str, limit: int = 10,
             masked_columns=masked_columns
         )
 
-        # Convert to MCP-compatible format
-        result = {
-            "database": sample_result.database,
-            "table": sample_result.table,
-            "columns": sample_result.columns,
-            "rows": sample_result.rows,
-            "row_count": sample_result.row_count,
-            "total_table_rows": sample_result.total_table_rows,
-            "execution_time_ms": sample_result.execution_time_ms,
-            "sampling_method": sample_result.sampling_method,
-            "masked_columns": sample_result.masked_columns,
-            "success": sample_result.is_successful()
-        }
-
-        if sample_result.error:
-            result["error"] = sample_result.error
+        result = _format_sample_result(sample_result)
 
         logger.info(f"Retrieved {sample_result.row_count} sample rows for table '{database}.{table}' "
                    f"in {sample_result.get_formatted_execution_time()}")
@@ -423,7 +512,101 @@ def get_sample_data(database: str, table: str, limit: int = 10,
         raise TiDBMCPServerError(f"Failed to get sample data for table '{database}.{table}': {str(e)}")
 
 
-def execute_query(query: str, timeout: int | None = None, use_cache: bool = True) -> dict[str, Any]:
+def _format_sample_result(sample_result) -> dict[str, Any]:
+    """Convert a SampleDataResult to the MCP-compatible response format."""
+    result = {
+        "database": sample_result.database,
+        "table": sample_result.table,
+        "columns": sample_result.columns,
+        "rows": sample_result.rows,
+        "row_count": sample_result.row_count,
+        "total_table_rows": sample_result.total_table_rows,
+        "execution_time_ms": sample_result.execution_time_ms,
+        "sampling_method": sample_result.sampling_method,
+        "masked_columns": sample_result.masked_columns,
+        "success": sample_result.is_successful()
+    }
+
+    if sample_result.error:
+        result["error"] = sample_result.error
+
+    return result
+
+
+def get_sample_data_batch(database: str, tables: list[str], limit: int = 10,
+                          masked_columns: list[str] | None = None) -> dict[str, Any]:
+    """
+    Get sample data from several tables in one request.
+    
+    Row counts and column lists are read in bulk; each table is then sampled
+    as by get_sample_data. Tables that fail are reported in ``errors``
+    without failing the others.
+    
+    Args:
+        database: Name of the database
+        tables: Names of the tables (at most 100)
+        limit: Number of sample rows per table (1-100, default 10)
+        masked_columns: Optional list of column names to mask in every table
+        
+    Returns:
+        Dictionary with ``tables`` mapping each table to its sample in the
+        get_sample_data format and ``errors`` mapping failed tables to messages
+        
+    Raises:
+        Exception: If the parameters are invalid
+    """
+    _ensure_initialized()
+
+    if not database or not database.strip():
+        raise ValueError("Database name is required and cannot be empty")
+
+    tables = _validate_table_list(tables)
+
+    if not isinstance(limit, int) or not 1 <= limit <= 100:
+        raise ValueError("Limit must be an integer between 1 and 100")
+
+    if masked_columns is None:
+        masked_columns = []
+
+    if not isinstance(masked_columns, list):
+        raise ValueError("Masked columns must be a list of column names")
+
+    try:
+        logger.info(f"Getting sample data for {len(tables)} tables in '{database}' "
+                   f"(limit={limit}, masked_columns={masked_columns}) via MCP tool")
+
+        samples = _schema_inspector.get_sample_data_batch(
+            database=database,
+            tables=tables,
+            limit=limit,
+            masked_columns=masked_columns
+        )
+
+        result = {
+            "database": database,
+            "tables": {},
+            "errors": {},
+            "success": True
+        }
+        for table, sample_result in samples.items():
+            if sample_result.error:
+                result["errors"][table] = sample_result.error
+            else:
+                result["tables"][table] = _format_sample_result(sample_result)
+        result["success"] = not result["errors"]
+
+        logger.info(f"Retrieved sample data for {len(result['tables'])}/{len(tables)} tables in '{database}'")
+        return result
+
+    except Exception as e:
+        logger.error(f"Sample data retrieval failed for {len(tables)} tables in '{database}': {e}")
+        raise TiDBMCPServerError(f"Failed to get sample data for tables in '{database}': {str(e)}")
+
+
+def execute_query(query: str, timeout: int | None = None, use_cache: bool = True,
+                  client_id: str | None = None, priority: str = "interactive",
+                  approximate: bool = False, sample_fraction: float | None = None,
+                  params: list[Any] | None = None) -> dict[str, Any]:
     """
     Execute a read-only SQL query against the database.
     
@@ -434,6 +617,12 @@ def execute_query(query: str, timeout: int | None = None, use_cache: bool = True
         query: SQL SELECT query to execute
         timeout: Query timeout in seconds (uses server default if None)
         use_cache: Whether to use caching for query results
+        client_id: Identifier of the calling client for fair-share scheduling
+        priority: Scheduling priority class ("interactive" or "background")
+        approximate: Allow approximate aggregates (APPROX_COUNT_DISTINCT, APPROX_PERCENTILE)
+        sample_fraction: Optional fraction of rows to sample for single-table aggregates
+        params: Values for ``?`` placeholders in the query, run as a cached prepared statement.
+            Each is a JSON scalar or ``{"type": "date", "value": "2024-01-31"}``
         
     Returns:
         Dictionary with query results and execution metadata
@@ -452,14 +641,33 @@ def execute_query(query: str, timeout: int | None = None, use_cache: bool = True
     if not isinstance(use_cache, bool):
         raise ValueError("use_cache must be a boolean")
 
+    if priority not in ("interactive", "background"):
+        raise ValueError("Priority must be 'interactive' or 'background'")
+
+    if not isinstance(approximate, bool):
+        raise ValueError("approximate must be a boolean")
+
+    if sample_fraction is not None and (not isinstance(sample_fraction, (int, float))
+                                        or not 0.0 < sample_fraction <= 1.0):
+        raise ValueError("sample_fraction must be a number greater than 0 and at most 1")
+
+    if params is not None and not isinstance(params, list):
+        raise ValueError("params must be a list")
+
     try:
-        logger.info(f"Executing query via MCP tool (timeout={timeout}, use_cache={use_cache}): "
-                   f"{query}")
+        logger.info(f"Executing query via MCP tool (timeout={timeout}, use_cache={use_cache}, "
+                   f"client_id={client_id}, priority={priority}, "
+                   f"params={len(params) if params is not None else None}): {query}")
 
         query_result = _query_executor.execute_query(
             query=query,
             timeout=timeout,
-            use_cache=use_cache
+            use_cache=use_cache,
+            client_id=client_id,
+            priority=priority,
+            approximate=approximate,
+            sample_fraction=sample_fraction,
+            params=params
         )
 
         # Convert to MCP-compatible format
@@ -475,6 +683,9 @@ def execute_query(query: str, timeout: int | None = None, use_cache: bool = True
         if query_result.error:
             result["error"] = query_result.error
 
+        if query_result.metadata:
+            result["metadata"] = query_result.metadata
+
         logger.info(f"Query executed successfully: {query_result.row_count} rows in "
                    f"{query_result.get_formatted_execution_time()}")
         return result
@@ -497,6 +708,54 @@ def execute_query(query: str, timeout: int | None = None, use_cache: bool = True
         raise TiDBMCPServerError(f"Query execution failed: {str(e)}")
 
 
+def stream_query(query: str, timeout: int | None = None, client_id: str | None = None,
+                 priority: str = "interactive", batch_size: int = 500,
+                 max_rows: int | None = None) -> QueryStream:
+    """
+    Execute a read-only SQL query and iterate over its results as they arrive.
+    
+    Used by the HTTP API's NDJSON streaming endpoint; streamed results are not
+    cached. Events are a ``columns`` event, one ``row`` event per row and a final
+    ``end`` event with the row count and whether the row limit was reached.
+    
+    Args:
+        query: SQL SELECT query to execute
+        timeout: Maximum seconds the stream may run (uses server default if None)
+        client_id: Identifier of the calling client for fair-share scheduling
+        priority: Scheduling priority class ("interactive" or "background")
+        batch_size: Rows fetched from the database per round trip
+        max_rows: Maximum rows to stream (capped by the server limit)
+        
+    Returns:
+        Stream of result events; close it to release its database slot early
+        
+    Raises:
+        Exception: If parameters are invalid
+    """
+    _ensure_initialized()
+
+    if not query or not query.strip():
+        raise ValueError("Query is required and cannot be empty")
+
+    if timeout is not None and (not isinstance(timeout, int) or timeout <= 0):
+        raise ValueError("Timeout must be a positive integer")
+
+    if priority not in ("interactive", "background"):
+        raise ValueError("Priority must be 'interactive' or 'background'")
+
+    if not isinstance(batch_size, int) or not 1 <= batch_size <= 10000:
+        raise ValueError("batch_size must be an integer between 1 and 10000")
+
+    if max_rows is not None and (not isinstance(max_rows, int) or max_rows <= 0):
+        raise ValueError("max_rows must be a positive integer")
+
+    logger.info(f"Streaming query via HTTP API: {query[:100]}...")
+    return _query_executor.stream_query(
+        query, timeout=timeout, client_id=client_id, priority=priority,
+        batch_size=batch_size, max_rows=max_rows
+    )
+
+
 def validate_query(query: str) -> dict[str, Any]:
     """
     Validate a SQL query without executing it.
@@ -531,6 +790,43 @@ def validate_query(query: str) -> dict[str, Any]:
         raise TiDBMCPServerError(f"Query validation failed: {str(e)}")
 
 
+def predict_query_latency(query: str) -> dict[str, Any]:
+    """
+    Predict a SQL query's execution time from past executions without running it.
+    
+    Predictions come from the history of the query's fingerprint (the query with
+    literals normalized), so they are available once similar queries have run.
+    
+    Args:
+        query: SQL query to predict
+        
+    Returns:
+        Dictionary with the fingerprint, the prediction (None without enough history),
+        and the suggested timeout and cache TTL in seconds
+        
+    Raises:
+        Exception: If prediction fails
+    """
+    _ensure_initialized()
+
+    if not query or not query.strip():
+        raise ValueError("Query is required and cannot be empty")
+
+    try:
+        logger.info(f"Predicting query latency via MCP tool: {query[:100]}...")
+        return _query_executor.predict_latency(query)
+
+    except QueryValidationError as e:
+        return {
+            "prediction": None,
+            "error": str(e),
+            "error_type": type(e).__name__
+        }
+    except Exception as e:
+        logger.error(f"Query latency prediction failed: {e}")
+        raise TiDBMCPServerError(f"Query latency prediction failed: {str(e)}")
+
+
 def get_server_stats() -> dict[str, Any]:
     """
     Get server statistics and performance metrics.
@@ -664,8 +960,7 @@ def discover_business_mappings(
     """
     _ensure_initialized()
     
-    if not _schema_intelligence:
-        raise TiDBMCPServerError("Schema intelligence engine not initialized")
+    _ensure_schema_intelligence()
     
     if confidence_threshold < 0.0 or confidence_threshold > 1.0:
         raise ValueError("Confidence threshold must be between 0.0 and 1.0")
@@ -738,8 +1033,7 @@ def analyze_query_intent(
     """
     _ensure_initialized()
     
-    if not _schema_intelligence:
-        raise TiDBMCPServerError("Schema intelligence engine not initialized")
+    _ensure_schema_intelligence()
     
     if not natural_language_query or not natural_language_query.strip():
         raise ValueError("Natural language query is required and cannot be empty")
@@ -803,8 +1097,7 @@ def suggest_schema_optimizations(
     """
     _ensure_initialized()
     
-    if not _schema_intelligence:
-        raise TiDBMCPServerError("Schema intelligence engine not initialized")
+    _ensure_schema_intelligence()
     
     if performance_threshold < 0.0 or performance_threshold > 1.0:
         raise ValueError("Performance threshold must be between 0.0 and 1.0")
@@ -870,8 +1163,7 @@ def get_schema_intelligence_stats() -> dict[str, Any]:
     """
     _ensure_initialized()
     
-    if not _schema_intelligence:
-        raise TiDBMCPServerError("Schema intelligence engine not initialized")
+    _ensure_schema_intelligence()
     
     try:
         logger.debug("Getting schema intelligence statistics")
@@ -924,8 +1216,7 @@ def learn_from_successful_mapping(
     """
     _ensure_initialized()
     
-    if not _schema_intelligence:
-        raise TiDBMCPServerError("Schema intelligence engine not initialized")
+    _ensure_schema_intelligence()
     
     if not business_term or not business_term.strip():
         raise ValueError("Business term is required and cannot be empty")
@@ -1105,15 +1396,38 @@ def register_all_tools() -> None:
         return _with_error_handling_and_rate_limiting(get_sample_data, "get_sample_data")(database, table, limit, masked_columns)
 
     @_mcp_server.tool()
-    def execute_query_tool(query: str, timeout: int | None = None, use_cache: bool = True) -> dict[str, Any]:
-        """Execute a read-only SQL query against the database."""
-        return _with_error_handling_and_rate_limiting(execute_query, "execute_query")(query, timeout, use_cache)
+    def get_table_schemas_tool(database: str, tables: list[str]) -> dict[str, Any]:
+        """Get detailed schema information for several tables in one request."""
+        return _with_error_handling_and_rate_limiting(get_table_schemas, "get_table_schemas")(database, tables)
+
+    @_mcp_server.tool()
+    def get_sample_data_batch_tool(database: str, tables: list[str], limit: int = 10,
+                                   masked_columns: list[str] | None = None) -> dict[str, Any]:
+        """Get sample data from several tables in one request."""
+        return _with_error_handling_and_rate_limiting(get_sample_data_batch, "get_sample_data_batch")(
+            database, tables, limit, masked_columns
+        )
+
+    @_mcp_server.tool()
+    def execute_query_tool(query: str, timeout: int | None = None, use_cache: bool = True,
+                           client_id: str | None = None, priority: str = "interactive",
+                           approximate: bool = False, sample_fraction: float | None = None,
+                           params: list[Any] | None = None) -> dict[str, Any]:
+        """Execute a read-only SQL query against the database, optionally with ``?`` placeholder params."""
+        return _with_error_handling_and_rate_limiting(execute_query, "execute_query")(
+            query, timeout, use_cache, client_id, priority, approximate, sample_fraction, params
+        )
 
     @_mcp_server.tool()
     def validate_query_tool(query: str) -> dict[str, Any]:
         """Validate a SQL query without executing it."""
         return _with_error_handling_and_rate_limiting(validate_query, "validate_query")(query)
 
+    @_mcp_server.tool()
+    def predict_query_latency_tool(query: str) -> dict[str, Any]:
+        """Predict a SQL query's execution time from past executions without running it."""
+        return _with_error_handling_and_rate_limiting(predict_query_latency, "predict_query_latency")(query)
+
     @_mcp_server.tool()
     def get_server_stats_tool() -> dict[str, Any]:
         """Get server statistics and performance metrics."""
@@ -1280,7 +1594,9 @@ MCP_TOOLS = [
     discover_databases,
     discover_tables,
     get_table_schema,
+    get_table_schemas,
     get_sample_data,
+    get_sample_data_batch,
     execute_query,
     validate_query,
     get_server_stats,
@@ -136,6 +136,7 @@ class QueryResult:
     execution_time_ms: float
     truncated: bool = False
     error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None  # Per-phase timings and result volume
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for MCP response formatting."""
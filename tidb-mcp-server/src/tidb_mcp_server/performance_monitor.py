@@ -2,7 +2,6 @@
 
 import time
 import threading
-import psutil
 import os
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, field
@@ -103,6 +102,8 @@ class PerformanceMonitor:
         # Monitoring state
         self._monitoring_active = False
         self._monitoring_thread: Optional[threading.Thread] = None
+        # psutil is imported here rather than at module level so importing this module stays cheap
+        import psutil
         self._process = psutil.Process(os.getpid())
         
         logger.info(f"PerformanceMonitor initialized with max_history_size={max_history_size}")
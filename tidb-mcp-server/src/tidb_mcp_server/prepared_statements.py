@@ -0,0 +1,185 @@
+"""
+Parameterized query support for TiDB MCP Server.
+
+Agents that inline literal values into SQL produce a different statement for
+every value, which defeats TiDB's prepared plan cache and fragments the result
+cache. This module lets them send a template with ``?`` placeholders plus a
+list of typed parameters instead. Parameters are validated and converted to
+Python values here; the statements themselves are prepared server-side once
+per pooled connection and tracked by :class:`PreparedStatementCache`.
+
+A parameter is either a JSON scalar (string, number, boolean or null) or an
+object ``{"type": ..., "value": ...}`` with one of the types in
+:data:`PARAMETER_TYPES`.
+"""
+
+import datetime
+import decimal
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any
+
+from .exceptions import QueryValidationError
+
+# Upper bound on placeholders in one template
+MAX_PARAMETERS = 256
+
+PARAMETER_TYPES = ("string", "int", "float", "decimal", "bool", "date", "datetime", "time", "null")
+
+
+def count_placeholders(template: str) -> int:
+    """
+    Count ``?`` placeholders outside string literals and quoted identifiers.
+
+    Args:
+        template: SQL template
+
+    Returns:
+        Number of placeholders
+    """
+    count = 0
+    quote = None
+    i = 0
+    while i < len(template):
+        char = template[i]
+        if quote:
+            if char == '\\' and quote != '`':
+                i += 1  # Skip the escaped character
+            elif char == quote:
+                # A doubled quote is an escaped quote inside the literal
+                if i + 1 < len(template) and template[i + 1] == quote:
+                    i += 1
+                else:
+                    quote = None
+        elif char in ("'", '"', '`'):
+            quote = char
+        elif char == '?':
+            count += 1
+        i += 1
+    return count
+
+
+def _coerce_typed(param_type: str, value: Any) -> Any:
+    """Convert a ``{"type", "value"}`` parameter to the Python value bound for it."""
+    if value is None or param_type == "null":
+        return None
+    try:
+        if param_type == "string":
+            return str(value)
+        if param_type == "int":
+            if isinstance(value, float) and not value.is_integer():
+                raise ValueError("not an integer")
+            return int(value)
+        if param_type == "float":
+            return float(value)
+        if param_type == "decimal":
+            return decimal.Decimal(str(value))
+        if param_type == "bool":
+            if isinstance(value, str):
+                if value.lower() not in ("true", "false", "1", "0"):
+                    raise ValueError("not a boolean")
+                return value.lower() in ("true", "1")
+            return bool(value)
+        if param_type == "date":
+            return datetime.date.fromisoformat(str(value))
+        if param_type == "datetime":
+            return datetime.datetime.fromisoformat(str(value))
+        if param_type == "time":
+            return datetime.time.fromisoformat(str(value))
+    except (TypeError, ValueError, decimal.InvalidOperation) as e:
+        raise QueryValidationError(f"Invalid {param_type} parameter {value!r}: {e}")
+    raise QueryValidationError(f"Unknown parameter type '{param_type}'. Must be one of: {list(PARAMETER_TYPES)}")
+
+
+def coerce_parameters(params: list[Any]) -> tuple:
+    """
+    Validate query parameters and convert them to the values bound to placeholders.
+
+    Args:
+        params: JSON scalars or ``{"type": ..., "value": ...}`` objects
+
+    Returns:
+        Tuple of Python values in placeholder order
+
+    Raises:
+        QueryValidationError: If a parameter is malformed or cannot be converted
+    """
+    if not isinstance(params, (list, tuple)):
+        raise QueryValidationError("Query parameters must be a list")
+    if len(params) > MAX_PARAMETERS:
+        raise QueryValidationError(f"At most {MAX_PARAMETERS} query parameters are allowed, got {len(params)}")
+
+    values = []
+    for position, param in enumerate(params):
+        if isinstance(param, dict):
+            if 'type' not in param:
+                raise QueryValidationError(f"Parameter {position} must have a 'type' and a 'value'")
+            values.append(_coerce_typed(str(param['type']).lower(), param.get('value')))
+        elif param is None or isinstance(param, (str, int, float, bool)):
+            values.append(param)
+        else:
+            raise QueryValidationError(f"Parameter {position} has unsupported type {type(param).__name__}")
+    return tuple(values)
+
+
+def parameters_digest(values: tuple) -> str:
+    """
+    Stable digest of bound parameter values for result cache keys.
+
+    Values of different types that render alike (``1`` and ``"1"``) get
+    different digests.
+    """
+    encoded = json.dumps(
+        [[type(value).__name__, value.isoformat() if hasattr(value, 'isoformat') else value] for value in values],
+        default=str, separators=(',', ':')
+    )
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+class PreparedStatementCache:
+    """
+    Server-side prepared statements of one connection, least recently used first.
+
+    Statements are keyed by (selected schema, template) because unqualified
+    table names are resolved in the schema that was current at PREPARE time.
+    """
+
+    def __init__(self, max_size: int = 100):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Statements kept prepared on the connection before the least recently used is deallocated
+        """
+        self.max_size = max_size
+        self._statements: OrderedDict[tuple[str | None, str], str] = OrderedDict()
+        self._next_id = 0
+
+    def get(self, key: tuple[str | None, str]) -> str | None:
+        """Get the statement name prepared for a key, marking it recently used."""
+        name = self._statements.get(key)
+        if name is not None:
+            self._statements.move_to_end(key)
+        return name
+
+    def reserve(self) -> tuple[str, str | None]:
+        """
+        Pick a name for a new statement and the statement to deallocate to make room.
+
+        Returns:
+            Tuple of (new statement name, name of the evicted statement or None)
+        """
+        name = f"mcp_stmt_{self._next_id}"
+        self._next_id += 1
+        evicted = None
+        if len(self._statements) >= self.max_size:
+            _, evicted = self._statements.popitem(last=False)
+        return name, evicted
+
+    def add(self, key: tuple[str | None, str], name: str) -> None:
+        """Record a statement that was prepared successfully."""
+        self._statements[key] = name
+
+    def __len__(self) -> int:
+        return len(self._statements)
@@ -6,20 +6,125 @@ and result size limiting. Only SELECT statements are allowed for security.
 """
 
 import hashlib
+import json
 import logging
 import re
+import threading
 import time
+from dataclasses import replace
+from collections.abc import Iterator
 from typing import Any
 
 # Import local database manager
 from .database import DatabaseManager
 
+from .approximate_query import estimate_sampling_error, plan_approximate_query
 from .cache_manager import CacheKeyGenerator, CacheManager
 from .exceptions import QueryExecutionError, QueryTimeoutError, QueryValidationError
+from .latency_model import QueryLatencyModel
 from .models import QueryResult
+from .prepared_statements import coerce_parameters, count_placeholders, parameters_digest
+from .query_scheduler import PRIORITY_INTERACTIVE, QueryScheduler
+from .storage_router import StorageRouter
+from . import tracing
+from .workload_recorder import WorkloadRecorder
 
 logger = logging.getLogger(__name__)
 
+_SELECT_KEYWORD = re.compile(r"^(\s*(?:USE\s+[^;]+;\s*)?SELECT)\b", re.IGNORECASE)
+_HINT_BLOCK = re.compile(r"^\s*/\*\+", re.IGNORECASE)
+
+
+def add_execution_deadline(query: str, timeout: float) -> str:
+    """
+    Bound a SELECT's execution time on the server with a ``MAX_EXECUTION_TIME`` hint.
+
+    The hint is merged into an existing optimizer hint block (such as the
+    storage router's) since only the first block after SELECT is honoured.
+    Other statement types are returned unchanged.
+    """
+    select_match = _SELECT_KEYWORD.match(query)
+    if not select_match:
+        return query
+    hint = f"MAX_EXECUTION_TIME({max(1, int(timeout * 1000))})"
+    rest = query[select_match.end():]
+    block = _HINT_BLOCK.match(rest)
+    if block:
+        return f"{query[:select_match.end()]}{rest[:block.end()]} {hint},{rest[block.end():]}"
+    return f"{query[:select_match.end()]} /*+ {hint} */{rest}"
+
+
+def estimate_json_size(rows: list[dict[str, Any]], sample_size: int = 32) -> int:
+    """
+    Estimate the size of rows serialized as compact JSON.
+
+    Only up to ``sample_size`` evenly spaced rows are serialized and the result is
+    scaled to the full row count, so the cost stays flat for large results.
+    """
+    if not rows:
+        return 2
+    step = max(1, len(rows) // sample_size)
+    sample = rows[::step][:sample_size]
+    sample_bytes = len(json.dumps(sample, default=str, separators=(',', ':'))) - 2
+    return 2 + round(sample_bytes * len(rows) / len(sample))
+
+
+def is_timeout_error(error_msg: str) -> bool:
+    """Whether a database error reports a client timeout or an exceeded execution deadline."""
+    message = error_msg.lower()
+    return "timeout" in message or "timed out" in message or "maximum statement execution time exceeded" in message
+
+
+class QueryStream:
+    """
+    Thread-safe iterator over the events of a streaming query.
+    
+    A stream is typically consumed from worker threads while the server decides
+    from its event loop that the client is gone, so :meth:`close` may be called
+    from any thread; it waits for an event being produced and then closes the
+    underlying generator, which releases the database slot and connection.
+    After ``lifetime`` seconds the stream closes itself and further reads raise
+    :class:`QueryTimeoutError`, so a stalled client cannot hold a slot forever.
+    """
+
+    def __init__(self, events: Iterator[dict[str, Any]], lifetime: float):
+        self._events = events
+        self._lock = threading.Lock()
+        self._expired = False
+        self.lifetime = lifetime
+        self._timer = threading.Timer(lifetime, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def __iter__(self) -> 'QueryStream':
+        return self
+
+    def __next__(self) -> dict[str, Any]:
+        with self._lock:
+            if self._expired:
+                raise QueryTimeoutError(f"Stream exceeded its {self.lifetime} second lifetime")
+            try:
+                event = next(self._events)
+            except BaseException:
+                self._timer.cancel()
+                raise
+            if event['type'] == 'end':
+                # The slot is already released once the end event is produced
+                self._timer.cancel()
+            return event
+
+    def close(self) -> None:
+        """Close the stream, releasing its database slot and connection."""
+        self._timer.cancel()
+        with self._lock:
+            self._events.close()
+
+    def _expire(self) -> None:
+        with self._lock:
+            self._expired = True
+            self._events.close()
+        logger.warning(f"Closed a query stream that exceeded its {self.lifetime} second lifetime")
+
 
 class QueryValidator:
     """
@@ -246,9 +351,22 @@ class QueryExecutor:
     validation, caching, and performance monitoring.
     """
 
+    # Phases reported in QueryResult.metadata["phases_ms"], in execution order
+    PHASES = (
+        'validation', 'cache_lookup', 'queue_wait', 'connect',
+        'execute', 'fetch', 'conversion'
+    )
+
     def __init__(self, db_manager: DatabaseManager | None = None,
                  cache_manager: CacheManager | None = None,
-                 max_timeout: int = 180, max_result_rows: int = 1000):
+                 max_timeout: int = 180, max_result_rows: int = 1000,
+                 scheduler: QueryScheduler | None = None,
+                 workload_recorder: WorkloadRecorder | None = None,
+                 latency_model: QueryLatencyModel | None = None,
+                 max_stream_rows: int = 100000,
+                 storage_router: StorageRouter | None = None,
+                 max_queue_wait: float = 30.0,
+                 stream_scheduler: QueryScheduler | None = None):
         """
         Initialize the query executor.
         
@@ -257,24 +375,82 @@ class QueryExecutor:
             cache_manager: Cache manager instance (creates new if None)
             max_timeout: Maximum query timeout in seconds
             max_result_rows: Maximum number of result rows to return
+            scheduler: Fair-share query scheduler (creates new if None)
+            workload_recorder: Recorder for executed query workload (creates new if None)
+            latency_model: Historical latency model per query fingerprint (in-memory if None)
+            max_stream_rows: Maximum number of rows returned by a streamed query
+            storage_router: TiFlash/TiKV storage engine router (creates new if None)
+            max_queue_wait: Maximum seconds a query waits for a database slot
+            stream_scheduler: Scheduler of the slots held by streamed queries, separate
+                from ``scheduler`` since streams hold them while clients read (creates new if None)
         """
         self.db_manager = db_manager or DatabaseManager()
         self.cache_manager = cache_manager or CacheManager(default_ttl=300)
+        self.scheduler = scheduler or QueryScheduler()
+        self.stream_scheduler = stream_scheduler or QueryScheduler(max_concurrent=4)
+        self.workload_recorder = workload_recorder or WorkloadRecorder()
+        self.latency_model = latency_model or QueryLatencyModel()
+        self.storage_router = storage_router or StorageRouter(
+            self.db_manager, default_database=getattr(self.db_manager, 'default_database', None)
+        )
         self.validator = QueryValidator()
         self.max_timeout = max_timeout
         self.max_result_rows = max_result_rows
+        self.max_stream_rows = max_stream_rows
+        self.max_queue_wait = max_queue_wait
+
+        # Aggregated latency breakdown and result volume across executions
+        self._breakdown_lock = threading.Lock()
+        self._phase_stats: dict[str, dict[str, float]] = {
+            phase: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0} for phase in self.PHASES
+        }
+        self._volume_stats = {
+            'queries': 0, 'cache_hits': 0, 'rows_fetched': 0, 'rows_returned': 0, 'bytes_produced': 0
+        }
 
         logger.info(f"QueryExecutor initialized with timeout={max_timeout}s, max_rows={max_result_rows}")
 
     def execute_query(self, query: str, timeout: int | None = None,
-                     use_cache: bool = True) -> QueryResult:
+                     use_cache: bool = True, client_id: str | None = None,
+                     priority: str = PRIORITY_INTERACTIVE, approximate: bool = False,
+                     sample_fraction: float | None = None, params: list[Any] | None = None) -> QueryResult:
         """
         Execute a SQL query with validation and safety checks.
         
+        Cache hits are served immediately; cache misses wait up to
+        ``max_queue_wait`` seconds for a database slot from the fair-share
+        scheduler, then run with the timeout as a server-side
+        ``MAX_EXECUTION_TIME`` deadline. The returned result's
+        ``metadata`` holds the time spent in each phase (``phases_ms``), whether it
+        was a cache hit, rows fetched versus returned and the estimated JSON bytes produced.
+        
+        In approximate mode, exact distinct counts and percentiles are rewritten to
+        TiDB's APPROX_COUNT_DISTINCT/APPROX_PERCENTILE and, with ``sample_fraction``,
+        single-table aggregates run over a row sample. Such results are flagged with
+        ``metadata["approximate"]`` and described in ``metadata["approximation"]``.
+        
+        Before a cache miss executes, the latency model predicts its execution time
+        from past runs of the same fingerprint (``metadata["prediction"]``). The
+        prediction sets the deadline when no timeout is given, triggers a warning for
+        long-running queries and decides whether and for how long to cache the result.
+        
+        Aggregations over large tables with TiFlash replicas are routed to TiFlash
+        with a ``READ_FROM_STORAGE`` hint; the choice is in ``metadata["routing"]``.
+        
+        With ``params``, the query is a template with ``?`` placeholders executed as
+        a server-side prepared statement, so every value shares one cached plan,
+        one latency fingerprint and one workload entry. Results are cached per
+        template and parameter values.
+        
         Args:
             query: SQL query string to execute
-            timeout: Query timeout in seconds (uses default if None)
+            timeout: Execution deadline in seconds (predicted from history, or the default, if None)
             use_cache: Whether to use caching for results
+            client_id: Identifier of the calling client for fair-share scheduling
+            priority: Scheduling priority class ("interactive" or "background")
+            approximate: Whether approximate aggregate rewrites are allowed
+            sample_fraction: Fraction of rows (0 < f <= 1) to sample in approximate mode
+            params: Values for the ``?`` placeholders (JSON scalars or ``{"type", "value"}`` objects)
             
         Returns:
             QueryResult object with execution results
@@ -284,6 +460,7 @@ class QueryExecutor:
             QueryTimeoutError: If query execution times out
             QueryExecutionError: If query execution fails
         """
+        timeout_given = timeout is not None
         if timeout is None:
             timeout = self.max_timeout
 
@@ -291,32 +468,104 @@ class QueryExecutor:
         if timeout > self.max_timeout:
             raise QueryValidationError(f"Timeout cannot exceed {self.max_timeout} seconds")
 
+        if sample_fraction is not None:
+            if not 0.0 < sample_fraction <= 1.0:
+                raise QueryValidationError("sample_fraction must be greater than 0 and at most 1")
+            approximate = True
+
+        bound_params = None
+        if params is not None:
+            if approximate:
+                raise QueryValidationError("Approximate mode is not supported for parameterized queries")
+            bound_params = coerce_parameters(params)
+            placeholders = count_placeholders(query)
+            if placeholders != len(bound_params):
+                raise QueryValidationError(
+                    f"Query has {placeholders} placeholders but {len(bound_params)} parameters were given"
+                )
+
         start_time = time.time()
+        phases: dict[str, float] = {}
 
         try:
             # Validate the query
+            phase_start = time.perf_counter()
             self.validator.validate_query(query)
 
-            # Generate cache key
-            query_hash = self._generate_query_hash(query)
+            # Rewrite for approximate execution; the rewritten SQL is validated again
+            plan = None
+            executed_query = query
+            if approximate:
+                plan = plan_approximate_query(query, sample_fraction)
+                if plan.is_approximate:
+                    executed_query = plan.query
+                    self.validator.validate_query(executed_query)
+            phases['validation'] = (time.perf_counter() - phase_start) * 1000
+
+            # Generate cache key from the executed SQL so exact and approximate results never mix
+            phase_start = time.perf_counter()
+            query_hash = self._generate_query_hash(executed_query)
+            if bound_params is not None:
+                query_hash = f"{query_hash}:{parameters_digest(bound_params)}"
             cache_key = CacheKeyGenerator.query_key(query_hash)
 
             # Try to get from cache first
             if use_cache:
                 cached_result = self.cache_manager.get(cache_key)
                 if cached_result is not None:
+                    phases['cache_lookup'] = (time.perf_counter() - phase_start) * 1000
                     logger.debug(f"Query result retrieved from cache: {query_hash}")
-                    return cached_result
-
-            logger.info(f"Executing query (timeout={timeout}s): {query[:100]}...")
-
-            # Execute the query with timeout
-            results = self._execute_with_timeout(query, timeout)
+                    cached_metadata = cached_result.metadata or {}
+                    metadata = self._build_metadata(
+                        phases, cache_hit=True, rows_fetched=0,
+                        rows_returned=cached_result.row_count,
+                        bytes_produced=cached_metadata.get('bytes_produced', 0)
+                    )
+                    metadata['approximate'] = cached_metadata.get('approximate', False)
+                    if 'approximation' in cached_metadata:
+                        metadata['approximation'] = cached_metadata['approximation']
+                    self._record_breakdown(metadata)
+                    # Copy so the cached entry keeps the metadata of the original execution
+                    return replace(cached_result, metadata=metadata)
+            phases['cache_lookup'] = (time.perf_counter() - phase_start) * 1000
+
+            # Predict execution time from the history of this fingerprint
+            fingerprint = self.latency_model.fingerprint(executed_query)
+            prediction = self.latency_model.predict(fingerprint)
+            if prediction is not None:
+                if prediction['long_running']:
+                    logger.warning(f"Query {fingerprint} is predicted to be long-running "
+                                   f"(p95={prediction['p95_ms']:.0f}ms over {prediction['samples']} runs)")
+                if not timeout_given:
+                    timeout = QueryLatencyModel.suggest_timeout(prediction, self.max_timeout)
+
+            # Choose the storage engine; the hint is added after validation, which rejects comments
+            routing = self.storage_router.route(executed_query)
+
+            logger.info(f"Executing query (timeout={timeout}s{', approximate' if executed_query != query else ''}): "
+                        f"{executed_query[:100]}...")
+
+            # Wait for a fair-share database slot, then execute the query within its deadline
+            with tracing.span("tidb.query", priority=priority, parameterized=bound_params is not None) as span, \
+                    self.scheduler.slot(client_id, priority, timeout=self.max_queue_wait) as wait_ms:
+                phases['queue_wait'] = wait_ms
+                db_start_time = time.time()
+                results = self._execute_with_timeout(routing.query, timeout, timings=phases, params=bound_params)
+                db_time_ms = (time.time() - db_start_time) * 1000
+                if span:
+                    span.set_attribute("phases_ms", {name: round(ms, 3) for name, ms in phases.items()})
+
+            # Record the workload for the schema advisor
+            self.workload_recorder.record(query, db_time_ms)
 
             # Process results
+            phase_start = time.perf_counter()
             processed_results = self._process_results(results)
+            rows_fetched = len(processed_results)
 
-            execution_time_ms = (time.time() - start_time) * 1000
+            sampling_error = None
+            if plan is not None and plan.sample_fraction is not None:
+                processed_results, sampling_error = estimate_sampling_error(processed_results, plan.sample_fraction)
 
             # Check if results were truncated
             truncated = len(processed_results) >= self.max_result_rows
@@ -325,6 +574,26 @@ class QueryExecutor:
 
             # Extract column names
             columns = list(processed_results[0].keys()) if processed_results else []
+            phases['conversion'] = phases.get('conversion', 0.0) + (time.perf_counter() - phase_start) * 1000
+
+            # Estimate the serialized size of the rows returned to the client
+            bytes_produced = estimate_json_size(processed_results)
+
+            self.latency_model.record(fingerprint, db_time_ms, rows=rows_fetched, result_bytes=bytes_produced)
+
+            execution_time_ms = (time.time() - start_time) * 1000
+
+            metadata = self._build_metadata(
+                phases, cache_hit=False, rows_fetched=rows_fetched,
+                rows_returned=len(processed_results), bytes_produced=bytes_produced
+            )
+            metadata['approximate'] = plan is not None and plan.is_approximate
+            if plan is not None:
+                metadata['approximation'] = plan.to_metadata(sampling_error)
+            metadata['prediction'] = prediction
+            metadata['routing'] = routing.to_metadata()
+            metadata['parameterized'] = bound_params is not None
+            self._record_breakdown(metadata)
 
             # Create query result
             query_result = QueryResult(
@@ -332,33 +601,173 @@ class QueryExecutor:
                 rows=processed_results,
                 row_count=len(processed_results),
                 execution_time_ms=execution_time_ms,
-                truncated=truncated
+                truncated=truncated,
+                metadata=metadata
             )
 
-            # Cache the results
-            if use_cache and not truncated:  # Don't cache truncated results
-                self.cache_manager.set(cache_key, query_result)
+            # Cache the results; slow queries are kept longer, cheap bulky results not at all
+            cache_ttl = QueryLatencyModel.suggest_cache_ttl(prediction, self.cache_manager.default_ttl)
+            if use_cache and not truncated and cache_ttl is not None:  # Don't cache truncated results
+                self.cache_manager.set(cache_key, query_result, ttl=cache_ttl)
 
             logger.info(f"Query executed successfully: {len(processed_results)} rows in "
                        f"{query_result.get_formatted_execution_time()}")
 
             return query_result
 
-        except QueryValidationError:
-            # Re-raise validation errors as-is
+        except (QueryValidationError, QueryTimeoutError):
+            # Re-raise validation and timeout errors as-is
             raise
         except Exception as e:
-            execution_time_ms = (time.time() - start_time) * 1000
             error_msg = str(e)
 
             logger.error(f"Query execution failed: {error_msg}")
 
             # Determine error type
-            if "timeout" in error_msg.lower() or execution_time_ms > timeout * 1000:
+            if is_timeout_error(error_msg):
                 raise QueryTimeoutError(f"Query execution timed out after {timeout} seconds")
             else:
                 raise QueryExecutionError(f"Query execution failed: {error_msg}")
 
+    def stream_query(self, query: str, timeout: int | None = None, client_id: str | None = None,
+                     priority: str = PRIORITY_INTERACTIVE, batch_size: int = 500,
+                     max_rows: int | None = None) -> QueryStream:
+        """
+        Execute a SQL query and yield its results incrementally.
+        
+        Rows are read from an unbuffered server-side cursor and yielded as they
+        arrive, so the first rows reach the caller before the query finishes and
+        the full result is never held in memory. Streamed results bypass the
+        cache and the approximate mode.
+        
+        Streams take their slots from ``stream_scheduler``, waiting at most
+        ``max_queue_wait`` seconds, since a stream holds its slot and connection
+        while the client reads. The slot is released when the stream is
+        exhausted, closed or has run for ``timeout`` seconds.
+        
+        Yields, in order: one ``{"type": "columns", "columns": [...]}`` event, one
+        ``{"type": "row", "row": {...}}`` event per row, and a final
+        ``{"type": "end", "row_count", "truncated", "execution_time_ms"}`` event.
+        
+        Args:
+            query: SQL query string to execute
+            timeout: Maximum seconds the stream may run (uses default if None)
+            client_id: Identifier of the calling client for fair-share scheduling
+            priority: Scheduling priority class ("interactive" or "background")
+            batch_size: Rows fetched from the database per round trip
+            max_rows: Maximum rows to stream (capped at ``max_stream_rows``)
+            
+        Returns:
+            Stream of result events that may be closed from another thread
+            
+        Raises:
+            QueryValidationError: If query validation fails
+            QueryTimeoutError: If no database slot became available in time or
+                the stream outlived its timeout (raised while iterating)
+            QueryExecutionError: If query execution fails (raised while iterating)
+        """
+        if timeout is None:
+            timeout = self.max_timeout
+        if timeout > self.max_timeout:
+            raise QueryValidationError(f"Timeout cannot exceed {self.max_timeout} seconds")
+        max_rows = min(max_rows or self.max_stream_rows, self.max_stream_rows)
+
+        self.validator.validate_query(query)
+
+        return QueryStream(self._stream_events(query, timeout, client_id, priority, batch_size, max_rows), timeout)
+
+    def _stream_events(self, query: str, timeout: float, client_id: str | None, priority: str,
+                       batch_size: int, max_rows: int) -> Iterator[dict[str, Any]]:
+        """Generate the events of a validated streaming query."""
+        # USE + SELECT selects the database on the streaming connection itself
+        database = None
+        statement = query
+        if ';' in query.rstrip(';') and self._is_safe_use_select_pattern(query):
+            database, statement = self._split_use_select(query)
+        statement = add_execution_deadline(statement, timeout)
+
+        start_time = time.time()
+        row_count = 0
+        truncated = False
+
+        logger.info(f"Streaming query (max_rows={max_rows}): {statement[:100]}...")
+
+        # The slot is held while the client consumes rows, so its duration says nothing about database latency
+        with self.stream_scheduler.slot(client_id, priority, timeout=self.max_queue_wait, measure_latency=False):
+            batches = self.db_manager.stream_query(statement, batch_size=batch_size, database=database)
+            try:
+                columns_sent = False
+                for batch in batches:
+                    rows = self._process_results(batch)
+                    if not columns_sent:
+                        yield {'type': 'columns', 'columns': list(rows[0].keys())}
+                        columns_sent = True
+                    for row in rows:
+                        if row_count >= max_rows:
+                            truncated = True
+                            break
+                        yield {'type': 'row', 'row': row}
+                        row_count += 1
+                    if truncated:
+                        break
+                if not columns_sent:
+                    yield {'type': 'columns', 'columns': []}
+            except Exception as e:
+                error_msg = str(e)
+                logger.error(f"Streaming query failed after {row_count} rows: {error_msg}")
+                if is_timeout_error(error_msg):
+                    raise QueryTimeoutError(f"Query execution timed out: {error_msg}")
+                raise QueryExecutionError(f"Query execution failed: {error_msg}")
+            finally:
+                batches.close()
+
+        execution_time_ms = (time.time() - start_time) * 1000
+        logger.info(f"Query streamed successfully: {row_count} rows in {execution_time_ms:.2f}ms")
+        yield {
+            'type': 'end',
+            'row_count': row_count,
+            'truncated': truncated,
+            'execution_time_ms': execution_time_ms
+        }
+
+    def _build_metadata(self, phases: dict[str, float], cache_hit: bool, rows_fetched: int,
+                        rows_returned: int, bytes_produced: int) -> dict[str, Any]:
+        """
+        Build the latency breakdown metadata attached to a QueryResult.
+        
+        Args:
+            phases: Milliseconds spent per phase (phases that did not run are omitted)
+            cache_hit: Whether the result was served from cache
+            rows_fetched: Rows fetched from the database
+            rows_returned: Rows returned to the caller after truncation
+            bytes_produced: Estimated size of the JSON-serialized rows
+            
+        Returns:
+            Metadata dictionary
+        """
+        return {
+            'cache_hit': cache_hit,
+            'phases_ms': {phase: round(phases[phase], 3) for phase in self.PHASES if phase in phases},
+            'rows_fetched': rows_fetched,
+            'rows_returned': rows_returned,
+            'bytes_produced': bytes_produced
+        }
+
+    def _record_breakdown(self, metadata: dict[str, Any]) -> None:
+        """Aggregate a result's latency breakdown and volume into the executor statistics."""
+        with self._breakdown_lock:
+            for phase, elapsed_ms in metadata['phases_ms'].items():
+                stats = self._phase_stats[phase]
+                stats['count'] += 1
+                stats['total_ms'] += elapsed_ms
+                stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+            self._volume_stats['queries'] += 1
+            self._volume_stats['cache_hits'] += int(metadata['cache_hit'])
+            self._volume_stats['rows_fetched'] += metadata['rows_fetched']
+            self._volume_stats['rows_returned'] += metadata['rows_returned']
+            self._volume_stats['bytes_produced'] += metadata['bytes_produced']
+
     def _generate_query_hash(self, query: str) -> str:
         """
         Generate a hash for the query to use as cache key.
@@ -373,14 +782,21 @@ class QueryExecutor:
         normalized = ' '.join(query.split()).upper()
         return hashlib.sha256(normalized.encode()).hexdigest()[:16]
 
-    def _execute_with_timeout(self, query: str, timeout: int) -> list[dict[str, Any]]:
+    def _execute_with_timeout(self, query: str, timeout: int,
+                              timings: dict[str, float] | None = None,
+                              params: tuple | None = None) -> list[dict[str, Any]]:
         """
         Execute query with timeout enforcement.
         Handles USE + SELECT patterns by executing them as separate operations.
         
+        SELECT statements carry the timeout as a ``MAX_EXECUTION_TIME`` hint, so
+        TiDB aborts them at the deadline.
+        
         Args:
             query: SQL query to execute
-            timeout: Timeout in seconds
+            timeout: Execution deadline in seconds
+            timings: Optional dict accumulating connect/execute/fetch/conversion milliseconds
+            params: Bound values to execute the query as a prepared statement with
             
         Returns:
             List of result rows as dictionaries
@@ -389,18 +805,27 @@ class QueryExecutor:
             QueryTimeoutError: If query times out
             QueryExecutionError: If query execution fails
         """
+        query = add_execution_deadline(query, timeout)
         try:
+            if params is not None:
+                database = None
+                if ';' in query.rstrip(';') and self._is_safe_use_select_pattern(query):
+                    database, query = self._split_use_select(query)
+                results = self.db_manager.execute_prepared(query.rstrip().rstrip(';'), params,
+                                                           database=database, timings=timings)
+                return results if results else []
+
             # Check if this is a USE + SELECT pattern that needs special handling
             if ';' in query.rstrip(';') and self._is_safe_use_select_pattern(query):
-                return self._execute_use_select_pattern(query)
+                return self._execute_use_select_pattern(query, timings)
             
             # Execute single statement normally
-            results = self.db_manager.execute_query(query, fetch_all=True)
+            results = self.db_manager.execute_query(query, fetch_all=True, timings=timings)
             return results if results else []
 
         except Exception as e:
             error_msg = str(e)
-            if "timeout" in error_msg.lower():
+            if is_timeout_error(error_msg):
                 raise QueryTimeoutError(f"Query execution timed out: {error_msg}")
             else:
                 raise QueryExecutionError(f"Database error: {error_msg}")
@@ -433,28 +858,39 @@ class QueryExecutor:
         
         return any(second_stmt.startswith(stmt + ' ') for stmt in safe_second_statements)
 
-    def _execute_use_select_pattern(self, query: str) -> list[dict[str, Any]]:
+    def _execute_use_select_pattern(self, query: str,
+                                    timings: dict[str, float] | None = None) -> list[dict[str, Any]]:
         """
-        Execute USE database; SELECT ... pattern as separate operations.
+        Execute USE database; SELECT ... pattern on a single connection.
+        
+        The database is selected on the pooled connection that runs the SELECT,
+        so no separate USE round trip is needed and the context always applies.
         
         Args:
             query: Multi-statement query with USE + SELECT pattern
+            timings: Optional dict accumulating connect/execute/fetch/conversion milliseconds
             
         Returns:
             Results from the SELECT statement
         """
-        # Split the query into USE and SELECT parts
-        statements = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
-        use_stmt = statements[0]
-        select_stmt = statements[1]
-        
-        # Execute USE statement first (this switches database context)
-        self.db_manager.execute_query(use_stmt, fetch_all=False)
-        
-        # Execute SELECT statement and return results
-        results = self.db_manager.execute_query(select_stmt, fetch_all=True)
+        database, select_stmt = self._split_use_select(query)
+        results = self.db_manager.execute_query(select_stmt, fetch_all=True, timings=timings, database=database)
         return results if results else []
 
+    def _split_use_select(self, query: str) -> tuple[str, str]:
+        """
+        Split a USE database; SELECT ... query into the database name and the statement.
+        
+        Args:
+            query: Multi-statement query with USE + SELECT pattern
+            
+        Returns:
+            Tuple of (database name, statement)
+        """
+        use_stmt, statement = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
+        database = use_stmt.split(None, 1)[1].strip().strip('`')
+        return database, statement
+
     def _process_results(self, results: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """
         Process raw database results for consistent formatting.
@@ -487,6 +923,30 @@ class QueryExecutor:
 
         return processed
 
+    def predict_latency(self, query: str) -> dict[str, Any]:
+        """
+        Predict a query's execution time from past executions without running it.
+        
+        Args:
+            query: SQL query to predict
+            
+        Returns:
+            Dictionary with the fingerprint, the prediction (None without enough
+            history), the suggested timeout in seconds and the suggested cache TTL
+            
+        Raises:
+            QueryValidationError: If query validation fails
+        """
+        self.validator.validate_query(query)
+        fingerprint = self.latency_model.fingerprint(query)
+        prediction = self.latency_model.predict(fingerprint)
+        return {
+            'fingerprint': fingerprint,
+            'prediction': prediction,
+            'suggested_timeout': QueryLatencyModel.suggest_timeout(prediction, self.max_timeout),
+            'suggested_cache_ttl': QueryLatencyModel.suggest_cache_ttl(prediction, self.cache_manager.default_ttl)
+        }
+
     def validate_query_syntax(self, query: str) -> dict[str, Any]:
         """
         Validate query syntax without executing it.
@@ -520,10 +980,30 @@ class QueryExecutor:
         """
         cache_stats = self.cache_manager.get_stats()
 
+        with self._breakdown_lock:
+            latency_breakdown = {
+                phase: {
+                    'count': stats['count'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3) if stats['count'] else 0.0,
+                    'max_ms': round(stats['max_ms'], 3),
+                    'total_ms': round(stats['total_ms'], 3)
+                }
+                for phase, stats in self._phase_stats.items()
+            }
+            result_volume = dict(self._volume_stats)
+
         return {
             'max_timeout': self.max_timeout,
             'max_result_rows': self.max_result_rows,
-            'cache_stats': cache_stats
+            'cache_stats': cache_stats,
+            'scheduler': self.scheduler.get_stats(),
+            'stream_scheduler': self.stream_scheduler.get_stats(),
+            'workload': self.workload_recorder.get_stats(),
+            'latency_model': self.latency_model.get_stats(),
+            'connection_pool': self.db_manager.get_pool_stats(),
+            'storage_routing': self.storage_router.get_stats(),
+            'latency_breakdown': latency_breakdown,
+            'result_volume': result_volume
         }
 
     def clear_query_cache(self) -> int:
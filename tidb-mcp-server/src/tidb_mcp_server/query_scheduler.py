@@ -0,0 +1,331 @@
+"""
+Weighted fair-share query scheduler for TiDB MCP Server.
+
+This module provides a scheduling layer in front of database execution. Every
+request waits for one of a fixed number of global database slots, and waiting
+requests are dispatched in start-time fair queuing order across flows, where a
+flow is a (client, priority class) pair. Each flow's share is its client weight
+multiplied by its priority class weight, so interactive queries are favoured
+over background schema work without ever starving it.
+
+When an :class:`~.concurrency_limiter.AdaptiveConcurrencyLimiter` is attached,
+the number of slots handed out follows its latency-driven limit, bounded by
+``max_concurrent``. Waiting for a slot blocks the calling thread, so async
+callers must run slot-holding work in a worker thread; slots held on an event
+loop thread are not reported to the limiter, since their hold time includes
+time the loop spent on unrelated tasks.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from .concurrency_limiter import AdaptiveConcurrencyLimiter
+from .exceptions import QueryTimeoutError
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+DEFAULT_PRIORITY_WEIGHTS = {
+    PRIORITY_INTERACTIVE: 4.0,
+    PRIORITY_BACKGROUND: 1.0,
+}
+
+
+def _on_event_loop() -> bool:
+    """Whether the calling thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _Ticket:
+    """A single request waiting for (or holding) a database slot."""
+
+    __slots__ = ("client_id", "priority", "start_tag", "enqueued_at", "granted", "cancelled")
+
+    def __init__(self, client_id: str, priority: str, start_tag: float):
+        self.client_id = client_id
+        self.priority = priority
+        self.start_tag = start_tag
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+
+
+class _WaitStats:
+    """Aggregated queue wait statistics for a client or priority class."""
+
+    __slots__ = ("dispatched", "timeouts", "total_wait_ms", "max_wait_ms", "recent_waits")
+
+    def __init__(self):
+        self.dispatched = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.recent_waits: deque = deque(maxlen=500)
+
+    def record(self, wait_ms: float) -> None:
+        self.dispatched += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.recent_waits.append(wait_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        waits = sorted(self.recent_waits)
+        p95 = waits[min(int(len(waits) * 0.95), len(waits) - 1)] if waits else 0.0
+        return {
+            "dispatched": self.dispatched,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait_ms / self.dispatched, 2) if self.dispatched else 0.0,
+            "p95_wait_ms": round(p95, 2),
+            "max_wait_ms": round(self.max_wait_ms, 2),
+        }
+
+
+class QueryScheduler:
+    """
+    Thread-safe weighted fair-share scheduler for database slots.
+
+    Requests enter through :meth:`slot`, which blocks until a slot is granted
+    or the wait budget runs out. Dispatch order follows start-time fair
+    queuing: each request gets a virtual start tag of
+    ``max(virtual_time, flow_last_finish)`` and the smallest tag runs next.
+    """
+
+    def __init__(self, max_concurrent: int = 10,
+                 client_weights: dict[str, float] | None = None,
+                 priority_weights: dict[str, float] | None = None,
+                 default_client_weight: float = 1.0,
+                 limiter: AdaptiveConcurrencyLimiter | None = None):
+        """
+        Initialize the query scheduler.
+
+        Args:
+            max_concurrent: Global cap on concurrently held database slots
+            client_weights: Optional per-client weights (higher gets a larger share)
+            priority_weights: Optional per-priority-class weights
+            default_client_weight: Weight for clients without an explicit weight
+            limiter: Optional adaptive limiter that lowers the cap while database latency is high
+        """
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent must be positive")
+
+        self.max_concurrent = max_concurrent
+        self.client_weights = dict(client_weights or {})
+        self.priority_weights = dict(priority_weights or DEFAULT_PRIORITY_WEIGHTS)
+        self.default_client_weight = default_client_weight
+        self.limiter = limiter
+
+        self._cond = threading.Condition(threading.Lock())
+        self._waiting: list[tuple[float, int, _Ticket]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._flow_finish: dict[tuple[str, str], float] = {}
+        self._active = 0
+        self._active_by_client: dict[str, int] = defaultdict(int)
+        self._waiting_by_client: dict[str, int] = defaultdict(int)
+
+        self._client_stats: dict[str, _WaitStats] = defaultdict(_WaitStats)
+        self._priority_stats: dict[str, _WaitStats] = defaultdict(_WaitStats)
+        self._overall_stats = _WaitStats()
+
+        logger.info(f"QueryScheduler initialized with max_concurrent={max_concurrent}, "
+                    f"priority_weights={self.priority_weights}")
+
+    def set_client_weight(self, client_id: str, weight: float) -> None:
+        """
+        Set the fair-share weight for a client.
+
+        Args:
+            client_id: Client identifier
+            weight: Positive weight; a client with weight 2 gets twice the share of weight 1
+        """
+        if weight <= 0:
+            raise ValueError("Client weight must be positive")
+        with self._cond:
+            self.client_weights[client_id] = weight
+
+    @property
+    def concurrency_limit(self) -> int:
+        """Slots currently handed out at most: the adaptive limit, capped by ``max_concurrent``."""
+        if self.limiter is None:
+            return self.max_concurrent
+        return min(self.max_concurrent, self.limiter.limit)
+
+    @contextmanager
+    def slot(self, client_id: str | None = None, priority: str = PRIORITY_INTERACTIVE,
+             timeout: float | None = None, measure_latency: bool = True) -> Iterator[float]:
+        """
+        Hold a database slot for the duration of the block.
+
+        Args:
+            client_id: Client identifier used for fair sharing
+            priority: Priority class ("interactive" or "background")
+            timeout: Maximum seconds to wait for a slot (waits indefinitely if None)
+            measure_latency: Whether the time the slot is held is reported to the
+                adaptive limiter; disable it for blocks that wait on the client.
+                Slots held on an event loop thread are never reported.
+
+        Yields:
+            Milliseconds spent waiting in the queue
+
+        Raises:
+            QueryTimeoutError: If no slot became available within the timeout
+        """
+        measure_latency = measure_latency and not _on_event_loop()
+        wait_ms = self.acquire(client_id, priority, timeout)
+        held_start = time.monotonic()
+        latency_ms = None
+        dropped = False
+        try:
+            yield wait_ms
+            if measure_latency:
+                latency_ms = (time.monotonic() - held_start) * 1000
+        except QueryTimeoutError:
+            # A statement timing out while holding its slot is the clearest overload signal
+            if measure_latency:
+                latency_ms = (time.monotonic() - held_start) * 1000
+                dropped = True
+            raise
+        finally:
+            self.release(client_id, latency_ms=latency_ms, dropped=dropped)
+
+    def acquire(self, client_id: str | None = None, priority: str = PRIORITY_INTERACTIVE,
+                timeout: float | None = None) -> float:
+        """
+        Block until a database slot is granted.
+
+        Callers must pair every successful acquire with :meth:`release`.
+
+        Returns:
+            Milliseconds spent waiting in the queue
+        """
+        client_id = client_id or "default"
+        if priority not in self.priority_weights:
+            raise ValueError(f"Unknown priority class '{priority}'. "
+                             f"Must be one of: {list(self.priority_weights)}")
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self._cond:
+            ticket = self._enqueue(client_id, priority)
+            self._dispatch()
+
+            while not ticket.granted:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    ticket.cancelled = True
+                    self._waiting_by_client[client_id] -= 1
+                    self._client_stats[client_id].timeouts += 1
+                    self._priority_stats[priority].timeouts += 1
+                    self._overall_stats.timeouts += 1
+                    raise QueryTimeoutError(
+                        f"Timed out after {timeout}s waiting for a database slot "
+                        f"(client={client_id}, priority={priority})"
+                    )
+                self._cond.wait(remaining)
+
+            wait_ms = (time.monotonic() - ticket.enqueued_at) * 1000
+            self._client_stats[client_id].record(wait_ms)
+            self._priority_stats[priority].record(wait_ms)
+            self._overall_stats.record(wait_ms)
+
+        if wait_ms > 1000:
+            logger.info(f"Query from client '{client_id}' ({priority}) waited {wait_ms:.0f}ms for a slot")
+        return wait_ms
+
+    def release(self, client_id: str | None = None, latency_ms: float | None = None,
+                dropped: bool = False) -> None:
+        """
+        Release a slot previously granted by :meth:`acquire`.
+
+        Args:
+            client_id: Client identifier the slot was acquired for
+            latency_ms: Time the slot was held, reported to the adaptive limiter if given
+            dropped: Whether the work timed out while holding the slot
+        """
+        client_id = client_id or "default"
+        with self._cond:
+            if self.limiter is not None and latency_ms is not None:
+                self.limiter.on_sample(latency_ms, inflight=self._active, dropped=dropped)
+            self._active -= 1
+            self._active_by_client[client_id] -= 1
+            if self._active_by_client[client_id] <= 0:
+                del self._active_by_client[client_id]
+            self._dispatch()
+
+    def _enqueue(self, client_id: str, priority: str) -> _Ticket:
+        """Assign a start tag and queue a new ticket (lock must be held)."""
+        flow = (client_id, priority)
+        weight = self.client_weights.get(client_id, self.default_client_weight) * self.priority_weights[priority]
+
+        start_tag = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+        self._flow_finish[flow] = start_tag + 1.0 / weight
+
+        ticket = _Ticket(client_id, priority, start_tag)
+        heapq.heappush(self._waiting, (start_tag, next(self._sequence), ticket))
+        self._waiting_by_client[client_id] += 1
+        return ticket
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the waiting tickets with the smallest start tags (lock must be held)."""
+        granted_any = False
+        limit = self.concurrency_limit
+        while self._active < limit and self._waiting:
+            start_tag, _, ticket = heapq.heappop(self._waiting)
+            if ticket.cancelled:
+                continue
+            ticket.granted = True
+            self._virtual_time = max(self._virtual_time, start_tag)
+            self._active += 1
+            self._active_by_client[ticket.client_id] += 1
+            self._waiting_by_client[ticket.client_id] -= 1
+            granted_any = True
+
+        if not self._waiting:
+            # Idle flows must not bank credit: forget finish tags once the queue drains
+            self._flow_finish.clear()
+
+        if granted_any:
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get scheduler statistics including queue wait times.
+
+        Returns:
+            Dictionary with slot usage and wait-time statistics per client and priority class
+        """
+        with self._cond:
+            clients = set(self._client_stats) | {c for c, n in self._waiting_by_client.items() if n > 0}
+            return {
+                "max_concurrent": self.max_concurrent,
+                "concurrency_limit": self.concurrency_limit,
+                "adaptive_limiter": self.limiter.get_stats() if self.limiter is not None else None,
+                "active": self._active,
+                "waiting": sum(n for n in self._waiting_by_client.values() if n > 0),
+                "queue_wait": self._overall_stats.to_dict(),
+                "by_priority": {
+                    priority: stats.to_dict() for priority, stats in self._priority_stats.items()
+                },
+                "by_client": {
+                    client_id: {
+                        "weight": self.client_weights.get(client_id, self.default_client_weight),
+                        "active": self._active_by_client.get(client_id, 0),
+                        "waiting": max(0, self._waiting_by_client.get(client_id, 0)),
+                        **self._client_stats[client_id].to_dict(),
+                    }
+                    for client_id in sorted(clients)
+                },
+            }
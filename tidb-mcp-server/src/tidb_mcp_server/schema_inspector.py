@@ -6,6 +6,7 @@ using the existing DatabaseManager from the backend. It includes caching for
 performance optimization and proper error handling.
 """
 
+import hashlib
 import logging
 import time
 from datetime import datetime
@@ -19,6 +20,7 @@ class DatabaseConfig:
     pass
 from .models import DatabaseInfo, TableInfo, TableSchema, ColumnInfo, IndexInfo, SampleDataResult
 from .cache_manager import CacheManager, CacheKeyGenerator
+from .query_scheduler import PRIORITY_BACKGROUND, QueryScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +33,45 @@ class SchemaInspector:
     database operations and integrates with CacheManager for performance optimization.
     """
     
-    def __init__(self, db_manager: Optional[DatabaseManager] = None, cache_manager: Optional[CacheManager] = None):
+    # Client identifier used when competing for scheduler slots
+    SCHEDULER_CLIENT_ID = "schema_inspector"
+    
+    def __init__(self, db_manager: Optional[DatabaseManager] = None, cache_manager: Optional[CacheManager] = None,
+                 scheduler: Optional[QueryScheduler] = None):
         """
         Initialize the schema inspector.
         
         Args:
             db_manager: Database manager instance (creates new if None)
             cache_manager: Cache manager instance (creates new if None)
+            scheduler: Optional fair-share scheduler; metadata queries run as background work
         """
         self.db_manager = db_manager or DatabaseManager()
         self.cache_manager = cache_manager or CacheManager(default_ttl=300)  # 5 minutes default TTL
+        self.scheduler = scheduler
         
         logger.info("SchemaInspector initialized")
     
+    def _execute_query(self, query: str, params: Optional[tuple] = None,
+                       fetch_all: bool = True, fetch_one: bool = False) -> Any:
+        """
+        Execute a metadata query, holding a background scheduler slot when a scheduler is configured.
+        
+        Args:
+            query: SQL query to execute
+            params: Optional query parameters
+            fetch_all: Whether to fetch all rows
+            fetch_one: Whether to fetch a single row
+            
+        Returns:
+            Query results from the database manager
+        """
+        if self.scheduler is None:
+            return self.db_manager.execute_query(query, params=params, fetch_all=fetch_all, fetch_one=fetch_one)
+        
+        with self.scheduler.slot(self.SCHEDULER_CLIENT_ID, PRIORITY_BACKGROUND):
+            return self.db_manager.execute_query(query, params=params, fetch_all=fetch_all, fetch_one=fetch_one)
+    
     def get_databases(self) -> List[DatabaseInfo]:
         """
         Retrieve list of accessible databases from INFORMATION_SCHEMA.SCHEMATA.
@@ -71,7 +99,7 @@ class SchemaInspector:
             # Query INFORMATION_SCHEMA.SCHEMATA for database information
             query = "SELECT SCHEMA_NAME as name, DEFAULT_CHARACTER_SET_NAME as charset, DEFAULT_COLLATION_NAME as collation FROM INFORMATION_SCHEMA.SCHEMATA ORDER BY SCHEMA_NAME"
             
-            results = self.db_manager.execute_query(query, fetch_all=True)
+            results = self._execute_query(query, fetch_all=True)
             
             # Filter out system databases in Python code to avoid SQL formatting issues
             system_databases = {
@@ -155,7 +183,7 @@ class SchemaInspector:
                 ORDER BY TABLE_NAME
             """
             
-            results = self.db_manager.execute_query(query, params=(database,), fetch_all=True)
+            results = self._execute_query(query, params=(database,), fetch_all=True)
             
             tables = []
             for row in results:
@@ -216,20 +244,7 @@ class SchemaInspector:
             # Get primary key and foreign key information
             primary_keys, foreign_keys = self._get_key_constraints(database, table)
             
-            # Update column info with key information
-            for column in columns:
-                column.is_primary_key = column.name in primary_keys
-                column.is_foreign_key = any(fk.get('column_name') == column.name for fk in foreign_keys)
-            
-            # Create table schema object
-            table_schema = TableSchema(
-                database=database,
-                table=table,
-                columns=columns,
-                indexes=indexes,
-                primary_keys=primary_keys,
-                foreign_keys=foreign_keys
-            )
+            table_schema = self._build_table_schema(database, table, columns, indexes, primary_keys, foreign_keys)
             
             # Cache the results
             self.cache_manager.set(cache_key, table_schema)
@@ -241,6 +256,151 @@ class SchemaInspector:
             logger.error(f"Failed to retrieve schema for table '{database}.{table}': {e}")
             raise
     
+    def _build_table_schema(self, database: str, table: str, columns: List[ColumnInfo],
+                            indexes: List[IndexInfo], primary_keys: List[str],
+                            foreign_keys: List[Dict[str, str]]) -> TableSchema:
+        """Mark key columns and assemble a TableSchema."""
+        # Update column info with key information
+        for column in columns:
+            column.is_primary_key = column.name in primary_keys
+            column.is_foreign_key = any(fk.get('column_name') == column.name for fk in foreign_keys)
+        
+        return TableSchema(
+            database=database,
+            table=table,
+            columns=columns,
+            indexes=indexes,
+            primary_keys=primary_keys,
+            foreign_keys=foreign_keys
+        )
+    
+    def get_table_schemas(self, database: str,
+                          tables: List[str]) -> tuple[Dict[str, TableSchema], Dict[str, str]]:
+        """
+        Retrieve schema information for several tables of one database at once.
+        
+        Cached schemas are reused; the remaining tables are read with one
+        ``TABLE_NAME IN (...)`` query per INFORMATION_SCHEMA view instead of
+        four queries per table. Each schema is cached as by get_table_schema.
+        
+        Args:
+            database: Database name
+            tables: Table names
+            
+        Returns:
+            Tuple of (schemas by table, error messages by table) for tables
+            that were found and tables that were not
+            
+        Raises:
+            Exception: If the metadata queries fail
+        """
+        schemas: Dict[str, TableSchema] = {}
+        missing = []
+        for table in dict.fromkeys(tables):
+            cached_result = self.cache_manager.get(CacheKeyGenerator.schema_key(database, table))
+            if cached_result is not None:
+                schemas[table] = cached_result
+            else:
+                missing.append(table)
+        
+        if not missing:
+            logger.debug(f"Retrieved schemas for {len(schemas)} tables in '{database}' from cache")
+            return schemas, {}
+        
+        try:
+            logger.debug(f"Querying schemas for {len(missing)} tables in '{database}'")
+            placeholders = ", ".join(["%s"] * len(missing))
+            params = (database, *missing)
+            
+            column_rows = self._execute_query(f"""
+                SELECT 
+                    TABLE_NAME as table_name,
+                    COLUMN_NAME as name,
+                    DATA_TYPE as data_type,
+                    IS_NULLABLE as is_nullable,
+                    COLUMN_DEFAULT as default_value,
+                    COLUMN_COMMENT as comment
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """, params=params, fetch_all=True)
+            
+            index_rows = self._execute_query(f"""
+                SELECT 
+                    TABLE_NAME as table_name,
+                    INDEX_NAME as name,
+                    COLUMN_NAME as column_name,
+                    NON_UNIQUE as non_unique,
+                    INDEX_TYPE as index_type,
+                    SEQ_IN_INDEX as seq_in_index
+                FROM INFORMATION_SCHEMA.STATISTICS 
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+                ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+            """, params=params, fetch_all=True)
+            
+            pk_rows = self._execute_query(f"""
+                SELECT TABLE_NAME as table_name, COLUMN_NAME as column_name
+                FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE 
+                WHERE TABLE_SCHEMA = %s 
+                    AND TABLE_NAME IN ({placeholders}) 
+                    AND CONSTRAINT_NAME = 'PRIMARY'
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """, params=params, fetch_all=True)
+            
+            fk_rows = self._execute_query(f"""
+                SELECT 
+                    kcu.TABLE_NAME as table_name,
+                    kcu.COLUMN_NAME as column_name,
+                    kcu.CONSTRAINT_NAME as constraint_name,
+                    kcu.REFERENCED_TABLE_SCHEMA as referenced_database,
+                    kcu.REFERENCED_TABLE_NAME as referenced_table,
+                    kcu.REFERENCED_COLUMN_NAME as referenced_column
+                FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
+                JOIN INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc 
+                    ON kcu.CONSTRAINT_NAME = tc.CONSTRAINT_NAME 
+                    AND kcu.TABLE_SCHEMA = tc.TABLE_SCHEMA
+                    AND kcu.TABLE_NAME = tc.TABLE_NAME
+                WHERE kcu.TABLE_SCHEMA = %s 
+                    AND kcu.TABLE_NAME IN ({placeholders}) 
+                    AND tc.CONSTRAINT_TYPE = 'FOREIGN KEY'
+                ORDER BY kcu.TABLE_NAME, kcu.ORDINAL_POSITION
+            """, params=params, fetch_all=True)
+        except Exception as e:
+            logger.error(f"Failed to retrieve schemas for {len(missing)} tables in '{database}': {e}")
+            raise
+        
+        def group_by_table(rows):
+            grouped = {}
+            for row in rows or []:
+                grouped.setdefault(row['table_name'].lower(), []).append(row)
+            return grouped
+        
+        columns_by_table = group_by_table(column_rows)
+        indexes_by_table = group_by_table(index_rows)
+        pks_by_table = group_by_table(pk_rows)
+        fks_by_table = group_by_table(fk_rows)
+        
+        errors: Dict[str, str] = {}
+        for table in missing:
+            key = table.lower()
+            if key not in columns_by_table:
+                errors[table] = f"Table '{database}.{table}' has no columns or does not exist"
+                continue
+            
+            table_schema = self._build_table_schema(
+                database, table,
+                self._rows_to_columns(columns_by_table[key]),
+                self._rows_to_indexes(indexes_by_table.get(key, [])),
+                [row['column_name'] for row in pks_by_table.get(key, [])],
+                self._rows_to_foreign_keys(fks_by_table.get(key, []))
+            )
+            self.cache_manager.set(CacheKeyGenerator.schema_key(database, table), table_schema)
+            schemas[table] = table_schema
+        
+        logger.debug(f"Retrieved schemas for {len(schemas)} tables in '{database}' "
+                     f"({len(missing)} queried, {len(errors)} not found)")
+        return schemas, errors
+    
     def _get_column_info(self, database: str, table: str) -> List[ColumnInfo]:
         """
         Retrieve column information from INFORMATION_SCHEMA.COLUMNS.
@@ -264,10 +424,13 @@ class SchemaInspector:
             ORDER BY ORDINAL_POSITION
         """
         
-        results = self.db_manager.execute_query(query, params=(database, table), fetch_all=True)
-        
+        results = self._execute_query(query, params=(database, table), fetch_all=True)
+        return self._rows_to_columns(results)
+    
+    def _rows_to_columns(self, rows: List[Dict[str, Any]]) -> List[ColumnInfo]:
+        """Convert INFORMATION_SCHEMA.COLUMNS rows to ColumnInfo objects."""
         columns = []
-        for row in results:
+        for row in rows:
             column_info = ColumnInfo(
                 name=row['name'],
                 data_type=row['data_type'],
@@ -302,11 +465,14 @@ class SchemaInspector:
             ORDER BY INDEX_NAME, SEQ_IN_INDEX
         """
         
-        results = self.db_manager.execute_query(query, params=(database, table), fetch_all=True)
-        
+        results = self._execute_query(query, params=(database, table), fetch_all=True)
+        return self._rows_to_indexes(results)
+    
+    def _rows_to_indexes(self, rows: List[Dict[str, Any]]) -> List[IndexInfo]:
+        """Convert INFORMATION_SCHEMA.STATISTICS rows, ordered by index and sequence, to IndexInfo objects."""
         # Group columns by index name
         index_groups = {}
-        for row in results:
+        for row in rows:
             index_name = row['name']
             if index_name not in index_groups:
                 index_groups[index_name] = {
@@ -350,7 +516,7 @@ class SchemaInspector:
             ORDER BY ORDINAL_POSITION
         """
         
-        pk_results = self.db_manager.execute_query(pk_query, params=(database, table), fetch_all=True)
+        pk_results = self._execute_query(pk_query, params=(database, table), fetch_all=True)
         primary_keys = [row['COLUMN_NAME'] for row in pk_results]
         
         # Get foreign key information
@@ -371,10 +537,14 @@ class SchemaInspector:
             ORDER BY kcu.ORDINAL_POSITION
         """
         
-        fk_results = self.db_manager.execute_query(fk_query, params=(database, table), fetch_all=True)
+        fk_results = self._execute_query(fk_query, params=(database, table), fetch_all=True)
         
+        return primary_keys, self._rows_to_foreign_keys(fk_results)
+    
+    def _rows_to_foreign_keys(self, rows: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Convert foreign key constraint rows to foreign key dictionaries."""
         foreign_keys = []
-        for row in fk_results:
+        for row in rows:
             foreign_key = {
                 'column_name': row['column_name'],
                 'constraint_name': row['constraint_name'],
@@ -384,7 +554,7 @@ class SchemaInspector:
             }
             foreign_keys.append(foreign_key)
         
-        return primary_keys, foreign_keys
+        return foreign_keys
     
     def _test_database_access(self, database: str) -> bool:
         """
@@ -399,12 +569,49 @@ class SchemaInspector:
         try:
             # Simple query to test database access
             query = "SELECT 1 FROM INFORMATION_SCHEMA.SCHEMATA WHERE SCHEMA_NAME = %s LIMIT 1"
-            self.db_manager.execute_query(query, params=(database,), fetch_one=True)
+            self._execute_query(query, params=(database,), fetch_one=True)
             return True
         except Exception as e:
             logger.debug(f"Database '{database}' is not accessible: {e}")
             return False
-    
+
+    def get_schema_version(self, database: str) -> str:
+        """
+        Compute a version fingerprint of a database's schema.
+
+        The fingerprint is a hash over every table's column names, types, nullability
+        and keys, so it changes whenever a table or column is added, dropped or altered.
+        It is always computed from the database and never cached.
+
+        Args:
+            database: Database name
+
+        Returns:
+            Hex digest identifying the current schema version
+        """
+        query = """
+        SELECT
+            TABLE_NAME as table_name,
+            COLUMN_NAME as column_name,
+            COLUMN_TYPE as column_type,
+            IS_NULLABLE as is_nullable,
+            COLUMN_KEY as column_key
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = %s
+        ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """
+
+        results = self._execute_query(query, params=(database,), fetch_all=True)
+
+        digest = hashlib.sha256()
+        for row in results:
+            digest.update("|".join(
+                str(row[field]) for field in ('table_name', 'column_name', 'column_type', 'is_nullable', 'column_key')
+            ).encode('utf-8'))
+            digest.update(b"\n")
+
+        return digest.hexdigest()[:16]
+
     def invalidate_cache(self, database: Optional[str] = None, table: Optional[str] = None) -> int:
         """
         Invalidate cached schema information.
@@ -486,18 +693,40 @@ class SchemaInspector:
                 logger.debug(f"Retrieved sample data for table '{database}.{table}' from cache")
                 return cached_result
         
+        return self._sample_table(database, table, limit, masked_columns)
+    
+    def _sample_table(self, database: str, table: str, limit: int, masked_columns: List[str],
+                      total_rows: Optional[int] = None,
+                      all_columns: Optional[List[str]] = None) -> 'SampleDataResult':
+        """
+        Sample a table, reading its row count and columns unless they were prefetched.
+        
+        Args:
+            database: Database name
+            table: Table name
+            limit: Number of sample rows
+            masked_columns: Column names to mask
+            total_rows: Prefetched approximate row count
+            all_columns: Prefetched column names in ordinal order
+            
+        Returns:
+            SampleDataResult, with ``error`` set if sampling failed
+        """
+        cache_key = CacheKeyGenerator.sample_data_key(database, table, limit)
         start_time = time.time()
         
         try:
             logger.info(f"Retrieving sample data for table '{database}.{table}' (limit: {limit})")
             
             # First, get table row count and column information
-            table_info = self._get_table_row_count(database, table)
-            total_rows = table_info.get('row_count', 0)
+            if total_rows is None:
+                table_info = self._get_table_row_count(database, table)
+                total_rows = table_info.get('row_count', 0)
             
             # Get column names for the table
-            columns_info = self._get_column_info(database, table)
-            all_columns = [col.name for col in columns_info]
+            if all_columns is None:
+                columns_info = self._get_column_info(database, table)
+                all_columns = [col.name for col in columns_info]
             
             if not all_columns:
                 raise Exception(f"Table '{database}.{table}' has no columns or does not exist")
@@ -508,7 +737,7 @@ class SchemaInspector:
             )
             
             # Execute the sample query
-            results = self.db_manager.execute_query(query, fetch_all=True)
+            results = self._execute_query(query, fetch_all=True)
             
             # Process results and apply column masking
             processed_rows = self._process_sample_rows(results, masked_columns)
@@ -557,6 +786,86 @@ class SchemaInspector:
                 error=error_msg
             )
     
+    def get_sample_data_batch(self, database: str, tables: List[str], limit: int = 10,
+                              masked_columns: Optional[List[str]] = None) -> Dict[str, 'SampleDataResult']:
+        """
+        Retrieve sample data from several tables of one database.
+        
+        Row counts and column lists for all uncached tables are read with one
+        ``TABLE_NAME IN (...)`` query each; only the per-table sample queries
+        remain. Failures are reported per table through ``SampleDataResult.error``.
+        
+        Args:
+            database: Database name
+            tables: Table names
+            limit: Number of sample rows per table (1-100, default 10)
+            masked_columns: Optional list of column names to mask in every table
+            
+        Returns:
+            Dictionary mapping table names to SampleDataResult objects
+            
+        Raises:
+            ValueError: If limit is outside valid range (1-100)
+        """
+        if not 1 <= limit <= 100:
+            raise ValueError(f"Sample limit must be between 1 and 100, got {limit}")
+        
+        if masked_columns is None:
+            masked_columns = []
+        
+        results: Dict[str, SampleDataResult] = {}
+        missing = []
+        for table in dict.fromkeys(tables):
+            cached_result = None
+            if not masked_columns:
+                cached_result = self.cache_manager.get(CacheKeyGenerator.sample_data_key(database, table, limit))
+            if cached_result is not None:
+                results[table] = cached_result
+            else:
+                missing.append(table)
+        
+        if not missing:
+            return results
+        
+        row_counts: Dict[str, int] = {}
+        columns_by_table: Dict[str, List[str]] = {}
+        prefetched = True
+        try:
+            placeholders = ", ".join(["%s"] * len(missing))
+            params = (database, *missing)
+            
+            for row in self._execute_query(f"""
+                SELECT TABLE_NAME as table_name, TABLE_ROWS as row_count
+                FROM INFORMATION_SCHEMA.TABLES 
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+            """, params=params, fetch_all=True) or []:
+                row_counts[row['table_name'].lower()] = row.get('row_count', 0) or 0
+            
+            for row in self._execute_query(f"""
+                SELECT TABLE_NAME as table_name, COLUMN_NAME as name
+                FROM INFORMATION_SCHEMA.COLUMNS 
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+                ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """, params=params, fetch_all=True) or []:
+                columns_by_table.setdefault(row['table_name'].lower(), []).append(row['name'])
+        except Exception as e:
+            # Fall back to per-table metadata lookups inside _sample_table
+            logger.warning(f"Bulk metadata lookup for sample data in '{database}' failed: {e}")
+            prefetched = False
+        
+        for table in missing:
+            key = table.lower()
+            if prefetched:
+                results[table] = self._sample_table(
+                    database, table, limit, masked_columns,
+                    total_rows=row_counts.get(key, 0),
+                    all_columns=columns_by_table.get(key, [])
+                )
+            else:
+                results[table] = self._sample_table(database, table, limit, masked_columns)
+        
+        return results
+    
     def _get_table_row_count(self, database: str, table: str) -> Dict[str, Any]:
         """
         Get approximate row count for a table from INFORMATION_SCHEMA.
@@ -576,7 +885,7 @@ class SchemaInspector:
             WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
         """
         
-        result = self.db_manager.execute_query(query, params=(database, table), fetch_one=True)
+        result = self._execute_query(query, params=(database, table), fetch_one=True)
         
         if result:
             return {
@@ -11,10 +11,14 @@ This module provides advanced schema intelligence capabilities including:
 import json
 import logging
 import re
+import time
+from collections import defaultdict
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 
+from .workload_recorder import ROLE_GROUP_BY, ROLE_JOIN, ROLE_PREDICATE, ROLE_RANGE
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -82,6 +86,7 @@ class SchemaOptimization:
     implementation_complexity: str  # 'low', 'medium', 'high'
     estimated_impact: float  # 0.0 to 1.0
     sql_commands: List[str] = None
+    estimated_latency_saved_ms: float = 0.0  # Across the recorded query workload
 
     def __post_init__(self):
         if self.sql_commands is None:
@@ -92,17 +97,120 @@ class SchemaOptimization:
         return asdict(self)
 
 
+class SchemaNameIndex:
+    """
+    Inverted n-gram index over the table and column names of one database.
+
+    Names are lowercased and posted under every 1-, 2- and 3-character substring,
+    so substring lookups touch only the names sharing the fragment's n-grams
+    instead of every schema element. The index is tagged with the schema version
+    it was built from and is rebuilt when that version changes; ``checked_at``
+    records when that version was last confirmed against the database.
+    """
+
+    MAX_GRAM = 3
+
+    def __init__(self, database: str, version: Optional[str] = None):
+        self.database = database
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.elements: List[Tuple[str, str, Optional[str]]] = []  # (type, table, column)
+        self._names: Dict[str, List[int]] = {}  # lowercase name -> element ids
+        self._grams: Dict[str, Set[str]] = defaultdict(set)  # n-gram -> lowercase names
+
+    @classmethod
+    def build(cls, schema_inspector, database: str, version: Optional[str] = None) -> 'SchemaNameIndex':
+        """Build the index from the (cached) tables and schemas of a database."""
+        index = cls(database, version)
+        for table in schema_inspector.get_tables(database):
+            index.add('table', table.name)
+            try:
+                schema = schema_inspector.get_table_schema(database, table.name)
+            except Exception as e:
+                logger.debug(f"Failed to get schema for {database}.{table.name}: {e}")
+                continue
+            for column in schema.columns:
+                index.add('column', table.name, column.name)
+        return index
+
+    def add(self, element_type: str, table_name: str, column_name: Optional[str] = None) -> None:
+        """Add a table or column to the index."""
+        name = (column_name or table_name).lower()
+        element_id = len(self.elements)
+        self.elements.append((element_type, table_name, column_name))
+
+        if name not in self._names:
+            self._names[name] = []
+            for n in range(1, self.MAX_GRAM + 1):
+                for i in range(len(name) - n + 1):
+                    self._grams[name[i:i + n]].add(name)
+        self._names[name].append(element_id)
+
+    @property
+    def names(self) -> Set[str]:
+        """All distinct lowercase names in the index."""
+        return set(self._names)
+
+    def names_containing(self, fragment: str) -> Set[str]:
+        """Get the names that contain ``fragment`` as a substring."""
+        if not fragment:
+            return self.names
+        if len(fragment) <= self.MAX_GRAM:
+            return set(self._grams.get(fragment, ()))
+
+        postings = sorted(
+            (self._grams.get(fragment[i:i + self.MAX_GRAM], set())
+             for i in range(len(fragment) - self.MAX_GRAM + 1)),
+            key=len
+        )
+        candidates = set.intersection(*postings)
+        return {name for name in candidates if fragment in name}
+
+    def names_within(self, text: str) -> Set[str]:
+        """Get the names that are themselves substrings of ``text``."""
+        substrings = {text[i:j] for i in range(len(text)) for j in range(i + 1, len(text) + 1)}
+        return substrings & self._names.keys()
+
+    def element_ids(self, names: Set[str]) -> List[int]:
+        """Get the element ids for a set of names, in schema order."""
+        return sorted(element_id for name in names for element_id in self._names.get(name, ()))
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+
 class SchemaIntelligenceEngine:
     """
     Advanced schema intelligence engine for semantic analysis and optimization.
     """
 
+    # Fuzzy character-overlap scores are capped at this value, so thresholds above it
+    # can only be met by exact, substring or pattern matches that the name index can shortlist
+    FUZZY_SCORE_CAP = 0.5
+
+    # Seconds a name index is trusted before its schema version is checked again;
+    # the version is a hash over every column of the database, too costly per lookup
+    NAME_INDEX_VERSION_TTL = 60.0
+
+    # Estimated fraction of a query's latency saved by an index on a column, by usage role
+    WORKLOAD_INDEX_BENEFIT = {
+        ROLE_PREDICATE: 0.6,
+        ROLE_JOIN: 0.5,
+        ROLE_RANGE: 0.4,
+        ROLE_GROUP_BY: 0.2
+    }
+    # Estimated fraction of a range-filtered query's latency saved by partition pruning
+    WORKLOAD_PARTITION_BENEFIT = 0.5
+    # Tables smaller than this gain proportionally less from new indexes
+    WORKLOAD_FULL_BENEFIT_ROWS = 10000
+
     def __init__(self, schema_inspector=None, query_executor=None, cache_manager=None):
         self.schema_inspector = schema_inspector
         self.query_executor = query_executor
         self.cache_manager = cache_manager
         self.business_mappings: Dict[str, List[BusinessMapping]] = {}
         self.learned_patterns: Dict[str, Dict] = {}
+        self._name_indexes: Dict[str, SchemaNameIndex] = {}
         
         # Initialize with common business term patterns
         self._initialize_business_patterns()
@@ -153,10 +261,11 @@ class SchemaIntelligenceEngine:
                 databases = []
         
         mappings = []
+        name_indexes: Dict[str, SchemaNameIndex] = {}
         
         for business_term in business_terms:
             term_mappings = await self._analyze_business_term(
-                business_term, databases, confidence_threshold
+                business_term, databases, confidence_threshold, name_indexes
             )
             mappings.extend(term_mappings)
             
@@ -170,9 +279,16 @@ class SchemaIntelligenceEngine:
         self, 
         business_term: str, 
         databases: List[str], 
-        confidence_threshold: float
+        confidence_threshold: float,
+        name_indexes: Optional[Dict[str, SchemaNameIndex]] = None
     ) -> List[BusinessMapping]:
-        """Analyze a single business term for schema mappings."""
+        """
+        Analyze a single business term for schema mappings.
+        
+        Candidate tables and columns are shortlisted through each database's name
+        index before similarity scoring, and each distinct name is scored once.
+        ``name_indexes`` lets callers share index lookups across several terms.
+        """
         mappings = []
         patterns = self.business_patterns.get(business_term, [business_term])
         
@@ -180,50 +296,32 @@ class SchemaIntelligenceEngine:
             logger.warning("Schema inspector not available for business term analysis")
             return mappings
         
+        if name_indexes is None:
+            name_indexes = {}
+        
         for database in databases:
             try:
-                # Get all tables in the database
-                tables = self.schema_inspector.get_tables(database)
+                if database not in name_indexes:
+                    name_indexes[database] = self._get_schema_name_index(database)
+                index = name_indexes[database]
                 
-                for table in tables:
-                    # Analyze table name
-                    table_confidence = self._calculate_name_similarity(
-                        business_term, table.name, patterns
-                    )
-                    
-                    if table_confidence >= confidence_threshold:
-                        mapping = BusinessMapping(
-                            business_term=business_term,
-                            schema_element_type='table',
-                            database_name=database,
-                            table_name=table.name,
-                            confidence_score=table_confidence,
-                            mapping_type='semantic'
-                        )
-                        mappings.append(mapping)
-                    
-                    # Analyze column names
-                    try:
-                        schema = self.schema_inspector.get_table_schema(database, table.name)
-                        for column in schema.columns:
-                            column_confidence = self._calculate_name_similarity(
-                                business_term, column.name, patterns
-                            )
-                            
-                            if column_confidence >= confidence_threshold:
-                                mapping = BusinessMapping(
-                                    business_term=business_term,
-                                    schema_element_type='column',
-                                    database_name=database,
-                                    table_name=table.name,
-                                    column_name=column.name,
-                                    confidence_score=column_confidence,
-                                    mapping_type='semantic'
-                                )
-                                mappings.append(mapping)
-                    except Exception as e:
-                        logger.debug(f"Failed to get schema for {database}.{table.name}: {e}")
-                        continue
+                scores = {
+                    name: self._calculate_name_similarity(business_term, name, patterns)
+                    for name in self._shortlist_names(index, business_term, patterns, confidence_threshold)
+                }
+                matched = {name for name, score in scores.items() if score >= confidence_threshold}
+                
+                for element_id in index.element_ids(matched):
+                    element_type, table_name, column_name = index.elements[element_id]
+                    mappings.append(BusinessMapping(
+                        business_term=business_term,
+                        schema_element_type=element_type,
+                        database_name=database,
+                        table_name=table_name,
+                        column_name=column_name,
+                        confidence_score=scores[(column_name or table_name).lower()],
+                        mapping_type='semantic'
+                    ))
                         
             except Exception as e:
                 logger.error(f"Error analyzing database {database}: {e}")
@@ -231,6 +329,61 @@ class SchemaIntelligenceEngine:
         
         return mappings
 
+    def _get_schema_name_index(self, database: str) -> SchemaNameIndex:
+        """
+        Get the name index for a database, rebuilding it when the schema version changes.
+        
+        The version is checked at most once per ``NAME_INDEX_VERSION_TTL`` seconds.
+        """
+        cached = self._name_indexes.get(database)
+        if (cached is not None and cached.version is not None
+                and time.monotonic() - cached.checked_at < self.NAME_INDEX_VERSION_TTL):
+            return cached
+        
+        version = None
+        try:
+            version = self.schema_inspector.get_schema_version(database)
+        except Exception as e:
+            logger.debug(f"Schema version unavailable for '{database}', rebuilding name index: {e}")
+        
+        if cached is not None and version is not None and cached.version == version:
+            cached.checked_at = time.monotonic()
+            return cached
+        
+        index = SchemaNameIndex.build(self.schema_inspector, database, version)
+        self._name_indexes[database] = index
+        logger.debug(f"Built schema name index for '{database}' with {len(index)} elements (version {version})")
+        return index
+
+    def _shortlist_names(
+        self,
+        index: SchemaNameIndex,
+        business_term: str,
+        patterns: List[str],
+        confidence_threshold: float
+    ) -> Set[str]:
+        """
+        Get the names that can possibly reach the confidence threshold.
+        
+        Mirrors the non-fuzzy rules of :meth:`_calculate_name_similarity`: the name
+        contains the term, a pattern or a pattern word, or is contained in the term.
+        """
+        if confidence_threshold <= self.FUZZY_SCORE_CAP:
+            # Fuzzy overlap alone may qualify, so every name has to be scored
+            return index.names
+        
+        business_lower = business_term.lower()
+        fragments = {business_lower}
+        for pattern in patterns:
+            pattern_lower = pattern.lower()
+            fragments.add(pattern_lower)
+            fragments.update(pattern_lower.split('_'))
+        
+        names = index.names_within(business_lower)
+        for fragment in fragments:
+            names |= index.names_containing(fragment)
+        return names
+
     def _calculate_name_similarity(
         self, 
         business_term: str, 
@@ -487,6 +640,10 @@ class SchemaIntelligenceEngine:
         """
         Suggest schema optimizations based on usage patterns and performance.
         
+        When the query executor records its workload, index and partition suggestions
+        are derived from the predicate, join and GROUP BY columns actually queried and
+        ranked by the latency they are estimated to save.
+        
         Args:
             database: Target database (if None, analyzes all databases)
             query_patterns: Common query patterns to optimize for
@@ -530,8 +687,8 @@ class SchemaIntelligenceEngine:
                 logger.error(f"Error analyzing database {db_name} for optimizations: {e}")
                 continue
         
-        # Sort optimizations by estimated impact
-        optimizations.sort(key=lambda x: x.estimated_impact, reverse=True)
+        # Rank by latency saved across the recorded workload, then by estimated impact
+        optimizations.sort(key=lambda x: (x.estimated_latency_saved_ms, x.estimated_impact), reverse=True)
         
         logger.info(f"Generated {len(optimizations)} optimization suggestions")
         return optimizations
@@ -549,12 +706,15 @@ class SchemaIntelligenceEngine:
             # Get table schema
             schema = self.schema_inspector.get_table_schema(database, table.name)
             
+            # Get recorded workload usage of this table's columns
+            usage = self._get_workload_usage(database, table, schema)
+            
             # Check for missing indexes
-            index_suggestions = self._suggest_indexes(database, table, schema)
+            index_suggestions = self._suggest_indexes(database, table, schema, usage)
             optimizations.extend(index_suggestions)
             
             # Check for partitioning opportunities
-            partition_suggestions = self._suggest_partitioning(database, table, schema)
+            partition_suggestions = self._suggest_partitioning(database, table, schema, usage)
             optimizations.extend(partition_suggestions)
             
             # Check for denormalization opportunities
@@ -567,9 +727,41 @@ class SchemaIntelligenceEngine:
         # Filter by performance threshold
         return [opt for opt in optimizations if opt.estimated_impact >= performance_threshold]
 
-    def _suggest_indexes(self, database: str, table, schema) -> List[SchemaOptimization]:
-        """Suggest index optimizations for a table."""
+    def _get_workload_usage(self, database: str, table, schema) -> Dict[str, Dict[str, Any]]:
+        """Get recorded workload usage of a table's columns, keyed by lowercase column name."""
+        recorder = getattr(self.query_executor, 'workload_recorder', None)
+        if recorder is None:
+            return {}
+        
+        table_columns = {column.name.lower() for column in schema.columns}
+        usage = recorder.get_column_usage(database, table.name, table_columns)
+        return {
+            column: column_usage for (_, column), column_usage in usage.items()
+            if column in table_columns
+        }
+
+    def _estimate_index_savings(self, table, column_usage: Optional[Dict[str, Any]]) -> float:
+        """Estimate workload latency saved (ms) by indexing a column with the given usage."""
+        if not column_usage:
+            return 0.0
+        benefit = max(self.WORKLOAD_INDEX_BENEFIT.get(role, 0.0) for role in column_usage['roles'])
+        if table.rows is not None:
+            benefit *= min(1.0, table.rows / self.WORKLOAD_FULL_BENEFIT_ROWS)
+        return round(column_usage['total_latency_ms'] * benefit, 2)
+
+    def _workload_impact(self, latency_saved_ms: float) -> float:
+        """Map estimated latency saved to an impact score relative to the total recorded workload."""
+        recorder = getattr(self.query_executor, 'workload_recorder', None)
+        total_latency_ms = recorder.get_total_latency_ms() if recorder else 0.0
+        if total_latency_ms <= 0:
+            return 0.5
+        return round(min(0.95, 0.5 + latency_saved_ms / total_latency_ms), 3)
+
+    def _suggest_indexes(self, database: str, table, schema,
+                         usage: Optional[Dict[str, Dict[str, Any]]] = None) -> List[SchemaOptimization]:
+        """Suggest index optimizations for a table, using recorded workload usage when available."""
         suggestions = []
+        usage = usage or {}
         
         # Look for columns that might benefit from indexes
         for column in schema.columns:
@@ -583,7 +775,8 @@ class SchemaIntelligenceEngine:
                     expected_benefit="Improved JOIN performance and referential integrity checks",
                     implementation_complexity='low',
                     estimated_impact=0.7,
-                    sql_commands=[f"CREATE INDEX idx_{table.name}_{column.name} ON {table.name}({column.name})"]
+                    sql_commands=[f"CREATE INDEX idx_{table.name}_{column.name} ON {table.name}({column.name})"],
+                    estimated_latency_saved_ms=self._estimate_index_savings(table, usage.get(column.name.lower()))
                 )
                 suggestions.append(suggestion)
             
@@ -598,19 +791,85 @@ class SchemaIntelligenceEngine:
                         expected_benefit="Improved performance for date range queries and time-based filtering",
                         implementation_complexity='low',
                         estimated_impact=0.6,
-                        sql_commands=[f"CREATE INDEX idx_{table.name}_{column.name} ON {table.name}({column.name})"]
+                        sql_commands=[f"CREATE INDEX idx_{table.name}_{column.name} ON {table.name}({column.name})"],
+                        estimated_latency_saved_ms=self._estimate_index_savings(table, usage.get(column.name.lower()))
                     )
                     suggestions.append(suggestion)
         
+        # Columns the workload filters, joins or groups on without a leading index
+        suggested_columns = {s.target_columns[0].lower() for s in suggestions}
+        for column in schema.columns:
+            column_usage = usage.get(column.name.lower())
+            if not column_usage or column.name.lower() in suggested_columns:
+                continue
+            if self._has_leading_index_on_column(schema, column.name):
+                continue
+            
+            latency_saved_ms = self._estimate_index_savings(table, column_usage)
+            if latency_saved_ms <= 0:
+                continue
+            
+            roles = ', '.join(f"{role} x{count}" for role, count in sorted(column_usage['roles'].items()))
+            suggestions.append(SchemaOptimization(
+                optimization_type='index',
+                target_table=f"{database}.{table.name}",
+                target_columns=[column.name],
+                description=(f"Add index on '{column.name}', used by {column_usage['fingerprints']} "
+                             f"recorded query patterns ({roles})"),
+                expected_benefit="Avoids full scans for the recorded queries filtering, joining or grouping on this column",
+                implementation_complexity='low',
+                estimated_impact=self._workload_impact(latency_saved_ms),
+                sql_commands=[f"CREATE INDEX idx_{table.name}_{column.name} ON {table.name}({column.name})"],
+                estimated_latency_saved_ms=latency_saved_ms
+            ))
+        
         return suggestions
 
-    def _suggest_partitioning(self, database: str, table, schema) -> List[SchemaOptimization]:
-        """Suggest partitioning optimizations for large tables."""
+    def _suggest_partitioning(self, database: str, table, schema,
+                              usage: Optional[Dict[str, Dict[str, Any]]] = None) -> List[SchemaOptimization]:
+        """Suggest partitioning optimizations for large tables, preferring range-filtered columns."""
         suggestions = []
+        usage = usage or {}
         
         # Only suggest partitioning for large tables
         if table.rows and table.rows > 1000000:  # More than 1M rows
-            # Look for date columns suitable for partitioning
+            # Date columns the workload range-filters on come first, by latency spent
+            def range_latency(column) -> float:
+                column_usage = usage.get(column.name.lower())
+                if not column_usage or ROLE_RANGE not in column_usage['roles']:
+                    return 0.0
+                return column_usage['total_latency_ms']
+            
+            temporal_columns = [
+                column for column in schema.columns
+                if any(t in column.data_type.lower() for t in ('date', 'time', 'year'))
+            ]
+            ranked_columns = sorted(temporal_columns, key=range_latency, reverse=True)
+            if ranked_columns and range_latency(ranked_columns[0]) > 0:
+                column = ranked_columns[0]
+                latency_saved_ms = round(range_latency(column) * self.WORKLOAD_PARTITION_BENEFIT, 2)
+                suggestions.append(SchemaOptimization(
+                    optimization_type='partitioning',
+                    target_table=f"{database}.{table.name}",
+                    target_columns=[column.name],
+                    description=(f"Partition large table by '{column.name}', which recorded queries "
+                                 f"range-filter on {usage[column.name.lower()]['roles'][ROLE_RANGE]} times"),
+                    expected_benefit="Partition pruning for the recorded range queries on this column",
+                    implementation_complexity='high',
+                    estimated_impact=max(0.8, self._workload_impact(latency_saved_ms)),
+                    sql_commands=[
+                        f"-- Example partitioning by {column.name}",
+                        f"ALTER TABLE {table.name} PARTITION BY RANGE (YEAR({column.name})) (",
+                        f"  PARTITION p2023 VALUES LESS THAN (2024),",
+                        f"  PARTITION p2024 VALUES LESS THAN (2025),",
+                        f"  PARTITION pmax VALUES LESS THAN MAXVALUE",
+                        f");"
+                    ],
+                    estimated_latency_saved_ms=latency_saved_ms
+                ))
+                return suggestions
+            
+            # Otherwise look for date columns suitable for partitioning by name
             for column in schema.columns:
                 if ('date' in column.name.lower() or 'time' in column.name.lower() or 
                     'created' in column.name.lower()):
@@ -667,6 +926,15 @@ class SchemaIntelligenceEngine:
                 return True
         return False
 
+    def _has_leading_index_on_column(self, schema, column_name: str) -> bool:
+        """Check if a column is the leading column of an index (or the sole primary key)."""
+        if list(schema.primary_keys) == [column_name]:
+            return True
+        for index in schema.indexes:
+            if index.columns and index.columns[0].lower() == column_name.lower():
+                return True
+        return False
+
     def learn_from_successful_mapping(
         self,
         business_term: str,
@@ -709,6 +977,10 @@ class SchemaIntelligenceEngine:
             'business_mappings_count': sum(len(mappings) for mappings in self.business_mappings.values()),
             'learned_patterns_count': len(self.learned_patterns),
             'business_terms_analyzed': len(self.business_mappings),
+            'schema_name_indexes': {
+                database: {'elements': len(index), 'version': index.version}
+                for database, index in self._name_indexes.items()
+            },
             'pattern_categories': len(self.business_patterns)
         }
 
@@ -0,0 +1,206 @@
+"""
+Storage engine routing for analytical queries.
+
+TiDB can serve a table from TiKV row storage or, where a TiFlash replica has
+been created, from TiFlash columnar storage. Wide aggregations and GROUP BY
+queries over large tables are much faster on TiFlash, but the optimizer does
+not always pick it. This module classifies query shapes, checks replica
+availability in ``information_schema.tiflash_replica`` and injects a
+``READ_FROM_STORAGE(TIFLASH[...])`` hint for the tables that qualify.
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from .workload_recorder import extract_column_usage
+
+logger = logging.getLogger(__name__)
+
+ENGINE_TIKV = "tikv"
+ENGINE_TIFLASH = "tiflash"
+
+_SELECT = re.compile(r"^(\s*(?:USE\s+[^;]+;\s*)?SELECT)\b", re.IGNORECASE)
+_AGGREGATE = re.compile(
+    r"\b(COUNT|SUM|AVG|MIN|MAX|STDDEV\w*|VAR\w*|APPROX_COUNT_DISTINCT|APPROX_PERCENTILE|GROUP_CONCAT)\s*\(",
+    re.IGNORECASE
+)
+_GROUP_BY = re.compile(r"\bGROUP\s+BY\b", re.IGNORECASE)
+_HINTED = re.compile(r"/\*\+", re.IGNORECASE)
+
+
+@dataclass
+class RoutingDecision:
+    """The storage engine chosen for a query and the query to execute."""
+
+    query: str
+    engine: str = ENGINE_TIKV
+    reason: str = ""
+    tiflash_tables: list[str] = field(default_factory=list)
+
+    def to_metadata(self) -> dict[str, Any]:
+        """Describe the decision for QueryResult metadata."""
+        return {'engine': self.engine, 'reason': self.reason, 'tiflash_tables': list(self.tiflash_tables)}
+
+
+class StorageRouter:
+    """
+    Routes analytical query shapes to TiFlash replicas with optimizer hints.
+
+    Replica availability and table sizes are read from ``information_schema``
+    and cached for ``refresh_seconds``; when the metadata cannot be read (for
+    example on MySQL or a cluster without TiFlash), queries stay on TiKV.
+    """
+
+    def __init__(self, db_manager, default_database: str | None = None, enabled: bool = True,
+                 min_table_rows: int = 100_000, refresh_seconds: float = 300.0):
+        """
+        Initialize the storage router.
+
+        Args:
+            db_manager: Database manager used to read replica metadata
+            default_database: Database of unqualified tables outside ``USE db;`` queries
+            enabled: Whether queries are routed at all
+            min_table_rows: Estimated rows a table needs before it is read from TiFlash
+            refresh_seconds: How long replica and table-size metadata is cached
+        """
+        self.db_manager = db_manager
+        self.default_database = default_database
+        self.enabled = enabled
+        self.min_table_rows = min_table_rows
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.Lock()
+        self._replicas: dict[tuple[str, str], bool] | None = {}  # (database, table) -> available
+        self._replicas_loaded_at = 0.0
+        self._table_rows: dict[tuple[str, str], tuple[int, float]] = {}  # -> (rows, loaded_at)
+        self._stats = {'routed_tiflash': 0, 'routed_tikv': 0, 'metadata_errors': 0}
+
+    def route(self, query: str) -> RoutingDecision:
+        """
+        Choose a storage engine for a validated query.
+
+        Args:
+            query: Validated SQL query (``USE db; SELECT ...`` is supported)
+
+        Returns:
+            RoutingDecision with the query to execute, hinted if routed to TiFlash
+        """
+        decision = self._decide(query)
+        with self._lock:
+            self._stats[f'routed_{decision.engine}'] += 1
+        if decision.engine == ENGINE_TIFLASH:
+            logger.info(f"Routing query to TiFlash for {', '.join(decision.tiflash_tables)}: {decision.reason}")
+        else:
+            logger.debug(f"Routing query to TiKV: {decision.reason}")
+        return decision
+
+    def _decide(self, query: str) -> RoutingDecision:
+        if not self.enabled:
+            return RoutingDecision(query, reason="routing disabled")
+
+        select_match = _SELECT.match(query)
+        if not select_match:
+            return RoutingDecision(query, reason="not a SELECT query")
+        if _HINTED.search(query):
+            return RoutingDecision(query, reason="query already carries optimizer hints")
+        if not (_AGGREGATE.search(query) or _GROUP_BY.search(query)):
+            return RoutingDecision(query, reason="not an aggregation or GROUP BY")
+
+        usage = extract_column_usage(query)
+        if not usage.references:
+            return RoutingDecision(query, reason="no base tables referenced")
+
+        replicas = self._get_replicas()
+        if replicas is None:
+            return RoutingDecision(query, reason="TiFlash replica metadata unavailable")
+
+        hint_names = []
+        skipped = []
+        for name, database, table in usage.references:
+            key = ((database or self.default_database or '').lower(), table.lower())
+            if not replicas.get(key):
+                skipped.append(f"{table} has no available TiFlash replica")
+                continue
+            rows = self._get_table_rows(*key)
+            if rows < self.min_table_rows:
+                skipped.append(f"{table} has ~{rows} rows")
+                continue
+            hint_names.append(name)
+
+        if not hint_names:
+            return RoutingDecision(query, reason='; '.join(skipped))
+
+        hint = f" /*+ READ_FROM_STORAGE(TIFLASH[{', '.join(hint_names)}]) */"
+        routed = f"{query[:select_match.end()]}{hint}{query[select_match.end():]}"
+        reason = f"aggregation over {len(hint_names)} large table(s) with TiFlash replicas"
+        return RoutingDecision(routed, ENGINE_TIFLASH, reason, hint_names)
+
+    def _get_replicas(self) -> dict[tuple[str, str], bool] | None:
+        """Get TiFlash replica availability by (database, table), refreshing it when stale."""
+        with self._lock:
+            if time.time() - self._replicas_loaded_at < self.refresh_seconds:
+                return self._replicas
+
+        try:
+            rows = self.db_manager.execute_query(
+                "SELECT TABLE_SCHEMA, TABLE_NAME, AVAILABLE FROM information_schema.tiflash_replica",
+                fetch_all=True
+            ) or []
+            replicas = {
+                (row['TABLE_SCHEMA'].lower(), row['TABLE_NAME'].lower()): bool(row['AVAILABLE'])
+                for row in rows
+            }
+        except Exception as e:
+            logger.warning(f"Could not read TiFlash replica metadata, routing to TiKV: {e}")
+            replicas = None
+
+        with self._lock:
+            # Failures are cached too so an unsupported cluster is not queried on every request
+            self._replicas = replicas
+            self._replicas_loaded_at = time.time()
+            if replicas is None:
+                self._stats['metadata_errors'] += 1
+        return replicas
+
+    def _get_table_rows(self, database: str, table: str) -> int:
+        """Get the estimated row count of a table from information_schema."""
+        now = time.time()
+        with self._lock:
+            cached = self._table_rows.get((database, table))
+            if cached and now - cached[1] < self.refresh_seconds:
+                return cached[0]
+
+        try:
+            row = self.db_manager.execute_query(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s",
+                params=(database, table), fetch_one=True
+            )
+            rows = int(row['TABLE_ROWS'] or 0) if row else 0
+        except Exception as e:
+            logger.warning(f"Could not read row estimate for {database}.{table}: {e}")
+            rows = 0
+
+        with self._lock:
+            self._table_rows[(database, table)] = (rows, now)
+        return rows
+
+    def invalidate(self) -> None:
+        """Forget cached replica and table-size metadata."""
+        with self._lock:
+            self._replicas = {}
+            self._replicas_loaded_at = 0.0
+            self._table_rows.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get routing statistics."""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'min_table_rows': self.min_table_rows,
+                'tables_with_tiflash_replica': sum(1 for available in (self._replicas or {}).values() if available),
+                **self._stats
+            }
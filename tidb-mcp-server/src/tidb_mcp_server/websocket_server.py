@@ -8,20 +8,25 @@ import json
 import logging
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Set
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from enum import Enum
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
 
+from . import tracing
 from .mcp_tools import (
     discover_databases,
     discover_tables,
     get_table_schema,
+    get_table_schemas,
     get_sample_data,
+    get_sample_data_batch,
     execute_query,
     validate_query,
+    predict_query_latency,
     get_server_stats
 )
 from .llm_tools import (
@@ -46,10 +51,34 @@ class MessageType(Enum):
     PONG = "pong"
 
 
+# Slow-consumer policies applied when an agent's outbound queue is full
+POLICY_DROP_OLDEST = "drop_oldest"
+POLICY_COALESCE = "coalesce"
+POLICY_DISCONNECT = "disconnect"
+SLOW_CONSUMER_POLICIES = (POLICY_DROP_OLDEST, POLICY_COALESCE, POLICY_DISCONNECT)
+
+# Tables per get_table_schemas call when building a schema context
+SCHEMA_BATCH_SIZE = 100
+
+
 class AgentConnection:
-    """Represents a connected agent with metadata"""
+    """
+    Represents a connected agent with metadata.
+    
+    Outbound messages go through a bounded per-connection queue drained by a
+    dedicated writer task, so a slow agent only delays its own messages. When
+    the queue is full, events are handled by the slow-consumer policy:
+    ``drop_oldest`` discards the oldest queued event, ``coalesce`` replaces a
+    queued event of the same name (falling back to dropping the oldest) and
+    ``disconnect`` closes the connection. Responses to requests are never dropped.
+    """
     
-    def __init__(self, websocket: WebSocket, agent_id: str, agent_type: str = "unknown"):
+    def __init__(self, websocket: WebSocket, agent_id: str, agent_type: str = "unknown",
+                 max_queue_size: int = 256, slow_consumer_policy: str = POLICY_DROP_OLDEST):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy '{slow_consumer_policy}'. "
+                             f"Must be one of: {list(SLOW_CONSUMER_POLICIES)}")
+        
         self.websocket = websocket
         self.agent_id = agent_id
         self.agent_type = agent_type
@@ -59,17 +88,144 @@ class AgentConnection:
         self.total_latency = 0.0
         self.capabilities = []
         
+        # Outbound queue of (message, event name or None for non-droppable messages)
+        self.max_queue_size = max_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self._outbound: Deque[Tuple[Dict[str, Any], Optional[str]]] = deque()
+        self._outbound_ready = asyncio.Event()
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.queue_stats = {
+            "sent": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "max_depth": 0,
+            "send_failures": 0,
+            "last_send_ms": 0.0
+        }
+        
     @property
     def avg_latency(self) -> float:
         return self.total_latency / self.request_count if self.request_count > 0 else 0.0
     
-    async def send_message(self, message: Dict[str, Any]) -> bool:
-        """Send message to agent with proper connection state validation"""
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting to be written to the agent."""
+        return len(self._outbound)
+    
+    @property
+    def is_closed(self) -> bool:
+        """Whether the connection stopped accepting outbound messages."""
+        return self._closed
+    
+    def start_writer(self) -> None:
+        """Start the task that writes queued messages to the WebSocket."""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer_loop())
+    
+    async def close(self) -> None:
+        """Stop the writer task and discard queued messages."""
+        self._closed = True
+        self._outbound.clear()
+        if self._writer_task and not self._writer_task.done() and self._writer_task is not asyncio.current_task():
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+    
+    def enqueue(self, message: Dict[str, Any], event_name: Optional[str] = None) -> bool:
+        """
+        Queue a message for the writer task without waiting for it to be sent.
+        
+        Args:
+            message: Message to send
+            event_name: Event name for droppable event messages; None for responses,
+                which are always queued
+            
+        Returns:
+            True if the message was queued, False if it was rejected
+        """
+        if self._closed:
+            return False
+        
+        if event_name is not None:
+            if self.slow_consumer_policy == POLICY_COALESCE and self._coalesce(message, event_name):
+                return True
+            if len(self._outbound) >= self.max_queue_size:
+                if self.slow_consumer_policy == POLICY_DISCONNECT:
+                    logger.warning(f"Disconnecting slow agent {self.agent_id}: "
+                                   f"outbound queue full ({len(self._outbound)} messages)")
+                    self.queue_stats["dropped"] += 1
+                    self._closed = True
+                    asyncio.create_task(self._disconnect_slow_consumer())
+                    return False
+                if not self._drop_oldest_event():
+                    # Only responses are queued; never drop those for an event
+                    self.queue_stats["dropped"] += 1
+                    return False
+        
+        self._outbound.append((message, event_name))
+        self.queue_stats["max_depth"] = max(self.queue_stats["max_depth"], len(self._outbound))
+        self._outbound_ready.set()
+        return True
+    
+    def _coalesce(self, message: Dict[str, Any], event_name: str) -> bool:
+        """Replace a queued event of the same name with a newer one."""
+        for index, (_, queued_event_name) in enumerate(self._outbound):
+            if queued_event_name == event_name:
+                self._outbound[index] = (message, event_name)
+                self.queue_stats["coalesced"] += 1
+                return True
+        return False
+    
+    def _drop_oldest_event(self) -> bool:
+        """Drop the oldest queued event to make room."""
+        for index, (_, queued_event_name) in enumerate(self._outbound):
+            if queued_event_name is not None:
+                del self._outbound[index]
+                self.queue_stats["dropped"] += 1
+                return True
+        return False
+    
+    async def _disconnect_slow_consumer(self) -> None:
+        """Close a connection that cannot keep up with its outbound messages."""
+        await self.close()
+        try:
+            await self.websocket.close(code=1008, reason="Outbound queue overflow")
+        except Exception as e:
+            logger.debug(f"Error closing WebSocket for {self.agent_id}: {e}")
+    
+    async def _writer_loop(self) -> None:
+        """Write queued messages to the WebSocket in order."""
+        while not self._closed:
+            if not self._outbound:
+                self._outbound_ready.clear()
+                await self._outbound_ready.wait()
+                continue
+            
+            message, _ = self._outbound.popleft()
+            start = time.perf_counter()
+            if not await self._write(message):
+                self.queue_stats["send_failures"] += 1
+                if not self._is_connected():
+                    self._closed = True
+                    self._outbound.clear()
+                    break
+                continue
+            self.queue_stats["sent"] += 1
+            self.queue_stats["last_send_ms"] = (time.perf_counter() - start) * 1000
+    
+    def _is_connected(self) -> bool:
+        return bool(self.websocket and 
+                    hasattr(self.websocket, 'client_state') and 
+                    self.websocket.client_state == WebSocketState.CONNECTED)
+    
+    async def _write(self, message: Dict[str, Any]) -> bool:
+        """Send one message with proper connection state validation"""
         try:
             # Check if websocket exists and is in connected state
-            if (self.websocket and 
-                hasattr(self.websocket, 'client_state') and 
-                self.websocket.client_state == WebSocketState.CONNECTED):
+            if self._is_connected():
                 await self.websocket.send_text(json.dumps(message))
                 return True
             else:
@@ -79,6 +235,22 @@ class AgentConnection:
             logger.error(f"Failed to send message to {self.agent_id}: {e}")
         return False
     
+    async def send_message(self, message: Dict[str, Any]) -> bool:
+        """Queue a response message for the agent; it is never dropped by the slow-consumer policy"""
+        if self._writer_task is None:
+            # Not started yet (e.g. used outside the manager): write directly
+            return await self._write(message)
+        return self.enqueue(message)
+    
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get outbound queue metrics for this connection."""
+        return {
+            "depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "policy": self.slow_consumer_policy,
+            **self.queue_stats
+        }
+    
     def update_stats(self, latency: float):
         """Update connection statistics"""
         self.request_count += 1
@@ -92,8 +264,15 @@ class WebSocketMCPServerManager:
     with intelligent routing, batching, and real-time event broadcasting.
     """
     
-    def __init__(self, app: FastAPI):
+    def __init__(self, app: FastAPI, outbound_queue_size: int = 256,
+                 slow_consumer_policy: str = POLICY_DROP_OLDEST):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy '{slow_consumer_policy}'. "
+                             f"Must be one of: {list(SLOW_CONSUMER_POLICIES)}")
+        
         self.app = app
+        self.outbound_queue_size = outbound_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
         self.connected_agents: Dict[str, AgentConnection] = {}
         self.agent_types: Dict[str, Set[str]] = {}  # agent_type -> set of agent_ids
         
@@ -111,6 +290,7 @@ class WebSocketMCPServerManager:
             "total_requests": 0,
             "batch_requests": 0,
             "events_broadcast": 0,
+            "events_rejected": 0,
             "avg_response_time": 0.0
         }
         
@@ -138,11 +318,17 @@ class WebSocketMCPServerManager:
             "discover_databases": self._handle_discover_databases,
             "discover_tables": self._handle_discover_tables,
             "get_table_schema": self._handle_get_table_schema,
+            "get_table_schemas": self._handle_get_table_schemas,
+            "get_table_schemas_tool": self._handle_get_table_schemas,
             "get_sample_data": self._handle_get_sample_data,
+            "get_sample_data_batch": self._handle_get_sample_data_batch,
+            "get_sample_data_batch_tool": self._handle_get_sample_data_batch,
             "execute_query": self._handle_execute_query,
             "execute_query_tool": self._handle_execute_query,
             "validate_query": self._handle_validate_query,
             "validate_query_tool": self._handle_validate_query,
+            "predict_query_latency": self._handle_predict_query_latency,
+            "predict_query_latency_tool": self._handle_predict_query_latency,
             "get_server_stats": self._handle_get_server_stats,
             "build_schema_context": self._handle_build_schema_context
         })
@@ -198,8 +384,13 @@ class WebSocketMCPServerManager:
                 capabilities = payload.get("capabilities", [])
                 
                 # Create agent connection
-                agent_connection = AgentConnection(websocket, agent_id, agent_type)
+                agent_connection = AgentConnection(
+                    websocket, agent_id, agent_type,
+                    max_queue_size=self.outbound_queue_size,
+                    slow_consumer_policy=self.slow_consumer_policy
+                )
                 agent_connection.capabilities = capabilities
+                agent_connection.start_writer()
                 
                 # Register agent
                 self.connected_agents[agent_id] = agent_connection
@@ -248,6 +439,9 @@ class WebSocketMCPServerManager:
             logger.error(f"WebSocket error for {agent_id}: {e}")
         finally:
             # Cleanup agent connection
+            if agent_connection:
+                await agent_connection.close()
+            
             if agent_id and agent_id in self.connected_agents:
                 agent_connection = self.connected_agents[agent_id]
                 del self.connected_agents[agent_id]
@@ -300,13 +494,17 @@ class WebSocketMCPServerManager:
         try:
             # Route request to appropriate handler
             if method in self.request_handlers:
-                result = await self.request_handlers[method](params)
-                
-                response = {
-                    "type": MessageType.RESPONSE.value,
-                    "request_id": request_id,
-                    "payload": result
-                }
+                params.setdefault("client_id", agent_id)
+                with tracing.server_span(f"mcp.{method}", message.get(tracing.TRACEPARENT),
+                                         service="tidb-mcp-server", transport="websocket"):
+                    result = await self.request_handlers[method](params)
+                    
+                    response = {
+                        "type": MessageType.RESPONSE.value,
+                        "request_id": request_id,
+                        "payload": result,
+                        **tracing.response_fields()
+                    }
                 
                 await self._send_to_agent(agent_id, response)
             else:
@@ -330,6 +528,7 @@ class WebSocketMCPServerManager:
             for req in requests:
                 method = req.get("method")
                 params = req.get("params", {})
+                params.setdefault("client_id", agent_id)
                 
                 if method in self.request_handlers:
                     task = self.request_handlers[method](params)
@@ -398,7 +597,7 @@ class WebSocketMCPServerManager:
     async def _handle_discover_databases(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle discover databases request"""
         try:
-            databases = discover_databases()
+            databases = await asyncio.to_thread(discover_databases)
             return {"success": True, "databases": databases}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -410,7 +609,7 @@ class WebSocketMCPServerManager:
             if not database:
                 return {"success": False, "error": "Database parameter required"}
             
-            tables = discover_tables(database)
+            tables = await asyncio.to_thread(discover_tables, database)
             return {"success": True, "tables": tables}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -424,7 +623,7 @@ class WebSocketMCPServerManager:
             if not database or not table:
                 return {"success": False, "error": "Database and table parameters required"}
             
-            schema = get_table_schema(database, table)
+            schema = await asyncio.to_thread(get_table_schema, database, table)
             return {"success": True, "schema": schema}
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -439,22 +638,59 @@ class WebSocketMCPServerManager:
             if not database or not table:
                 return {"success": False, "error": "Database and table parameters required"}
             
-            sample_data = get_sample_data(database, table, limit)
+            sample_data = await asyncio.to_thread(get_sample_data, database, table, limit)
             return {"success": True, "sample_data": sample_data}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    async def _handle_get_table_schemas(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle multi-table schema request"""
+        try:
+            database = params.get("database")
+            tables = params.get("tables")
+            
+            if not database or not tables:
+                return {"success": False, "error": "Database and tables parameters required"}
+            
+            return await asyncio.to_thread(get_table_schemas, database, tables)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    async def _handle_get_sample_data_batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle multi-table sample data request"""
+        try:
+            database = params.get("database")
+            tables = params.get("tables")
+            limit = params.get("limit", 10)
+            masked_columns = params.get("masked_columns")
+            
+            if not database or not tables:
+                return {"success": False, "error": "Database and tables parameters required"}
+            
+            return await asyncio.to_thread(get_sample_data_batch, database, tables, limit, masked_columns)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
     async def _handle_execute_query(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle execute query request"""
         try:
             query = params.get("query")
             timeout = params.get("timeout")
             use_cache = params.get("use_cache", True)
+            client_id = params.get("client_id")
+            priority = params.get("priority", "interactive")
+            approximate = params.get("approximate", False)
+            sample_fraction = params.get("sample_fraction")
+            query_params = params.get("params")
             
             if not query:
                 return {"success": False, "error": "Query parameter required"}
             
-            result = execute_query(query, timeout, use_cache)
+            # Waiting for a scheduler slot blocks, so keep it off the event loop
+            result = await asyncio.to_thread(
+                execute_query, query, timeout, use_cache, client_id, priority,
+                approximate, sample_fraction, query_params
+            )
             return result
         except Exception as e:
             return {"success": False, "error": str(e)}
@@ -471,6 +707,18 @@ class WebSocketMCPServerManager:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    async def _handle_predict_query_latency(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle query latency prediction request"""
+        try:
+            query = params.get("query")
+            if not query:
+                return {"success": False, "error": "Query parameter required"}
+            
+            result = predict_query_latency(query)
+            return {"success": "error" not in result, **result}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
     async def _handle_generate_sql(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Handle generate SQL request"""
         try:
@@ -528,7 +776,7 @@ class WebSocketMCPServerManager:
             
             # If no databases specified, discover available databases
             if not databases:
-                databases = discover_databases()
+                databases = await asyncio.to_thread(discover_databases)
             
             schema_context = {
                 "databases": {},
@@ -547,24 +795,29 @@ class WebSocketMCPServerManager:
                         database_name = str(database)
                     
                     # Get tables for this database
-                    tables = discover_tables(database_name)
+                    tables = await asyncio.to_thread(discover_tables, database_name)
                     database_info = {
                         "name": database_name,
                         "tables": {},
                         "table_count": len(tables)
                     }
                     
-                    for table in tables:
+                    # Fetch schemas in bulk, one batch per SCHEMA_BATCH_SIZE tables (ensure names are strings)
+                    table_names = [table.get("name") if isinstance(table, dict) else str(table) for table in tables]
+                    for start in range(0, len(table_names), SCHEMA_BATCH_SIZE):
+                        batch = table_names[start:start + SCHEMA_BATCH_SIZE]
                         try:
-                            # Get schema for each table (ensure table is string)
-                            table_name = table.get("name") if isinstance(table, dict) else str(table)
-                            schema = get_table_schema(database_name, table_name)
+                            batch_result = await asyncio.to_thread(get_table_schemas, database_name, batch)
+                        except Exception as e:
+                            logger.warning(f"Failed to get schemas for {len(batch)} tables in {database_name}: {e}")
+                            batch_result = {"tables": {}, "errors": {table_name: str(e) for table_name in batch}}
+                        
+                        for table_name, schema in batch_result["tables"].items():
                             database_info["tables"][table_name] = schema
                             schema_context["total_columns"] += len(schema.get("columns", []))
-                        except Exception as e:
-                            table_name = table.get("name") if isinstance(table, dict) else str(table)
-                            logger.warning(f"Failed to get schema for {database_name}.{table_name}: {e}")
-                            database_info["tables"][table_name] = {"error": str(e)}
+                        for table_name, error in batch_result["errors"].items():
+                            logger.warning(f"Failed to get schema for {database_name}.{table_name}: {error}")
+                            database_info["tables"][table_name] = {"error": error}
                     
                     schema_context["databases"][database_name] = database_info
                     schema_context["tables"].extend([f"{database_name}.{table.get('name') if isinstance(table, dict) else str(table)}" for table in tables])
@@ -616,7 +869,8 @@ class WebSocketMCPServerManager:
                 "connected_at": connection.connected_at.isoformat(),
                 "request_count": connection.request_count,
                 "avg_latency": connection.avg_latency,
-                "capabilities": connection.capabilities
+                "capabilities": connection.capabilities,
+                "outbound_queue": connection.get_queue_stats()
             }
         
         return {
@@ -642,12 +896,23 @@ class WebSocketMCPServerManager:
             else:
                 logger.warning(f"Agent {agent_id} connection is not healthy, removing from active connections")
                 # Remove unhealthy connection
+                await connection.close()
                 del self.connected_agents[agent_id]
                 if connection.agent_type in self.agent_types:
                     self.agent_types[connection.agent_type].discard(agent_id)
                 self.metrics["active_connections"] = len(self.connected_agents)
         return False
     
+    def _enqueue_event(self, agent_id: str, event_message: Dict[str, Any]) -> bool:
+        """Queue an event for an agent without waiting for slow connections"""
+        connection = self.connected_agents.get(agent_id)
+        if connection is None or connection.is_closed:
+            return False
+        if connection.enqueue(event_message, event_name=event_message["event_name"]):
+            return True
+        self.metrics["events_rejected"] += 1
+        return False
+    
     async def _send_error(
         self,
         agent_id: str,
@@ -716,11 +981,8 @@ class WebSocketMCPServerManager:
         if not target_agents and not agent_types and not agent_ids:
             target_agents = set(self.connected_agents.keys())
         
-        # Send to target agents
-        sent_count = 0
-        for agent_id in target_agents:
-            if await self._send_to_agent(agent_id, event_message):
-                sent_count += 1
+        # Queue for every target at once; each connection's writer task sends at its own pace
+        sent_count = sum(1 for agent_id in target_agents if self._enqueue_event(agent_id, event_message))
         
         self.metrics["events_broadcast"] += 1
         logger.info(f"Broadcasted event '{event_name}' to {sent_count} agents")
@@ -789,6 +1051,7 @@ class WebSocketMCPServerManager:
                             # Continue with cleanup even if close fails
                     
                     # Remove from tracking
+                    await connection.close()
                     del self.connected_agents[agent_id]
                     
                     if connection.agent_type in self.agent_types:
@@ -819,7 +1082,7 @@ class WebSocketMCPServerManager:
         }
         
         for agent_id in list(self.connected_agents.keys()):
-            await self._send_to_agent(agent_id, heartbeat_message)
+            self._enqueue_event(agent_id, heartbeat_message)
     
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get connection statistics"""
@@ -835,5 +1098,14 @@ class WebSocketMCPServerManager:
             "total_requests": self.metrics["total_requests"],
             "batch_requests": self.metrics["batch_requests"],
             "events_broadcast": self.metrics["events_broadcast"],
-            "avg_response_time": self.metrics["avg_response_time"]
+            "events_rejected": self.metrics["events_rejected"],
+            "avg_response_time": self.metrics["avg_response_time"],
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "outbound_queues": {
+                agent_id: connection.get_queue_stats()
+                for agent_id, connection in self.connected_agents.items()
+            },
+            "outbound_queue_depth_total": sum(
+                connection.queue_depth for connection in self.connected_agents.values()
+            )
         }
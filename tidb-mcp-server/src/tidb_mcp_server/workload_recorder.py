@@ -0,0 +1,328 @@
+"""
+Query workload recorder for TiDB MCP Server.
+
+This module aggregates the queries actually executed against TiDB by
+fingerprint (the query text with literals replaced by placeholders) and
+records, for each fingerprint, how often it ran, how long it took, and which
+columns it used in predicates, joins and GROUP BY clauses. The schema advisor
+uses these aggregates to rank index and partition suggestions by the latency
+they would save across the real workload.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ROLE_PREDICATE = "predicate"
+ROLE_RANGE = "range"
+ROLE_JOIN = "join"
+ROLE_GROUP_BY = "group_by"
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+_IDENTIFIER = r"`?[A-Za-z_][\w$]*`?"
+_COLUMN_REF = rf"(?:({_IDENTIFIER})\s*\.\s*)?({_IDENTIFIER})"
+_TABLE_REF = re.compile(
+    rf"\b(?:FROM|JOIN)\s+((?:{_IDENTIFIER}\s*\.\s*)?{_IDENTIFIER})(?:\s+(?:AS\s+)?({_IDENTIFIER}))?",
+    re.IGNORECASE
+)
+_COMPARISON = re.compile(
+    rf"{_COLUMN_REF}\s*(=|<=>|<>|!=|<=|>=|<|>|\bNOT\s+IN\b|\bIN\b|\bNOT\s+LIKE\b|\bLIKE\b|\bBETWEEN\b|\bIS\b)",
+    re.IGNORECASE
+)
+_JOIN_EQUALITY = re.compile(rf"{_COLUMN_REF}\s*=\s*{_COLUMN_REF}", re.IGNORECASE)
+_CLAUSE_END = r"(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|\bLIMIT\b|\bUNION\b|\bWINDOW\b|$)"
+_WHERE_CLAUSE = re.compile(rf"\b(?:WHERE|HAVING)\b(.*?){_CLAUSE_END}", re.IGNORECASE | re.DOTALL)
+_ON_CLAUSE = re.compile(
+    r"\bON\b(.*?)(?=\b(?:INNER|LEFT|RIGHT|CROSS|FULL|NATURAL)?\s*JOIN\b|\bWHERE\b|\bGROUP\s+BY\b|"
+    r"\bORDER\s+BY\b|\bHAVING\b|\bLIMIT\b|\bUNION\b|$)",
+    re.IGNORECASE | re.DOTALL
+)
+_GROUP_BY_CLAUSE = re.compile(r"\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|\bUNION\b|\)|$)",
+                              re.IGNORECASE | re.DOTALL)
+_USE_STATEMENT = re.compile(rf"^\s*USE\s+({_IDENTIFIER})\s*;", re.IGNORECASE)
+
+# Words that can follow a table name but are not aliases
+_NON_ALIAS_WORDS = {
+    'WHERE', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'OUTER', 'CROSS', 'FULL', 'NATURAL', 'ON',
+    'USING', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'UNION', 'AS', 'WINDOW', 'STRAIGHT_JOIN'
+}
+_NON_COLUMN_WORDS = {
+    'AND', 'OR', 'NOT', 'NULL', 'TRUE', 'FALSE', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END',
+    'EXISTS', 'INTERVAL', 'SELECT', 'DISTINCT', 'ASC', 'DESC', 'WITH', 'ROLLUP'
+}
+
+
+def _strip_quotes(identifier: str) -> str:
+    return identifier.strip('`')
+
+
+def fingerprint_query(query: str) -> tuple[str, str]:
+    """
+    Normalize a query into its fingerprint.
+
+    String and numeric literals become ``?`` placeholders, IN-lists collapse to a
+    single placeholder and whitespace and keyword case are normalized, so queries
+    that differ only in their constants share a fingerprint.
+
+    Args:
+        query: SQL query text
+
+    Returns:
+        Tuple of (fingerprint hash, normalized query text)
+    """
+    normalized = _STRING_LITERAL.sub('?', query)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (?)', normalized)
+    normalized = ' '.join(normalized.split()).lower().rstrip(';').strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16], normalized
+
+
+@dataclass
+class QueryColumnUsage:
+    """Tables and columns referenced by a single query, by role."""
+
+    database: str | None = None
+    tables: dict[str, tuple[str | None, str]] = field(default_factory=dict)  # alias -> (database, table)
+    columns: set[tuple[str | None, str | None, str, str]] = field(default_factory=set)  # (db, table, column, role)
+    references: list[tuple[str, str | None, str]] = field(default_factory=list)  # (name in query, db, table)
+
+    def resolve(self, qualifier: str | None) -> tuple[str | None, str | None]:
+        """Resolve a column qualifier (alias or table name) to a (database, table) pair."""
+        if qualifier:
+            return self.tables.get(_strip_quotes(qualifier).lower(), (None, None))
+        distinct_tables = set(self.tables.values())
+        if len(distinct_tables) == 1:
+            return next(iter(distinct_tables))
+        return None, None  # Ambiguous without schema information
+
+
+def extract_column_usage(query: str) -> QueryColumnUsage:
+    """
+    Extract the tables and the predicate, join and GROUP BY columns of a query.
+
+    This is a lightweight regex-based analysis aimed at the SELECT statements the
+    executor accepts; it does not attempt to fully parse SQL. Unqualified columns
+    in multi-table queries are left unresolved (table ``None``).
+
+    Args:
+        query: SQL query text
+
+    Returns:
+        QueryColumnUsage describing the query
+    """
+    usage = QueryColumnUsage()
+
+    use_match = _USE_STATEMENT.match(query)
+    if use_match:
+        usage.database = _strip_quotes(use_match.group(1))
+        query = query[use_match.end():]
+
+    # Literals may contain anything, including keywords, so drop them first
+    query = _STRING_LITERAL.sub('?', query)
+
+    for match in _TABLE_REF.finditer(query):
+        name, alias = match.group(1), match.group(2)
+        parts = [_strip_quotes(part.strip()) for part in name.split('.')]
+        database, table = (parts[0], parts[1]) if len(parts) == 2 else (usage.database, parts[0])
+        if table.upper() in _NON_COLUMN_WORDS:
+            continue
+        usage.tables[table.lower()] = (database, table)
+        if alias and alias.upper() not in _NON_ALIAS_WORDS:
+            usage.tables[_strip_quotes(alias).lower()] = (database, table)
+            usage.references.append((_strip_quotes(alias), database, table))
+        else:
+            usage.references.append(('.'.join(parts), database, table))
+
+    def add_column(qualifier: str | None, column: str, role: str) -> None:
+        column = _strip_quotes(column)
+        if column.upper() in _NON_COLUMN_WORDS or column == '?':
+            return
+        database, table = usage.resolve(qualifier)
+        if qualifier and table is None:
+            return  # Qualifier refers to a derived table or subquery
+        usage.columns.add((database, table, column, role))
+
+    for clause in _WHERE_CLAUSE.findall(query):
+        for qualifier, column, operator in _COMPARISON.findall(clause):
+            is_range = operator.strip().upper() in {'<', '>', '<=', '>=', 'BETWEEN'}
+            add_column(qualifier or None, column, ROLE_RANGE if is_range else ROLE_PREDICATE)
+
+    for clause in _ON_CLAUSE.findall(query):
+        for left_qualifier, left_column, right_qualifier, right_column in _JOIN_EQUALITY.findall(clause):
+            add_column(left_qualifier or None, left_column, ROLE_JOIN)
+            add_column(right_qualifier or None, right_column, ROLE_JOIN)
+
+    for clause in _GROUP_BY_CLAUSE.findall(query):
+        for item in clause.split(','):
+            match = re.fullmatch(rf"\s*{_COLUMN_REF}\s*", item)
+            if match:
+                add_column(match.group(1) or None, match.group(2), ROLE_GROUP_BY)
+
+    return usage
+
+
+class _FingerprintStats:
+    """Aggregated execution statistics for one query fingerprint."""
+
+    __slots__ = ("normalized", "usage", "count", "total_latency_ms", "max_latency_ms")
+
+    def __init__(self, normalized: str, usage: QueryColumnUsage):
+        self.normalized = normalized
+        self.usage = usage
+        self.count = 0
+        self.total_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+
+    def record(self, latency_ms: float) -> None:
+        self.count += 1
+        self.total_latency_ms += latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "query": self.normalized[:500],
+            "count": self.count,
+            "total_latency_ms": round(self.total_latency_ms, 2),
+            "avg_latency_ms": round(self.total_latency_ms / self.count, 2) if self.count else 0.0,
+            "max_latency_ms": round(self.max_latency_ms, 2),
+            "tables": sorted({table for _, table in self.usage.tables.values()}),
+        }
+
+
+class WorkloadRecorder:
+    """
+    Thread-safe recorder of executed queries aggregated by fingerprint.
+
+    Each new fingerprint is analyzed once; subsequent executions only update
+    counters. When ``max_fingerprints`` is reached the least frequently executed
+    fingerprint is dropped to make room.
+    """
+
+    def __init__(self, max_fingerprints: int = 1000):
+        """
+        Initialize the workload recorder.
+
+        Args:
+            max_fingerprints: Maximum number of distinct fingerprints to retain
+        """
+        self.max_fingerprints = max_fingerprints
+        self._lock = threading.Lock()
+        self._fingerprints: dict[str, _FingerprintStats] = {}
+
+    def record(self, query: str, latency_ms: float) -> str | None:
+        """
+        Record one execution of a query.
+
+        Only SELECT queries (optionally preceded by USE) are recorded; schema
+        discovery statements carry no useful workload information.
+
+        Args:
+            query: SQL query text as executed
+            latency_ms: Database latency of this execution in milliseconds
+
+        Returns:
+            The query fingerprint, or None if the query was not recorded
+        """
+        statement = _USE_STATEMENT.sub('', query, count=1).lstrip()
+        if not statement[:6].upper() == 'SELECT':
+            return None
+
+        fingerprint, normalized = fingerprint_query(query)
+
+        with self._lock:
+            stats = self._fingerprints.get(fingerprint)
+            if stats is None:
+                if len(self._fingerprints) >= self.max_fingerprints:
+                    coldest = min(self._fingerprints, key=lambda key: self._fingerprints[key].count)
+                    del self._fingerprints[coldest]
+                stats = _FingerprintStats(normalized, extract_column_usage(query))
+                self._fingerprints[fingerprint] = stats
+            stats.record(latency_ms)
+
+        return fingerprint
+
+    def get_column_usage(self, database: str | None = None, table: str | None = None,
+                         table_columns: set[str] | None = None) -> dict[tuple[str, str], dict[str, Any]]:
+        """
+        Aggregate recorded column usage per (table, column).
+
+        Args:
+            database: Only include columns of tables in this database (tables with an
+                unknown database are included as well)
+            table: Only include columns of this table
+            table_columns: Lowercase column names of ``table``; when given, unqualified
+                columns of multi-table queries that reference ``table`` are attributed
+                to it if it has a column of that name
+
+        Returns:
+            Mapping of (table, column) to a dictionary with per-role execution counts
+            (``roles``), the total latency of the queries using the column
+            (``total_latency_ms``) and the number of distinct fingerprints
+        """
+        usage: dict[tuple[str, str], dict[str, Any]] = defaultdict(
+            lambda: {"roles": defaultdict(int), "total_latency_ms": 0.0, "fingerprints": 0}
+        )
+
+        with self._lock:
+            for stats in self._fingerprints.values():
+                seen = set()
+                for column_db, column_table, column, role in stats.usage.columns:
+                    if column_table is None:
+                        if not (table and table_columns and column.lower() in table_columns):
+                            continue
+                        if table.lower() not in {name.lower() for _, name in stats.usage.tables.values()}:
+                            continue
+                        column_table = table
+                    if database and column_db and column_db.lower() != database.lower():
+                        continue
+                    if table and column_table.lower() != table.lower():
+                        continue
+                    key = (column_table.lower(), column.lower())
+                    entry = usage[key]
+                    entry["roles"][role] += stats.count
+                    if key not in seen:
+                        entry["total_latency_ms"] += stats.total_latency_ms
+                        entry["fingerprints"] += 1
+                        seen.add(key)
+
+        return {key: {**value, "roles": dict(value["roles"])} for key, value in usage.items()}
+
+    def get_total_latency_ms(self) -> float:
+        """Get the total recorded database latency across all fingerprints."""
+        with self._lock:
+            return sum(stats.total_latency_ms for stats in self._fingerprints.values())
+
+    def get_stats(self, top: int = 10) -> dict[str, Any]:
+        """
+        Get workload statistics.
+
+        Args:
+            top: Number of fingerprints to list, ordered by total latency
+
+        Returns:
+            Dictionary with fingerprint counts and the most expensive fingerprints
+        """
+        with self._lock:
+            ranked = sorted(self._fingerprints.items(), key=lambda item: item[1].total_latency_ms, reverse=True)
+            return {
+                "fingerprints": len(self._fingerprints),
+                "executions": sum(stats.count for stats in self._fingerprints.values()),
+                "total_latency_ms": round(sum(stats.total_latency_ms for stats in self._fingerprints.values()), 2),
+                "top_fingerprints": [
+                    {"fingerprint": fingerprint, **stats.to_dict()} for fingerprint, stats in ranked[:top]
+                ],
+            }
+
+    def clear(self) -> None:
+        """Forget all recorded workload."""
+        with self._lock:
+            self._fingerprints.clear()